@@ -27,13 +27,16 @@ import base64
 from datetime import datetime
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-import hashlib
-import json
 
 from core.base_agent import BaseAgent
 from core.api_schemas import TaskResult
 from core.logger import get_logger
 from core.exceptions import ValidationError, WorkflowError
+from core.mesh_kernels import (
+    face_normals, grid_faces, grid_vertices, laplacian_smooth, mesh_volume,
+    surface_area, taubin_smooth
+)
+from core.result_cache import DEFAULT_CACHE_DIR, get_result_cache, make_result_key, warm_from_directory
 
 class ProcessingMode:
     """Processing mode constants"""
@@ -93,8 +96,8 @@ class AdvancedImageProcessor(BaseAgent):
         # Initialize thread pool for parallel processing
         self.thread_pool = ThreadPoolExecutor(max_workers=self.default_params['max_processing_threads'])
         
-        # Cache for processed results
-        self.processing_cache = {}
+        # Processed results, shared with the other image-to-3D consumers
+        self.result_cache = get_result_cache(self.config.get('result_cache_dir', DEFAULT_CACHE_DIR))
     
     async def process_image_advanced(self, image_data: bytes, image_filename: str, 
                                    processing_params: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -119,9 +122,11 @@ class AdvancedImageProcessor(BaseAgent):
             cache_key = self._generate_cache_key(image_data, params)
             
             # Check cache if enabled
-            if params['enable_caching'] and cache_key in self.processing_cache:
-                self.logger.info(f"Using cached result for {image_filename}")
-                return self.processing_cache[cache_key]
+            if params['enable_caching']:
+                cached = await self.result_cache.get_async(cache_key)
+                if cached is not None:
+                    self.logger.info(f"Using cached result for {image_filename}")
+                    return cached
             
             # Step 1: Load and enhance image
             image_array = await self._load_and_enhance_image(image_data, params)
@@ -161,7 +166,7 @@ class AdvancedImageProcessor(BaseAgent):
             
             # Cache result if enabled
             if params['enable_caching']:
-                self.processing_cache[cache_key] = result
+                await self.result_cache.put_async(cache_key, result)
             
             self.logger.info(f"Advanced processing completed for {image_filename}")
             return result
@@ -338,15 +343,25 @@ class AdvancedImageProcessor(BaseAgent):
     
     def _generate_cache_key(self, image_data: bytes, params: Dict[str, Any]) -> str:
         """Generate unique cache key for image and parameters"""
-        # Create hash from image data
-        image_hash = hashlib.md5(image_data).hexdigest()[:16]
-        
-        # Create hash from relevant parameters
         cache_params = {k: v for k, v in params.items() if k != 'enable_caching'}
-        params_str = json.dumps(cache_params, sort_keys=True)
-        params_hash = hashlib.md5(params_str.encode()).hexdigest()[:16]
+        return make_result_key('advanced_image_processor', image_data, cache_params)
+    
+    async def warm_cache(self, directory: str = "data/uploads",
+                         processing_params: Dict[str, Any] = None) -> Dict[str, int]:
+        """
+        Precompute cached results for the images in a directory
+        
+        Args:
+            directory: Directory searched recursively for images
+            processing_params: Parameters the results are computed with
+            
+        Returns:
+            Counts of processed and failed images
+        """
+        async def process(image_data: bytes, filename: str) -> None:
+            await self.process_image_advanced(image_data, filename, processing_params)
         
-        return f"{image_hash}_{params_hash}"
+        return await warm_from_directory(process, directory)
     
     def _auto_levels(self, image_array: np.ndarray) -> np.ndarray:
         """Apply auto-levels adjustment to image"""
@@ -528,30 +543,11 @@ class AdvancedImageProcessor(BaseAgent):
             scale_x = params.get('scale_x', 1.0)
             scale_y = params.get('scale_y', 1.0)
             
-            vertices = []
-            faces = []
-            
-            # Create vertex grid
-            for y in range(height):
-                for x in range(width):
-                    vertices.append([
-                        x * scale_x, 
-                        y * scale_y, 
-                        heightmap[y, x]
-                    ])
-            
-            # Create triangular faces
-            for y in range(height - 1):
-                for x in range(width - 1):
-                    # Current vertex indices
-                    v1 = y * width + x
-                    v2 = y * width + (x + 1)
-                    v3 = (y + 1) * width + x
-                    v4 = (y + 1) * width + (x + 1)
-                    
-                    # Two triangles per quad
-                    faces.append([v1, v2, v3])
-                    faces.append([v2, v4, v3])
+            # Vertex grid and two triangles per quad
+            vertex_array = grid_vertices(heightmap, scale_x, scale_y)
+            face_array = grid_faces(height, width)
+            vertices = vertex_array.tolist()
+            faces = face_array.tolist()
             
             self.logger.info(f"Generated heightmap with {len(vertices)} vertices and {len(faces)} faces")
             
@@ -569,7 +565,7 @@ class AdvancedImageProcessor(BaseAgent):
                 'mesh_info': {
                     'vertex_count': len(vertices),
                     'face_count': len(faces),
-                    'surface_area': self._calculate_surface_area(vertices, faces)
+                    'surface_area': self._calculate_surface_area(vertex_array, face_array)
                 }
             }
             
@@ -740,69 +736,21 @@ class AdvancedImageProcessor(BaseAgent):
             resolution = params.get('resolution', 1)  # Every nth pixel
             height, width = depth_map.shape
             
-            vertices = []
-            faces = []
-            normals = []
-            
             # Calculate scale factors
             scale_x = params.get('scale_x', 1.0)
             scale_y = params.get('scale_y', 1.0)
             
-            # Create vertex grid with specified resolution
-            vertex_map = {}  # Maps (row, col) to vertex index
-            vertex_idx = 0
-            
-            for row in range(0, height, resolution):
-                for col in range(0, width, resolution):
-                    x = col * scale_x
-                    y = row * scale_y
-                    z = depth_map[row, col]
-                    
-                    vertices.append([x, y, z])
-                    vertex_map[(row, col)] = vertex_idx
-                    vertex_idx += 1
-            
-            # Generate faces and calculate normals
-            for row in range(0, height - resolution, resolution):
-                for col in range(0, width - resolution, resolution):
-                    # Get vertex indices for this quad
-                    v1_key = (row, col)
-                    v2_key = (row, col + resolution)
-                    v3_key = (row + resolution, col)
-                    v4_key = (row + resolution, col + resolution)
-                    
-                    # Check if all vertices exist
-                    if all(key in vertex_map for key in [v1_key, v2_key, v3_key, v4_key]):
-                        v1 = vertex_map[v1_key]
-                        v2 = vertex_map[v2_key]
-                        v3 = vertex_map[v3_key]
-                        v4 = vertex_map[v4_key]
-                        
-                        # Create two triangles for the quad
-                        faces.append([v1, v2, v3])
-                        faces.append([v2, v4, v3])
-                        
-                        # Calculate normals for surface orientation
-                        # Get vertex positions
-                        p1 = np.array(vertices[v1])
-                        p2 = np.array(vertices[v2])
-                        p3 = np.array(vertices[v3])
-                        p4 = np.array(vertices[v4])
-                        
-                        # Calculate face normals
-                        n1 = np.cross(p2 - p1, p3 - p1)
-                        n2 = np.cross(p4 - p2, p3 - p2)
-                        
-                        # Normalize
-                        if np.linalg.norm(n1) > 0:
-                            n1 = n1 / np.linalg.norm(n1)
-                        if np.linalg.norm(n2) > 0:
-                            n2 = n2 / np.linalg.norm(n2)
-                        
-                        normals.extend([n1.tolist(), n2.tolist()])
+            # Vertex grid of every nth pixel, two triangles per quad and
+            # unit normals per face
+            sampled = depth_map[::resolution, ::resolution]
+            vertex_array = grid_vertices(sampled, scale_x * resolution, scale_y * resolution)
+            face_array = grid_faces(*sampled.shape)
+            vertices = vertex_array.tolist()
+            faces = face_array.tolist()
+            normals = face_normals(vertex_array, face_array).tolist()
             
             # Calculate surface quality metrics
-            surface_area = self._calculate_surface_area(vertices, faces)
+            surface_area = self._calculate_surface_area(vertex_array, face_array)
             surface_roughness = self._calculate_surface_roughness(depth_map, resolution)
             
             # Edge detection for feature analysis
@@ -947,8 +895,14 @@ class AdvancedImageProcessor(BaseAgent):
             
             # Apply surface smoothing if requested
             if params.get('smooth_surface', True):
-                vertices, faces = self._apply_surface_smoothing(vertices, faces, 
-                                                              iterations=params.get('smooth_iterations', 2))
+                smooth_method = params.get('smooth_method', 'laplacian')
+                vertices, faces = self._apply_surface_smoothing(
+                    vertices, faces,
+                    iterations=params.get('smooth_iterations', 2),
+                    method=smooth_method,
+                    lam=params.get('smooth_lambda', 0.5 if smooth_method == 'taubin' else 1.0),
+                    mu=params.get('smooth_mu', -0.53)
+                )
             
             # Add thickness for 3D printing
             if params.get('add_thickness', True):
@@ -1012,24 +966,10 @@ class AdvancedImageProcessor(BaseAgent):
     def _calculate_surface_area(self, vertices: List[List[float]], faces: List[List[int]]) -> float:
         """Calculate total surface area of mesh"""
         try:
-            total_area = 0.0
-            vertices_array = np.array(vertices)
-            
-            for face in faces:
-                if len(face) >= 3:
-                    v1 = vertices_array[face[0]]
-                    v2 = vertices_array[face[1]]
-                    v3 = vertices_array[face[2]]
-                    
-                    # Calculate triangle area using cross product
-                    edge1 = v2 - v1
-                    edge2 = v3 - v1
-                    cross = np.cross(edge1, edge2)
-                    area = 0.5 * np.linalg.norm(cross)
-                    total_area += area
-            
-            return total_area
-        except:
+            if len(faces) == 0:
+                return 0.0
+            return surface_area(vertices, faces)
+        except Exception:
             return 0.0
     
     def _calculate_surface_roughness(self, depth_map: np.ndarray, resolution: int = 1) -> float:
@@ -1062,20 +1002,10 @@ class AdvancedImageProcessor(BaseAgent):
     def _calculate_volume(self, vertices: List[List[float]], faces: List[List[int]]) -> float:
         """Calculate mesh volume using divergence theorem"""
         try:
-            volume = 0.0
-            vertices_array = np.array(vertices)
-            
-            for face in faces:
-                if len(face) >= 3:
-                    v1 = vertices_array[face[0]]
-                    v2 = vertices_array[face[1]]
-                    v3 = vertices_array[face[2]]
-                    
-                    # Calculate signed volume of tetrahedron
-                    volume += np.dot(v1, np.cross(v2, v3)) / 6.0
-            
-            return abs(volume)
-        except:
+            if len(faces) == 0:
+                return 0.0
+            return mesh_volume(vertices, faces)
+        except Exception:
             return 0.0
     
     def _create_base_platform(self, vertices: List[List[float]], thickness: float) -> Tuple[List[List[float]], List[List[int]]]:
@@ -1106,34 +1036,30 @@ class AdvancedImageProcessor(BaseAgent):
         except:
             return [], []
     
-    def _apply_surface_smoothing(self, vertices: List[List[float]], faces: List[List[int]], iterations: int = 2) -> Tuple[List[List[float]], List[List[int]]]:
-        """Apply Laplacian smoothing to surface"""
+    def _apply_surface_smoothing(self, vertices: List[List[float]], faces: List[List[int]], iterations: int = 2,
+                                 method: str = 'laplacian', lam: float = 1.0,
+                                 mu: float = -0.53) -> Tuple[List[List[float]], List[List[int]]]:
+        """
+        Apply Laplacian or Taubin smoothing to surface.
+        
+        Args:
+            vertices: Vertex positions
+            faces: Triangle vertex indices
+            iterations: Smoothing passes (lambda/mu pairs for Taubin)
+            method: 'laplacian' or 'taubin' (keeps volume)
+            lam: Step towards the neighbour mean (1.0 replaces each vertex by it)
+            mu: Inflating step of Taubin smoothing
+        """
         try:
-            # Simple Laplacian smoothing (basic implementation)
-            vertices_array = np.array(vertices)
-            
-            for _ in range(iterations):
-                new_vertices = vertices_array.copy()
-                
-                # For each vertex, average with neighbors
-                for i, vertex in enumerate(vertices_array):
-                    neighbors = []
-                    
-                    # Find neighbor vertices through face connections
-                    for face in faces:
-                        if i in face:
-                            for j in face:
-                                if j != i:
-                                    neighbors.append(j)
-                    
-                    if neighbors:
-                        neighbor_positions = vertices_array[neighbors]
-                        new_vertices[i] = np.mean(neighbor_positions, axis=0)
-                
-                vertices_array = new_vertices
-            
-            return vertices_array.tolist(), faces
-        except:
+            if len(vertices) == 0 or len(faces) == 0 or iterations <= 0:
+                return vertices, faces
+            if method == 'taubin':
+                smoothed = taubin_smooth(vertices, faces, iterations, lam=lam, mu=mu)
+            else:
+                smoothed = laplacian_smooth(vertices, faces, iterations, lam=lam)
+            return smoothed.tolist(), faces
+        except Exception as e:
+            self.logger.warning(f"Surface smoothing failed: {e}")
             return vertices, faces
     
     def _add_surface_thickness(self, vertices: List[List[float]], faces: List[List[int]], thickness: float) -> Tuple[List[List[float]], List[List[int]]]:
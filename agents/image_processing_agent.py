@@ -38,6 +38,7 @@ except ImportError:
 from core.base_agent import BaseAgent
 from core.logger import get_logger
 from core.exceptions import ValidationError, WorkflowError
+from core.result_cache import DEFAULT_CACHE_DIR, get_result_cache, make_result_key, warm_from_directory
 
 class ImageProcessingAgent(BaseAgent):
     """Agent responsible for converting images to 3D models"""
@@ -81,9 +82,14 @@ class ImageProcessingAgent(BaseAgent):
             'depth_smoothing_sigma': 1.0,
             'min_depth_points': 1000,  # Minimum points for 3D reconstruction
             'depth_scale_factor': 10.0,  # Scale factor for depth values (mm)
-            'use_depth_for_extrusion': False  # Whether to use depth for extrusion height
+            'use_depth_for_extrusion': False,  # Whether to use depth for extrusion height
+            # Reuse results for identical images and parameters
+            'enable_caching': True
         }
         
+        # Processed results, shared with the other image-to-3D consumers
+        self.result_cache = get_result_cache(self.config.get('result_cache_dir', DEFAULT_CACHE_DIR))
+        
         # Initialize depth estimation model
         self.depth_model = None
         self.depth_processor = None
@@ -144,6 +150,16 @@ class ImageProcessingAgent(BaseAgent):
             # Merge parameters
             params = {**self.default_params, **(processing_params or {})}
             
+            # Results with and without a loaded depth model differ
+            cache_params = {k: v for k, v in params.items() if k != 'enable_caching'}
+            cache_params['depth_model_loaded'] = self.depth_model is not None
+            cache_key = make_result_key('image_processing_agent', image_data, cache_params)
+            if params['enable_caching']:
+                cached = await self.result_cache.get_async(cache_key)
+                if cached is not None:
+                    self.logger.info(f"Using cached result for {image_filename}")
+                    return cached
+            
             # Step 1: Load and preprocess image
             image_array = self._load_and_preprocess_image(image_data, params)
             
@@ -184,6 +200,9 @@ class ImageProcessingAgent(BaseAgent):
                 }
             }
             
+            if params['enable_caching']:
+                await self.result_cache.put_async(cache_key, result)
+            
             self.logger.info(f"Image processing completed successfully. Found {len(contours)} contours.")
             return result
             
@@ -191,6 +210,23 @@ class ImageProcessingAgent(BaseAgent):
             self.logger.error(f"Error processing image {image_filename}: {str(e)}")
             raise WorkflowError(f"Image processing failed: {str(e)}")
     
+    async def warm_cache(self, directory: str = "data/uploads",
+                         processing_params: Dict[str, Any] = None) -> Dict[str, int]:
+        """
+        Precompute cached results for the images in a directory
+        
+        Args:
+            directory: Directory searched recursively for images
+            processing_params: Parameters the results are computed with
+            
+        Returns:
+            Counts of processed and failed images
+        """
+        async def process(image_data: bytes, filename: str) -> None:
+            await self.process_image_to_3d(image_data, filename, processing_params)
+        
+        return await warm_from_directory(process, directory)
+    
     def _load_and_preprocess_image(self, image_data: bytes, params: Dict[str, Any]) -> np.ndarray:
         """Load image from bytes and preprocess for advanced edge detection"""
         try:
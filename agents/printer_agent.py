@@ -18,7 +18,7 @@ import threading
 import time
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union, Callable
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, Callable
 from datetime import datetime
 from queue import Queue
 from dataclasses import dataclass
@@ -58,6 +58,12 @@ from core.exceptions import (
 )
 from core.api_schemas import TaskResult
 from core.retry_utils import retry_with_backoff
+from core.progress_publisher import ProgressPublisher
+from core.gcode_streaming import (
+    WindowedGCodeStreamer, PrefetchIterator, frame_gcode_line, iter_prepared_gcode,
+    count_streamable_lines, DEFAULT_RX_BUFFER_SIZE, DEFAULT_MAX_LINES_IN_FLIGHT,
+    DEFAULT_PREFETCH_LINES
+)
 
 
 class PrinterStatus(Enum):
@@ -339,12 +345,29 @@ class PrinterAgent(BaseAgent):
         self.print_progress = None
         self.streaming_thread = None
         self.streaming_stop_event = threading.Event()
+        # Pause/resume commands for the streaming thread, which owns the
+        # serial port while _stream_owns_port is set
         self.streaming_queue = Queue()
-        self.progress_callbacks = []
-        self.progress_callbacks_lock = threading.Lock()
-        self.checksum_enabled = self.config.get('gcode', {}).get('streaming', {}).get('checksum_enabled', True)
-        self.chunk_size = self.config.get('gcode', {}).get('streaming', {}).get('chunk_size', 1)
-        self.ack_timeout = self.config.get('gcode', {}).get('streaming', {}).get('ack_timeout', 5)
+        self._stream_owns_port = False
+        streaming_config = self.config.get('gcode', {}).get('streaming', {})
+        self.checksum_enabled = streaming_config.get('checksum_enabled', True)
+        self.chunk_size = streaming_config.get('chunk_size', 1)
+        self.ack_timeout = streaming_config.get('ack_timeout', 5)
+        # 'windowed' keeps several lines in flight on real serial connections,
+        # 'ack' waits for every ok (stop-and-wait)
+        self.streaming_mode = streaming_config.get('mode', 'windowed')
+        self.rx_buffer_size = streaming_config.get('rx_buffer_size', DEFAULT_RX_BUFFER_SIZE)
+        self.max_lines_in_flight = streaming_config.get('max_lines_in_flight', DEFAULT_MAX_LINES_IN_FLIGHT)
+        self.max_resends = streaming_config.get('max_resends', 10)
+        # Lines prepared ahead of the sender; optional directory for line-count index files
+        self.prefetch_lines = streaming_config.get('prefetch_lines', DEFAULT_PREFETCH_LINES)
+        self.line_index_dir = streaming_config.get('line_index_dir')
+        # Progress updates are coalesced to at most progress_max_rate per second
+        self.progress_publisher = ProgressPublisher(
+            max_rate=streaming_config.get('progress_max_rate', 4.0),
+            min_percent_delta=streaming_config.get('progress_min_delta', 1.0)
+        )
+        self.streaming_stats = {}
         
         # Print job management
         self.active_jobs = {}
@@ -1292,8 +1315,10 @@ class PrinterAgent(BaseAgent):
                         self.mock_printer.update_temperatures()
                         self.temperature_data = self.mock_printer.temperature
                         
-                    elif self.serial_connection and self.serial_connection.is_open:
-                        # Check for unrequested messages from printer
+                    elif (self.serial_connection and self.serial_connection.is_open
+                          and not self.streaming_status.is_streaming):
+                        # Check for unrequested messages from printer (while
+                        # streaming, the streamer owns the serial input)
                         if self.serial_connection.in_waiting > 0:
                             message = self.serial_connection.readline().decode('utf-8').strip()
                             self._process_unrequested_message(message)
@@ -1361,14 +1386,21 @@ class PrinterAgent(BaseAgent):
             if not self.mock_mode and self.printer_status not in [PrinterStatus.CONNECTED, PrinterStatus.IDLE]:
                 raise GCodeStreamingError("Printer not connected")
             
-            # Read and prepare G-code
-            gcode_lines = self._prepare_gcode_file(gcode_file)
+            # Prepare G-code lazily: lines are read, numbered and checksummed
+            # on demand behind a bounded prefetch buffer, so the first line
+            # goes out without reading the whole file
+            if not os.path.isfile(gcode_file):
+                raise GCodeStreamingError(f"G-code file not found: {gcode_file}")
+            gcode_lines = PrefetchIterator(
+                iter_prepared_gcode(gcode_file, self.checksum_enabled), self.prefetch_lines
+            )
             
-            # Initialize progress tracking
+            # Initialize progress tracking (the line total arrives from a
+            # background count pass)
             self.print_progress = PrintProgress(
                 job_id=job_id,
                 status=PrintJobStatus.STARTING,
-                lines_total=len(gcode_lines),
+                lines_total=0,
                 gcode_file=gcode_file,
                 start_time=datetime.now()
             )
@@ -1377,7 +1409,7 @@ class PrinterAgent(BaseAgent):
                 self.active_jobs[job_id].update({
                     'status': PrintJobStatus.STARTING.value,
                     'updated_at': datetime.now(),
-                    'lines_total': len(gcode_lines),
+                    'lines_total': 0,
                     'lines_sent': 0
                 })
             else:
@@ -1387,21 +1419,27 @@ class PrinterAgent(BaseAgent):
                     'status': PrintJobStatus.STARTING.value,
                     'created_at': datetime.now(),
                     'updated_at': datetime.now(),
-                    'lines_total': len(gcode_lines),
+                    'lines_total': 0,
                     'lines_sent': 0,
                     'duration': 0.0
                 }
             
+            threading.Thread(
+                target=self._count_gcode_lines,
+                args=(gcode_file, job_id),
+                daemon=True
+            ).start()
+            
             # Update streaming status
             self.streaming_status.is_streaming = True
             self.streaming_status.is_paused = False
             self.streaming_status.can_pause = True
             self.streaming_status.can_resume = False
             
-            # Add progress callback if provided (thread-safe)
+            # Add progress callback if provided; coroutine callbacks run on
+            # this event loop
             if progress_callback:
-                with self.progress_callbacks_lock:
-                    self.progress_callbacks.append(progress_callback)
+                self.progress_publisher.add_callback(progress_callback)
             
             # Start streaming thread
             self.streaming_thread = threading.Thread(
@@ -1420,37 +1458,29 @@ class PrinterAgent(BaseAgent):
             return False
     
     def _prepare_gcode_file(self, gcode_file: str) -> List[str]:
-        """Read and prepare G-code file for streaming."""
+        """Read and prepare a whole G-code file (streaming uses the lazy pipeline)."""
         try:
-            with open(gcode_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # Filter and prepare lines
-            prepared_lines = []
-            line_number = 1
-            
-            for line in lines:
-                line = line.strip()
-                
-                # Skip empty lines and comments (but keep layer info)
-                if not line or (line.startswith(';') and not line.startswith(';LAYER')):
-                    continue
-                
-                # Add line number and checksum if enabled
-                if self.checksum_enabled:
-                    line_with_number = f"N{line_number} {line}"
-                    checksum = self._calculate_checksum(line_with_number)
-                    prepared_lines.append(f"{line_with_number}*{checksum}")
-                    line_number += 1
-                else:
-                    prepared_lines.append(line)
-            
+            prepared_lines = list(iter_prepared_gcode(gcode_file, self.checksum_enabled))
             self.logger.info(f"Prepared {len(prepared_lines)} G-code lines for streaming")
             return prepared_lines
             
         except Exception as e:
             raise GCodeStreamingError(f"Failed to prepare G-code file: {e}")
     
+    def _count_gcode_lines(self, gcode_file: str, job_id: str) -> None:
+        """Fill in lines_total for a job from the fast line-count pass."""
+        try:
+            lines_total = count_streamable_lines(gcode_file, self.line_index_dir)
+        except OSError as e:
+            self.logger.warning(f"Could not count G-code lines: {e}")
+            return
+        
+        with self.state_lock:
+            if self.print_progress and self.print_progress.job_id == job_id:
+                self.print_progress.lines_total = max(lines_total, self.print_progress.lines_sent)
+            if job_id in self.active_jobs:
+                self.active_jobs[job_id]['lines_total'] = lines_total
+    
     def _calculate_checksum(self, line: str) -> int:
         """Calculate checksum for G-code line."""
         checksum = 0
@@ -1458,11 +1488,18 @@ class PrinterAgent(BaseAgent):
             checksum ^= ord(char)
         return checksum
     
-    def _stream_gcode_worker(self, gcode_lines: List[str]):
+    def _stream_gcode_worker(self, gcode_lines: Iterable[str]):
         """Worker thread for streaming G-code lines with improved concurrency."""
         self.logger.info("G-code streaming worker started")
+        streamer = self._create_windowed_streamer()
+        with self.state_lock:
+            self._stream_owns_port = True
         
         try:
+            if streamer and self.checksum_enabled:
+                # Reset the firmware line counter before numbered lines
+                streamer.send(frame_gcode_line("M110 N0", 0))
+            
             with self.state_lock:
                 self.print_progress.status = PrintJobStatus.PRINTING
                 self.printer_status = PrinterStatus.PRINTING
@@ -1479,12 +1516,14 @@ class PrinterAgent(BaseAgent):
                 
                 # Handle pause with timeout
                 while True:
+                    self._send_queued_commands(streamer)
                     with self.state_lock:
                         if not self.streaming_status.is_paused or not self.streaming_status.is_streaming:
                             break
                     # Use Event.wait() instead of sleep for better responsiveness
                     if self.streaming_stop_event.wait(timeout=0.1):
                         break
+                self._send_queued_commands(streamer)
                 
                 # Final check after pause
                 with self.state_lock:
@@ -1496,8 +1535,12 @@ class PrinterAgent(BaseAgent):
                     with self.state_lock:
                         self.print_progress.current_command = line
                     
-                    # Send command with retry logic
-                    success = self._send_gcode_line_sync(line)
+                    # Send command: windowed (acks are collected while later
+                    # lines are already queued) or stop-and-wait
+                    if streamer:
+                        success = self._send_gcode_line_windowed(streamer, line)
+                    else:
+                        success = self._send_gcode_line_sync(line)
                     
                     if success:
                         with self.state_lock:
@@ -1520,17 +1563,29 @@ class PrinterAgent(BaseAgent):
                     else:
                         self.logger.error(f"Failed to send G-code line: {line}")
                         
+                except (GCodeStreamingError, PrinterTimeoutError):
+                    # Lost synchronization with the firmware; cannot continue
+                    raise
                 except Exception as e:
                     self.logger.error(f"Error sending G-code line: {e}")
                     
-                # Respect chunk size and timing
-                if (i + 1) % self.chunk_size == 0:
+                # Respect chunk size and timing (the window already paces
+                # windowed streaming)
+                if streamer is None and (i + 1) % self.chunk_size == 0:
                     if self.streaming_stop_event.wait(timeout=0.01):
                         break  # Stop immediately if requested
             
+            # Wait for the acknowledgment of the last lines in flight
+            self._send_queued_commands(streamer)
+            if streamer:
+                streamer.drain()
+            
             # Check completion status safely
             with self.state_lock:
                 if self.streaming_status.is_streaming and not self.streaming_status.is_paused:
+                    # Every line is sent; the total is known even if the
+                    # background count has not finished yet
+                    self.print_progress.lines_total = self.print_progress.lines_sent
                     self._complete_print_job()
                 else:
                     self._cancel_print_job()
@@ -1540,8 +1595,75 @@ class PrinterAgent(BaseAgent):
             self._fail_print_job(str(e))
         
         finally:
+            with self.state_lock:
+                self._stream_owns_port = False
+            if not self.streaming_queue.empty():
+                # Commands queued while the last lines were acknowledged
+                try:
+                    self._send_queued_commands(streamer)
+                    if streamer:
+                        streamer.drain()
+                except Exception as e:
+                    self.logger.warning(f"Failed to send queued printer commands: {e}")
+                    while not self.streaming_queue.empty():
+                        self.streaming_queue.get_nowait()
+            close = getattr(gcode_lines, 'close', None)
+            if close:
+                close()
+            self.streaming_stats = streamer.stats.to_dict() if streamer else {}
+            self.streaming_stats['progress'] = self.progress_publisher.stats.to_dict()
             self.logger.info("G-code streaming worker finished")
     
+    def _create_windowed_streamer(self) -> Optional[WindowedGCodeStreamer]:
+        """Create a windowed streamer for real serial connections, if enabled."""
+        if self.mock_mode or self.streaming_mode != 'windowed':
+            return None
+        if not self.serial_connection or not self.serial_connection.is_open:
+            return None
+        
+        return WindowedGCodeStreamer(
+            self.serial_connection,
+            rx_buffer_size=self.rx_buffer_size,
+            max_lines_in_flight=self.max_lines_in_flight,
+            ack_timeout=self.ack_timeout,
+            max_resends=self.max_resends,
+            on_message=self._process_unrequested_message,
+            logger=self.logger
+        )
+    
+    def _send_gcode_line_windowed(self, streamer: WindowedGCodeStreamer, line: str) -> bool:
+        """Queue a G-code line in the streaming window (comment lines stay local)."""
+        if line.startswith(';'):
+            return True
+        
+        with self.command_lock:
+            streamer.send(line)
+        return True
+    
+    def _send_queued_commands(self, streamer: Optional[WindowedGCodeStreamer]) -> None:
+        """Send commands queued by other threads (pause/resume) in stream order."""
+        while not self.streaming_queue.empty():
+            command = self.streaming_queue.get_nowait()
+            if streamer:
+                # Tracked in the window like any streamed line
+                self._send_gcode_line_windowed(streamer, command)
+            elif not self._send_gcode_line_sync(command):
+                self.logger.warning(f"Printer did not acknowledge {command}")
+    
+    def _send_control_command(self, command: str) -> None:
+        """Send a pause/resume command, through the streaming thread while it owns the port."""
+        if self.mock_mode and self.mock_printer and self.mock_printer.connected:
+            self.mock_printer.send_command(command)
+            return
+        with self.state_lock:
+            if self._stream_owns_port:
+                self.streaming_queue.put(command)
+                return
+        if self.serial_connection and self.serial_connection.is_open:
+            with self.command_lock:
+                self.serial_connection.write(f"{command}\n".encode('utf-8'))
+                self.serial_connection.flush()
+    
     def _send_gcode_line_sync(self, line: str) -> bool:
         """Send single G-code line synchronously."""
         try:
@@ -1586,8 +1708,15 @@ class PrinterAgent(BaseAgent):
                 return True
             return False
     
-    def _update_progress(self):
-        """Update progress calculations and notify callbacks."""
+    def _update_progress(self, force: bool = False):
+        """
+        Update the progress percentage and report it to the progress publisher.
+        
+        Called for every streamed line; the publisher coalesces these reports
+        and only builds and emits a payload on layer changes or percentage
+        steps, at most ``progress_max_rate`` times per second (``force``
+        bypasses the throttle for state changes).
+        """
         if not self.print_progress:
             return
         
@@ -1597,6 +1726,15 @@ class PrinterAgent(BaseAgent):
                 self.print_progress.lines_sent / self.print_progress.lines_total
             ) * 100
         
+        self.progress_publisher.report(
+            self.print_progress.progress_percentage,
+            self.print_progress.current_layer,
+            self._get_progress_data,
+            force=force
+        )
+    
+    def _refresh_progress_times(self):
+        """Update elapsed and estimated remaining time."""
         # Calculate elapsed time
         if self.print_progress.start_time:
             total_elapsed = (datetime.now() - self.print_progress.start_time).total_seconds()
@@ -1615,42 +1753,13 @@ class PrinterAgent(BaseAgent):
         if self.print_progress.progress_percentage > 0:
             estimated_total = self.print_progress.elapsed_time / (self.print_progress.progress_percentage / 100)
             self.print_progress.estimated_remaining = estimated_total - self.print_progress.elapsed_time
-        
-        # Notify callbacks
-        self._notify_progress_callbacks()
-    
-    def _notify_progress_callbacks(self):
-        """Notify all registered progress callbacks (thread-safe)."""
-        with self.progress_callbacks_lock:
-            if not self.progress_callbacks or not self.print_progress:
-                return
-            
-            # Make a copy to avoid modification during iteration
-            callbacks = self.progress_callbacks.copy()
-        
-        progress_data = self._get_progress_data()
-        
-        for callback in callbacks:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    # Schedule async callback safely
-                    try:
-                        loop = asyncio.get_event_loop()
-                        loop.create_task(callback(progress_data))
-                    except RuntimeError:
-                        # No event loop in current thread
-                        self.logger.debug("No event loop available for async callback")
-                else:
-                    # Call sync callback
-                    callback(progress_data)
-            except Exception as e:
-                self.logger.error(f"Progress callback error: {e}")
     
     def _get_progress_data(self) -> Dict[str, Any]:
         """Get current progress data."""
         if not self.print_progress:
             return {}
         
+        self._refresh_progress_times()
         return {
             'job_id': self.print_progress.job_id,
             'status': self.print_progress.status.value,
@@ -1681,14 +1790,11 @@ class PrinterAgent(BaseAgent):
                 self.print_progress.pause_time = datetime.now()
             
             self.printer_status = PrinterStatus.PAUSED
+            self._update_progress(force=True)
             
             # Send pause command to printer if connected
             try:
-                if self.mock_mode and self.mock_printer and self.mock_printer.connected:
-                    self.mock_printer.send_command("M25")  # Pause command
-                elif self.serial_connection and self.serial_connection.is_open:
-                    self.serial_connection.write("M25\n".encode('utf-8'))
-                    self.serial_connection.flush()
+                self._send_control_command("M25")
             except Exception as e:
                 self.logger.warning(f"Failed to send pause command to printer: {e}")
             
@@ -1714,14 +1820,11 @@ class PrinterAgent(BaseAgent):
                 self.print_progress.resume_time = datetime.now()
             
             self.printer_status = PrinterStatus.PRINTING
+            self._update_progress(force=True)
             
             # Send resume command to printer if connected
             try:
-                if self.mock_mode and self.mock_printer and self.mock_printer.connected:
-                    self.mock_printer.send_command("M24")  # Resume command
-                elif self.serial_connection and self.serial_connection.is_open:
-                    self.serial_connection.write("M24\n".encode('utf-8'))
-                    self.serial_connection.flush()
+                self._send_control_command("M24")
             except Exception as e:
                 self.logger.warning(f"Failed to send resume command to printer: {e}")
             
@@ -1791,6 +1894,8 @@ class PrinterAgent(BaseAgent):
         self.printer_status = PrinterStatus.IDLE
         self.print_statistics['successful_prints'] += 1
         self.print_statistics['total_print_time'] += duration
+        # Final update bypasses the throttle
+        self._update_progress(force=True)
         self._reset_streaming_state()
         
         self.logger.info(f"Print job completed: {self.print_progress.job_id if self.print_progress else 'unknown'}")
@@ -1815,6 +1920,8 @@ class PrinterAgent(BaseAgent):
         self.printer_status = PrinterStatus.IDLE
         self.print_statistics['cancelled_prints'] += 1
         self.print_statistics['total_print_time'] += duration
+        # Final update bypasses the throttle
+        self._update_progress(force=True)
         self._reset_streaming_state()
         
         self.logger.info(f"Print job cancelled: {self.print_progress.job_id if self.print_progress else 'unknown'}")
@@ -1840,6 +1947,8 @@ class PrinterAgent(BaseAgent):
         self.printer_status = PrinterStatus.ERROR
         self.print_statistics['failed_prints'] += 1
         self.print_statistics['total_print_time'] += duration
+        # Final update bypasses the throttle
+        self._update_progress(force=True)
         self._reset_streaming_state()
         
         self.logger.error(f"Print job failed: {error_message}")
@@ -1853,8 +1962,7 @@ class PrinterAgent(BaseAgent):
             self.streaming_status = StreamingStatus()
             
         # Clear callbacks safely
-        with self.progress_callbacks_lock:
-            self.progress_callbacks = []
+        self.progress_publisher.clear_callbacks()
         
         # Clean up streaming thread
         if (self.streaming_thread and 
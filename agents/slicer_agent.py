@@ -11,14 +11,17 @@ Task 2.3.1: Slicer CLI Wrapper with Profiles
 - CLI wrapper with robust error handling
 """
 
+import asyncio
 import os
+import re
 import subprocess
 import tempfile
 import time
 import shutil
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 import yaml
+import numpy as np
 
 # Serial communication imports for Task 2.3.2
 try:
@@ -35,9 +38,17 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from core.base_agent import BaseAgent
 from core.logger import get_logger
-from core.exceptions import SlicerExecutionError, ValidationError
+from core.exceptions import SlicerExecutionError, SlicerJobCancelledError, ValidationError
 from core.api_schemas import SlicerAgentInput, TaskResult
 from core.retry_utils import retry_with_backoff, retry_with_fallback
+from core.gcode_parser import parse_gcode_file
+from core.print_time_estimator import MotionLimits, PrintEstimate, estimate_print
+from core.slice_cache import (
+    DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_SIZE_BYTES,
+    SliceCache, compute_slice_key, get_slice_cache
+)
+from core.message_queue import MessagePriority
+from core.slicer_executor import SlicerProcessPool, get_slicer_process_pool
 
 
 class SlicerAgent(BaseAgent):
@@ -59,6 +70,8 @@ class SlicerAgent(BaseAgent):
         # Slicer configuration
         self.slicer_engine = config.get('default_slicer', "prusaslicer")  # Default engine
         self.mock_mode = config.get('mock_mode', False)  # For testing without actual slicer
+        # Returned G-code files are deleted by cleanup() unless the caller owns them
+        self.track_output_files = config.get('track_output_files', True)
         
         # Slicer executable paths
         self.slicer_paths = {
@@ -86,6 +99,20 @@ class SlicerAgent(BaseAgent):
         # Initialize predefined profiles
         self._init_predefined_profiles()
         
+        # Slicer probe results keyed by (executable, mtime_ns): (available, version)
+        self._slicer_probes: Dict[tuple, tuple] = {}
+        
+        # Printer profiles for print time estimation, loaded on first estimate
+        self._printer_profiles: Any = None
+        
+        # Content-addressed cache of real slicer output
+        self.slice_cache: Optional[SliceCache] = None
+        self._configure_slice_cache(config.get('slice_cache', {}))
+        
+        # Shared pool running slicer processes without blocking the event loop
+        self.slice_timeout = config.get('slice_timeout', 600)  # 10 minutes for complex models
+        self.max_concurrent_slices: Optional[int] = config.get('max_concurrent_slices')
+        
         # Load configuration (only if not provided in constructor)
         if not config:
             self._load_slicer_config()
@@ -286,11 +313,33 @@ class SlicerAgent(BaseAgent):
                 if 'executable_path' in prusaslicer_config:
                     self.slicer_paths['prusaslicer'] = prusaslicer_config['executable_path']
                 
+                self._configure_slice_cache(slicer_config.get('cache', {}))
+                self.slice_timeout = slicer_config.get('slice_timeout', self.slice_timeout)
+                self.max_concurrent_slices = slicer_config.get('max_concurrent', self.max_concurrent_slices)
+                
                 self.logger.debug(f"Loaded slicer config: engine={self.slicer_engine}, mock_mode={self.mock_mode}")
             
         except Exception as e:
             self.logger.warning(f"Failed to load slicer config: {e}")
     
+    @property
+    def process_pool(self) -> SlicerProcessPool:
+        """Slicer process pool of the running event loop."""
+        return get_slicer_process_pool(self.max_concurrent_slices)
+    
+    def _configure_slice_cache(self, cache_config: Dict[str, Any]) -> None:
+        """Attach the shared slice cache described by ``cache_config``."""
+        if not cache_config.get('enabled', True):
+            self.slice_cache = None
+            return
+        
+        max_size_mb = cache_config.get('max_size_mb')
+        self.slice_cache = get_slice_cache(
+            cache_config.get('directory', DEFAULT_CACHE_DIR),
+            max_size_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else DEFAULT_MAX_SIZE_BYTES,
+            max_entries=cache_config.get('max_entries', DEFAULT_MAX_ENTRIES)
+        )
+    
     async def execute_task(self, task_details: Dict[str, Any]) -> Dict[str, Any]:
         """Execute slicing task based on task details."""
         task_type = task_details.get('task_type', 'slice_stl')
@@ -355,11 +404,18 @@ class SlicerAgent(BaseAgent):
             if not self.mock_mode and not self._is_slicer_available():
                 raise SlicerExecutionError(f"Slicer engine '{self.slicer_engine}' not available")
             
+            # Scheduling options for the slicer process pool
+            job_options = {
+                'priority': input_data.get('priority', MessagePriority.NORMAL),
+                'job_id': input_data.get('job_id'),
+                'on_progress': input_data.get('progress_callback')
+            }
+            
             # Perform slicing operation
             if self.mock_mode:
                 gcode_result = await self._mock_slice_operation(slicer_input, effective_settings)
             else:
-                gcode_result = await self._perform_actual_slicing(slicer_input, effective_settings)
+                gcode_result = await self._slice_with_cache(slicer_input, effective_settings, job_options)
             
             processing_time = time.time() - start_time
             gcode_result['processing_time'] = processing_time
@@ -373,6 +429,9 @@ class SlicerAgent(BaseAgent):
                 error_message=None
             )
             
+        except SlicerJobCancelledError:
+            self.logger.info(f"Slicing task cancelled: {input_data.get('model_file_path')}")
+            raise
         except Exception as e:
             self.logger.error(f"Slicing task failed: {e}")
             processing_time = time.time() - start_time
@@ -440,6 +499,11 @@ class SlicerAgent(BaseAgent):
             self.logger.warning(f"Slicer executable not accessible: {slicer_path}")
             return False
         
+        # A successful probe is reused until the executable changes
+        probe_key = (slicer_path, os.stat(slicer_path).st_mtime_ns)
+        if probe_key in self._slicer_probes:
+            return self._slicer_probes[probe_key][0]
+        
         # Try to run the slicer with --help to verify it's working
         try:
             result = subprocess.run(
@@ -450,6 +514,7 @@ class SlicerAgent(BaseAgent):
             )
             if result.returncode == 0:
                 self.logger.info(f"Slicer {self.slicer_engine} is available and working at: {slicer_path}")
+                self._slicer_probes[probe_key] = (True, self._parse_slicer_version(result.stdout))
                 return True
             else:
                 self.logger.warning(f"Slicer {self.slicer_engine} failed help test: {result.stderr}")
@@ -458,6 +523,58 @@ class SlicerAgent(BaseAgent):
             self.logger.warning(f"Slicer {self.slicer_engine} verification failed: {e}")
             return False
     
+    def _parse_slicer_version(self, help_output: str) -> str:
+        """Extract the version banner (e.g. 'PrusaSlicer-2.7.2+linux-x64') from --help output."""
+        match = re.search(r'(PrusaSlicer|SuperSlicer|Cura)[-\s]([\w.+-]+)', help_output or '')
+        if match:
+            return f"{match.group(1)}-{match.group(2)}"
+        first_line = (help_output or '').strip().splitlines()
+        return first_line[0].strip() if first_line else f"{self.slicer_engine}-unknown"
+    
+    def _get_slicer_version(self) -> str:
+        """Version of the configured slicer executable."""
+        slicer_path = self.slicer_paths.get(self.slicer_engine)
+        if slicer_path and self._is_slicer_available():
+            probe_key = (slicer_path, os.stat(slicer_path).st_mtime_ns)
+            if probe_key in self._slicer_probes:
+                return self._slicer_probes[probe_key][1]
+        return f"{self.slicer_engine}-unknown"
+    
+    async def _slice_with_cache(self, slicer_input: SlicerAgentInput, effective_settings: Dict[str, Any],
+                                job_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Serve a slicing job from the slice cache, slicing and storing it on a miss.
+        
+        The key covers the model bytes, the effective settings, the job fields
+        used by the command builder and the slicer version.
+        """
+        if not self.slice_cache:
+            return await self._perform_actual_slicing(slicer_input, effective_settings, job_options)
+        
+        job = {
+            'settings': effective_settings,
+            'printer_profile': slicer_input.printer_profile,
+            'material_type': slicer_input.material_type,
+            'quality_preset': slicer_input.quality_preset
+        }
+        cache_key = await asyncio.to_thread(
+            compute_slice_key, slicer_input.model_file_path, job, self._get_slicer_version()
+        )
+        
+        cached = await asyncio.to_thread(self.slice_cache.get, cache_key)
+        if cached is not None:
+            self.logger.info(f"Slice cache hit for {slicer_input.model_file_path}")
+            self._track_output_file(cached['gcode_file_path'])
+            cached['cache_hit'] = True
+            return cached
+        
+        result = await self._perform_actual_slicing(slicer_input, effective_settings, job_options)
+        # Results of the mock fallback carry no slicer version and are not cached
+        if result.get('slicer_version'):
+            await asyncio.to_thread(self.slice_cache.put, cache_key, result['gcode_file_path'], result)
+        result['cache_hit'] = False
+        return result
+    
     async def _mock_slice_operation(self, slicer_input: SlicerAgentInput, effective_settings: Dict[str, Any]) -> Dict[str, Any]:
         """Perform mock slicing operation for testing."""
         self.logger.info("Performing mock slicing operation")
@@ -509,10 +626,7 @@ class SlicerAgent(BaseAgent):
         gcode_file.write(gcode_content)
         gcode_file.close()
         
-        # Track temp files for cleanup
-        if not hasattr(self, '_temp_files'):
-            self._temp_files = []
-        self._temp_files.append(gcode_file.name)
+        self._track_output_file(gcode_file.name)
         
         return {
             "gcode_file_path": gcode_file.name,
@@ -524,7 +638,8 @@ class SlicerAgent(BaseAgent):
             "profile_used": slicer_input.printer_profile
         }
     
-    async def _fallback_to_mock_slicing(self, slicer_input: SlicerAgentInput, effective_settings: Dict[str, Any]) -> Dict[str, Any]:
+    async def _fallback_to_mock_slicing(self, slicer_input: SlicerAgentInput, effective_settings: Dict[str, Any],
+                                        job_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Fallback to mock slicing when real slicer fails.
         
@@ -541,16 +656,27 @@ class SlicerAgent(BaseAgent):
         max_retries=2,
         base_delay=2.0,
         fallback_func=_fallback_to_mock_slicing,
-        fallback_on_exceptions=(SlicerExecutionError, subprocess.TimeoutExpired, FileNotFoundError)
+        fallback_on_exceptions=(SlicerExecutionError, FileNotFoundError)
     )
-    async def _perform_actual_slicing(self, slicer_input: SlicerAgentInput, effective_settings: Dict[str, Any]) -> Dict[str, Any]:
+    async def _perform_actual_slicing(self, slicer_input: SlicerAgentInput, effective_settings: Dict[str, Any],
+                                      job_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Perform actual slicing using slicer executable with retry + fallback.
         
+        The slicer runs on the shared process pool, so the event loop stays
+        free and at most ``max_concurrent`` slicers run at once.
+        
         Retry Strategy:
         - Attempt 1: Try PrusaSlicer
         - Attempt 2: Wait 2s, try again (might be temp file lock)
         - Fallback: Use mock slicing to keep workflow running
+        
+        A cancelled job is neither retried nor replaced by mock output.
+        
+        Args:
+            slicer_input: Validated slicing job
+            effective_settings: Merged profile and job settings
+            job_options: Process pool options (priority, job_id, on_progress)
         """
         self.logger.info("Performing actual slicing operation with PrusaSlicer")
         start_time = time.time()
@@ -569,6 +695,7 @@ class SlicerAgent(BaseAgent):
         gcode_path = output_file.name
         output_file.close()
         
+        cmd: List[str] = []
         try:
             # Build comprehensive PrusaSlicer command via helper
             if 'prusa-slicer' in slicer_path:
@@ -581,11 +708,13 @@ class SlicerAgent(BaseAgent):
             self.logger.info(f"Input file: {slicer_input.model_file_path}")
             self.logger.info(f"Output file: {gcode_path}")
             
-            result = subprocess.run(
+            job_options = job_options or {}
+            result = await self.process_pool.run(
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minute timeout for complex models
+                priority=job_options.get('priority', MessagePriority.NORMAL),
+                timeout=self.slice_timeout,
+                on_progress=job_options.get('on_progress'),
+                job_id=job_options.get('job_id')
             )
             
             slicing_time = time.time() - start_time
@@ -612,12 +741,9 @@ class SlicerAgent(BaseAgent):
             self.logger.info(f"Generated G-code file: {gcode_path} ({file_size} bytes)")
             
             # Analyze the generated G-code
-            analysis = self._analyze_gcode_file(gcode_path)
+            analysis = await asyncio.to_thread(self._analyze_gcode_file, gcode_path, effective_settings)
             
-            # Track temp files for cleanup
-            if not hasattr(self, '_temp_files'):
-                self._temp_files = []
-            self._temp_files.append(gcode_path)
+            self._track_output_file(gcode_path)
             
             return {
                 "gcode_file_path": gcode_path,
@@ -629,119 +755,100 @@ class SlicerAgent(BaseAgent):
                 "estimated_print_time": analysis.get("estimated_print_time", 0),
                 "material_usage": analysis.get("material_usage", 0.0),
                 "file_size": file_size,
-                "slicer_version": "PrusaSlicer-2.7.2",
+                "slicer_version": self._get_slicer_version(),
                 "settings_used": effective_settings
             }
             
-        except subprocess.TimeoutExpired:
+        except SlicerJobCancelledError:
             if os.path.exists(gcode_path):
                 os.unlink(gcode_path)
-            raise SlicerExecutionError("PrusaSlicer operation timed out (10 minutes)")
+            raise
         except Exception as e:
             # Clean up output file on error
             if os.path.exists(gcode_path):
                 os.unlink(gcode_path)
             raise SlicerExecutionError(f"PrusaSlicer slicing failed: {str(e)}")
+        finally:
+            # Temporary settings files are only read by the slicer process
+            self._discard_temp_files(
+                cmd[index + 1] for index, arg in enumerate(cmd[:-1]) if arg == '--load'
+            )
     
-    def _analyze_gcode_file(self, gcode_file_path: str) -> Dict[str, Any]:
-        """Analyze G-code file and extract metrics."""
+    def _analyze_gcode_file(self, gcode_file_path: str,
+                            settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Analyze G-code file and extract metrics.
+        
+        Print time and filament usage come from the kinematic estimator
+        (core/print_time_estimator.py) using the limits of the target printer.
+        
+        Args:
+            gcode_file_path: Path to the G-code file
+            settings: Effective slicer settings (printer, material, accelerations)
+            
+        Returns:
+            Dictionary with layer count, movements, material usage (g),
+            filament length (mm), print time (minutes), temperatures and
+            the PrintEstimate they come from (``print_estimate``)
+        """
+        empty_analysis = {
+            "layer_count": 0,
+            "total_movements": 0,
+            "material_usage": 0.0,
+            "filament_length": 0.0,
+            "estimated_print_time": 0,
+            "hotend_temperature": 0,
+            "bed_temperature": 0,
+            "print_estimate": None
+        }
+        settings = settings or {}
         try:
             if not os.path.exists(gcode_file_path):
                 self.logger.warning(f"Failed to analyze G-code file: [Errno 2] No such file or directory: '{gcode_file_path}'")
-                return {
-                    "layer_count": 0,
-                    "total_movements": 0,
-                    "material_usage": 0.0,
-                    "estimated_print_time": 0,
-                    "hotend_temperature": 0,
-                    "bed_temperature": 0
-                }
-            
-            with open(gcode_file_path, 'r') as f:
-                content = f.read()
-            
-            # Initialize analysis results
-            layer_count = 0
-            total_movements = 0
-            material_usage = 0.0
-            hotend_temperature = 0
-            bed_temperature = 0
-            
-            # Parse G-code content
-            lines = content.split('\n')
-            for line in lines:
-                line = line.strip()
-                
-                # Count layers
-                if line.startswith('; Layer'):
-                    layer_count += 1
-                
-                # Count movement commands
-                if line.startswith('G1'):
-                    total_movements += 1
-                    
-                    # Extract material usage from E commands
-                    if 'E' in line:
-                        try:
-                            e_index = line.find('E')
-                            e_value_str = line[e_index+1:].split()[0]
-                            e_value = float(e_value_str)
-                            if e_value > material_usage:
-                                material_usage = e_value
-                        except (ValueError, IndexError):
-                            pass
-                
-                # Extract temperatures (only capture first non-zero temperatures)
-                if line.startswith('M104') and 'S' in line and hotend_temperature == 0:  # Hotend temperature
-                    try:
-                        # Parse M104 S200 ; set hotend temperature
-                        parts = line.split()
-                        for part in parts:
-                            if part.startswith('S'):
-                                temp_str = part[1:]  # Remove 'S' prefix
-                                temp_value = int(temp_str)
-                                if temp_value > 0:  # Only capture heating commands, not cooling
-                                    hotend_temperature = temp_value
-                                break
-                    except (ValueError, IndexError):
-                        pass
-                
-                if line.startswith('M140') and 'S' in line and bed_temperature == 0:  # Bed temperature
-                    try:
-                        # Parse M140 S60 ; set bed temperature
-                        parts = line.split()
-                        for part in parts:
-                            if part.startswith('S'):
-                                temp_str = part[1:]  # Remove 'S' prefix
-                                temp_value = int(temp_str)
-                                if temp_value > 0:  # Only capture heating commands, not cooling
-                                    bed_temperature = temp_value
-                                break
-                    except (ValueError, IndexError):
-                        pass
+                return empty_analysis
             
-            # Estimate print time (simple heuristic)
-            estimated_print_time = layer_count * 2 + total_movements * 0.05
+            # Stream the file into compact arrays instead of holding every line
+            parsed = parse_gcode_file(gcode_file_path)
+            estimate = estimate_print(
+                parsed,
+                self._get_motion_limits(settings),
+                material=settings.get('material', 'PLA'),
+                filament_diameter=settings.get('filament_diameter', 1.75)
+            )
             
+            # Only capture first non-zero temperatures (heating, not cooling)
             return {
-                "layer_count": layer_count,
-                "total_movements": total_movements,
-                "material_usage": material_usage,
-                "estimated_print_time": int(estimated_print_time),
-                "hotend_temperature": hotend_temperature,
-                "bed_temperature": bed_temperature
+                "layer_count": parsed.layer_count,
+                "total_movements": int(np.count_nonzero(~parsed.rapid)),
+                "material_usage": round(estimate.filament_mass, 2),
+                "filament_length": round(estimate.filament_length, 2),
+                "estimated_print_time": int(round(estimate.total_minutes)),
+                "hotend_temperature": int(parsed.first_temperature('extruder')),
+                "bed_temperature": int(parsed.first_temperature('bed')),
+                "print_estimate": estimate
             }
             
         except Exception as e:
             self.logger.warning(f"Failed to analyze G-code file: {e}")
-            return {
-                "layer_count": 0,
-                "total_movements": 0,
-                "material_usage": 0.0,
-                "estimated_print_time": 0,
-                "hotend_temperature": 0,
-                "bed_temperature": 0
-            }
+            return empty_analysis
+    
+    def _get_motion_limits(self, settings: Optional[Dict[str, Any]] = None) -> MotionLimits:
+        """Motion limits of the target printer for print time estimation."""
+        settings = settings or {}
+        acceleration = settings.get('accel_perimeter')
+        if self._printer_profiles is None:
+            try:
+                from printer_support.multi_printer_support import PrinterProfileManager
+                self._printer_profiles = PrinterProfileManager()
+            except ImportError:
+                self._printer_profiles = False
+        
+        profile = None
+        if self._printer_profiles:
+            profile = self._printer_profiles.get_profile(settings.get('printer', 'ender3'))
+        if profile is None:
+            return MotionLimits(acceleration=acceleration)
+        return MotionLimits.from_printer_profile(profile, acceleration)
 
     # Public API methods
     
@@ -754,10 +861,15 @@ class SlicerAgent(BaseAgent):
         Args:
             stl_path: Path to the STL file to slice
             profile_name: Name of the printer profile to use
-            **kwargs: Additional slicing parameters
+            **kwargs: Additional slicing parameters; ``priority``
+                (MessagePriority), ``job_id`` and ``progress_callback``
+                schedule the slicer process
             
         Returns:
             Dictionary containing G-code file path and slicing metrics
+            
+        Raises:
+            SlicerJobCancelledError: If the job was cancelled via cancel_slice()
         """
         try:
             # Prepare input data
@@ -768,7 +880,10 @@ class SlicerAgent(BaseAgent):
                 'quality_preset': kwargs.get('quality_preset', 'standard'),
                 'infill_percentage': kwargs.get('infill_percentage', 20),
                 'layer_height': kwargs.get('layer_height', 0.2),
-                'print_speed': kwargs.get('print_speed', 50)
+                'print_speed': kwargs.get('print_speed', 50),
+                'priority': kwargs.get('priority', MessagePriority.NORMAL),
+                'job_id': kwargs.get('job_id'),
+                'progress_callback': kwargs.get('progress_callback')
             }
             
             # Execute slicing task
@@ -779,10 +894,32 @@ class SlicerAgent(BaseAgent):
             else:
                 raise SlicerExecutionError(f"Slicing failed: {response.error_message}")
                 
+        except SlicerJobCancelledError:
+            raise
         except Exception as e:
             self.logger.error(f"slice_stl failed: {e}")
             raise SlicerExecutionError(f"Slicing operation failed: {str(e)}")
 
+    def _track_output_file(self, path: str) -> None:
+        """Remember a returned G-code file for cleanup() unless the caller keeps it."""
+        if not self.track_output_files:
+            return
+        if not hasattr(self, '_temp_files'):
+            self._temp_files = []
+        self._temp_files.append(path)
+    
+    def _discard_temp_files(self, paths: Iterable[str]) -> None:
+        """Delete tracked temporary files that are no longer needed."""
+        temp_files = getattr(self, '_temp_files', [])
+        for path in paths:
+            if path not in temp_files:
+                continue
+            temp_files.remove(path)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    
     def cleanup(self) -> None:
         """Clean up agent resources."""
         try:
@@ -800,6 +937,21 @@ class SlicerAgent(BaseAgent):
         except Exception as e:
             self.logger.warning(f"Cleanup warning: {e}")
     
+    def get_slice_cache_stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counters of the slice cache."""
+        if not self.slice_cache:
+            return {'enabled': False}
+        return {'enabled': True, **self.slice_cache.get_stats()}
+    
+    def cancel_slice(self, job_id: str) -> bool:
+        """Cancel a queued or running slicing job (kills the slicer process)."""
+        return self.process_pool.cancel(job_id)
+    
+    def get_slice_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status and progress of a slicing job."""
+        job = self.process_pool.get_job(job_id)
+        return job.to_dict() if job else None
+    
     def set_mock_mode(self, enabled: bool) -> None:
         """Set mock mode on or off."""
         old_mode = self.mock_mode
@@ -1079,8 +1231,20 @@ class SlicerAgent(BaseAgent):
         merged.update(custom_settings)
         return merged
     
-    def _estimate_print_time(self, gcode_metrics: Dict[str, Any]) -> float:
-        """Estimate print time based on G-code metrics."""
+    def _estimate_print_time(self, gcode_metrics: Dict[str, Any],
+                             estimate: Optional[PrintEstimate] = None) -> float:
+        """
+        Estimate print time in minutes.
+        
+        Uses the kinematic estimate when one is given (e.g. the
+        ``print_estimate`` of _analyze_gcode_file) or the metrics reference a
+        G-code file (``gcode_file_path``); otherwise falls back to a
+        per-layer heuristic.
+        """
+        estimate = estimate or self._estimate_from_metrics(gcode_metrics)
+        if estimate is not None:
+            return max(estimate.total_minutes, 1.0)
+        
         layer_count = gcode_metrics.get("layer_count", 0)
         total_movements = gcode_metrics.get("total_movements", 0)
         
@@ -1090,16 +1254,42 @@ class SlicerAgent(BaseAgent):
         
         return max(base_time + movement_time, 1.0)  # Minimum 1 minute
     
-    def _estimate_material_usage(self, gcode_metrics: Dict[str, Any]) -> float:
-        """Estimate material usage based on G-code metrics."""
+    def _estimate_material_usage(self, gcode_metrics: Dict[str, Any],
+                                 estimate: Optional[PrintEstimate] = None) -> float:
+        """
+        Estimate material usage in grams.
+        
+        Uses the filament mass of the given kinematic estimate, or integrates
+        the extrusion of the referenced G-code file when ``gcode_file_path``
+        is given; otherwise falls back to 0.5g per layer.
+        """
+        estimate = estimate or self._estimate_from_metrics(gcode_metrics)
+        if estimate is not None:
+            return max(estimate.filament_mass, 0.1)
+        
         layer_count = gcode_metrics.get("layer_count", 0)
-        total_movements = gcode_metrics.get("total_movements", 0)
         
         # Rough estimation: 0.5g per layer
         material_usage = layer_count * 0.5
         
         return max(material_usage, 0.1)  # Minimum 0.1g
     
+    def _estimate_from_metrics(self, gcode_metrics: Dict[str, Any]) -> Optional[PrintEstimate]:
+        """Kinematic estimate for the metrics' G-code file, if they reference one."""
+        gcode_path = gcode_metrics.get("gcode_file_path")
+        if gcode_path and os.path.exists(gcode_path):
+            return self._estimate_from_gcode(gcode_path, gcode_metrics)
+        return None
+    
+    def _estimate_from_gcode(self, gcode_path: str, settings: Dict[str, Any]) -> PrintEstimate:
+        """Run the kinematic estimator on a G-code file."""
+        return estimate_print(
+            parse_gcode_file(gcode_path),
+            self._get_motion_limits(settings),
+            material=settings.get('material', 'PLA'),
+            filament_diameter=settings.get('filament_diameter', 1.75)
+        )
+    
     def _postprocess_gcode(self, gcode_content: str) -> str:
         """Post-process G-code content."""
         # Basic post-processing (could be enhanced)
@@ -136,6 +136,8 @@ class TemplateSearchRequest(BaseModel):
     difficulty: Optional[str] = None
     search_term: Optional[str] = None
     tags: Optional[List[str]] = None
+    limit: Optional[int] = Field(None, ge=1)
+    offset: int = Field(0, ge=0)
 
 class TemplateCustomizationRequest(BaseModel):
     template_id: str
@@ -515,11 +517,14 @@ async def complete_design_analysis(
             f.write(content)
         
         try:
+            # Parse once; preview and AI analysis share the geometry arrays
+            geometry_data = preview_manager.stl_parser.parse_stl_file(temp_file)
+            
             # Generate 3D preview
-            preview_data = preview_manager.generate_stl_preview(temp_file)
+            preview_data = preview_manager.generate_stl_preview(temp_file, geometry_data)
             
             # Perform AI analysis
-            analysis_result = ai_enhancer.analyze_design(design_id, preview_data)
+            analysis_result = ai_enhancer.analyze_design(design_id, geometry_data)
             
             # Get user preferences if user_id provided
             user_insights = None
@@ -1187,10 +1192,10 @@ async def get_system_health():
 
 # Template Library Endpoints
 @router.get("/templates")
-async def list_templates():
+async def list_templates(limit: Optional[int] = Query(None, ge=1), offset: int = Query(0, ge=0)):
     """List all available templates"""
     try:
-        templates = await template_library.list_templates()
+        templates = await template_library.list_templates(limit=limit, offset=offset)
         return JSONResponse({
             "success": True,
             "templates": templates,
@@ -1208,7 +1213,9 @@ async def search_templates(request: TemplateSearchRequest):
             category=request.category,
             difficulty=request.difficulty,
             search_term=request.search_term,
-            tags=request.tags
+            tags=request.tags,
+            limit=request.limit,
+            offset=request.offset
         )
         return JSONResponse({
             "success": True,
@@ -342,29 +342,15 @@ async def stop_monitoring():
 async def get_aggregated_metrics(
     time_range: str = Query("24h", description="Time range for aggregation"),
     metrics: str = Query("cpu_usage,memory_usage,response_time_avg", description="Comma-separated metric names"),
-    aggregation: str = Query("avg", description="Aggregation type: avg, min, max")
+    aggregation: str = Query("avg", description="Aggregation type: avg, min, max, sum, count or a percentile such as p95")
 ):
     """Get aggregated metrics data"""
     try:
         metric_list = [m.strip() for m in metrics.split(",")]
-        results = {}
         
-        for metric_name in metric_list:
-            data_points = await analytics._get_historical_data(metric_name, time_range)
-            
-            if data_points:
-                values = [point[1] for point in data_points]
-                
-                if aggregation == "avg":
-                    results[metric_name] = sum(values) / len(values)
-                elif aggregation == "min":
-                    results[metric_name] = min(values)
-                elif aggregation == "max":
-                    results[metric_name] = max(values)
-                else:
-                    results[metric_name] = None
-            else:
-                results[metric_name] = None
+        # One query for all metrics, aggregated by the database
+        aggregated = await analytics.aggregate_metrics(metric_list, time_range, (aggregation,))
+        results = {metric_name: values[aggregation] for metric_name, values in aggregated.items()}
         
         return {
             "success": True,
@@ -438,8 +424,8 @@ async def export_metrics(
         key_metrics = ["cpu_usage", "memory_usage", "response_time_avg", "cache_hit_rate", "error_rate"]
         export_data = {}
         
-        for metric in key_metrics:
-            data_points = await analytics._get_historical_data(metric, time_range)
+        series = await analytics._get_historical_series(key_metrics, time_range)
+        for metric, data_points in series.items():
             export_data[metric] = [
                 {
                     "timestamp": point[0].isoformat(),
@@ -7,10 +7,12 @@ POST /api/convert/cat → returns printable STL from a single cat photo
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
 
+from agents.cad_agent import CADAgent
+from core.agent_pool import get_agent_pool
 from core.logger import get_logger
 from core.cat_to_3d import image_to_3d_cat_async
 
@@ -19,6 +21,12 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/api/convert", tags=["cat"])
 
 
+async def get_cad_agent() -> AsyncIterator[CADAgent]:
+    """Dependency: the pooled CADAgent, held within its concurrency limit."""
+    async with get_agent_pool().acquire("cad") as agent:
+        yield agent
+
+
 @router.post("/cat")
 async def convert_cat_image(
     image: UploadFile = File(..., description="Cat image (jpg/png)"),
@@ -48,6 +56,7 @@ async def convert_cat_image(
     drain_holes_count: int = Form(2),
     drain_hole_diameter_mm: float = Form(4.0),
     drain_hole_edge_margin_mm: float = Form(10.0),
+    cad_agent: CADAgent = Depends(get_cad_agent),
 ):
     """Convert a single image to a printable cat STL, returning metadata and file paths."""
     try:
@@ -84,7 +93,7 @@ async def convert_cat_image(
             "drain_hole_edge_margin_mm": drain_hole_edge_margin_mm,
         }
 
-        result = await image_to_3d_cat_async(image_bytes, params)
+        result = await image_to_3d_cat_async(image_bytes, params, cad_agent=cad_agent)
         return {
             "success": True,
             "created_at": datetime.now().isoformat(),
@@ -46,6 +46,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import core system components
 from core.parent_agent import ParentAgent
+from core.message_queue import create_message_queue_from_config
 from core.logger import get_logger
 from core.exceptions import (
     AgentCommunicationError, ValidationError,
@@ -53,6 +54,9 @@ from core.exceptions import (
 )
 from config.settings import load_config
 from core.health_monitor import health_monitor, setup_default_monitoring
+from core.agent_pool import get_agent_pool
+from core.cpu_executor import get_cpu_executor
+from core.template_model_cache import get_template_model_cache
 
 # Import printer discovery (optional)
 try:
@@ -86,7 +90,7 @@ logger = get_logger(__name__)
 
 # Import API routers (after logger is defined)
 try:
-    from api.advanced_routes import router as advanced_router
+    from api.advanced_routes import router as advanced_router, template_library
     ADVANCED_ROUTES_AVAILABLE = True
 except ImportError as e:
     ADVANCED_ROUTES_AVAILABLE = False
@@ -140,6 +144,11 @@ except ImportError as e:
 # Application state
 app_state = {
     "parent_agent": None,
+    "agent_pool": None,
+    "agent_pool_warmup": None,
+    "cpu_executor": None,
+    "cpu_executor_warmup": None,
+    "template_cache_prewarm": None,
     "active_workflows": {},
     "websocket_connections": {},
     "startup_time": None,
@@ -163,7 +172,7 @@ async def lifespan(app: FastAPI):
         app_state["startup_time"] = datetime.now()
         
         # Initialize ParentAgent with all sub-agents
-        parent_agent = ParentAgent()
+        parent_agent = ParentAgent(message_queue=create_message_queue_from_config(config.get("job_queue", {})))
         app_state["parent_agent"] = parent_agent
         
         # Initialize agents
@@ -171,6 +180,42 @@ async def lifespan(app: FastAPI):
         await parent_agent.initialize()
         app_state["system_health"]["agents_initialized"] = True
         
+        # Shared agents for the API routes; built in the background so
+        # startup is not delayed and the first requests find them ready
+        pool_config = config.get("api", {}).get("agent_pool", {})
+        agent_pool = get_agent_pool(pool_config.get("limits"))
+        app_state["agent_pool"] = agent_pool
+        if pool_config.get("warm_up", True):
+            app_state["agent_pool_warmup"] = asyncio.create_task(agent_pool.warm_up())
+        
+        # Worker processes for CPU-heavy mesh work, shared by all requests
+        executor_config = config.get("api", {}).get("cpu_executor", {})
+        cpu_executor = get_cpu_executor(
+            executor_config.get("max_workers"),
+            executor_config.get("max_tasks_per_child", 50),
+            executor_config.get("task_timeout", 300)
+        )
+        app_state["cpu_executor"] = cpu_executor
+        if executor_config.get("warm_up", True):
+            app_state["cpu_executor_warmup"] = asyncio.create_task(cpu_executor.warm_up())
+        
+        # Generated template models; the popular templates' defaults are
+        # generated in the background so their first customization is a hit
+        template_config = config.get("api", {}).get("template_cache", {})
+        template_model_cache = get_template_model_cache(
+            template_config.get("directory", "./cache/template_models"),
+            int(template_config.get("max_size_mb", 512) * 1024 * 1024),
+            template_config.get("max_entries", 2000)
+        )
+        if ADVANCED_ROUTES_AVAILABLE:
+            template_library.model_cache = template_model_cache
+            template_library.parameter_quantum = template_config.get("parameter_quantum", 0.01)
+            prewarm_templates = template_config.get("prewarm_templates", 3)
+            if prewarm_templates:
+                app_state["template_cache_prewarm"] = asyncio.create_task(
+                    template_library.prewarm_model_cache(prewarm_templates)
+                )
+        
         # Initialize health monitoring
         logger.info("Setting up health monitoring...")
         await setup_default_monitoring()
@@ -195,6 +240,19 @@ async def lifespan(app: FastAPI):
         if app_state["parent_agent"]:
             await app_state["parent_agent"].shutdown()
         
+        if app_state["agent_pool_warmup"] and not app_state["agent_pool_warmup"].done():
+            app_state["agent_pool_warmup"].cancel()
+        if app_state["agent_pool"]:
+            await app_state["agent_pool"].shutdown()
+        
+        if app_state["cpu_executor_warmup"] and not app_state["cpu_executor_warmup"].done():
+            app_state["cpu_executor_warmup"].cancel()
+        if app_state["cpu_executor"]:
+            app_state["cpu_executor"].shutdown(wait=False)
+        
+        if app_state["template_cache_prewarm"] and not app_state["template_cache_prewarm"].done():
+            app_state["template_cache_prewarm"].cancel()
+        
         # Close all WebSocket connections
         for workflow_id, connections in app_state["websocket_connections"].items():
             for websocket in connections.copy():
@@ -990,6 +1048,19 @@ async def detailed_health_check():
         }
 
 
+@app.get("/health/agents")
+async def agent_pool_health_check():
+    """Health and usage of the shared agents used by the API routes."""
+    try:
+        report = await get_agent_pool().health_check()
+        report["cpu_executor"] = get_cpu_executor().get_stats()
+        return report
+        
+    except Exception as e:
+        logger.error(f"Agent pool health check failed: {e}")
+        return {"status": "unhealthy", "error": str(e), "agents": {}}
+
+
 @app.get("/health/components/{component_name}")
 async def component_health_check(component_name: str):
     """Get health status for a specific component."""
@@ -80,11 +80,11 @@ async def get_security_status():
     """Get current security status and metrics"""
     try:
         # Get rate limiting status
+        limiter_stats = await rate_limiter.get_stats()
         rate_limit_status = {
-            "global_active": len(rate_limiter.request_history.get('global', [])),
-            "user_limits_active": len(rate_limiter.request_history.get('users', {})),
-            "ip_limits_active": len(rate_limiter.request_history.get('ips', {})),
-            "violations": len(rate_limiter.violation_penalties)
+            "backend": limiter_stats["backend"],
+            "active_buckets": limiter_stats["active_buckets"],
+            "violations": limiter_stats["violators"]
         }
         
         # Get audit log stats
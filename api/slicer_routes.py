@@ -4,15 +4,26 @@ Slicer API routes to slice STL files and list profiles.
 Exposes:
 - POST /api/slicer/slice: slice an STL using a given profile/preset
 - GET  /api/slicer/profiles: list available profiles
+- GET  /api/slicer/cache: slice cache hit/miss/eviction counters
+- GET  /api/slicer/jobs: slicer process pool load and job progress
+- GET  /api/slicer/jobs/{job_id}: progress of one slicing job
+- DELETE /api/slicer/jobs/{job_id}: cancel a slicing job (kills the slicer)
+
+Handlers share one long-lived SlicerAgent from the agent pool
+(core/agent_pool.py) instead of constructing an agent per request.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
 import os
 
 from agents.slicer_agent import SlicerAgent
+from core.agent_pool import get_agent_pool
+from core.exceptions import SlicerJobCancelledError
 from core.logger import get_logger
+from core.message_queue import MessagePriority
+from core.slicer_executor import get_slicer_process_pool
 
 logger = get_logger(__name__)
 
@@ -27,25 +38,71 @@ class SliceRequest(BaseModel):
     infill_percentage: int = Field(default=12, ge=0, le=100)
     layer_height: Optional[float] = Field(default=None, gt=0, le=1.0)
     print_speed: Optional[int] = Field(default=None, gt=0, le=300)
+    priority: str = Field(default="NORMAL", description="Queue priority: CRITICAL, HIGH, NORMAL, LOW or BACKGROUND")
+    job_id: Optional[str] = Field(default=None, description="Job id for progress queries and cancellation")
+
+
+async def get_slicer_agent() -> AsyncIterator[SlicerAgent]:
+    """Dependency: the pooled SlicerAgent, held within its concurrency limit."""
+    async with get_agent_pool().acquire("slicer") as agent:
+        yield agent
+
+
+async def get_shared_slicer_agent() -> SlicerAgent:
+    """Dependency: the pooled SlicerAgent for quick reads that take no slot."""
+    return await get_agent_pool().get("slicer")
 
 
 @router.get("/profiles")
-async def list_profiles() -> Dict[str, Any]:
+async def list_profiles(agent: SlicerAgent = Depends(get_shared_slicer_agent)) -> Dict[str, Any]:
     try:
-        agent = SlicerAgent("api_slicer", config={"mock_mode": True})
         return {"profiles": list(agent.list_profiles().keys())}
     except Exception as e:
         logger.error(f"Failed to list profiles: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/cache")
+async def slice_cache_stats(agent: SlicerAgent = Depends(get_shared_slicer_agent)) -> Dict[str, Any]:
+    try:
+        return {"success": True, "data": agent.get_slice_cache_stats()}
+    except Exception as e:
+        logger.error(f"Failed to read slice cache stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs")
+async def list_slice_jobs() -> Dict[str, Any]:
+    pool = get_slicer_process_pool()
+    return {"success": True, "data": {"pool": pool.get_stats(), "jobs": pool.list_jobs()}}
+
+
+@router.get("/jobs/{job_id}")
+async def get_slice_job(job_id: str) -> Dict[str, Any]:
+    job = get_slicer_process_pool().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Slicing job not found: {job_id}")
+    return {"success": True, "data": job.to_dict()}
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_slice_job(job_id: str) -> Dict[str, Any]:
+    pool = get_slicer_process_pool()
+    if pool.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Slicing job not found: {job_id}")
+    if not pool.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Slicing job already finished: {job_id}")
+    return {"success": True, "data": pool.get_job(job_id).to_dict()}
+
+
 @router.post("/slice")
-async def slice_model(req: SliceRequest) -> Dict[str, Any]:
+async def slice_model(req: SliceRequest, agent: SlicerAgent = Depends(get_slicer_agent)) -> Dict[str, Any]:
     try:
         if not os.path.exists(req.stl_path):
             raise HTTPException(status_code=400, detail=f"STL not found: {req.stl_path}")
+        if req.priority.upper() not in MessagePriority.__members__:
+            raise HTTPException(status_code=400, detail=f"Unknown priority: {req.priority}")
 
-        agent = SlicerAgent("api_slicer", config={"mock_mode": True})
         result = await agent.slice_stl(
             stl_path=req.stl_path,
             profile_name=req.profile,
@@ -54,11 +111,15 @@ async def slice_model(req: SliceRequest) -> Dict[str, Any]:
             infill_percentage=req.infill_percentage,
             layer_height=req.layer_height if req.layer_height else 0.12,
             print_speed=req.print_speed if req.print_speed else 35,
+            priority=MessagePriority[req.priority.upper()],
+            job_id=req.job_id,
         )
 
         return {"success": True, "data": result}
     except HTTPException:
         raise
+    except SlicerJobCancelledError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Slicing failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -18,7 +18,6 @@ Features:
 import asyncio
 import json
 import time
-import statistics
 import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
@@ -31,10 +30,36 @@ from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 
 from core.logger import get_logger
+from core.metric_store import AGGREGATIONS, MetricStore, parse_percentile
 from core.performance import MultiLevelCache, ResourceManager, PerformanceMonitor
 
 logger = get_logger(__name__)
 
+# Scalar SystemMetrics fields kept as typed metric store columns
+SYSTEM_METRIC_COLUMNS = {
+    "cpu_usage": "REAL",
+    "memory_usage": "REAL",
+    "disk_usage": "REAL",
+    "cache_hit_rate": "REAL",
+    "active_requests": "INTEGER",
+    "response_time_avg": "REAL",
+    "error_rate": "REAL",
+    "queue_size": "INTEGER",
+    "temperature": "REAL",
+}
+
+TIME_RANGES = {
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30)
+}
+
+
+def _range_start(time_range: str) -> float:
+    """Epoch start of a time range such as '24h' (unknown ranges mean 24h)"""
+    return (datetime.now() - TIME_RANGES.get(time_range, timedelta(hours=24))).timestamp()
+
 
 @dataclass
 class SystemMetrics:
@@ -107,6 +132,10 @@ class AdvancedAnalytics:
         self._init_database()
         self._load_alert_rules()
         
+        # Metric samples and their rollups, in the same database
+        self.metric_store = MetricStore(self.data_dir / "analytics.db", SYSTEM_METRIC_COLUMNS)
+        self._migrate_legacy_metrics()
+        
         # Start background monitoring
         self._monitoring_active = True
         
@@ -118,16 +147,6 @@ class AdvancedAnalytics:
             with sqlite3.connect(db_path) as conn:
                 cursor = conn.cursor()
                 
-                # Metrics table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS system_metrics (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp TEXT NOT NULL,
-                        metrics_json TEXT NOT NULL,
-                        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
                 # Alerts table
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS alerts (
@@ -297,24 +316,58 @@ class AdvancedAnalytics:
 
     async def _store_metrics(self, metrics: SystemMetrics):
         """Store metrics in database"""
+        try:
+            # Buffered; the metric store writes samples in batches
+            self.metric_store.record(
+                metrics.timestamp,
+                {name: getattr(metrics, name) for name in SYSTEM_METRIC_COLUMNS}
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error storing metrics: {e}")
+
+    def _migrate_legacy_metrics(self):
+        """Move samples stored as JSON blobs into the metric store"""
         try:
             db_path = self.data_dir / "analytics.db"
             
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT INTO system_metrics (timestamp, metrics_json)
-                    VALUES (?, ?)
-                """, (
-                    metrics.timestamp.isoformat(),
-                    json.dumps(asdict(metrics), default=str)
-                ))
+            conn = sqlite3.connect(db_path)
+            try:
+                legacy_table = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'system_metrics'"
+                ).fetchone()
+                if legacy_table is None:
+                    return
                 
-                conn.commit()
+                # Each batch deletes its source rows in the transaction that stores it,
+                # so restarts (and retention of the imported samples) never import twice
+                migrated = 0
+                while True:
+                    rows = conn.execute(
+                        "SELECT id, timestamp, metrics_json FROM system_metrics ORDER BY id LIMIT 1000"
+                    ).fetchall()
+                    if not rows:
+                        break
+                    
+                    samples = []
+                    for _, timestamp_str, metrics_json in rows:
+                        try:
+                            samples.append((datetime.fromisoformat(timestamp_str), json.loads(metrics_json)))
+                        except (json.JSONDecodeError, ValueError):
+                            continue
+                    self.metric_store.import_samples(
+                        samples, [("DELETE FROM system_metrics WHERE id <= ?", (rows[-1][0],))]
+                    )
+                    migrated += len(samples)
+            finally:
+                conn.close()
+            
+            self.metric_store.import_samples([], [("DROP TABLE system_metrics", ())])
+            if migrated:
+                self.logger.info(f"Migrated {migrated} stored metric samples to the metric store")
                 
         except Exception as e:
-            self.logger.error(f"Error storing metrics: {e}")
+            self.logger.error(f"Error migrating stored metrics: {e}")
 
     async def _check_alerts(self, metrics: SystemMetrics):
         """Check metrics against alert rules"""
@@ -475,48 +528,55 @@ class AdvancedAnalytics:
     async def _get_historical_data(self, metric_name: str, 
                                  time_range: str) -> List[Tuple[datetime, float]]:
         """Get historical data for a metric"""
+        series = await self._get_historical_series([metric_name], time_range)
+        return series[metric_name]
+
+    async def _get_historical_series(self, metric_names: List[str],
+                                   time_range: str) -> Dict[str, List[Tuple[datetime, float]]]:
+        """
+        Get historical data for several metrics with one query.
+        
+        Ranges beyond a few hours come from the rollups: each point is the
+        average of a 1-minute, 1-hour or 1-day bucket.
+        """
+        series = {name: [] for name in metric_names}
         try:
-            # Convert time range to timedelta
-            time_delta_map = {
-                "1h": timedelta(hours=1),
-                "24h": timedelta(hours=24),
-                "7d": timedelta(days=7),
-                "30d": timedelta(days=30)
-            }
-            
-            delta = time_delta_map.get(time_range, timedelta(hours=24))
-            start_time = datetime.now() - delta
-            
-            db_path = self.data_dir / "analytics.db"
-            data_points = []
-            
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT timestamp, metrics_json FROM system_metrics
-                    WHERE timestamp >= ?
-                    ORDER BY timestamp
-                """, (start_time.isoformat(),))
+            known = [name for name in metric_names if name in SYSTEM_METRIC_COLUMNS]
+            if known:
+                series.update(self.metric_store.series(known, _range_start(time_range)))
                 
-                rows = cursor.fetchall()
-                
-                for timestamp_str, metrics_json in rows:
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str)
-                        metrics_data = json.loads(metrics_json)
-                        
-                        if metric_name in metrics_data:
-                            value = metrics_data[metric_name]
-                            data_points.append((timestamp, float(value)))
-                            
-                    except (json.JSONDecodeError, ValueError, KeyError):
-                        continue
-                        
-            return data_points
-            
         except Exception as e:
             self.logger.error(f"Error getting historical data: {e}")
-            return []
+            
+        return series
+
+    async def aggregate_metrics(self, metric_names: List[str], time_range: str = "24h",
+                              aggregations: Tuple[str, ...] = ("avg",)) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Aggregate metrics over a time range in the database.
+        
+        Args:
+            metric_names: Metrics to aggregate
+            time_range: '1h', '24h', '7d' or '30d'
+            aggregations: avg, min, max, sum, count or percentiles such as 'p95'
+            
+        Returns:
+            Metric -> aggregation -> value (None for unknown metrics or
+            aggregations and ranges without data)
+        """
+        results = {name: dict.fromkeys(aggregations) for name in metric_names}
+        try:
+            known = [name for name in metric_names if name in SYSTEM_METRIC_COLUMNS]
+            valid = [a for a in aggregations if a in AGGREGATIONS or parse_percentile(a) is not None]
+            if known and valid:
+                aggregated = self.metric_store.aggregate(known, valid, _range_start(time_range))
+                for name, values in aggregated.items():
+                    results[name].update(values)
+                    
+        except Exception as e:
+            self.logger.error(f"Error aggregating metrics: {e}")
+            
+        return results
 
     async def get_dashboard_data(self) -> Dict[str, Any]:
         """Get comprehensive dashboard data"""
@@ -679,6 +739,7 @@ class AdvancedAnalytics:
     def stop_monitoring(self):
         """Stop continuous monitoring"""
         self._monitoring_active = False
+        self.metric_store.flush()
         self.logger.info("Monitoring stopped")
 
     async def acknowledge_alert(self, alert_id: str) -> bool:
@@ -741,18 +802,16 @@ class AdvancedAnalytics:
     async def _get_period_summary(self, period: str) -> Dict[str, Any]:
         """Get summary for a specific time period"""
         try:
-            data_points = await self._get_historical_data("cpu_usage", period)
+            cpu = (await self.aggregate_metrics(["cpu_usage"], period, ("avg", "max", "min", "count")))["cpu_usage"]
             
-            if not data_points:
+            if not cpu["count"]:
                 return {"message": "No data available"}
-                
-            cpu_values = [point[1] for point in data_points]
             
             return {
-                "avg_cpu": statistics.mean(cpu_values),
-                "max_cpu": max(cpu_values),
-                "min_cpu": min(cpu_values),
-                "data_points": len(data_points)
+                "avg_cpu": cpu["avg"],
+                "max_cpu": cpu["max"],
+                "min_cpu": cpu["min"],
+                "data_points": cpu["count"]
             }
             
         except Exception as e:
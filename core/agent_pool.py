@@ -0,0 +1,303 @@
+"""
+Shared Agent Pool for AI Agent 3D Print System
+
+API routes used to construct a new agent for every request, repeating
+executable discovery, profile setup and CAD backend initialization each
+time. AgentPool keeps one long-lived instance per registered agent and
+hands it out to request handlers:
+
+- Agents are created lazily on first use (in a worker thread, so the event
+  loop is not blocked) or eagerly by ``warm_up()`` from the application
+  lifespan.
+- Each agent has a concurrency limit; ``acquire()`` waits for a free slot.
+- ``health_check()`` probes the created agents; an unhealthy agent is
+  dropped once idle and rebuilt on its next use.
+
+Routes obtain agents through FastAPI dependencies that wrap ``acquire()``.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from core.logger import get_logger
+
+# Default concurrency limits of the agents registered by register_default_agents.
+# CADAgent builds every model in one FreeCAD document, so it takes one request at a time.
+DEFAULT_AGENT_LIMITS = {
+    'slicer': 4,
+    'cad': 1,
+}
+
+
+@dataclass
+class PooledAgent:
+    """A registered agent and its usage counters."""
+    name: str
+    factory: Callable[[], Any]
+    max_concurrent: int = 1
+    health_check: Optional[Callable[[Any], bool]] = None
+    instance: Any = None
+    semaphore: Optional[asyncio.Semaphore] = None
+    build_lock: Optional[asyncio.Lock] = None
+    healthy: bool = True
+    active: int = 0
+    acquisitions: int = 0
+    builds: int = 0
+    build_time: float = 0.0
+    total_wait_time: float = 0.0
+    failures: int = 0
+    last_health_check: Optional[float] = None
+    last_error: Optional[str] = None
+    created_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize counters and state."""
+        return {
+            'name': self.name,
+            'created': self.instance is not None,
+            'healthy': self.healthy,
+            'max_concurrent': self.max_concurrent,
+            'active': self.active,
+            'acquisitions': self.acquisitions,
+            'builds': self.builds,
+            'last_build_time': self.build_time,
+            'avg_wait_time': self.total_wait_time / self.acquisitions if self.acquisitions else 0.0,
+            'failures': self.failures,
+            'last_health_check': self.last_health_check,
+            'last_error': self.last_error,
+            'created_at': self.created_at
+        }
+
+
+class AgentPool:
+    """Registry of long-lived agent instances with per-agent concurrency limits."""
+
+    def __init__(self):
+        self.logger = get_logger(f"{__name__}.AgentPool")
+        self._agents: Dict[str, PooledAgent] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], max_concurrent: int = 1,
+                 health_check: Optional[Callable[[Any], bool]] = None) -> None:
+        """
+        Register an agent.
+
+        Args:
+            name: Pool key of the agent
+            factory: Builds the agent (called without arguments)
+            max_concurrent: Requests allowed to use the agent at once
+            health_check: Returns True if the agent is usable (defaults to
+                calling ``get_status()`` when the agent has one)
+        """
+        if name in self._agents and self._agents[name].instance is not None:
+            raise ValueError(f"Agent '{name}' is already registered and in use")
+        self._agents[name] = PooledAgent(
+            name=name,
+            factory=factory,
+            max_concurrent=max(1, max_concurrent),
+            health_check=health_check
+        )
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._agents
+
+    def _slot(self, name: str) -> PooledAgent:
+        slot = self._agents.get(name)
+        if slot is None:
+            raise KeyError(f"Agent '{name}' is not registered")
+        # Loop-bound primitives are created on first use inside the event loop
+        if slot.semaphore is None:
+            slot.semaphore = asyncio.Semaphore(slot.max_concurrent)
+            slot.build_lock = asyncio.Lock()
+        return slot
+
+    async def get(self, name: str) -> Any:
+        """
+        Get an agent instance, building it on first use.
+
+        This does not take a concurrency slot; use ``acquire()`` in request
+        handlers.
+        """
+        slot = self._slot(name)
+        if slot.instance is not None and slot.healthy:
+            return slot.instance
+
+        async with slot.build_lock:
+            if slot.instance is not None and not slot.healthy and slot.active == 0:
+                self._dispose(slot)
+            if slot.instance is None:
+                start = time.perf_counter()
+                try:
+                    slot.instance = await asyncio.to_thread(slot.factory)
+                except Exception as e:
+                    slot.failures += 1
+                    slot.last_error = str(e)
+                    self.logger.error(f"Failed to build agent '{name}': {e}")
+                    raise
+                slot.build_time = time.perf_counter() - start
+                slot.builds += 1
+                slot.healthy = True
+                slot.created_at = time.time()
+                self.logger.info(f"Agent '{name}' ready in {slot.build_time * 1000:.1f}ms")
+        return slot.instance
+
+    @asynccontextmanager
+    async def acquire(self, name: str) -> AsyncIterator[Any]:
+        """
+        Use an agent within its concurrency limit.
+
+        Example:
+            async with pool.acquire('slicer') as agent:
+                await agent.slice_stl(...)
+        """
+        slot = self._slot(name)
+        wait_start = time.perf_counter()
+        async with slot.semaphore:
+            slot.total_wait_time += time.perf_counter() - wait_start
+            agent = await self.get(name)
+            slot.acquisitions += 1
+            slot.active += 1
+            try:
+                yield agent
+            finally:
+                slot.active -= 1
+
+    async def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        Build agents ahead of their first request.
+
+        Args:
+            names: Agents to build (default: all registered)
+
+        Returns:
+            Build time in seconds per agent that was built successfully
+        """
+        timings = {}
+        for name in list(names or self._agents):
+            try:
+                await self.get(name)
+                timings[name] = self._agents[name].build_time
+            except Exception as e:
+                self.logger.warning(f"Warm-up of agent '{name}' failed: {e}")
+        return timings
+
+    async def health_check(self) -> Dict[str, Any]:
+        """
+        Probe every created agent.
+
+        Unhealthy agents are rebuilt on their next use (once no request is
+        using them).
+
+        Returns:
+            Overall status and per-agent state
+        """
+        for slot in self._agents.values():
+            if slot.instance is None:
+                continue
+            try:
+                if slot.health_check is not None:
+                    healthy = bool(await asyncio.to_thread(slot.health_check, slot.instance))
+                elif hasattr(slot.instance, 'get_status'):
+                    slot.instance.get_status()
+                    healthy = True
+                else:
+                    healthy = True
+                if not healthy:
+                    slot.last_error = "health check failed"
+            except Exception as e:
+                healthy = False
+                slot.last_error = str(e)
+            if slot.healthy and not healthy:
+                self.logger.warning(f"Agent '{slot.name}' is unhealthy: {slot.last_error}")
+            slot.healthy = healthy
+            slot.last_health_check = time.time()
+
+        agents = {name: slot.to_dict() for name, slot in self._agents.items()}
+        return {
+            'status': 'healthy' if all(a['healthy'] for a in agents.values()) else 'degraded',
+            'agents': agents
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-agent counters."""
+        return {name: slot.to_dict() for name, slot in self._agents.items()}
+
+    async def shutdown(self) -> None:
+        """Release all agent instances."""
+        for slot in self._agents.values():
+            if slot.instance is not None:
+                self._dispose(slot)
+            # A later event loop gets fresh primitives
+            slot.semaphore = None
+            slot.build_lock = None
+
+    def _dispose(self, slot: PooledAgent) -> None:
+        agent, slot.instance = slot.instance, None
+        for method in ('cleanup', 'shutdown'):
+            handler = getattr(agent, method, None)
+            if callable(handler) and not asyncio.iscoroutinefunction(handler):
+                try:
+                    handler()
+                except Exception as e:
+                    self.logger.warning(f"Agent '{slot.name}' {method} failed: {e}")
+                break
+
+
+def _build_slicer_agent():
+    from agents.slicer_agent import SlicerAgent
+    # G-code files are handed to API clients, so the shared agent must not
+    # collect (and later delete) them
+    return SlicerAgent("api_slicer", config={"mock_mode": True, "track_output_files": False})
+
+
+def _build_cad_agent():
+    from agents.cad_agent import CADAgent
+    return CADAgent(agent_name="cat_cad")
+
+
+def _slicer_agent_healthy(agent) -> bool:
+    return bool(agent.list_profiles())
+
+
+def _cad_agent_healthy(agent) -> bool:
+    return getattr(agent, 'cad_backend', None) is not None
+
+
+def register_default_agents(pool: AgentPool, limits: Optional[Dict[str, int]] = None) -> None:
+    """
+    Register the agents used by the API routes.
+
+    Args:
+        pool: Pool to register with (agents already registered are kept)
+        limits: Concurrency limit per agent name (overrides DEFAULT_AGENT_LIMITS)
+    """
+    limits = {**DEFAULT_AGENT_LIMITS, **(limits or {})}
+    defaults = {
+        'slicer': (_build_slicer_agent, _slicer_agent_healthy),
+        'cad': (_build_cad_agent, _cad_agent_healthy),
+    }
+    for name, (factory, health_check) in defaults.items():
+        if not pool.is_registered(name):
+            pool.register(name, factory, max_concurrent=limits[name], health_check=health_check)
+
+
+_POOL: Optional[AgentPool] = None
+
+
+def get_agent_pool(limits: Optional[Dict[str, int]] = None) -> AgentPool:
+    """
+    Get the process-wide agent pool (with the default API agents registered).
+
+    The limits of the first call win; the application lifespan makes that
+    call with the configured limits.
+    """
+    global _POOL
+    if _POOL is None:
+        _POOL = AgentPool()
+        register_default_agents(_POOL, limits)
+    return _POOL
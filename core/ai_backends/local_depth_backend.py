@@ -19,6 +19,7 @@ import tempfile
 from core.logger import get_logger
 from core.ai_backends.base_backend import BaseAI3DBackend
 from core.ai_backends.backend_registry import register_backend
+from core.heightmap_mesher import DEFAULT_MAX_ERROR, heightmap_to_solid
 
 
 @register_backend('local_depth')
@@ -59,7 +60,8 @@ class LocalDepthBackend(BaseAI3DBackend):
         
         Args:
             image_path: Path to input image
-            params: depth_scale, extrusion_height, base_thickness, smoothing
+            params: depth_scale, extrusion_height, base_thickness, smoothing,
+                max_error (height tolerance of the mesh decimation)
         """
         try:
             if not self.is_initialized:
@@ -71,7 +73,8 @@ class LocalDepthBackend(BaseAI3DBackend):
                 'extrusion_height': 10.0,
                 'base_thickness': 2.0,
                 'smoothing': True,
-                'resolution': (256, 256)
+                'resolution': (256, 256),
+                'max_error': DEFAULT_MAX_ERROR
             }
             if params:
                 p.update(params)
@@ -97,7 +100,8 @@ class LocalDepthBackend(BaseAI3DBackend):
             # Create mesh from heightmap
             mesh = self._heightmap_to_mesh(
                 height_map, 
-                base_thickness=p['base_thickness']
+                base_thickness=p['base_thickness'],
+                max_error=p['max_error']
             )
             
             # Add some metadata
@@ -254,98 +258,9 @@ class LocalDepthBackend(BaseAI3DBackend):
             'description': 'Basic depth-based 3D generation running locally. Good for testing and simple use cases.'
         }
     
-    def _heightmap_to_mesh(self, height_map: np.ndarray, base_thickness: float = 2.0) -> trimesh.Trimesh:
-        """Convert heightmap array to 3D mesh"""
-        rows, cols = height_map.shape
-        
-        # Create vertices
-        vertices = []
-        for i in range(rows):
-            for j in range(cols):
-                # Top surface
-                x = j
-                y = i
-                z = height_map[i, j] + base_thickness
-                vertices.append([x, y, z])
-        
-        # Add base vertices
-        for i in range(rows):
-            for j in range(cols):
-                x = j
-                y = i
-                z = 0
-                vertices.append([x, y, z])
-        
-        vertices = np.array(vertices)
-        
-        # Create faces
-        faces = []
-        num_top_vertices = rows * cols
-        
-        # Top surface faces
-        for i in range(rows - 1):
-            for j in range(cols - 1):
-                v1 = i * cols + j
-                v2 = i * cols + (j + 1)
-                v3 = (i + 1) * cols + j
-                v4 = (i + 1) * cols + (j + 1)
-                
-                faces.append([v1, v2, v3])
-                faces.append([v2, v4, v3])
-        
-        # Bottom surface faces (reversed winding)
-        for i in range(rows - 1):
-            for j in range(cols - 1):
-                v1 = num_top_vertices + i * cols + j
-                v2 = num_top_vertices + i * cols + (j + 1)
-                v3 = num_top_vertices + (i + 1) * cols + j
-                v4 = num_top_vertices + (i + 1) * cols + (j + 1)
-                
-                faces.append([v1, v3, v2])
-                faces.append([v2, v3, v4])
-        
-        # Side faces
-        # Left edge
-        for i in range(rows - 1):
-            v1 = i * cols
-            v2 = (i + 1) * cols
-            v3 = num_top_vertices + i * cols
-            v4 = num_top_vertices + (i + 1) * cols
-            faces.append([v1, v3, v2])
-            faces.append([v2, v3, v4])
-        
-        # Right edge
-        for i in range(rows - 1):
-            v1 = i * cols + (cols - 1)
-            v2 = (i + 1) * cols + (cols - 1)
-            v3 = num_top_vertices + i * cols + (cols - 1)
-            v4 = num_top_vertices + (i + 1) * cols + (cols - 1)
-            faces.append([v1, v2, v3])
-            faces.append([v2, v4, v3])
-        
-        # Front edge
-        for j in range(cols - 1):
-            v1 = j
-            v2 = j + 1
-            v3 = num_top_vertices + j
-            v4 = num_top_vertices + j + 1
-            faces.append([v1, v2, v3])
-            faces.append([v2, v4, v3])
-        
-        # Back edge
-        for j in range(cols - 1):
-            v1 = (rows - 1) * cols + j
-            v2 = (rows - 1) * cols + j + 1
-            v3 = num_top_vertices + (rows - 1) * cols + j
-            v4 = num_top_vertices + (rows - 1) * cols + j + 1
-            faces.append([v1, v3, v2])
-            faces.append([v2, v3, v4])
-        
-        faces = np.array(faces)
-        
-        # Create mesh
-        mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
-        mesh.remove_duplicate_faces()
-        mesh.merge_vertices()
-        
-        return mesh
+    def _heightmap_to_mesh(self, height_map: np.ndarray, base_thickness: float = 2.0,
+                           max_error: float = DEFAULT_MAX_ERROR) -> trimesh.Trimesh:
+        """Convert heightmap array to a watertight 3D solid (adaptively decimated top surface)"""
+        vertices, faces = heightmap_to_solid(height_map + base_thickness, pixel_size=1.0,
+                                             max_error=max_error, base_z=0.0)
+        return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
@@ -29,6 +29,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, mean_squared_error
 
 from core.logger import get_logger
+from core.spatial_index import TriangleIndex, count_crowded_points
 
 logger = get_logger(__name__)
 
@@ -106,8 +107,9 @@ class GeometryAnalyzer:
             DesignMetrics object with all calculated metrics
         """
         try:
-            vertices = geometry_data['vertices']
-            normals = geometry_data['normals']
+            # Arrays from core.stl_reader; plain nested lists are accepted too
+            vertices = np.asarray(geometry_data['vertices'], dtype=np.float64).reshape(-1, 3)
+            normals = np.asarray(geometry_data['normals'], dtype=np.float64).reshape(-1, 3)
             bounds = geometry_data['bounds']
             
             # Basic geometric properties
@@ -128,7 +130,7 @@ class GeometryAnalyzer:
             small_features_count = self._count_small_features(vertices)
             
             # Structural analysis
-            wall_thickness_min, wall_thickness_avg = self._analyze_wall_thickness(vertices)
+            wall_thickness_min, wall_thickness_avg = self._analyze_wall_thickness(vertices, normals)
             stress_concentration_points = self._find_stress_concentrations(vertices)
             weak_points_count = self._count_weak_points(vertices, normals)
             
@@ -170,36 +172,27 @@ class GeometryAnalyzer:
             self.logger.error(f"Error analyzing geometry: {e}")
             raise
     
-    def _calculate_surface_area(self, vertices: List[List[float]], normals: List[List[float]]) -> float:
+    @staticmethod
+    def _triangles(vertices: np.ndarray) -> np.ndarray:
+        """View complete vertex triples as a (n, 3, 3) triangle array"""
+        vertex_array = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        return vertex_array[:len(vertex_array) // 3 * 3].reshape(-1, 3, 3)
+    
+    def _calculate_surface_area(self, vertices: np.ndarray, normals: np.ndarray) -> float:
         """Calculate surface area of the mesh"""
-        total_area = 0.0
-        for i in range(0, len(vertices), 3):
-            if i + 2 < len(vertices):
-                v1 = np.array(vertices[i])
-                v2 = np.array(vertices[i + 1])
-                v3 = np.array(vertices[i + 2])
-                
-                # Calculate triangle area using cross product
-                edge1 = v2 - v1
-                edge2 = v3 - v1
-                triangle_area = 0.5 * np.linalg.norm(np.cross(edge1, edge2))
-                total_area += triangle_area
+        triangles = self._triangles(vertices)
         
-        return total_area
+        # Triangle areas using cross product
+        cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        return float(0.5 * np.linalg.norm(cross, axis=1).sum())
     
-    def _calculate_volume(self, vertices: List[List[float]]) -> float:
+    def _calculate_volume(self, vertices: np.ndarray) -> float:
         """Calculate volume using divergence theorem"""
-        volume = 0.0
-        for i in range(0, len(vertices), 3):
-            if i + 2 < len(vertices):
-                v1 = np.array(vertices[i])
-                v2 = np.array(vertices[i + 1])
-                v3 = np.array(vertices[i + 2])
-                
-                # Calculate signed volume of tetrahedron
-                volume += np.dot(v1, np.cross(v2, v3)) / 6.0
+        triangles = self._triangles(vertices)
         
-        return abs(volume)
+        # Sum of signed tetrahedron volumes
+        signed = np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2]))
+        return float(abs(signed.sum() / 6.0))
     
     def _calculate_bounding_box_volume(self, bounds: Dict[str, Tuple[float, float]]) -> float:
         """Calculate bounding box volume"""
@@ -217,39 +210,30 @@ class GeometryAnalyzer:
         ]
         return max(dimensions) / min(dimensions) if min(dimensions) > 0 else 1.0
     
-    def _analyze_overhangs(self, vertices: List[List[float]], normals: List[List[float]]) -> float:
+    def _analyze_overhangs(self, vertices: np.ndarray, normals: np.ndarray) -> float:
         """Analyze percentage of surface that requires supports"""
         overhang_threshold = -0.7  # cos(135°) - steeper than 45° overhang
-        overhang_triangles = 0
-        total_triangles = len(normals)
+        normal_array = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+        total_triangles = len(normal_array)
         
-        for normal in normals:
-            if normal[2] < overhang_threshold:  # Z component indicates overhang
-                overhang_triangles += 1
+        # Z component indicates overhang
+        overhang_triangles = int(np.count_nonzero(normal_array[:, 2] < overhang_threshold))
         
         return (overhang_triangles / total_triangles * 100) if total_triangles > 0 else 0
     
-    def _count_bridges(self, vertices: List[List[float]], normals: List[List[float]]) -> int:
+    def _count_bridges(self, vertices: np.ndarray, normals: np.ndarray) -> int:
         """Count potential bridge structures"""
         # Simplified bridge detection based on horizontal surfaces with gaps
-        bridges = 0
-        z_levels = {}
+        triangles = self._triangles(vertices)
+        if len(triangles) == 0:
+            return 0
         
         # Group triangles by Z level
-        for i in range(0, len(vertices), 3):
-            if i + 2 < len(vertices):
-                z_avg = (vertices[i][2] + vertices[i + 1][2] + vertices[i + 2][2]) / 3
-                z_level = round(z_avg, 1)
-                if z_level not in z_levels:
-                    z_levels[z_level] = []
-                z_levels[z_level].append(i // 3)
-        
-        # Check for gaps at each level (simplified)
-        for z_level, triangles in z_levels.items():
-            if len(triangles) < 5:  # Potential bridge if few triangles at this level
-                bridges += 1
+        z_levels = np.round(triangles[:, :, 2].mean(axis=1), 1)
+        _, counts = np.unique(z_levels, return_counts=True)
         
-        return bridges
+        # Potential bridge if few triangles at this level (simplified)
+        return int(np.count_nonzero(counts < 5))
     
     def _estimate_support_volume(self, vertices: List[List[float]], normals: List[List[float]]) -> float:
         """Estimate support material volume as percentage of model volume"""
@@ -265,7 +249,7 @@ class GeometryAnalyzer:
         
         # This is a simplified implementation
         # In practice, would need more sophisticated mesh analysis
-        vertex_array = np.array(vertices)
+        vertex_array = np.asarray(vertices)
         if len(vertex_array) > 0:
             # Estimate based on surface area to volume ratio
             surface_area = self._calculate_surface_area(vertices, [])
@@ -283,45 +267,36 @@ class GeometryAnalyzer:
         min_feature_size = 0.5  # mm
         
         # Simplified detection based on vertex clustering
-        vertex_array = np.array(vertices)
+        vertex_array = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
         if len(vertex_array) > 100:
             # Sample vertices and check for tight clusters
             sample_size = min(1000, len(vertex_array))
             sample_indices = np.random.choice(len(vertex_array), sample_size, replace=False)
             sample_vertices = vertex_array[sample_indices]
             
-            # Count vertices that are very close to others
-            for i, vertex in enumerate(sample_vertices):
-                close_count = 0
-                for j, other in enumerate(sample_vertices):
-                    if i != j:
-                        distance = np.linalg.norm(vertex - other)
-                        if distance < min_feature_size:
-                            close_count += 1
-                if close_count > 5:  # Many nearby vertices indicate small feature
-                    small_features += 1
+            # Many nearby vertices indicate small feature (KD-tree neighbour count)
+            small_features = count_crowded_points(sample_vertices, min_feature_size, 5)
         
         return min(small_features // 10, 15)  # Scale down and cap
     
-    def _analyze_wall_thickness(self, vertices: List[List[float]]) -> Tuple[float, float]:
-        """Analyze wall thickness statistics"""
-        # Simplified wall thickness analysis
-        # In practice, would need ray casting or other advanced techniques
-        vertex_array = np.array(vertices)
+    def _analyze_wall_thickness(self, vertices: np.ndarray,
+                                normals: Optional[np.ndarray] = None) -> Tuple[float, float]:
+        """Analyze wall thickness statistics (min, average) in mm"""
+        vertex_array = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
         
         if len(vertex_array) == 0:
             return 1.0, 1.0
         
-        # Estimate based on bounding box and vertex distribution
-        bounds_x = [vertex_array[:, 0].min(), vertex_array[:, 0].max()]
-        bounds_y = [vertex_array[:, 1].min(), vertex_array[:, 1].max()]
-        bounds_z = [vertex_array[:, 2].min(), vertex_array[:, 2].max()]
+        # Ray casting: distance from sampled faces along the inward normal
+        # to the opposite surface
+        thickness = TriangleIndex(vertex_array, normals).wall_thickness()
+        thickness = thickness[np.isfinite(thickness)]
+        if len(thickness) > 0:
+            return float(thickness.min()), float(thickness.mean())
         
-        dimensions = [
-            bounds_x[1] - bounds_x[0],
-            bounds_y[1] - bounds_y[0],
-            bounds_z[1] - bounds_z[0]
-        ]
+        # No opposite surface found (open surface): estimate based on
+        # bounding box and vertex distribution
+        dimensions = (vertex_array.max(axis=0) - vertex_array.min(axis=0)).tolist()
         
         # Rough estimation
         min_thickness = min(dimensions) * 0.05  # 5% of smallest dimension
@@ -329,49 +304,42 @@ class GeometryAnalyzer:
         
         return max(min_thickness, 0.4), max(avg_thickness, 0.8)
     
-    def _find_stress_concentrations(self, vertices: List[List[float]]) -> int:
+    def _find_stress_concentrations(self, vertices: np.ndarray) -> int:
         """Find potential stress concentration points"""
         # Simplified stress concentration detection
         # Based on sharp angles and geometric discontinuities
-        stress_points = 0
+        triangles = self._triangles(vertices)
+        if len(triangles) * 3 <= 9:
+            return 0
         
-        vertex_array = np.array(vertices)
-        if len(vertex_array) > 9:
-            # Check for sharp angles in triangle mesh
-            for i in range(0, len(vertex_array) - 6, 3):
-                v1 = vertex_array[i]
-                v2 = vertex_array[i + 1]
-                v3 = vertex_array[i + 2]
-                
-                # Calculate angle between edges
-                edge1 = v2 - v1
-                edge2 = v3 - v1
-                
-                if np.linalg.norm(edge1) > 0 and np.linalg.norm(edge2) > 0:
-                    cos_angle = np.dot(edge1, edge2) / (np.linalg.norm(edge1) * np.linalg.norm(edge2))
-                    angle = np.arccos(np.clip(cos_angle, -1, 1))
-                    
-                    # Sharp angle indicates potential stress concentration
-                    if angle < np.pi / 6:  # Less than 30 degrees
-                        stress_points += 1
+        # Check for sharp angles in triangle mesh (the last two triangles are
+        # not checked)
+        triangles = triangles[:len(triangles) - 2]
+        edge1 = triangles[:, 1] - triangles[:, 0]
+        edge2 = triangles[:, 2] - triangles[:, 0]
+        lengths = np.linalg.norm(edge1, axis=1) * np.linalg.norm(edge2, axis=1)
+        valid = lengths > 0
+        
+        cos_angle = np.einsum('ij,ij->i', edge1[valid], edge2[valid]) / lengths[valid]
+        angle = np.arccos(np.clip(cos_angle, -1, 1))
+        
+        # Sharp angle (less than 30 degrees) indicates potential stress concentration
+        stress_points = int(np.count_nonzero(angle < np.pi / 6))
         
         return min(stress_points // 10, 10)  # Scale down and cap
     
-    def _count_weak_points(self, vertices: List[List[float]], normals: List[List[float]]) -> int:
+    def _count_weak_points(self, vertices: np.ndarray, normals: np.ndarray) -> int:
         """Count structural weak points"""
         # Simplified weak point detection
-        weak_points = 0
-        
         # Check for areas with high curvature or thin connections
-        vertex_array = np.array(vertices)
-        normal_array = np.array(normals)
+        normal_array = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
         
+        weak_points = 0
         if len(normal_array) > 1:
-            # Check for rapid normal changes (high curvature)
-            for i in range(len(normal_array) - 1):
-                dot_product = np.dot(normal_array[i], normal_array[i + 1])
-                if dot_product < 0.5:  # Normals differ significantly
-                    weak_points += 1
+            # Check for rapid normal changes (high curvature): normals of
+            # consecutive triangles differ significantly
+            dot_products = np.einsum('ij,ij->i', normal_array[:-1], normal_array[1:])
+            weak_points = int(np.count_nonzero(dot_products < 0.5))
         
         return min(weak_points // 5, 8)  # Scale down and cap
     
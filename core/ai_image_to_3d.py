@@ -24,6 +24,7 @@ import json
 import uuid
 
 from core.logger import get_logger
+from core.result_cache import get_result_cache, make_result_key, warm_from_directory
 
 logger = get_logger(__name__)
 
@@ -37,6 +38,9 @@ class AIImageTo3DConverter:
         self.depth_estimation_model = None
         self.mesh_reconstruction_model = None
         
+        # Conversion results, shared with the other image-to-3D consumers
+        self.result_cache = get_result_cache()
+        
         # Initialize AI models
         self._initialize_ai_models()
     
@@ -582,6 +586,20 @@ class AIImageTo3DConverter:
         try:
             self.logger.info(f"🖼️ Converting image {filename} to 3D model...")
             
+            # Identical images convert to the same model whatever their name
+            cache_key = make_result_key(
+                'ai_image_to_3d', image_data,
+                {"style": style, "quality": quality, "output_format": output_format}
+            )
+            cached = await self.result_cache.get_async(cache_key)
+            if cached is not None:
+                self.logger.info(f"♻️ Using cached conversion {cached['model_id']} for {filename}")
+                return {
+                    **cached,
+                    "cache_hit": True,
+                    "metadata": {**cached["metadata"], "original_filename": filename}
+                }
+            
             # Simulate processing time
             await asyncio.sleep(2)
             
@@ -610,6 +628,7 @@ class AIImageTo3DConverter:
                     "created_at": datetime.now().isoformat()
                 }
             }
+            await self.result_cache.put_async(cache_key, result)
             
             self.logger.info(f"✅ Image conversion completed: {model_id}")
             return result
@@ -621,6 +640,25 @@ class AIImageTo3DConverter:
                 "error": str(e)
             }
     
+    async def warm_cache(self, directory: str = "data/uploads", style: str = "realistic",
+                         quality: str = "medium", output_format: str = "stl") -> Dict[str, int]:
+        """
+        Precompute cached conversions for the images in a directory
+        
+        Args:
+            directory: Directory searched recursively for images
+            style: Conversion style
+            quality: Output quality
+            output_format: Output format
+            
+        Returns:
+            Counts of processed and failed images
+        """
+        async def process(image_data: bytes, filename: str) -> None:
+            await self.convert_image_to_3d(image_data, filename, style, quality, output_format)
+        
+        return await warm_from_directory(process, directory)
+    
     def get_status(self) -> Dict[str, Any]:
         """Get converter status"""
         return {
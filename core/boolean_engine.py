@@ -0,0 +1,259 @@
+"""
+Mesh Boolean Engines for AI Agent 3D Print System
+
+Two engines for CSG on triangle meshes:
+
+- manifold: manifold3d, exact and fast on closed (manifold) input.
+  trimesh arrays are handed over as float64/uint64 buffers (no conversion
+  copy when the dtypes already match) and results come back as views of
+  the manifold output. Any number of operands is combined in one
+  ``batch_boolean`` call, which lets manifold3d order the work itself
+  instead of folding pairwise.
+- voxel: approximate fallback for input manifold3d rejects (open or
+  self-intersecting meshes). Every operand is voxelized on a shared grid
+  and kept as a sorted array of occupied cell keys, so the boolean itself
+  is a set operation on the occupied cells only; the grid pitch adapts to
+  the size of the operands and a voxel budget. The result is remeshed
+  with marching cubes over its own bounding box.
+
+csg() tries the engines in order and reports which one produced the
+result.
+"""
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import trimesh
+
+try:
+    import manifold3d
+    MANIFOLD_AVAILABLE = True
+except ImportError:
+    manifold3d = None
+    MANIFOLD_AVAILABLE = False
+
+try:
+    from skimage import measure
+    SKIMAGE_AVAILABLE = True
+except ImportError:
+    SKIMAGE_AVAILABLE = False
+
+try:
+    from .exceptions import BooleanOperationError
+    from .logger import get_logger
+except ImportError:
+    from core.exceptions import BooleanOperationError
+    from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+OPERATIONS = ('union', 'difference', 'intersection')
+ENGINES = ('manifold', 'voxel')
+
+# Occupied cells the voxel engine aims for across the combined bounds
+DEFAULT_VOXEL_BUDGET = 2_000_000
+
+# The smallest operand spans at least this many cells when the budget allows
+MIN_CELLS_ACROSS = 64
+
+
+def _check_operands(meshes: Sequence[trimesh.Trimesh], operation: str) -> None:
+    if operation not in OPERATIONS:
+        raise BooleanOperationError(f"Unsupported boolean operation: {operation}",
+                                    operation=operation, objects=list(meshes))
+    if len(meshes) < 1:
+        raise BooleanOperationError("Boolean operation needs at least one operand", operation=operation)
+
+
+# =============================================================================
+# MANIFOLD ENGINE
+# =============================================================================
+
+def to_manifold(mesh: trimesh.Trimesh) -> "manifold3d.Manifold":
+    """
+    Convert a trimesh mesh to a manifold3d Manifold.
+
+    Raises:
+        BooleanOperationError: manifold3d is missing or rejects the mesh
+    """
+    if not MANIFOLD_AVAILABLE:
+        raise BooleanOperationError("manifold3d not available")
+    vertices = np.ascontiguousarray(mesh.vertices, dtype=np.float64)
+    faces = np.ascontiguousarray(mesh.faces, dtype=np.uint64)
+    # The bindings only take writeable buffers (read-only: results of from_manifold)
+    if not vertices.flags.writeable:
+        vertices = vertices.copy()
+    if not faces.flags.writeable:
+        faces = faces.copy()
+    manifold = manifold3d.Manifold(manifold3d.Mesh64(vertices, faces))
+    status = manifold.status()
+    if status != manifold3d.Error.NoError:
+        raise BooleanOperationError(f"manifold3d rejected mesh: {status.name}")
+    return manifold
+
+
+def from_manifold(manifold: "manifold3d.Manifold") -> trimesh.Trimesh:
+    """Convert a manifold3d Manifold to trimesh (its output is already merged)."""
+    output = manifold.to_mesh64()
+    return trimesh.Trimesh(vertices=output.vert_properties[:, :3], faces=output.tri_verts, process=False)
+
+
+def manifold_boolean(meshes: Sequence[trimesh.Trimesh], operation: str) -> trimesh.Trimesh:
+    """
+    Exact boolean of any number of closed meshes with manifold3d.
+
+    ``difference`` subtracts all further operands from the first one.
+
+    Args:
+        meshes: Operand meshes
+        operation: 'union', 'difference' or 'intersection'
+
+    Returns:
+        Result mesh (empty when the operands do not overlap for
+        intersection)
+
+    Raises:
+        BooleanOperationError: manifold3d is missing or rejects an operand
+    """
+    _check_operands(meshes, operation)
+    op_type = {
+        'union': 'Add',
+        'difference': 'Subtract',
+        'intersection': 'Intersect',
+    }[operation]
+    manifolds = [to_manifold(mesh) for mesh in meshes]
+    result = manifold3d.Manifold.batch_boolean(manifolds, getattr(manifold3d.OpType, op_type))
+    return from_manifold(result)
+
+
+# =============================================================================
+# SPARSE VOXEL ENGINE
+# =============================================================================
+
+def adaptive_pitch(meshes: Sequence[trimesh.Trimesh], voxel_budget: int = DEFAULT_VOXEL_BUDGET) -> float:
+    """
+    Grid pitch for the voxel engine.
+
+    The pitch resolves the smallest operand with MIN_CELLS_ACROSS cells
+    unless that would put more than ``voxel_budget`` cells into the
+    combined bounding box.
+
+    Args:
+        meshes: Operand meshes
+        voxel_budget: Upper bound on the cells of the combined bounds
+
+    Returns:
+        Edge length of a voxel
+    """
+    bounds = np.array([mesh.bounds for mesh in meshes])
+    extent = bounds[:, 1].max(axis=0) - bounds[:, 0].min(axis=0)
+    extent = np.maximum(extent, 1e-6)
+    budget_pitch = float(np.cbrt(np.prod(extent) / max(1, voxel_budget)))
+    smallest = float(min(np.max(mesh.extents) for mesh in meshes))
+    return max(budget_pitch, smallest / MIN_CELLS_ACROSS) if smallest > 0 else budget_pitch
+
+
+def _occupied_cells(mesh: trimesh.Trimesh, pitch: float) -> np.ndarray:
+    """Integer (i, j, k) cells inside a mesh, on the grid of cell centres ``k * pitch``."""
+    grid = mesh.voxelized(pitch=pitch).fill()
+    return np.round(np.asarray(grid.points) / pitch).astype(np.int64)
+
+
+def voxel_boolean(meshes: Sequence[trimesh.Trimesh], operation: str,
+                  pitch: Optional[float] = None,
+                  voxel_budget: int = DEFAULT_VOXEL_BUDGET) -> trimesh.Trimesh:
+    """
+    Approximate boolean on a shared voxel grid.
+
+    Args:
+        meshes: Operand meshes (need not be closed)
+        operation: 'union', 'difference' or 'intersection'
+        pitch: Voxel edge length (default: adaptive_pitch)
+        voxel_budget: Cell budget for the adaptive pitch
+
+    Returns:
+        Watertight result mesh, empty if no cell remains
+
+    Raises:
+        BooleanOperationError: Unsupported operation or no marching cubes
+    """
+    _check_operands(meshes, operation)
+    if not SKIMAGE_AVAILABLE:
+        raise BooleanOperationError("Voxel boolean needs scikit-image for marching cubes", operation=operation)
+    pitch = pitch or adaptive_pitch(meshes, voxel_budget)
+    cells = [_occupied_cells(mesh, pitch) for mesh in meshes]
+    if not any(len(c) for c in cells):
+        return trimesh.Trimesh()
+
+    # Encode cells as keys on a box holding all operands
+    lower = np.min([c.min(axis=0) for c in cells if len(c)], axis=0)
+    upper = np.max([c.max(axis=0) for c in cells if len(c)], axis=0)
+    shape = upper - lower + 1
+    keys = [np.unique(np.ravel_multi_index((c - lower).T, shape)) if len(c) else np.zeros(0, np.int64)
+            for c in cells]
+
+    result = keys[0]
+    for other in keys[1:]:
+        if operation == 'union':
+            result = np.union1d(result, other)
+        elif operation == 'difference':
+            result = np.setdiff1d(result, other, assume_unique=True)
+        else:
+            result = np.intersect1d(result, other, assume_unique=True)
+    if len(result) == 0:
+        return trimesh.Trimesh()
+
+    # Dense grid over the result only, padded so the surface closes
+    occupied = np.stack(np.unravel_index(result, shape), axis=1)
+    start = occupied.min(axis=0)
+    dense = np.zeros(tuple(occupied.max(axis=0) - start + 3), dtype=np.float32)
+    dense[tuple((occupied - start + 1).T)] = 1.0
+    vertices, faces, _, _ = measure.marching_cubes(dense, level=0.5)
+    vertices = (vertices + start + lower - 1) * pitch
+    mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=True)
+    # marching_cubes winds faces for increasing values; flip to point outwards
+    mesh.invert()
+    return mesh
+
+
+# =============================================================================
+# ENGINE CASCADE
+# =============================================================================
+
+def csg(meshes: Sequence[trimesh.Trimesh], operation: str,
+        engines: Sequence[str] = ENGINES) -> Tuple[trimesh.Trimesh, str]:
+    """
+    Boolean of several meshes with the first engine that succeeds.
+
+    Args:
+        meshes: Operand meshes
+        operation: 'union', 'difference' or 'intersection'
+        engines: Engine names to try, in order
+
+    Returns:
+        (result mesh, engine name)
+
+    Raises:
+        BooleanOperationError: Unsupported operation or every engine failed
+    """
+    _check_operands(meshes, operation)
+    errors: List[str] = []
+    for engine in engines:
+        start = time.perf_counter()
+        try:
+            if engine == 'manifold':
+                result = manifold_boolean(meshes, operation)
+            elif engine == 'voxel':
+                result = voxel_boolean(meshes, operation)
+            else:
+                raise BooleanOperationError(f"Unknown boolean engine: {engine}")
+        except Exception as e:
+            errors.append(f"{engine}: {e}")
+            logger.debug(f"Boolean engine {engine} failed for {operation}: {e}")
+            continue
+        logger.debug(f"Boolean {operation} of {len(meshes)} meshes via {engine} "
+                     f"in {time.perf_counter() - start:.3f}s")
+        return result, engine
+    raise BooleanOperationError(f"All boolean engines failed for {operation}: {'; '.join(errors)}",
+                                operation=operation, objects=list(meshes))
@@ -21,6 +21,9 @@ from PIL import Image
 
 # Local imports
 from agents.cad_agent import CADAgent
+from core.agent_pool import get_agent_pool
+from core.boolean_engine import from_manifold, to_manifold
+from core.cpu_executor import get_cpu_executor
 from core.logger import get_logger
 
 
@@ -401,17 +404,11 @@ def printability_check(stl_path: Path, params: CatConversionParams) -> Dict[str,
 
 
 def _to_manifold(mesh: trimesh.Trimesh):
-    import numpy as _np
-    import manifold3d as _mf
-    v = _np.asarray(mesh.vertices, dtype=_np.float64)
-    f = _np.asarray(mesh.faces, dtype=_np.int32)
-    return _mf.Manifold(_mf.Mesh(v, f))
+    return to_manifold(mesh)
 
 
 def _from_manifold(m) -> trimesh.Trimesh:
-    import numpy as _np
-    pos, tri = m.to_mesh()
-    return trimesh.Trimesh(vertices=_np.asarray(pos), faces=_np.asarray(tri), process=True)
+    return from_manifold(m)
 
 
 def auto_hollow_and_add_drains(stl_path: Path, params: CatConversionParams) -> Dict[str, Any]:
@@ -477,9 +474,8 @@ def auto_hollow_and_add_drains(stl_path: Path, params: CatConversionParams) -> D
                     ang = 2.0 * math.pi * (k / n)
                     positions.append((cx + rpos * math.cos(ang), cy + rpos * math.sin(ang)))
 
-            import numpy as _np
             import manifold3d as _mf
-            added = 0
+            drains = []
             for (px, py) in positions:
                 cyl = trimesh.creation.cylinder(radius=hole_radius, height=height, sections=32)
                 # Move cylinder so it passes through from below
@@ -488,9 +484,10 @@ def auto_hollow_and_add_drains(stl_path: Path, params: CatConversionParams) -> D
                 T[1, 3] = float(py)
                 T[2, 3] = float(z0 - 1.0)  # start slightly below bed to ensure pass-through
                 cyl.apply_transform(T)
-                m_cyl = _to_manifold(cyl)
-                shell = shell - m_cyl
-                added += 1
+                drains.append(_to_manifold(cyl))
+            # Subtract all drains in one batch instead of one boolean per hole
+            shell = _mf.Manifold.batch_boolean([shell, *drains], _mf.OpType.Subtract)
+            added = len(drains)
 
             shell_mesh = _from_manifold(shell)
             if shell_mesh.is_empty:
@@ -540,13 +537,20 @@ def auto_hollow_and_add_drains(stl_path: Path, params: CatConversionParams) -> D
         return info
 
 
-async def image_to_3d_cat_async(image_bytes: bytes, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """Async variant suitable for FastAPI handlers."""
+async def image_to_3d_cat_async(image_bytes: bytes, params: Optional[Dict[str, Any]] = None,
+                                cad_agent: Optional[CADAgent] = None) -> Dict[str, Any]:
+    """Async variant suitable for FastAPI handlers.
+
+    Args:
+        image_bytes: Uploaded image
+        params: CatConversionParams fields
+        cad_agent: CADAgent to run the conversion on (default: the shared
+            agent of the agent pool, within its concurrency limit)
+    """
     p = CatConversionParams(**(params or {}))
     dirs = _ensure_dirs()
     img_path = _save_image_bytes(image_bytes, dirs["uploads"])
 
-    cad = CADAgent(agent_name="cat_cad")
     task = {
         "operation": "create_from_image",
         "image_path": str(img_path),
@@ -559,7 +563,11 @@ async def image_to_3d_cat_async(image_bytes: bytes, params: Optional[Dict[str, A
         "pose": p.pose,
     }
 
-    result = await cad.execute_task(task)
+    if cad_agent is None:
+        async with get_agent_pool().acquire("cad") as cad:
+            result = await cad.execute_task(task)
+    else:
+        result = await cad_agent.execute_task(task)
     if not result or not getattr(result, "success", False):
         err = getattr(result, "error_message", "Unknown error") if result else "No result"
         raise RuntimeError(f"CADAgent conversion failed: {err}")
@@ -580,17 +588,24 @@ async def image_to_3d_cat_async(image_bytes: bytes, params: Optional[Dict[str, A
         except Exception:
             pass
 
+    # Mesh post-processing runs in worker processes, so concurrent uploads
+    # use all cores and do not block the event loop
+    executor = get_cpu_executor()
+
     # Mesh clean & metrics
-    metrics = mesh_clean_cat(out_path, p) if p.clean_mesh else _repair_mesh_if_needed(out_path)
+    if p.clean_mesh:
+        metrics = await executor.run(mesh_clean_cat, out_path, p)
+    else:
+        metrics = await executor.run(_repair_mesh_if_needed, out_path)
 
     # Optional hollowing + drains
-    hollow_info = auto_hollow_and_add_drains(out_path, p)
+    hollow_info = await executor.run(auto_hollow_and_add_drains, out_path, p)
     if hollow_info.get("hollowed"):
         # Recalculate metrics after geometry change
-        metrics = _repair_mesh_if_needed(out_path)
+        metrics = await executor.run(_repair_mesh_if_needed, out_path)
 
     # Printability assessment
-    printable = printability_check(out_path, p)
+    printable = await executor.run(printability_check, out_path, p)
     response = {
         "success": True,
         "model_id": model_id,
@@ -0,0 +1,368 @@
+"""
+Process-Pool CPU Executor for AI Agent 3D Print System
+
+Heightmap meshing, mesh cleaning, hollowing and printability analysis are
+CPU-bound Python/NumPy work. Run in the event loop they stall every other
+request; run in threads they serialize on the GIL. CPUExecutor runs them
+in a shared pool of worker processes:
+
+- NumPy arrays in the arguments and results of a task travel through
+  shared memory blocks; only a small descriptor is pickled
+- every task has a timeout; the worker running a task that overruns is
+  killed, so a runaway mesh operation cannot hold a core forever. The kill
+  breaks the pool: it is replaced, and the other tasks it was running are
+  resubmitted to the new pool
+- workers are replaced after a fixed number of tasks, which returns memory
+  fragmented by large meshes to the system
+- a broken pool (a worker crashed) is restarted and the task retried once
+
+Workers are started with the ``spawn`` method, so task functions must be
+importable module-level functions. With ``max_workers=0`` tasks run in
+threads instead (no isolation, for constrained environments).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .exceptions import CPUTaskTimeoutError, SystemResourceError
+    from .logger import get_logger
+except ImportError:
+    from core.exceptions import CPUTaskTimeoutError, SystemResourceError
+    from core.logger import get_logger
+
+DEFAULT_MAX_TASKS_PER_CHILD = 50
+DEFAULT_TASK_TIMEOUT = 300.0
+
+# Smaller arrays are cheaper to pickle than to map
+SHARED_MEMORY_MIN_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Descriptor of an array stored in a shared memory block."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _to_shared(array: np.ndarray) -> Tuple[SharedArray, shared_memory.SharedMemory]:
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return SharedArray(block.name, array.shape, array.dtype.str), block
+
+
+def _export(value: Any, blocks: List[shared_memory.SharedMemory]) -> Any:
+    """Replace large arrays (also inside dicts, lists and tuples) by SharedArray descriptors."""
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject or value.nbytes < SHARED_MEMORY_MIN_BYTES:
+            return value
+        descriptor, block = _to_shared(value)
+        blocks.append(block)
+        return descriptor
+    if isinstance(value, dict):
+        return {key: _export(item, blocks) for key, item in value.items()}
+    if type(value) in (list, tuple):
+        return type(value)(_export(item, blocks) for item in value)
+    return value
+
+
+def _import(value: Any, blocks: List[shared_memory.SharedMemory], copy: bool) -> Any:
+    """Inverse of _export; attached blocks are appended to ``blocks``."""
+    if isinstance(value, SharedArray):
+        block = shared_memory.SharedMemory(name=value.name)
+        blocks.append(block)
+        view = np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=block.buf)
+        return view.copy() if copy else view
+    if isinstance(value, dict):
+        return {key: _import(item, blocks, copy) for key, item in value.items()}
+    if type(value) in (list, tuple):
+        return type(value)(_import(item, blocks, copy) for item in value)
+    return value
+
+
+def _release(blocks: List[shared_memory.SharedMemory], unlink: bool) -> None:
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # A view is still referenced; the mapping goes away with the process
+            pass
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _run_in_worker(func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any],
+                   pid_slot: Optional[str] = None) -> Any:
+    """Worker side of a task: map the shared inputs, run, share the outputs."""
+    if pid_slot is not None:
+        # Tells the parent which worker to kill if the task times out. The
+        # pid is published before the cancelled flag is read and the parent
+        # sets the flag before reading the pid, so a task that starts while
+        # the parent gives up is either killed or sees the flag and aborts.
+        slot = shared_memory.SharedMemory(name=pid_slot)
+        state = np.ndarray((2,), dtype=np.int64, buffer=slot.buf)
+        state[0] = os.getpid()
+        cancelled = bool(state[1])
+        del state
+        slot.close()
+        if cancelled:
+            return None
+    inputs: List[shared_memory.SharedMemory] = []
+    outputs: List[shared_memory.SharedMemory] = []
+    try:
+        result = func(*_import(args, inputs, copy=False), **_import(kwargs, inputs, copy=False))
+        exported = _export(result, outputs)
+        del result
+        # The parent unlinks the output blocks after copying them
+        _release(outputs, unlink=False)
+        return exported
+    except BaseException:
+        _release(outputs, unlink=True)
+        raise
+    finally:
+        _release(inputs, unlink=False)
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+class CPUExecutor:
+    """Shared process pool for CPU-bound tasks."""
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_tasks_per_child: Optional[int] = DEFAULT_MAX_TASKS_PER_CHILD,
+                 task_timeout: Optional[float] = DEFAULT_TASK_TIMEOUT):
+        """
+        Initialize the executor (worker processes start on first use).
+
+        Args:
+            max_workers: Worker processes (None = number of CPU cores,
+                0 = run tasks in threads)
+            max_tasks_per_child: Tasks after which a worker is replaced
+                (None = never)
+            task_timeout: Default seconds before a task is abandoned and its
+                worker is killed (None = no limit)
+        """
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max(0, int(max_workers))
+        self.max_tasks_per_child = max_tasks_per_child
+        self.task_timeout = task_timeout
+        self.logger = get_logger(f"{__name__}.CPUExecutor")
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'pool_restarts': 0,
+            'shared_bytes': 0,
+            'busy_seconds': 0.0
+        }
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # Pools broken on purpose by killing a timed-out task's worker
+        self._killed_pools: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                options: Dict[str, Any] = {
+                    'max_workers': self.max_workers,
+                    'mp_context': multiprocessing.get_context('spawn')
+                }
+                if self.max_tasks_per_child:
+                    options['max_tasks_per_child'] = self.max_tasks_per_child
+                self._executor = ProcessPoolExecutor(**options)
+                self.logger.info(f"Started CPU process pool with {self.max_workers} workers")
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        """Replace a broken pool; the next task starts a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # already replaced by a concurrent task
+            self._executor = None
+            self.stats['pool_restarts'] += 1
+        executor.shutdown(wait=False)
+
+    def _kill_worker(self, executor: ProcessPoolExecutor, pid_slot: shared_memory.SharedMemory) -> bool:
+        """
+        Kill the worker that runs a task; returns False if it never started.
+
+        The task is marked cancelled first: a worker that picks it up after
+        this point aborts it instead of running it.
+        """
+        state = np.ndarray((2,), dtype=np.int64, buffer=pid_slot.buf)
+        state[1] = 1
+        pid = int(state[0])
+        del state
+        process = (getattr(executor, '_processes', None) or {}).get(pid)
+        if process is None:
+            return False
+        self._killed_pools.add(executor)
+        try:
+            process.terminate()
+        except Exception:
+            pass
+        self._restart(executor)
+        return True
+
+    async def run(self, func: Callable[..., Any], *args: Any,
+                  timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Run a function in a worker process.
+
+        Args:
+            func: Module-level function (must be importable by the workers)
+            *args: Positional arguments; arrays are passed via shared memory
+            timeout: Seconds before the task is abandoned (default: task_timeout)
+            **kwargs: Keyword arguments; arrays are passed via shared memory
+
+        Returns:
+            The function's result; arrays in it are copied out of shared memory
+
+        Raises:
+            CPUTaskTimeoutError: If the task did not finish in time
+            SystemResourceError: If the pool broke twice in a row
+        """
+        timeout = self.task_timeout if timeout is None else timeout
+        name = getattr(func, '__qualname__', repr(func))
+        self.stats['submitted'] += 1
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            if self.max_workers == 0:
+                result = await asyncio.wait_for(asyncio.to_thread(func, *args, **kwargs), timeout)
+            else:
+                result = await self._run_in_pool(func, name, args, kwargs, timeout)
+            self.stats['completed'] += 1
+            return result
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            self.stats['failed'] += 1
+            raise CPUTaskTimeoutError(
+                f"CPU task {name} did not finish within {timeout}s",
+                task_name=name, timeout_seconds=timeout or 0.0
+            )
+        except BaseException:
+            self.stats['failed'] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self.stats['busy_seconds'] += time.perf_counter() - start
+
+    async def _run_in_pool(self, func: Callable[..., Any], name: str, args: tuple,
+                           kwargs: Dict[str, Any], timeout: Optional[float]) -> Any:
+        inputs: List[shared_memory.SharedMemory] = []
+        try:
+            shared_args = _export(args, inputs)
+            shared_kwargs = _export(kwargs, inputs)
+            self.stats['shared_bytes'] += sum(block.size for block in inputs)
+
+            crashes = 0
+            while True:
+                executor = self._pool()
+                # The worker that picks the task up writes its pid here; the
+                # second word is the cancelled flag
+                pid_slot = shared_memory.SharedMemory(create=True, size=16)
+                np.ndarray((2,), dtype=np.int64, buffer=pid_slot.buf)[:] = 0
+                try:
+                    future = executor.submit(_run_in_worker, func, shared_args, shared_kwargs, pid_slot.name)
+                    shared_result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+                    break
+                except asyncio.TimeoutError:
+                    if self._kill_worker(executor, pid_slot):
+                        self.logger.warning(f"CPU task {name} timed out after {timeout}s; killed its worker")
+                    raise
+                except BrokenProcessPool as e:
+                    self._restart(executor)
+                    if executor in self._killed_pools:
+                        # Another task timed out; this one did nothing wrong
+                        self.logger.info(f"CPU pool restarted after a timeout; resubmitting {name}")
+                        continue
+                    crashes += 1
+                    if crashes > 1:
+                        raise SystemResourceError(f"CPU process pool failed running {name}: {e}") from e
+                    self.logger.warning(f"CPU process pool broke running {name}; retrying")
+                finally:
+                    # A cancelled task that has not attached the slot yet fails
+                    # fast once it is unlinked; one that has keeps the mapping
+                    _release([pid_slot], unlink=True)
+
+            outputs: List[shared_memory.SharedMemory] = []
+            try:
+                return _import(shared_result, outputs, copy=True)
+            finally:
+                _release(outputs, unlink=True)
+        finally:
+            _release(inputs, unlink=True)
+
+    async def warm_up(self) -> int:
+        """Start the worker processes ahead of the first task; returns their count."""
+        if self.max_workers == 0:
+            return 0
+        executor = self._pool()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(
+            *(loop.run_in_executor(executor, _noop) for _ in range(self.max_workers)),
+            return_exceptions=True
+        )
+        return len({pid for pid in pids if isinstance(pid, int)})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics."""
+        finished = self.stats['completed'] + self.stats['failed']
+        return {
+            'mode': 'threads' if self.max_workers == 0 else 'processes',
+            'max_workers': self.max_workers,
+            'max_tasks_per_child': self.max_tasks_per_child,
+            'task_timeout': self.task_timeout,
+            'in_flight': self._in_flight,
+            'success_rate': self.stats['completed'] / finished if finished > 0 else 1.0,
+            **self.stats
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes (a later task starts a new pool)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_EXECUTOR: Optional[CPUExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_cpu_executor(max_workers: Optional[int] = None,
+                     max_tasks_per_child: Optional[int] = DEFAULT_MAX_TASKS_PER_CHILD,
+                     task_timeout: Optional[float] = DEFAULT_TASK_TIMEOUT) -> CPUExecutor:
+    """
+    Get the process-wide CPU executor.
+
+    The agents and the API routes share one pool; the settings of the
+    first call win.
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = CPUExecutor(max_workers, max_tasks_per_child, task_timeout)
+        return _EXECUTOR
@@ -227,6 +227,16 @@ class SlicerExecutionError(SlicerAgentError):
         })
 
 
+class SlicerJobCancelledError(SlicerAgentError):
+    """Raised when a queued or running slicer job is cancelled."""
+    
+    def __init__(self, message: str, job_id: str = "", **kwargs):
+        super().__init__(message, **kwargs)
+        self.details.update({
+            "job_id": job_id
+        })
+
+
 class GCodeGenerationError(SlicerAgentError):
     """Raised when G-code generation fails."""
     
@@ -567,6 +577,17 @@ class PerformanceError(AI3DPrintError):
         })
 
 
+class CPUTaskTimeoutError(SystemResourceError):
+    """Raised when a task in the CPU process pool exceeds its timeout."""
+    
+    def __init__(self, message: str, task_name: str = "", timeout_seconds: float = 0.0, **kwargs):
+        super().__init__(message, **kwargs)
+        self.details.update({
+            "task_name": task_name,
+            "timeout_seconds": timeout_seconds
+        })
+
+
 class ResourceExhaustedException(SystemResourceError):
     """Raised when system resources are exhausted."""
     
@@ -667,6 +688,7 @@ ERROR_CODES = {
     
     # Slicer Agent
     "SLICER_EXECUTION_FAILED": SlicerExecutionError,
+    "SLICER_JOB_CANCELLED": SlicerJobCancelledError,
     "GCODE_GENERATION_FAILED": GCodeGenerationError,
     "PROFILE_NOT_FOUND": SlicerProfileError,
     
@@ -680,6 +702,7 @@ ERROR_CODES = {
     "CONFIGURATION_ERROR": ConfigurationError,
     "VALIDATION_ERROR": ValidationError,
     "WORKFLOW_ERROR": WorkflowError,
+    "CPU_TASK_TIMEOUT": CPUTaskTimeoutError,
 }
 
 
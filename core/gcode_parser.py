@@ -0,0 +1,365 @@
+"""
+Streaming G-code Parser for AI Agent 3D Print System
+
+This module turns G-code into compact NumPy arrays instead of per-line Python
+objects, so multi-hundred-megabyte production files can be analyzed with a
+bounded memory footprint. It is shared by the SlicerAgent G-code analysis and
+the print preview system.
+
+The file is read in fixed-size chunks. Each chunk is tokenized directly on
+its byte buffer with NumPy (comment masking, word detection and number
+assembly are all array operations), and modal state such as the current
+position, feedrate and extrusion mode is resolved with vectorized forward
+fills and cumulative sums. Only rare lines (relative positioning blocks,
+temperature commands) take a Python slow path.
+
+Output (ParsedGCode):
+- x, y, z, f: absolute position and feedrate after each G0/G1 move (float32)
+- e: filament extruded by each move in mm (negative for retractions)
+- rapid: True for G0 moves
+- layer_starts: index of the first move of every layer marker
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+# Default read size for streaming parsing (2 MiB)
+DEFAULT_CHUNK_SIZE = 2 * 1024 * 1024
+
+_LAYER_MARKER_RE = re.compile(
+    rb'^[ \t]*;(?:LAYER:|LAYER_CHANGE\b|[ \t]?Layer[ \t]+\d)', re.MULTILINE
+)
+
+# Powers of ten for digit place values, indexed by exponent + _POW10_OFFSET
+_POW10_OFFSET = 24
+_POW10 = 10.0 ** np.arange(-_POW10_OFFSET, _POW10_OFFSET + 1)
+
+_G, _M, _S = ord('G'), ord('M'), ord('S')
+
+_AXES = ('x', 'y', 'z')
+
+
+@dataclass
+class ParsedGCode:
+    """Compact array representation of a G-code program."""
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+    e: np.ndarray
+    f: np.ndarray
+    rapid: np.ndarray
+    layer_starts: np.ndarray
+    start_position: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    total_lines: int = 0
+    temperature_events: List[Tuple[int, str, float]] = field(default_factory=list)
+
+    @property
+    def move_count(self) -> int:
+        """Number of G0/G1 moves."""
+        return int(self.x.shape[0])
+
+    @property
+    def layer_count(self) -> int:
+        """Number of layer markers found in the program."""
+        return int(self.layer_starts.shape[0])
+
+    @property
+    def extruded_length(self) -> float:
+        """Net filament length pushed through the nozzle in mm."""
+        return float(self.e.sum(dtype=np.float64))
+
+    def first_temperature(self, heater: str) -> float:
+        """First non-zero target temperature for 'extruder' or 'bed'."""
+        for _, name, value in self.temperature_events:
+            if name == heater and value > 0:
+                return value
+        return 0.0
+
+    def layer_ranges(self) -> List[Tuple[int, int]]:
+        """(start, end) move index range of every layer."""
+        starts = self.layer_starts.tolist()
+        ends = starts[1:] + [self.move_count]
+        return list(zip(starts, ends))
+
+
+class GCodeStreamParser:
+    """
+    Incremental G-code parser.
+
+    Feed raw bytes with ``feed()`` in any chunking; call ``finish()`` to get
+    the ParsedGCode. Modal state is carried across chunk boundaries.
+    """
+
+    def __init__(self):
+        self._remainder = b''
+        self._position = [0.0, 0.0, 0.0]
+        self._feedrate = 0.0
+        self._e_position = 0.0
+        self._relative_xyz = False
+        self._relative_e = False
+        self._move_count = 0
+        self._total_lines = 0
+        self._chunks: Dict[str, List[np.ndarray]] = {
+            name: [] for name in ('x', 'y', 'z', 'e', 'f', 'rapid')
+        }
+        self._layer_starts: List[np.ndarray] = []
+        self._temperature_events: List[Tuple[int, str, float]] = []
+
+    def feed(self, data: bytes) -> None:
+        """Parse all complete lines in ``data``; keep the partial tail."""
+        data = self._remainder + data
+        cut = data.rfind(b'\n')
+        if cut < 0:
+            self._remainder = data
+            return
+        self._remainder = data[cut + 1:]
+        self._parse_block(data[:cut + 1])
+
+    def finish(self) -> ParsedGCode:
+        """Flush any trailing line and return the parsed program."""
+        if self._remainder:
+            self._parse_block(self._remainder + b'\n')
+            self._remainder = b''
+
+        def join(name: str, dtype) -> np.ndarray:
+            parts = self._chunks[name]
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+        layer_starts = (
+            np.concatenate(self._layer_starts) if self._layer_starts
+            else np.zeros(0, dtype=np.int64)
+        )
+        return ParsedGCode(
+            x=join('x', np.float32),
+            y=join('y', np.float32),
+            z=join('z', np.float32),
+            e=join('e', np.float32),
+            f=join('f', np.float32),
+            rapid=join('rapid', bool),
+            layer_starts=layer_starts,
+            total_lines=self._total_lines,
+            temperature_events=self._temperature_events,
+        )
+
+    @staticmethod
+    def _forward_fill(values: np.ndarray, initial: float) -> np.ndarray:
+        """Replace NaN with the last preceding value (``initial`` at start)."""
+        valid = ~np.isnan(values)
+        index = np.where(valid, np.arange(values.shape[0]), -1)
+        np.maximum.accumulate(index, out=index)
+        filled = values[np.maximum(index, 0)]
+        filled[index < 0] = initial
+        return filled
+
+    @staticmethod
+    def _mode_mask(on: np.ndarray, off: np.ndarray, initial: bool) -> np.ndarray:
+        """Modal flag per row that switches on/off at the given rows."""
+        events = np.where(on, 1.0, np.where(off, 0.0, np.nan))
+        return GCodeStreamParser._forward_fill(events, float(initial)).astype(bool)
+
+    @staticmethod
+    def _tokenize(block: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Split a block of complete lines into ``<letter><number>`` words.
+
+        Everything happens on the raw byte buffer with array operations:
+        comments are masked per line, word positions are found from the
+        letter/number character classes, and numbers are assembled from their
+        digits with place values. Returns (line index, letter, value) per word,
+        the byte offset of every line end and the number of lines.
+        """
+        buf = np.frombuffer(block, dtype=np.uint8)
+        newline = buf == 10
+        line_ends = np.flatnonzero(newline)
+        line_of = np.cumsum(newline, dtype=np.int32)
+        line_of -= newline
+
+        # Mask comments (';' to end of line) and checksums ('*')
+        comment_start = (buf == 59) | (buf == 42)
+        last_mark = np.where(comment_start, line_of, -1)
+        np.maximum.accumulate(last_mark, out=last_mark)
+        code = last_mark != line_of
+
+        upper = np.where((buf >= 97) & (buf <= 122), buf - 32, buf).astype(np.uint8)
+        is_digit = (buf >= 48) & (buf <= 57)
+        is_number = is_digit | (buf == 46) | (buf == 45) | (buf == 43)
+        is_letter = (upper >= 65) & (upper <= 90) & code
+
+        words = np.flatnonzero(is_letter[:-1] & is_number[1:])
+        if words.size == 0:
+            empty = np.zeros(0)
+            return empty.astype(np.int32), empty.astype(np.uint8), empty, line_ends, line_ends.size
+
+        # Number span of each word: [start, end)
+        starts = words + 1
+        non_number = np.flatnonzero(~is_number)
+        ends = non_number[np.searchsorted(non_number, starts)]
+        lengths = ends - starts
+        offsets = np.zeros(lengths.size, dtype=np.int64)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+
+        word_of_char = np.repeat(np.arange(words.size), lengths)
+        char_pos = np.arange(word_of_char.size) - offsets[word_of_char] + starts[word_of_char]
+        chars = buf[char_pos]
+
+        # Integer part ends at the first '.', or at the end of the span
+        dot_pos = np.where(chars == 46, char_pos, np.iinfo(np.int64).max)
+        int_end = np.minimum(np.minimum.reduceat(dot_pos, offsets), ends)[word_of_char]
+        exponent = np.where(char_pos < int_end, int_end - char_pos - 1, int_end - char_pos)
+        np.clip(exponent, -_POW10_OFFSET, _POW10_OFFSET, out=exponent)
+        digits = np.where(is_digit[char_pos], chars.astype(np.float64) - 48.0, 0.0)
+        values = np.add.reduceat(digits * _POW10[exponent + _POW10_OFFSET], offsets)
+        values[buf[starts] == 45] *= -1.0
+
+        return line_of[words], upper[words], values, line_ends, line_ends.size
+
+    def _parse_block(self, block: bytes) -> None:
+        word_line, letters, values, line_ends, line_count = self._tokenize(block)
+        self._total_lines += line_count
+        if line_count == 0:
+            return
+
+        # Command word (first G or M word) of every line
+        command_words = np.flatnonzero((letters == _G) | (letters == _M))
+        if command_words.size:
+            first = np.r_[True, word_line[command_words][1:] != word_line[command_words][:-1]]
+            command_words = command_words[first]
+        cmd_letter = np.zeros(line_count, dtype=np.uint8)
+        cmd_number = np.full(line_count, -1.0)
+        cmd_letter[word_line[command_words]] = letters[command_words]
+        cmd_number[word_line[command_words]] = values[command_words]
+
+        is_g = cmd_letter == _G
+        is_m = cmd_letter == _M
+        is_g0 = is_g & (cmd_number == 0)
+        is_move = is_g0 | (is_g & (cmd_number == 1))
+        is_g92 = is_g & (cmd_number == 92)
+        is_g90 = is_g & (cmd_number == 90)
+        is_g91 = is_g & (cmd_number == 91)
+
+        # Parameter words scattered into per-line columns (NaN = not given)
+        columns = {}
+        for name in ('x', 'y', 'z', 'e', 'f'):
+            column = np.full(line_count, np.nan)
+            selected = letters == ord(name.upper())
+            column[word_line[selected]] = values[selected]
+            columns[name] = column
+
+        # Modal positioning / extrusion modes
+        relative_xyz = self._mode_mask(is_g91, is_g90, self._relative_xyz)
+        relative_e = self._mode_mask(
+            is_g91 | (is_m & (cmd_number == 83)),
+            is_g90 | (is_m & (cmd_number == 82)),
+            self._relative_e
+        )
+        self._relative_xyz = bool(relative_xyz[-1])
+        self._relative_e = bool(relative_e[-1])
+
+        # Coordinates: resolve relative moves (rare), then forward fill
+        positions = {}
+        for axis_index, axis in enumerate(_AXES):
+            column = columns[axis]
+            column[~(is_move | is_g92)] = np.nan
+            relative_rows = np.flatnonzero(is_move & relative_xyz & ~np.isnan(column))
+            if relative_rows.size:
+                last = np.where(~np.isnan(column), np.arange(line_count), -1)
+                np.maximum.accumulate(last, out=last)
+                for row in relative_rows:
+                    previous = last[row - 1] if row > 0 else -1
+                    base = column[previous] if previous >= 0 else self._position[axis_index]
+                    column[row] = base + column[row]
+            positions[axis] = self._forward_fill(column, self._position[axis_index])
+            self._position[axis_index] = float(positions[axis][-1])
+
+        feed = columns['f']
+        feed[~is_move] = np.nan
+        feedrate = self._forward_fill(feed, self._feedrate)
+        self._feedrate = float(feedrate[-1])
+
+        # Extrusion: absolute values and G92 reset the E position, relative
+        # values add to it; the per-move extrusion is the position delta.
+        e_values = columns['e']
+        has_e = ~np.isnan(e_values) & (is_move | is_g92)
+        increments = np.where(has_e & is_move & relative_e, e_values, 0.0)
+        cumulative = np.cumsum(increments)
+        resets = has_e & (is_g92 | ~relative_e)
+        last_reset = np.where(resets, np.arange(line_count), -1)
+        np.maximum.accumulate(last_reset, out=last_reset)
+        has_reset = last_reset >= 0
+        safe_reset = np.maximum(last_reset, 0)
+        base = np.where(has_reset, e_values[safe_reset], self._e_position)
+        offset = np.where(has_reset, cumulative[safe_reset], 0.0)
+        e_position = base + cumulative - offset
+        e_delta = np.diff(e_position, prepend=self._e_position)
+        self._e_position = float(e_position[-1])
+
+        move_rows = np.flatnonzero(is_move)
+        moves_before = np.cumsum(is_move) - is_move + self._move_count
+
+        for name, column in (
+            ('x', positions['x']), ('y', positions['y']), ('z', positions['z']),
+            ('e', e_delta), ('f', feedrate)
+        ):
+            self._chunks[name].append(column[move_rows].astype(np.float32))
+        self._chunks['rapid'].append(is_g0[move_rows])
+
+        # Layer markers live in comments, so they are located by a text scan
+        marker_offsets = [match.start() for match in _LAYER_MARKER_RE.finditer(block)]
+        if marker_offsets:
+            marker_rows = np.searchsorted(line_ends, marker_offsets)
+            self._layer_starts.append(moves_before[marker_rows].astype(np.int64))
+
+        temperature_rows = np.flatnonzero(
+            is_m & np.isin(cmd_number, (104, 109, 140, 190))
+        )
+        if temperature_rows.size:
+            s_words = np.flatnonzero(letters == _S)
+            s_value = dict(zip(word_line[s_words].tolist(), values[s_words].tolist()))
+            for row in temperature_rows.tolist():
+                if row in s_value:
+                    heater = 'bed' if cmd_number[row] in (140, 190) else 'extruder'
+                    self._temperature_events.append(
+                        (int(moves_before[row]), heater, s_value[row])
+                    )
+
+        self._move_count += int(move_rows.size)
+
+
+def parse_gcode_file(
+    file_path: Union[str, Path],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> ParsedGCode:
+    """
+    Parse a G-code file without loading it into memory as a whole.
+
+    Args:
+        file_path: Path to the G-code file
+        chunk_size: Number of bytes read per chunk
+
+    Returns:
+        ParsedGCode with per-move arrays and layer boundaries
+    """
+    parser = GCodeStreamParser()
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    return parser.finish()
+
+
+def parse_gcode_text(
+    gcode_content: Union[str, bytes],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> ParsedGCode:
+    """Parse G-code held in memory (e.g. an uploaded file)."""
+    data = gcode_content.encode('utf-8', errors='replace') if isinstance(gcode_content, str) else gcode_content
+    parser = GCodeStreamParser()
+    for start in range(0, len(data), chunk_size):
+        parser.feed(data[start:start + chunk_size])
+    return parser.finish()
@@ -0,0 +1,517 @@
+"""
+Windowed G-code Streaming for AI Agent 3D Print System
+
+Stop-and-wait streaming (send a line, wait for ``ok``) leaves the printer idle
+for one serial round trip per line, so short segments starve the firmware
+planner. This module keeps several lines in flight instead:
+
+- Character counting (Grbl style): the bytes and lines sent but not yet
+  acknowledged are tracked against the firmware's serial RX buffer size and
+  command buffer depth; a new line is written as soon as it fits.
+- ADVANCED_OK (Marlin): when ``ok`` responses carry ``B<free slots>``, the
+  reported number of free command slots replaces the static line limit.
+- Resend handling: on ``Resend: N`` the firmware has discarded line N and
+  everything after it, so those lines leave the window and the already
+  framed ``N<line> ...*<checksum>`` lines are sent again from N. Lines
+  before N stay in the window until their ``ok`` arrives.
+
+The transport is any serial-like object with ``write()``, ``flush()`` and
+``readline()`` (pyserial ``Serial`` or the printer emulator's serial port).
+
+Preparing a file for streaming is lazy as well: ``iter_prepared_gcode`` reads,
+filters, numbers and checksums lines on demand, ``PrefetchIterator`` keeps a
+bounded number of them ready on a background thread, and
+``count_streamable_lines`` provides the line total from a chunked byte-level
+pre-pass (memoized per file version, optionally persisted as an index file).
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    from .exceptions import GCodeStreamingError, PrinterTimeoutError
+except ImportError:
+    from core.exceptions import GCodeStreamingError, PrinterTimeoutError
+
+# Marlin defaults: RX_BUFFER_SIZE 128 bytes, BUFSIZE 4 queued commands
+DEFAULT_RX_BUFFER_SIZE = 128
+DEFAULT_MAX_LINES_IN_FLIGHT = 4
+
+_LINE_NUMBER_RE = re.compile(r'^N(\d+)\s')
+_RESEND_RE = re.compile(r'^(?:Resend|rs)[:\s]\s*N?(\d+)', re.IGNORECASE)
+_FREE_SLOTS_RE = re.compile(r'\bB(\d+)')
+
+# Lines that are not streamed: blank lines and comments other than layer markers
+_SKIPPED_LINE_RE = re.compile(rb'^[ \t]*(?:;(?!LAYER)|\r?$)', re.MULTILINE)
+_COUNT_CHUNK_SIZE = 4 * 1024 * 1024
+_LINE_COUNT_INDEX_SIZE = 256
+
+DEFAULT_PREFETCH_LINES = 512
+
+_line_count_index: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+_line_count_lock = threading.Lock()
+
+
+@dataclass
+class StreamingStats:
+    """Counters of a streaming session."""
+    lines_sent: int = 0
+    lines_acked: int = 0
+    bytes_sent: int = 0
+    resend_requests: int = 0
+    lines_resent: int = 0
+    errors: int = 0
+    max_lines_in_flight: int = 0
+    advanced_ok: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class WindowedGCodeStreamer:
+    """
+    Sliding-window G-code sender with resend support.
+
+    ``send()`` blocks only while the window is full, reading responses to free
+    it; ``drain()`` waits until every line has been acknowledged. Not thread
+    safe - use one streamer per streaming thread.
+    """
+
+    def __init__(
+        self,
+        transport: Any,
+        rx_buffer_size: int = DEFAULT_RX_BUFFER_SIZE,
+        max_lines_in_flight: int = DEFAULT_MAX_LINES_IN_FLIGHT,
+        ack_timeout: float = 5.0,
+        max_resends: int = 10,
+        history_size: int = 1024,
+        on_message: Optional[Callable[[str], None]] = None,
+        logger: Any = None
+    ):
+        """
+        Initialize the streamer.
+
+        Args:
+            transport: Serial-like object (write/flush/readline)
+            rx_buffer_size: Firmware serial RX buffer size in bytes
+            max_lines_in_flight: Firmware command buffer depth (BUFSIZE)
+            ack_timeout: Seconds without any response before giving up
+            max_resends: Maximum resend requests for the same line
+            history_size: Number of sent lines kept for resends
+            on_message: Called with responses that are not ok/resend/error
+                (temperature reports, busy messages, ...)
+            logger: Optional logger
+        """
+        self.transport = transport
+        self.rx_buffer_size = rx_buffer_size
+        self.max_lines_in_flight = max(1, max_lines_in_flight)
+        self.ack_timeout = ack_timeout
+        self.max_resends = max_resends
+        self.history_size = history_size
+        self.on_message = on_message
+        self.logger = logger
+
+        self.stats = StreamingStats()
+        self._in_flight: Deque[Tuple[str, int]] = deque()
+        self._bytes_in_flight = 0
+        self._history: "OrderedDict[int, str]" = OrderedDict()
+        self._resend_queue: Deque[str] = deque()
+        self._resend_counts: Dict[int, int] = {}
+        self._oks_to_ignore = 0
+        self._active_resend: Optional[int] = None
+        self._stale_resends = 0
+        self._free_slots: Optional[int] = None
+
+    @property
+    def lines_in_flight(self) -> int:
+        """Lines written but not yet acknowledged."""
+        return len(self._in_flight)
+
+    @property
+    def bytes_in_flight(self) -> int:
+        """Bytes written but not yet acknowledged."""
+        return self._bytes_in_flight
+
+    def send(self, line: str) -> None:
+        """
+        Queue one G-code line, writing it as soon as the window has room.
+
+        Args:
+            line: G-code line without trailing newline (optionally framed
+                as ``N<n> ...*<checksum>``)
+        """
+        if len(line) + 1 > self.rx_buffer_size:
+            raise GCodeStreamingError(
+                f"G-code line longer than the printer RX buffer ({self.rx_buffer_size} bytes)",
+                gcode_line=line
+            )
+
+        self._flush_resends()
+        while self._resend_queue or not self._has_room(len(line) + 1):
+            self._read_response()
+            self._flush_resends()
+
+        self._write(line)
+        line_number = self._line_number(line)
+        if line_number is not None:
+            self._history[line_number] = line
+            while len(self._history) > self.history_size:
+                self._history.popitem(last=False)
+
+    def drain(self) -> None:
+        """Wait until every written line has been acknowledged."""
+        while self._in_flight or self._resend_queue:
+            self._flush_resends()
+            if self._in_flight:
+                self._read_response()
+
+    def _has_room(self, size: int) -> bool:
+        if not self._in_flight:
+            return True
+        if self._bytes_in_flight + size > self.rx_buffer_size:
+            return False
+        if self._free_slots is not None:
+            return self._free_slots > 0
+        return len(self._in_flight) < self.max_lines_in_flight
+
+    def _flush_resends(self) -> None:
+        """Write queued resend lines while they fit in the window."""
+        while self._resend_queue and self._has_room(len(self._resend_queue[0]) + 1):
+            self._write(self._resend_queue.popleft())
+            self.stats.lines_resent += 1
+
+    def _write(self, line: str) -> None:
+        data = f"{line}\n".encode('utf-8')
+        self.transport.write(data)
+        self.transport.flush()
+
+        self._in_flight.append((line, len(data)))
+        self._bytes_in_flight += len(data)
+        if self._free_slots is not None:
+            self._free_slots -= 1
+        self.stats.lines_sent += 1
+        self.stats.bytes_sent += len(data)
+        self.stats.max_lines_in_flight = max(self.stats.max_lines_in_flight, len(self._in_flight))
+
+    def _read_response(self) -> None:
+        """Read and handle one response line, failing after ``ack_timeout``."""
+        deadline = time.monotonic() + self.ack_timeout
+        while True:
+            raw = self.transport.readline()
+            if raw:
+                self._handle_response(raw.decode('utf-8', errors='replace').strip())
+                return
+            if time.monotonic() >= deadline:
+                if self._active_resend is not None:
+                    # The request for a failed resend may have been taken for
+                    # a stale one; send the lines again
+                    self._resend_from(self._active_resend)
+                    return
+                pending = self._in_flight[0][0] if self._in_flight else ""
+                raise PrinterTimeoutError(
+                    f"No acknowledgment from printer within {self.ack_timeout}s",
+                    timeout_seconds=self.ack_timeout,
+                    operation=f"stream: {pending}"
+                )
+
+    def _handle_response(self, response: str) -> None:
+        if not response:
+            return
+
+        if response.startswith('ok'):
+            self._handle_ok(response)
+            return
+
+        resend = _RESEND_RE.match(response)
+        if resend:
+            self._handle_resend(int(resend.group(1)))
+            return
+
+        if response.startswith('Error') or response.startswith('!!'):
+            self.stats.errors += 1
+            if self.logger:
+                self.logger.warning(f"Printer reported: {response}")
+            return
+
+        if self.on_message:
+            self.on_message(response)
+
+    def _handle_ok(self, response: str) -> None:
+        free_slots = _FREE_SLOTS_RE.search(response)
+        if free_slots:
+            self.stats.advanced_ok = True
+
+        if self._oks_to_ignore:
+            # The ok that follows a resend request acknowledges nothing
+            self._oks_to_ignore -= 1
+            return
+
+        if self._in_flight:
+            _, size = self._in_flight.popleft()
+            self._bytes_in_flight -= size
+            self.stats.lines_acked += 1
+            self._active_resend = None
+            self._stale_resends = 0
+
+        if free_slots:
+            self._free_slots = int(free_slots.group(1))
+
+    def _handle_resend(self, line_number: int) -> None:
+        self.stats.resend_requests += 1
+        # The ok that follows a resend request acknowledges nothing
+        self._oks_to_ignore += 1
+        if line_number == self._active_resend and self._stale_resends > 0:
+            # Lines that were already on the wire when the firmware flushed its
+            # buffer produce repeated requests for the same line; they arrive
+            # before any request caused by the resent line itself.
+            self._stale_resends -= 1
+            return
+        self._resend_from(line_number)
+
+    def _resend_from(self, line_number: int) -> None:
+        """Queue the history from ``line_number`` on for retransmission."""
+        count = self._resend_counts.get(line_number, 0) + 1
+        self._resend_counts[line_number] = count
+        if count > self.max_resends:
+            raise GCodeStreamingError(
+                f"Printer requested line {line_number} more than {self.max_resends} times",
+                line_number=line_number,
+                gcode_line=self._history.get(line_number, "")
+            )
+        if line_number not in self._history:
+            raise GCodeStreamingError(
+                f"Printer requested line {line_number}, which is no longer available for resend",
+                line_number=line_number
+            )
+
+        if self.logger:
+            self.logger.warning(f"Printer requested resend from line {line_number}")
+
+        # The firmware dropped the requested line and everything after it;
+        # only lines written after it can still cause stale requests. Earlier
+        # lines stay in flight, their oks may still be on the way.
+        dropped = 0
+        for index, (line, _) in enumerate(self._in_flight):
+            number = self._line_number(line)
+            if number is not None and number >= line_number:
+                dropped = len(self._in_flight) - index
+                break
+        for _ in range(dropped):
+            _, size = self._in_flight.pop()
+            self._bytes_in_flight -= size
+        self._active_resend = line_number
+        self._stale_resends = max(dropped - 1, 0)
+        self._free_slots = None
+        self._resend_queue = deque(
+            line for number, line in self._history.items() if number >= line_number
+        )
+
+    @staticmethod
+    def _line_number(line: str) -> Optional[int]:
+        match = _LINE_NUMBER_RE.match(line)
+        return int(match.group(1)) if match else None
+
+
+def frame_gcode_line(command: str, line_number: int) -> str:
+    """Frame a command as ``N<line> <command>*<checksum>`` (Marlin/RepRap)."""
+    line = f"N{line_number} {command}"
+    checksum = 0
+    for char in line.encode('utf-8'):
+        checksum ^= char
+    return f"{line}*{checksum}"
+
+
+def stream_lines(streamer: WindowedGCodeStreamer, lines: List[str]) -> StreamingStats:
+    """Send all ``lines`` through ``streamer`` and wait for the last ack."""
+    for line in lines:
+        streamer.send(line)
+    streamer.drain()
+    return streamer.stats
+
+
+def prepare_gcode_line(raw_line: str) -> Optional[str]:
+    """
+    Normalize one raw G-code line for streaming.
+
+    Returns None for blank lines and comments, except ``;LAYER`` markers which
+    are kept (unnumbered) for progress tracking. Inline comments are dropped:
+    firmware treats everything after ';' as comment, including a trailing
+    ``*checksum``.
+    """
+    line = raw_line.strip()
+    if not line:
+        return None
+    if line.startswith(';'):
+        return line if line.startswith(';LAYER') else None
+    return line.split(';', 1)[0].rstrip()
+
+
+def iter_prepared_gcode(gcode_file: Union[str, Path], checksum_enabled: bool = True,
+                        first_line_number: int = 1) -> Iterator[str]:
+    """
+    Lazily read, filter, number and checksum a G-code file.
+
+    Args:
+        gcode_file: Path to the G-code file
+        checksum_enabled: Frame commands as ``N<line> ...*<checksum>``
+        first_line_number: Line number of the first command
+
+    Yields:
+        Lines ready to stream (layer markers unnumbered)
+    """
+    line_number = first_line_number
+    with open(gcode_file, 'r', encoding='utf-8', errors='replace') as handle:
+        for raw_line in handle:
+            line = prepare_gcode_line(raw_line)
+            if line is None:
+                continue
+            if checksum_enabled and not line.startswith(';'):
+                yield frame_gcode_line(line, line_number)
+                line_number += 1
+            else:
+                yield line
+
+
+def _index_path(index_dir: Union[str, Path], key: Tuple[str, int, int]) -> Path:
+    digest = hashlib.sha1(key[0].encode('utf-8')).hexdigest()
+    return Path(index_dir) / f"{digest}.json"
+
+
+def count_streamable_lines(gcode_file: Union[str, Path],
+                           index_dir: Optional[Union[str, Path]] = None) -> int:
+    """
+    Count the lines ``iter_prepared_gcode`` will yield, without decoding them.
+
+    Newlines are counted per chunk with ``bytes.count`` and skipped lines are
+    subtracted with one regex pass. Results are memoized per (path, size,
+    mtime) and, when ``index_dir`` is given, stored there as small JSON index
+    files so reprints of the same file need no pre-pass at all.
+
+    Args:
+        gcode_file: Path to the G-code file
+        index_dir: Optional directory for persistent line-count index files
+
+    Returns:
+        Number of streamable lines
+    """
+    stat = os.stat(gcode_file)
+    key = (os.path.realpath(gcode_file), stat.st_size, stat.st_mtime_ns)
+
+    with _line_count_lock:
+        if key in _line_count_index:
+            _line_count_index.move_to_end(key)
+            return _line_count_index[key]
+
+    if index_dir:
+        try:
+            index = json.loads(_index_path(index_dir, key).read_text())
+            if index.get('size') == key[1] and index.get('mtime_ns') == key[2]:
+                return _remember_line_count(key, int(index['lines']))
+        except (OSError, ValueError, KeyError):
+            pass
+
+    count = 0
+    remainder = b''
+    with open(gcode_file, 'rb') as handle:
+        while True:
+            chunk = handle.read(_COUNT_CHUNK_SIZE)
+            if not chunk:
+                break
+            data = remainder + chunk
+            cut = data.rfind(b'\n') + 1
+            remainder = data[cut:]
+            if cut:
+                # Search up to the last newline (exclusive) so the empty
+                # position after it is not taken for a blank line
+                count += data.count(b'\n', 0, cut) - len(_SKIPPED_LINE_RE.findall(data, 0, cut - 1))
+    if remainder and prepare_gcode_line(remainder.decode('utf-8', errors='replace')) is not None:
+        count += 1
+
+    if index_dir:
+        try:
+            path = _index_path(index_dir, key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({'path': key[0], 'size': key[1], 'mtime_ns': key[2], 'lines': count}))
+        except OSError:
+            pass
+
+    return _remember_line_count(key, count)
+
+
+def _remember_line_count(key: Tuple[str, int, int], count: int) -> int:
+    with _line_count_lock:
+        _line_count_index[key] = count
+        while len(_line_count_index) > _LINE_COUNT_INDEX_SIZE:
+            _line_count_index.popitem(last=False)
+    return count
+
+
+class PrefetchIterator:
+    """
+    Iterate over ``source`` while a background thread keeps up to
+    ``max_buffered`` items ready.
+
+    Decouples file reading and line preparation from the serial writer while
+    bounding memory. Exceptions raised by the source are re-raised to the
+    consumer; ``close()`` stops the producer early.
+    """
+
+    _DONE = object()
+
+    def __init__(self, source: Iterable[Any], max_buffered: int = DEFAULT_PREFETCH_LINES):
+        self._source = source
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_buffered))
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            for item in self._source:
+                if not self._put(item):
+                    return
+            self._put(self._DONE)
+        except Exception as exc:
+            self._put(exc)
+        finally:
+            close = getattr(self._source, 'close', None)
+            if close:
+                close()
+
+    def __iter__(self) -> 'PrefetchIterator':
+        return self
+
+    def __next__(self) -> Any:
+        if self._closed.is_set():
+            raise StopIteration
+        item = self._queue.get()
+        if item is self._DONE:
+            self._closed.set()
+            raise StopIteration
+        if isinstance(item, Exception):
+            self._closed.set()
+            raise item
+        return item
+
+    def close(self) -> None:
+        """Stop the producer thread and drop buffered items."""
+        self._closed.set()
+        self._thread.join(timeout=1.0)
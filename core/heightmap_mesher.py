@@ -0,0 +1,205 @@
+"""
+Adaptive Heightmap Meshing for AI Agent 3D Print System
+
+Turns a heightmap into a closed, printable solid whose face count follows
+the detail of the surface instead of the pixel count:
+
+- quadtree decimation: the grid is covered with square leaves that are
+  split until the surface inside each leaf deviates from its triangle fan
+  by at most ``max_error``. Leaves of one size are tested together on
+  strided window views of the heightmap, so the test costs a few array
+  passes per quadtree level.
+- crack-free triangulation: every leaf is triangulated as a fan around
+  its centre through all leaf corners lying on its border, so a large leaf
+  next to smaller ones shares their vertices and no T-junctions open up.
+  Single-pixel leaves become two triangles.
+- solid: the border of the top surface is extruded down to ``base_z`` as
+  side walls and closed with a flat bottom, giving a watertight mesh with
+  outward normals.
+
+Grid point (row i, column j) maps to x = j * pixel_size, y = i * pixel_size.
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import ArrayLike
+
+# Height deviation (model units) a leaf may have from its fan triangulation
+DEFAULT_MAX_ERROR = 0.05
+
+
+@lru_cache(maxsize=16)
+def _fan_weights(size: int) -> np.ndarray:
+    """
+    Interpolation weights of the (size + 1)^2 grid points of a leaf.
+
+    The leaf is the fan of four triangles from its centre to its corners;
+    row k holds the weights of point k (row-major) for the heights of the
+    corners (0, 0), (0, size), (size, 0), (size, size) and the centre.
+    """
+    half = size / 2.0
+    di, dj = np.mgrid[0:size + 1, 0:size + 1]
+    u = (dj - half).ravel() / half  # -1 .. 1 along columns
+    v = (di - half).ravel() / half  # -1 .. 1 along rows
+    weights = np.zeros((len(u), 5))
+    weights[:, 4] = 1.0 - np.maximum(np.abs(u), np.abs(v))
+
+    # In each triangle the two corner weights are linear in (u, v)
+    top = (v <= -np.abs(u))
+    bottom = (v >= np.abs(u)) & ~top
+    left = (u < 0) & ~top & ~bottom
+    right = ~top & ~bottom & ~left
+    weights[top, 0], weights[top, 1] = (-v[top] - u[top]) / 2, (-v[top] + u[top]) / 2
+    weights[bottom, 2], weights[bottom, 3] = (v[bottom] - u[bottom]) / 2, (v[bottom] + u[bottom]) / 2
+    weights[left, 0], weights[left, 2] = (-u[left] - v[left]) / 2, (-u[left] + v[left]) / 2
+    weights[right, 1], weights[right, 3] = (u[right] - v[right]) / 2, (u[right] + v[right]) / 2
+    return weights
+
+
+def _perimeter(size: int) -> np.ndarray:
+    """(4 * size, 2) row/column offsets around a leaf, counter-clockwise in x/y."""
+    steps = np.arange(size)
+    return np.concatenate([
+        np.stack([np.zeros(size, int), steps], axis=1),          # row 0, left to right
+        np.stack([steps, np.full(size, size)], axis=1),          # last column, downwards
+        np.stack([np.full(size, size), size - steps], axis=1),   # last row, right to left
+        np.stack([size - steps, np.zeros(size, int)], axis=1),   # column 0, upwards
+    ])
+
+
+def quadtree_leaves(heights: ArrayLike, max_error: float = DEFAULT_MAX_ERROR) -> np.ndarray:
+    """
+    Cover the cells of a heightmap grid with error-bounded square leaves.
+
+    Args:
+        heights: (rows, cols) heights, rows and cols at least 2
+        max_error: Allowed height deviation of a leaf's fan triangulation
+
+    Returns:
+        (n, 3) int array of leaves as (row, column, size)
+    """
+    heights = np.asarray(heights, dtype=np.float64)
+    cell_rows, cell_cols = heights.shape[0] - 1, heights.shape[1] - 1
+    size = 1 << int(np.ceil(np.log2(max(cell_rows, cell_cols, 1))))
+
+    leaves = []
+    candidates = np.zeros((1, 2), dtype=np.int64)
+    while len(candidates):
+        # Drop squares outside the grid; split those crossing its border
+        candidates = candidates[(candidates[:, 0] < cell_rows) & (candidates[:, 1] < cell_cols)]
+        fits = (candidates[:, 0] + size <= cell_rows) & (candidates[:, 1] + size <= cell_cols)
+        split, fitting = candidates[~fits], candidates[fits]
+
+        if size > 1 and len(fitting):
+            blocks = sliding_window_view(heights, (size + 1, size + 1))[fitting[:, 0], fitting[:, 1]]
+            blocks = blocks.reshape(len(fitting), -1)
+            half = size // 2
+            corners = blocks[:, [0, size, size * (size + 1), -1, half * (size + 1) + half]]
+            error = np.abs(blocks - corners @ _fan_weights(size).T).max(axis=1)
+            accepted = error <= max_error
+            split = np.concatenate([split, fitting[~accepted]])
+            fitting = fitting[accepted]
+
+        leaves.append(np.column_stack([fitting, np.full(len(fitting), size, dtype=np.int64)]))
+        if size == 1:
+            break  # every remaining cell is a leaf
+        size //= 2
+        offsets = np.array([[0, 0], [0, size], [size, 0], [size, size]])
+        candidates = (split[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+
+    return np.concatenate(leaves)
+
+
+def heightmap_to_solid(heights: ArrayLike, pixel_size: float = 1.0,
+                       max_error: float = DEFAULT_MAX_ERROR,
+                       base_z: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mesh a heightmap as a closed solid from ``base_z`` up to the surface.
+
+    Args:
+        heights: (rows, cols) heights above the base, rows and cols at least 2
+        pixel_size: Grid spacing in x and y
+        max_error: Allowed height deviation of the decimated top surface
+            (0 keeps every grid height exactly)
+        base_z: Height of the flat bottom, below all heights
+
+    Returns:
+        (vertices, faces) as float64 (n, 3) and int64 (m, 3) arrays
+
+    Raises:
+        ValueError: The heightmap is not a 2-D grid of at least 2 x 2 points
+    """
+    heights = np.asarray(heights, dtype=np.float64)
+    if heights.ndim != 2 or min(heights.shape) < 2:
+        raise ValueError(f"Heightmap must be a 2-D grid of at least 2 x 2 points, got {heights.shape}")
+    rows, cols = heights.shape
+    leaves = quadtree_leaves(heights, max_error)
+    leaf_i, leaf_j, leaf_size = leaves.T
+
+    # Vertices: grid points that are leaf corners or centres of larger leaves
+    used = np.zeros((rows, cols), dtype=bool)
+    for di, dj in ((0, 0), (0, 1), (1, 0), (1, 1)):
+        used[leaf_i + di * leaf_size, leaf_j + dj * leaf_size] = True
+    large = leaf_size > 1
+    used[leaf_i[large] + leaf_size[large] // 2, leaf_j[large] + leaf_size[large] // 2] = True
+    index = np.full((rows, cols), -1, dtype=np.int64)
+    index[used] = np.arange(np.count_nonzero(used))
+    top_i, top_j = np.nonzero(used)
+
+    faces = []
+    # Single cells: two triangles, counter-clockwise seen from above
+    cells = leaves[~large]
+    i, j = cells[:, 0], cells[:, 1]
+    faces.append(np.stack([index[i, j], index[i, j + 1], index[i + 1, j + 1]], axis=1))
+    faces.append(np.stack([index[i, j], index[i + 1, j + 1], index[i + 1, j]], axis=1))
+
+    # Larger leaves: fan from the centre through every vertex on the border
+    for size in np.unique(leaf_size[large]):
+        group = leaves[leaf_size == size]
+        ring = _perimeter(int(size))
+        ring_i = (group[:, 0, None] + ring[None, :, 0]).ravel()
+        ring_j = (group[:, 1, None] + ring[None, :, 1]).ravel()
+        on_ring = np.flatnonzero(used[ring_i, ring_j])
+        owner = on_ring // len(ring)
+        # Successor of each border vertex around its own leaf
+        following = np.roll(on_ring, -1)
+        starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+        ends = np.r_[starts[1:] - 1, len(on_ring) - 1]
+        following[ends] = on_ring[starts]
+        centre = index[group[owner, 0] + size // 2, group[owner, 1] + size // 2]
+        faces.append(np.stack([centre,
+                               index[ring_i[on_ring], ring_j[on_ring]],
+                               index[ring_i[following], ring_j[following]]], axis=1))
+
+    # Border of the top surface, counter-clockwise, extruded to the base
+    border = _grid_border(rows, cols)
+    border = border[used[border[:, 0], border[:, 1]]]
+    top_ring = index[border[:, 0], border[:, 1]]
+    top_count = len(top_i)
+    bottom_ring = top_count + np.arange(len(border))
+    bottom_centre = top_count + len(border)
+    next_top, next_bottom = np.roll(top_ring, -1), np.roll(bottom_ring, -1)
+    faces.append(np.stack([next_top, top_ring, bottom_ring], axis=1))
+    faces.append(np.stack([next_top, bottom_ring, next_bottom], axis=1))
+    faces.append(np.stack([np.full(len(border), bottom_centre), next_bottom, bottom_ring], axis=1))
+
+    vertices = np.concatenate([
+        np.column_stack([top_j * pixel_size, top_i * pixel_size, heights[top_i, top_j]]),
+        np.column_stack([border[:, 1] * pixel_size, border[:, 0] * pixel_size,
+                         np.full(len(border), float(base_z))]),
+        [[(cols - 1) * pixel_size / 2.0, (rows - 1) * pixel_size / 2.0, float(base_z)]],
+    ])
+    return vertices, np.concatenate(faces)
+
+
+def _grid_border(rows: int, cols: int) -> np.ndarray:
+    """(k, 2) row/column indices around a rows x cols grid, counter-clockwise in x/y."""
+    return np.concatenate([
+        np.stack([np.zeros(cols - 1, int), np.arange(cols - 1)], axis=1),
+        np.stack([np.arange(rows - 1), np.full(rows - 1, cols - 1)], axis=1),
+        np.stack([np.full(cols - 1, rows - 1), np.arange(cols - 1, 0, -1)], axis=1),
+        np.stack([np.arange(rows - 1, 0, -1), np.zeros(rows - 1, int)], axis=1),
+    ])
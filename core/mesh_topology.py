@@ -0,0 +1,219 @@
+"""
+Mesh Topology Analysis for AI Agent 3D Print System
+
+One pass over the faces of a triangle mesh yields everything the CAD
+quality checks need:
+
+- edge -> face incidence: the three edges of every face are turned into
+  sorted integer keys (``low * vertex_count + high``) and counted with a
+  single ``np.unique``. Edges used once are boundary edges, edges used by
+  more than two faces are non-manifold; a mesh is watertight when every
+  edge is used exactly twice.
+- duplicate vertices and faces from lexicographic sorts of the rows
+- degenerate (zero-area) faces, surface area and enclosed volume from the
+  same per-face cross products
+
+Results are memoized by a hash of the vertex and face buffers, so the
+export, repair and printability checks of one mesh share one analysis,
+and an in-place edit of the mesh (new buffer contents) is analysed anew.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+DEFAULT_MAX_ENTRIES = 64
+
+# Faces with a smaller area count as degenerate
+DEGENERATE_AREA = 1e-10
+
+
+@dataclass(frozen=True)
+class MeshTopology:
+    """Topology and size measures of a triangle mesh."""
+    vertex_count: int
+    face_count: int
+    edge_count: int
+    boundary_edges: int
+    non_manifold_edges: int
+    duplicate_vertices: int
+    duplicate_faces: int
+    degenerate_faces: int
+    surface_area: float
+    volume: float
+
+    @property
+    def is_manifold(self) -> bool:
+        """No edge is shared by more than two faces."""
+        return self.non_manifold_edges == 0
+
+    @property
+    def is_watertight(self) -> bool:
+        """Every edge is shared by exactly two faces."""
+        return self.face_count > 0 and self.boundary_edges == 0 and self.non_manifold_edges == 0
+
+    @property
+    def has_degenerate_geometry(self) -> bool:
+        """Duplicate or zero-area faces, or non-manifold edges."""
+        return self.duplicate_faces > 0 or self.degenerate_faces > 0 or self.non_manifold_edges > 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Measures plus the derived flags."""
+        return {
+            **asdict(self),
+            'is_manifold': self.is_manifold,
+            'is_watertight': self.is_watertight,
+            'has_degenerate_geometry': self.has_degenerate_geometry,
+        }
+
+
+def _as_arrays(vertices: ArrayLike, faces: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    vertices = np.ascontiguousarray(np.asarray(vertices, dtype=np.float64).reshape(-1, 3))
+    faces = np.asarray(faces, dtype=np.int64)
+    faces = np.ascontiguousarray(faces.reshape(-1, 3) if faces.size else np.zeros((0, 3), dtype=np.int64))
+    return vertices, faces
+
+
+def _count_duplicate_rows(rows: np.ndarray) -> int:
+    """Number of rows equal to an earlier row."""
+    if len(rows) < 2:
+        return 0
+    order = np.lexsort(rows.T[::-1])
+    ordered = rows[order]
+    return int(np.count_nonzero(np.all(ordered[1:] == ordered[:-1], axis=1)))
+
+
+def mesh_buffer_key(vertices: ArrayLike, faces: ArrayLike) -> str:
+    """Hash of the vertex and face buffers of a mesh."""
+    vertices, faces = _as_arrays(vertices, faces)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array(vertices.shape + faces.shape, dtype=np.int64).tobytes())
+    digest.update(vertices.data)
+    digest.update(faces.data)
+    return digest.hexdigest()
+
+
+def analyze_topology(vertices: ArrayLike, faces: ArrayLike) -> MeshTopology:
+    """
+    Analyse the topology of a triangle mesh.
+
+    Args:
+        vertices: (n, 3) vertex positions
+        faces: (m, 3) vertex indices
+
+    Returns:
+        MeshTopology of the mesh
+    """
+    vertices, faces = _as_arrays(vertices, faces)
+    vertex_count, face_count = len(vertices), len(faces)
+    if face_count == 0:
+        return MeshTopology(vertex_count, 0, 0, 0, 0, _count_duplicate_rows(vertices), 0, 0, 0.0, 0.0)
+
+    # Edge -> face incidence from sorted edge keys
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    keys = edges[:, 0] * max(vertex_count, int(faces.max()) + 1) + edges[:, 1]
+    _, incidence = np.unique(keys, return_counts=True)
+
+    corners = vertices[faces]
+    cross = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    areas = 0.5 * np.linalg.norm(cross, axis=1)
+    # Signed tetrahedron volumes against the origin: v0 . (v1 x v2) / 6
+    volume = np.einsum('ij,ij->i', corners[:, 0], np.cross(corners[:, 1], corners[:, 2])).sum() / 6.0
+
+    return MeshTopology(
+        vertex_count=vertex_count,
+        face_count=face_count,
+        edge_count=len(incidence),
+        boundary_edges=int(np.count_nonzero(incidence == 1)),
+        non_manifold_edges=int(np.count_nonzero(incidence > 2)),
+        duplicate_vertices=_count_duplicate_rows(vertices),
+        duplicate_faces=_count_duplicate_rows(np.sort(faces, axis=1)),
+        degenerate_faces=int(np.count_nonzero(areas < DEGENERATE_AREA)),
+        surface_area=float(areas.sum()),
+        volume=abs(float(volume)),
+    )
+
+
+class MeshTopologyCache:
+    """LRU memo of topology analyses keyed by mesh buffer hash."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Number of analyses kept
+        """
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, MeshTopology]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, mesh: Any) -> MeshTopology:
+        """
+        Topology of a mesh object with ``vertices`` and ``faces``.
+
+        Args:
+            mesh: trimesh.Trimesh or any object with vertex and face arrays
+
+        Returns:
+            Cached or freshly computed MeshTopology
+        """
+        return self.analyze(mesh.vertices, mesh.faces)
+
+    def analyze(self, vertices: ArrayLike, faces: ArrayLike) -> MeshTopology:
+        """Topology of the given vertex and face arrays."""
+        key = mesh_buffer_key(vertices, faces)
+        with self._lock:
+            topology = self._entries.get(key)
+            if topology is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return topology
+            self.stats['misses'] += 1
+
+        topology = analyze_topology(vertices, faces)
+        with self._lock:
+            self._entries[key] = topology
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return topology
+
+    def clear(self) -> None:
+        """Drop all analyses."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'hit_rate': self.stats['hits'] / lookups if lookups > 0 else 0.0,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            **self.stats
+        }
+
+
+_CACHE: Optional[MeshTopologyCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_topology_cache(max_entries: int = DEFAULT_MAX_ENTRIES) -> MeshTopologyCache:
+    """
+    Get the process-wide topology cache.
+
+    The CAD agents share one cache; the settings of the first call win.
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = MeshTopologyCache(max_entries)
+        return _CACHE
@@ -4,28 +4,30 @@ Message Queue System with Priority Support for AI 3D Print System.
 This module provides a priority-based message queue system that enables
 asynchronous communication between agents with support for:
 - Priority-based task scheduling
-- Message persistence (optional Redis backend)
+- Message persistence (SQLite or Redis backends)
 - WebSocket real-time notifications
 - Dead letter queue for failed messages
 - Message acknowledgment and retry mechanisms
 
 Key Components:
 - Message: Data structure for queue messages
-- MessageQueue: In-memory priority queue implementation
-- RedisMessageQueue: Redis-backed distributed queue
-- QueueManager: High-level queue management interface
+- InMemoryQueueBackend: In-memory priority queue implementation
+- MessageQueue: High-level queue management interface
+
+Durable SQLite and Redis backends live in ``core.persistent_queue``.
 """
 
 import asyncio
+import itertools
 import time
 import uuid
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
 from enum import Enum, IntEnum
-from heapq import heappush, heappop
-from typing import Dict, List, Optional, Any, Callable
-from threading import Lock, Event
+from heapq import heapify, heappush, heappop
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from threading import Lock
 
 try:
     from .exceptions import (
@@ -195,7 +197,19 @@ class QueueBackend(ABC):
 
 
 class InMemoryQueueBackend(QueueBackend):
-    """In-memory priority queue backend."""
+    """
+    In-memory priority queue backend.
+
+    Consumers block on an ``asyncio.Condition`` instead of polling, so a
+    waiting ``get()`` wakes up as soon as a message is queued. Pending
+    messages are indexed by ID for O(1) duplicate checks, and expiry
+    deadlines live in a second heap so expired messages are dropped lazily
+    in O(log n) instead of rescanning the whole queue on every dequeue.
+    """
+    
+    # Rebuild the priority heap once stale entries make up this share of it
+    _COMPACT_RATIO = 0.5
+    _COMPACT_MIN_STALE = 1024
     
     def __init__(self, max_size: Optional[int] = None):
         """
@@ -205,91 +219,143 @@ class InMemoryQueueBackend(QueueBackend):
             max_size: Maximum queue size (None for unlimited)
         """
         self.max_size = max_size
-        self._queue: List[Message] = []
+        # Heap entries are [priority, created_ts, seq, message]; the sequence
+        # number keeps ordering stable and avoids comparing Message objects.
+        self._queue: List[list] = []
+        self._pending: Dict[str, list] = {}
+        self._expiry: List[Tuple[float, int, str]] = []
         self._processing: Dict[str, Message] = {}
+        self._seq = itertools.count()
+        self._stale_entries = 0
         self._lock = Lock()
-        self._not_empty = Event()
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
         self.logger = AgentLogger("message_queue")
     
+    def _get_condition(self) -> asyncio.Condition:
+        """Return the wake-up condition bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+    
+    async def _notify_consumers(self, count: int = 1) -> None:
+        """Wake up to ``count`` consumers waiting in ``get()``."""
+        condition = self._get_condition()
+        async with condition:
+            condition.notify(count)
+    
+    def _push(self, message: Message) -> None:
+        """Insert a message into the priority and expiry heaps (lock held)."""
+        seq = next(self._seq)
+        entry = [int(message.priority), message.created_at.timestamp(), seq, message]
+        heappush(self._queue, entry)
+        self._pending[message.id] = entry
+        if message.expires_at is not None:
+            heappush(self._expiry, (message.expires_at.timestamp(), seq, message.id))
+    
+    def _pop_ready(self) -> Optional[Message]:
+        """Pop the highest priority live message (lock held)."""
+        self._cleanup_expired()
+        while self._queue:
+            entry = heappop(self._queue)
+            message = entry[3]
+            if self._pending.get(message.id) is not entry:
+                self._stale_entries -= 1
+                continue
+            del self._pending[message.id]
+            return message
+        return None
+    
     async def put(self, message: Message) -> None:
         """Add message to priority queue."""
         with self._lock:
-            if self.max_size and len(self._queue) >= self.max_size:
+            self._cleanup_expired()
+            
+            if self.max_size and len(self._pending) >= self.max_size:
                 raise QueueFullError(
                     f"Queue is full (max size: {self.max_size})",
                     error_code="QUEUE_FULL"
                 )
             
-            # Check for duplicates
-            for existing in self._queue:
-                if existing.id == message.id:
-                    raise InvalidMessageError(
-                        f"Message with ID {message.id} already exists",
-                        error_code="DUPLICATE_MESSAGE"
-                    )
-            
-            heappush(self._queue, message)
-            self._not_empty.set()
+            if message.id in self._pending:
+                raise InvalidMessageError(
+                    f"Message with ID {message.id} already exists",
+                    error_code="DUPLICATE_MESSAGE"
+                )
             
-            self.logger.info(
-                "Message queued",
-                extra={
-                    "message_id": message.id,
-                    "sender": message.sender,
-                    "receiver": message.receiver,
-                    "priority": message.priority.name,
-                    "queue_size": len(self._queue)
-                }
-            )
+            self._push(message)
+            queue_size = len(self._pending)
+        
+        self.logger.debug(
+            "Message queued",
+            extra={
+                "message_id": message.id,
+                "sender": message.sender,
+                "receiver": message.receiver,
+                "priority": message.priority.name,
+                "queue_size": queue_size
+            }
+        )
+        
+        await self._notify_consumers()
     
     async def get(self, timeout: Optional[float] = None) -> Optional[Message]:
-        """Get next highest priority message."""
-        start_time = time.time()
+        """Get next highest priority message, waiting up to ``timeout`` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        condition = self._get_condition()
         
         while True:
             with self._lock:
-                # Remove expired messages
-                self._cleanup_expired()
-                
-                if self._queue:
-                    message = heappop(self._queue)
-                    if not self._queue:
-                        self._not_empty.clear()
-                    
+                message = self._pop_ready()
+                if message is not None:
                     # Move to processing
                     self._processing[message.id] = message
                     message.status = MessageStatus.PROCESSING
-                    
-                    self.logger.info(
-                        "Message dequeued",
-                        extra={
-                            "message_id": message.id,
-                            "sender": message.sender,
-                            "receiver": message.receiver,
-                            "priority": message.priority.name,
-                            "queue_size": len(self._queue)
-                        }
-                    )
-                    
-                    return message
+                    queue_size = len(self._pending)
+            
+            if message is not None:
+                self.logger.debug(
+                    "Message dequeued",
+                    extra={
+                        "message_id": message.id,
+                        "sender": message.sender,
+                        "receiver": message.receiver,
+                        "priority": message.priority.name,
+                        "queue_size": queue_size
+                    }
+                )
+                return message
             
-            # Check timeout
-            if timeout is not None:
-                elapsed = time.time() - start_time
-                if elapsed >= timeout:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
                     return None
-                remaining = timeout - elapsed
-            else:
-                remaining = 1.0  # Check every second
             
-            # Wait for new messages
-            await asyncio.sleep(min(0.1, remaining))
+            async with condition:
+                # Re-check under the condition lock so a put() racing with
+                # this consumer cannot slip its notification past us.
+                if self._pending:
+                    continue
+                try:
+                    await asyncio.wait_for(condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
     
     async def peek(self) -> Optional[Message]:
         """Peek at next message without removing it."""
         with self._lock:
             self._cleanup_expired()
-            return self._queue[0] if self._queue else None
+            while self._queue:
+                entry = self._queue[0]
+                if self._pending.get(entry[3].id) is entry:
+                    return entry[3]
+                heappop(self._queue)
+                self._stale_entries -= 1
+            return None
     
     async def ack(self, message_id: str) -> None:
         """Acknowledge successful message processing."""
@@ -298,7 +364,7 @@ class InMemoryQueueBackend(QueueBackend):
                 message = self._processing.pop(message_id)
                 message.status = MessageStatus.COMPLETED
                 
-                self.logger.info(
+                self.logger.debug(
                     "Message acknowledged",
                     extra={
                         "message_id": message_id,
@@ -313,6 +379,7 @@ class InMemoryQueueBackend(QueueBackend):
     
     async def nack(self, message_id: str, requeue: bool = True) -> None:
         """Handle failed message processing."""
+        requeued = False
         with self._lock:
             if message_id not in self._processing:
                 raise MessageNotFoundError(
@@ -326,8 +393,8 @@ class InMemoryQueueBackend(QueueBackend):
             if requeue and message.can_retry():
                 # Re-queue for retry
                 message.status = MessageStatus.RETRYING
-                heappush(self._queue, message)
-                self._not_empty.set()
+                self._push(message)
+                requeued = True
                 
                 self.logger.warning(
                     "Message requeued for retry",
@@ -349,47 +416,58 @@ class InMemoryQueueBackend(QueueBackend):
                         "max_retries": message.max_retries
                     }
                 )
+        
+        if requeued:
+            await self._notify_consumers()
     
     async def size(self) -> int:
         """Get total queue size (pending + processing)."""
         with self._lock:
-            return len(self._queue) + len(self._processing)
+            self._cleanup_expired()
+            return len(self._pending) + len(self._processing)
     
     async def clear(self) -> None:
         """Clear all messages."""
         with self._lock:
             self._queue.clear()
+            self._pending.clear()
+            self._expiry.clear()
             self._processing.clear()
-            self._not_empty.clear()
+            self._stale_entries = 0
             
             self.logger.info("Queue cleared")
     
     def _cleanup_expired(self) -> None:
-        """Remove expired messages from queue."""
-        current_time = datetime.now()
-        expired_count = 0
+        """Drop messages whose expiry deadline has passed (lock held)."""
+        if not self._expiry:
+            return
         
-        # Filter out expired messages
-        new_queue = []
-        for message in self._queue:
-            if message.is_expired():
-                message.status = MessageStatus.EXPIRED
-                expired_count += 1
-                self.logger.warning(
-                    "Message expired",
-                    extra={
-                        "message_id": message.id,
-                        "created_at": message.created_at.isoformat(),
-                        "expires_at": message.expires_at.isoformat()
-                    }
-                )
-            else:
-                new_queue.append(message)
+        now = time.time()
+        while self._expiry and self._expiry[0][0] < now:
+            _, seq, message_id = heappop(self._expiry)
+            entry = self._pending.get(message_id)
+            # Skip deadlines of messages that were already dequeued or re-queued
+            if entry is None or entry[2] != seq:
+                continue
+            
+            message = entry[3]
+            del self._pending[message_id]
+            self._stale_entries += 1
+            message.status = MessageStatus.EXPIRED
+            self.logger.warning(
+                "Message expired",
+                extra={
+                    "message_id": message.id,
+                    "created_at": message.created_at.isoformat(),
+                    "expires_at": message.expires_at.isoformat()
+                }
+            )
         
-        if expired_count > 0:
-            self._queue = new_queue
-            # Rebuild heap property
-            self._queue.sort()
+        if (self._stale_entries >= self._COMPACT_MIN_STALE
+                and self._stale_entries > len(self._queue) * self._COMPACT_RATIO):
+            self._queue = list(self._pending.values())
+            heapify(self._queue)
+            self._stale_entries = 0
             
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics."""
@@ -398,13 +476,13 @@ class InMemoryQueueBackend(QueueBackend):
             for priority in MessagePriority:
                 priority_counts[priority.name] = 0
             
-            for message in self._queue:
-                priority_counts[message.priority.name] += 1
+            for entry in self._pending.values():
+                priority_counts[entry[3].priority.name] += 1
             
             return {
-                "queue_size": len(self._queue),
+                "queue_size": len(self._pending),
                 "processing_count": len(self._processing),
-                "total_size": len(self._queue) + len(self._processing),
+                "total_size": len(self._pending) + len(self._processing),
                 "priority_breakdown": priority_counts,
                 "max_size": self.max_size
             }
@@ -547,7 +625,12 @@ class MessageQueue:
         self.logger.warning(f"Queue '{self.name}' cleared")
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get queue statistics."""
+        """
+        Get queue statistics.
+        
+        Persistent backends do I/O here; coroutines use
+        ``get_statistics_async()`` instead.
+        """
         base_stats = self.stats.copy()
         
         if hasattr(self.backend, 'get_stats'):
@@ -555,6 +638,17 @@ class MessageQueue:
             base_stats.update(backend_stats)
         
         return base_stats
+    
+    async def get_statistics_async(self) -> Dict[str, Any]:
+        """Get queue statistics without blocking the event loop."""
+        base_stats = self.stats.copy()
+        
+        if hasattr(self.backend, 'get_stats_async'):
+            base_stats.update(await self.backend.get_stats_async())
+        elif hasattr(self.backend, 'get_stats'):
+            base_stats.update(self.backend.get_stats())
+        
+        return base_stats
 
 
 # Factory function for creating message queues
@@ -568,26 +662,58 @@ def create_message_queue(
     Factory function to create message queues.
     
     Args:
-        queue_type: Type of queue backend ("memory", "redis")
+        queue_type: Type of queue backend ("memory", "sqlite", "redis")
         name: Queue name
         max_size: Maximum queue size
-        **kwargs: Additional backend-specific parameters
+        **kwargs: Additional backend-specific parameters (e.g. ``db_path``,
+            ``url``/``client``, ``visibility_timeout``, ``dead_letter_queue``)
         
     Returns:
         MessageQueue instance
     """
     if queue_type == "memory":
         backend = InMemoryQueueBackend(max_size)
+    elif queue_type == "sqlite":
+        try:
+            from .persistent_queue import SQLiteQueueBackend
+        except ImportError:  # pragma: no cover - legacy fallback paths
+            from core.persistent_queue import SQLiteQueueBackend  # type: ignore
+        backend = SQLiteQueueBackend(queue_name=name, max_size=max_size, **kwargs)
     elif queue_type == "redis":
-        # Redis backend not yet implemented - using in-memory fallback
-        # Future enhancement: implement RedisQueueBackend with redis-py
-        raise NotImplementedError("Redis backend not yet implemented. Use 'memory' queue type instead.")
+        try:
+            from .persistent_queue import RedisQueueBackend
+        except ImportError:  # pragma: no cover - legacy fallback paths
+            from core.persistent_queue import RedisQueueBackend  # type: ignore
+        backend = RedisQueueBackend(queue_name=name, max_size=max_size, **kwargs)
     else:
         raise ValueError(f"Unknown queue type: {queue_type}")
     
     return MessageQueue(backend=backend, name=name)
 
 
+def create_message_queue_from_config(queue_config: Dict[str, Any], name: str = "default") -> MessageQueue:
+    """
+    Create the message queue described by the ``job_queue`` settings.
+    
+    Args:
+        queue_config: ``job_queue`` section of settings.yaml (``type``,
+            ``sqlite_path``, ``redis_url``, ``visibility_timeout``)
+        name: Queue name
+        
+    Returns:
+        MessageQueue instance
+    """
+    queue_type = queue_config.get("type", "memory")
+    options: Dict[str, Any] = {}
+    if queue_type == "sqlite":
+        options["db_path"] = queue_config.get("sqlite_path", "./data/message_queue.db")
+    elif queue_type == "redis":
+        options["url"] = queue_config.get("redis_url", "redis://localhost:6379/0")
+    if queue_type in ("sqlite", "redis") and queue_config.get("visibility_timeout") is not None:
+        options["visibility_timeout"] = float(queue_config["visibility_timeout"])
+    return create_message_queue(queue_type, name=name, **options)
+
+
 # Utility functions
 def create_test_message(
     sender: str = "test_sender",
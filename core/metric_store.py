@@ -0,0 +1,484 @@
+"""
+Time-Series Metric Store for AI Agent 3D Print System
+
+AdvancedAnalytics used to store each metrics sample as a JSON blob and
+parsed every blob of a time range for every metric it was asked about.
+MetricStore keeps samples in SQLite tables with one typed column per
+metric instead:
+
+- metric_samples: the raw samples
+- metric_rollup_1m / _1h / _1d: per bucket and metric the sample count,
+  sum, minimum and maximum, updated together with the raw samples
+
+Samples are buffered and written in batches: one transaction inserts the
+raw rows and folds them into the rollups. Reads flush the buffer first.
+
+Queries pick a resolution from the length of the requested range: raw
+samples up to 6 hours, 1-minute buckets up to 2 days, 1-hour buckets up
+to 90 days, 1-day buckets beyond. A 30-day query reads 720 rows. Averages, extremes and
+sums are computed by SQL. Percentiles are nearest-rank over the raw
+samples, or over the bucket averages at rollup resolution. Range starts
+are rounded down to the bucket boundary.
+
+Each resolution has a retention period after which its rows are deleted.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from core.logger import get_logger
+
+RAW = "raw"
+
+# Bucket width in seconds of each rollup resolution
+ROLLUPS = {
+    "1m": 60,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+# Seconds each resolution is kept (None keeps it forever)
+DEFAULT_RETENTION = {
+    RAW: 7 * 86400,
+    "1m": 30 * 86400,
+    "1h": 400 * 86400,
+    "1d": None,
+}
+
+# Longest range served by each resolution, finest first
+_RESOLUTION_SPANS = (
+    (RAW, 6 * 3600),
+    ("1m", 2 * 86400),
+    ("1h", 90 * 86400),
+    ("1d", None),
+)
+
+AGGREGATIONS = ("avg", "min", "max", "sum", "count")
+
+_RETENTION_INTERVAL = 3600.0
+
+
+def _percentile_rank(percentile: float, count: int) -> int:
+    """1-based nearest rank of a percentile among ``count`` sorted values."""
+    return min(count, max(1, math.ceil(percentile / 100 * count)))
+
+
+def parse_percentile(aggregation: str) -> Optional[float]:
+    """Percentile of an aggregation name such as ``p95`` (None otherwise)."""
+    if not aggregation.startswith("p"):
+        return None
+    try:
+        percentile = float(aggregation[1:])
+    except ValueError:
+        return None
+    return percentile if 0 < percentile <= 100 else None
+
+
+class MetricStore:
+    """SQLite time-series store with typed metric columns and rollups."""
+
+    def __init__(self, db_path: Union[str, Path],
+                 metrics: Mapping[str, str],
+                 batch_size: int = 100,
+                 flush_interval: float = 5.0,
+                 retention: Optional[Mapping[str, Optional[float]]] = None):
+        """
+        Initialize the store (the database is opened on first use).
+
+        Args:
+            db_path: SQLite database file
+            metrics: Metric name -> SQL column type (REAL or INTEGER)
+            batch_size: Buffered samples that trigger a write
+            flush_interval: Seconds after which buffered samples are written
+            retention: Seconds each resolution is kept, overriding
+                DEFAULT_RETENTION per resolution
+        """
+        self.db_path = Path(db_path)
+        self.metrics = dict(metrics)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.logger = get_logger(f"{__name__}.MetricStore")
+        self.stats = {
+            'samples': 0,
+            'flushes': 0,
+            'expired_rows': 0
+        }
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._buffer: List[Tuple[float, Dict[str, Any]]] = []
+        self._buffer_started = 0.0
+        self._last_retention = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_tables(conn)
+            self._conn = conn
+        return self._conn
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS metric_samples (ts REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_metric_samples_ts ON metric_samples (ts)")
+        for resolution in ROLLUPS:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS metric_rollup_{resolution} (bucket INTEGER PRIMARY KEY)"
+            )
+
+        # Metrics added since the tables were created get their columns now
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(metric_samples)")}
+        for name, column_type in self.metrics.items():
+            if name in existing:
+                continue
+            conn.execute(f"ALTER TABLE metric_samples ADD COLUMN {name} {column_type}")
+            for resolution in ROLLUPS:
+                table = f"metric_rollup_{resolution}"
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name}_n INTEGER NOT NULL DEFAULT 0")
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name}_sum REAL NOT NULL DEFAULT 0")
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name}_min REAL")
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name}_max REAL")
+
+    def record(self, timestamp: Union[datetime, float], values: Mapping[str, Any]) -> None:
+        """
+        Buffer a sample; the buffer is written once it is full or old.
+
+        Args:
+            timestamp: Time of the sample
+            values: Metric values; unknown names and non-numbers are ignored
+        """
+        self.record_many([(timestamp, values)])
+
+    def record_many(self, samples: Iterable[Tuple[Union[datetime, float], Mapping[str, Any]]]) -> None:
+        """Buffer several samples (see record)."""
+        with self._lock:
+            for timestamp, values in samples:
+                if not self._buffer:
+                    self._buffer_started = time.monotonic()
+                self._buffer.append(self._sample(timestamp, values))
+
+            if (len(self._buffer) >= self.batch_size
+                    or time.monotonic() - self._buffer_started >= self.flush_interval):
+                self._flush()
+
+    def _sample(self, timestamp: Union[datetime, float], values: Mapping[str, Any]) -> Tuple[float, Dict[str, Any]]:
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        row = {}
+        for name in self.metrics:
+            value = values.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                row[name] = value
+        return timestamp, row
+
+    def import_samples(self, samples: Iterable[Tuple[Union[datetime, float], Mapping[str, Any]]],
+                       statements: Sequence[Tuple[str, Sequence[Any]]] = ()) -> None:
+        """
+        Write samples right away, in one transaction with ``statements``.
+
+        Migrations pass the statements that mark their source rows as
+        imported, so an interrupted import neither loses nor repeats samples.
+
+        Args:
+            samples: (timestamp, values) pairs as for record_many
+            statements: (SQL, parameters) run before the commit
+        """
+        with self._lock:
+            self._write_buffer()
+            self._buffer = [self._sample(timestamp, values) for timestamp, values in samples]
+            try:
+                self._write_buffer(statements)
+            except BaseException:
+                # The source rows stay in place; a later import retries them
+                self._buffer = []
+                raise
+            self._apply_retention_if_due()
+
+    def flush(self) -> None:
+        """Write buffered samples."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._write_buffer()
+        self._apply_retention_if_due()
+
+    def _write_buffer(self, statements: Sequence[Tuple[str, Sequence[Any]]] = ()) -> None:
+        if not self._buffer and not statements:
+            return
+        samples, self._buffer = self._buffer, []
+        names = list(self.metrics)
+
+        # Fold the batch per bucket before touching the rollup tables
+        rollups = {resolution: defaultdict(dict) for resolution in ROLLUPS}
+        for timestamp, row in samples:
+            for resolution, width in ROLLUPS.items():
+                bucket = rollups[resolution][int(timestamp // width) * width]
+                for name, value in row.items():
+                    n, total, low, high = bucket.get(name, (0, 0.0, value, value))
+                    bucket[name] = (n + 1, total + value, min(low, value), max(high, value))
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f"INSERT INTO metric_samples (ts, {', '.join(names)}) "
+                f"VALUES ({', '.join('?' * (len(names) + 1))})",
+                [(timestamp, *(row.get(name) for name in names)) for timestamp, row in samples]
+            )
+            for resolution, buckets in rollups.items():
+                self._merge_rollup(conn, resolution, names, buckets)
+            for sql, parameters in statements:
+                conn.execute(sql, parameters)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            # Keep the samples for the next attempt
+            self._buffer[:0] = samples
+            raise
+
+        self.stats['samples'] += len(samples)
+        self.stats['flushes'] += 1
+
+    @staticmethod
+    def _merge_rollup(conn: sqlite3.Connection, resolution: str, names: Sequence[str],
+                      buckets: Mapping[int, Dict[str, Tuple[int, float, float, float]]]) -> None:
+        columns = [f"{name}_{part}" for name in names for part in ("n", "sum", "min", "max")]
+        updates = []
+        for name in names:
+            updates.append(f"{name}_n = {name}_n + excluded.{name}_n")
+            updates.append(f"{name}_sum = {name}_sum + excluded.{name}_sum")
+            # Scalar min()/max() are NULL if either side is; coalesce keeps the other
+            updates.append(f"{name}_min = min(coalesce({name}_min, excluded.{name}_min),"
+                           f" coalesce(excluded.{name}_min, {name}_min))")
+            updates.append(f"{name}_max = max(coalesce({name}_max, excluded.{name}_max),"
+                           f" coalesce(excluded.{name}_max, {name}_max))")
+
+        rows = []
+        for bucket, aggregates in buckets.items():
+            row = [bucket]
+            for name in names:
+                n, total, low, high = aggregates.get(name, (0, 0.0, None, None))
+                row.extend((n, total, low, high))
+            rows.append(row)
+
+        conn.executemany(
+            f"""INSERT INTO metric_rollup_{resolution} (bucket, {', '.join(columns)})
+                VALUES ({', '.join('?' * (len(columns) + 1))})
+                ON CONFLICT (bucket) DO UPDATE SET {', '.join(updates)}""",
+            rows
+        )
+
+    def _apply_retention_if_due(self) -> None:
+        now = time.time()
+        if now - self._last_retention >= _RETENTION_INTERVAL:
+            self._last_retention = now
+            self.apply_retention(now)
+
+    def apply_retention(self, now: Optional[float] = None) -> int:
+        """
+        Delete rows older than their resolution's retention (buffered
+        samples are written first).
+
+        Returns:
+            Number of deleted rows
+        """
+        now = time.time() if now is None else now
+        deleted = 0
+        with self._lock:
+            self._write_buffer()
+            conn = self._connection()
+            for resolution, keep in self.retention.items():
+                if keep is None:
+                    continue
+                if resolution == RAW:
+                    sql = "DELETE FROM metric_samples WHERE ts < ?"
+                else:
+                    sql = f"DELETE FROM metric_rollup_{resolution} WHERE bucket < ?"
+                deleted += conn.execute(sql, (now - keep,)).rowcount
+        self.stats['expired_rows'] += deleted
+        return deleted
+
+    def resolution_for(self, start: float, end: float) -> str:
+        """Finest resolution that serves a range with a bounded number of rows."""
+        now = time.time()
+        for resolution, longest in _RESOLUTION_SPANS:
+            keep = self.retention.get(resolution)
+            if longest is not None and end - start > longest:
+                continue
+            if keep is not None and start < now - keep:
+                continue
+            return resolution
+        return "1d"
+
+    def _range(self, resolution: str, start: float, end: float) -> Tuple[str, str, List[float]]:
+        """Table, WHERE clause and parameters selecting a time range."""
+        if resolution == RAW:
+            return "metric_samples", "ts >= ? AND ts <= ?", [start, end]
+        width = ROLLUPS[resolution]
+        return f"metric_rollup_{resolution}", "bucket >= ? AND bucket <= ?", [(start // width) * width, end]
+
+    def _check_names(self, names: Iterable[str]) -> None:
+        unknown = [name for name in names if name not in self.metrics]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {unknown}")
+
+    def series(self, names: Sequence[str], start: float, end: Optional[float] = None,
+               resolution: Optional[str] = None) -> Dict[str, List[Tuple[datetime, float]]]:
+        """
+        Values of metrics over time.
+
+        Args:
+            names: Metrics to read
+            start: Range start (epoch seconds)
+            end: Range end (now if None)
+            resolution: RAW or a ROLLUPS key (chosen from the range if None)
+
+        Returns:
+            Metric -> [(time, value)] in time order; rollups give each
+            bucket's average at the bucket start
+        """
+        self._check_names(names)
+        end = time.time() if end is None else end
+        resolution = resolution or self.resolution_for(start, end)
+        table, where, params = self._range(resolution, start, end)
+
+        if resolution == RAW:
+            time_column, columns = "ts", list(names)
+        else:
+            time_column = "bucket"
+            columns = [f"{name}_sum / NULLIF({name}_n, 0)" for name in names]
+
+        with self._lock:
+            self._flush()
+            rows = self._connection().execute(
+                f"SELECT {time_column}, {', '.join(columns)} FROM {table} "
+                f"WHERE {where} ORDER BY {time_column}",
+                params
+            ).fetchall()
+
+        series = {name: [] for name in names}
+        for row in rows:
+            moment = datetime.fromtimestamp(row[0])
+            for name, value in zip(names, row[1:]):
+                if value is not None:
+                    series[name].append((moment, float(value)))
+        return series
+
+    def aggregate(self, names: Sequence[str], aggregations: Sequence[str], start: float,
+                  end: Optional[float] = None,
+                  resolution: Optional[str] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Aggregate metrics over a range in SQL.
+
+        Args:
+            names: Metrics to aggregate
+            aggregations: AGGREGATIONS entries or percentiles such as "p95"
+            start: Range start (epoch seconds)
+            end: Range end (now if None)
+            resolution: RAW or a ROLLUPS key (chosen from the range if None)
+
+        Returns:
+            Metric -> aggregation -> value (None without samples)
+        """
+        self._check_names(names)
+        end = time.time() if end is None else end
+        resolution = resolution or self.resolution_for(start, end)
+        table, where, params = self._range(resolution, start, end)
+
+        percentiles = {}
+        for aggregation in aggregations:
+            if aggregation in AGGREGATIONS:
+                continue
+            percentile = parse_percentile(aggregation)
+            if percentile is None:
+                raise ValueError(f"Unknown aggregation: {aggregation}")
+            percentiles[aggregation] = percentile
+
+        # Per metric: the AGGREGATIONS, then the number of values percentiles
+        # rank (samples, or buckets with samples at rollup resolution)
+        expressions = []
+        for name in names:
+            if resolution == RAW:
+                expressions += [f"AVG({name})", f"MIN({name})", f"MAX({name})",
+                                f"TOTAL({name})", f"COUNT({name})", f"COUNT({name})"]
+            else:
+                expressions += [f"SUM({name}_sum) / NULLIF(SUM({name}_n), 0)", f"MIN({name}_min)",
+                                f"MAX({name}_max)", f"TOTAL({name}_sum)", f"TOTAL({name}_n)",
+                                f"TOTAL({name}_n > 0)"]
+        width = len(AGGREGATIONS) + 1
+
+        with self._lock:
+            self._flush()
+            conn = self._connection()
+            row = conn.execute(f"SELECT {', '.join(expressions)} FROM {table} WHERE {where}", params).fetchone()
+
+            results = {}
+            for index, name in enumerate(names):
+                columns = row[index * width:(index + 1) * width]
+                values = dict(zip(AGGREGATIONS, columns))
+                values['count'] = int(values['count'])
+                if values['count'] == 0:
+                    values['sum'] = None
+                ranked = int(columns[-1])
+                if percentiles and ranked:
+                    values.update(self._percentiles(conn, table, where, params, name, resolution,
+                                                    percentiles, ranked))
+                results[name] = {aggregation: values.get(aggregation) for aggregation in aggregations}
+        return results
+
+    @staticmethod
+    def _percentiles(conn: sqlite3.Connection, table: str, where: str, params: List[float], name: str,
+                     resolution: str, percentiles: Mapping[str, float], count: int) -> Dict[str, float]:
+        if resolution == RAW:
+            value, condition = name, f"{name} IS NOT NULL"
+        else:
+            value, condition = f"{name}_sum / {name}_n", f"{name}_n > 0"
+        ranks = {aggregation: _percentile_rank(percentile, count) for aggregation, percentile in percentiles.items()}
+        wanted = sorted(set(ranks.values()))
+        rows = conn.execute(
+            f"""SELECT rank, value FROM (
+                    SELECT {value} AS value, ROW_NUMBER() OVER (ORDER BY {value}) AS rank
+                    FROM {table} WHERE {where} AND {condition}
+                ) WHERE rank IN ({', '.join('?' * len(wanted))})""",
+            [*params, *wanted]
+        ).fetchall()
+        by_rank = dict(rows)
+        return {aggregation: by_rank.get(rank) for aggregation, rank in ranks.items()}
+
+    def count(self, resolution: str = RAW) -> int:
+        """Number of stored rows of a resolution (after a flush)."""
+        table = "metric_samples" if resolution == RAW else f"metric_rollup_{resolution}"
+        with self._lock:
+            self._flush()
+            return self._connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics (counters are per process)."""
+        with self._lock:
+            return {**self.stats, 'buffered': len(self._buffer)}
+
+    def close(self) -> None:
+        """Write buffered samples and close the database."""
+        with self._lock:
+            if self._conn is not None or self._buffer:
+                self._flush()
+                self._conn.close()
+                self._conn = None
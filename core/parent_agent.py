@@ -6,6 +6,7 @@ workflow for creating 3D objects from natural language descriptions.
 """
 
 import asyncio
+import random
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -84,6 +85,7 @@ class WorkflowStep:
     error_message: Optional[str] = None
     retry_count: int = 0
     max_retries: int = 3
+    depends_on: List[str] = field(default_factory=list)
     
     @property
     def duration(self) -> Optional[timedelta]:
@@ -150,6 +152,41 @@ class Workflow:
         """Get all failed steps."""
         return [step for step in self.steps if step.is_failed]
     
+    def get_ready_steps(self) -> List[WorkflowStep]:
+        """Get pending steps whose dependencies have all completed."""
+        completed = {step.step_id for step in self.steps if step.is_completed}
+        return [
+            step for step in self.steps
+            if step.status == WorkflowStepStatus.PENDING
+            and all(dep in completed for dep in step.depends_on)
+        ]
+    
+    def validate_dependencies(self) -> None:
+        """Ensure every dependency exists and the step graph is acyclic."""
+        step_ids = {step.step_id for step in self.steps}
+        remaining = {step.step_id: set(step.depends_on) for step in self.steps}
+        
+        for step_id, deps in remaining.items():
+            unknown = deps - step_ids
+            if unknown:
+                raise WorkflowError(
+                    f"Step {step_id} depends on unknown steps: {sorted(unknown)}",
+                    error_code="INVALID_WORKFLOW_DEPENDENCIES"
+                )
+        
+        # Kahn's algorithm: repeatedly strip steps without open dependencies
+        while remaining:
+            free = [step_id for step_id, deps in remaining.items() if not deps]
+            if not free:
+                raise WorkflowError(
+                    f"Workflow steps contain a dependency cycle: {sorted(remaining)}",
+                    error_code="INVALID_WORKFLOW_DEPENDENCIES"
+                )
+            for step_id in free:
+                del remaining[step_id]
+            for deps in remaining.values():
+                deps.difference_update(free)
+    
     def calculate_progress(self) -> float:
         """Calculate overall workflow progress."""
         if not self.steps:
@@ -169,6 +206,16 @@ class Workflow:
                 pass
 
 
+# Default number of steps per agent type that may run at once across all
+# workflows; agent types not listed are unbounded.
+DEFAULT_AGENT_CONCURRENCY: Dict[str, int] = {
+    "research_agent": 8,
+    "cad_agent": 4,
+    "slicer_agent": 4,
+    "printer_agent": 1,
+}
+
+
 class ParentAgent(BaseAgent):
     """
     Main orchestration agent for the 3D printing workflow.
@@ -182,7 +229,10 @@ class ParentAgent(BaseAgent):
         agent_id: str = "parent_agent",
         message_queue: Optional[MessageQueue] = None,
         timeout: float = 300.0,  # 5 minutes default timeout
-        max_concurrent_workflows: int = 5
+        max_concurrent_workflows: int = 5,
+        agent_concurrency: Optional[Dict[str, int]] = None,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 30.0
     ):
         """
         Initialize ParentAgent.
@@ -192,21 +242,40 @@ class ParentAgent(BaseAgent):
             message_queue: Message queue for inter-agent communication
             timeout: Default timeout for agent operations
             max_concurrent_workflows: Maximum concurrent workflows
+            agent_concurrency: Maximum concurrently running steps per agent
+                type across all workflows (merged over the defaults)
+            retry_base_delay: Base delay for step retry backoff in seconds
+            retry_max_delay: Upper bound for a single retry delay in seconds
         """
         super().__init__(agent_id)
         self.logger = AgentLogger("parent_agent")
         self.message_queue = message_queue or create_message_queue()
         self.timeout = timeout
         self.max_concurrent_workflows = max_concurrent_workflows
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
         
         # Workflow management
         self.active_workflows: Dict[str, Workflow] = {}
         self.workflow_lock = asyncio.Lock()
+        self._workflow_slots = asyncio.Semaphore(max_concurrent_workflows)
+        
+        # Per-agent-type step concurrency limits
+        self.agent_concurrency: Dict[str, int] = {
+            **DEFAULT_AGENT_CONCURRENCY, **(agent_concurrency or {})
+        }
+        self._agent_semaphores: Dict[str, asyncio.Semaphore] = {}
         
         # Agent registry for communication
         self.registered_agents: Set[str] = set()
         self.agent_responses: Dict[str, Dict[str, Any]] = {}
         
+        # Request/response correlation: outgoing message id -> response future,
+        # plus "<agent>_<task_id>" -> message id for responders that do not
+        # echo the correlation id back.
+        self._pending_responses: Dict[str, asyncio.Future] = {}
+        self._response_keys: Dict[str, str] = {}
+        
         # Agent status tracking
         self.status = AgentStatus.IDLE
         
@@ -234,6 +303,11 @@ class ParentAgent(BaseAgent):
         for task in self._background_tasks:
             task.cancel()
         
+        # Release any step still waiting for an agent response
+        for future in self._pending_responses.values():
+            if not future.done():
+                future.cancel()
+        
         # Wait for tasks to complete
         if self._background_tasks:
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
@@ -267,7 +341,7 @@ class ParentAgent(BaseAgent):
             WorkflowError: If workflow creation fails
         """
         async with self.workflow_lock:
-            if len(self.active_workflows) >= self.max_concurrent_workflows:
+            if self._count_running_workflows() >= self.max_concurrent_workflows:
                 raise WorkflowError(
                     "Maximum concurrent workflows reached",
                     error_code="MAX_WORKFLOWS_EXCEEDED"
@@ -292,17 +366,20 @@ class ParentAgent(BaseAgent):
                 WorkflowStep(
                     step_id=f"{workflow_id}_cad",
                     name="3D Model Generation",
-                    agent_type="cad_agent"
+                    agent_type="cad_agent",
+                    depends_on=[f"{workflow_id}_research"]
                 ),
                 WorkflowStep(
                     step_id=f"{workflow_id}_slicer",
                     name="G-code Generation",
-                    agent_type="slicer_agent"
+                    agent_type="slicer_agent",
+                    depends_on=[f"{workflow_id}_cad"]
                 ),
                 WorkflowStep(
                     step_id=f"{workflow_id}_printer",
                     name="3D Printing",
-                    agent_type="printer_agent"
+                    agent_type="printer_agent",
+                    depends_on=[f"{workflow_id}_slicer"]
                 )
             ]
             
@@ -339,34 +416,15 @@ class ParentAgent(BaseAgent):
                 error_code="WORKFLOW_NOT_FOUND"
             )
         
+        workflow.validate_dependencies()
+        
+        # Admission: never run more than max_concurrent_workflows at once
+        await self._workflow_slots.acquire()
         try:
             self.logger.info(f"Starting workflow execution: {workflow_id}")
             workflow.state = WorkflowState.RESEARCH_PHASE
             
-            # Execute steps in sequence
-            for step in workflow.steps:
-                try:
-                    await self._execute_workflow_step(workflow, step)
-                    
-                    if step.is_failed and not step.can_retry:
-                        workflow.state = WorkflowState.FAILED
-                        workflow.error_message = step.error_message
-                        break
-                    
-                except Exception as e:
-                    step.status = WorkflowStepStatus.FAILED
-                    step.error_message = str(e)
-                    step.end_time = datetime.now()
-                    
-                    self.logger.error(
-                        f"Step execution failed: {step.step_id}",
-                        extra={"error": str(e), "workflow_id": workflow_id}
-                    )
-                    
-                    if not step.can_retry:
-                        workflow.state = WorkflowState.FAILED
-                        workflow.error_message = str(e)
-                        break
+            await self._run_workflow_steps(workflow)
             
             # Check final state
             if workflow.state != WorkflowState.FAILED:
@@ -399,7 +457,7 @@ class ParentAgent(BaseAgent):
             return TaskResult(
                 task_id=workflow_id,
                 success=False,
-                error=workflow.error_message or "Workflow execution failed",
+                error_message=workflow.error_message or "Workflow execution failed",
                 data={
                     "workflow_id": workflow_id,
                     "state": workflow.state.value,
@@ -428,6 +486,8 @@ class ParentAgent(BaseAgent):
             )
         
         finally:
+            self._workflow_slots.release()
+            
             # Update workflow progress
             workflow.calculate_progress()
             workflow.updated_at = datetime.now()
@@ -440,12 +500,103 @@ class ParentAgent(BaseAgent):
                 "completed": workflow.state in [WorkflowState.COMPLETED, WorkflowState.FAILED]
             })
     
+    def _count_running_workflows(self) -> int:
+        """Count workflows that have not reached a terminal state."""
+        terminal = (WorkflowState.COMPLETED, WorkflowState.FAILED, WorkflowState.CANCELLED)
+        return sum(1 for wf in self.active_workflows.values() if wf.state not in terminal)
+    
+    def _get_agent_semaphore(self, agent_type: str) -> Optional[asyncio.Semaphore]:
+        """Return the shared concurrency limiter for an agent type."""
+        limit = self.agent_concurrency.get(agent_type)
+        if limit is None:
+            return None
+        if agent_type not in self._agent_semaphores:
+            self._agent_semaphores[agent_type] = asyncio.Semaphore(limit)
+        return self._agent_semaphores[agent_type]
+    
+    @asynccontextmanager
+    async def _agent_slot(self, agent_type: str):
+        """Hold a concurrency slot of an agent type for one attempt."""
+        semaphore = self._get_agent_semaphore(agent_type)
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            yield
+    
+    async def _run_workflow_steps(self, workflow: Workflow) -> None:
+        """
+        Run workflow steps as a dependency graph.
+        
+        Every step whose dependencies have completed is started right away,
+        so independent steps overlap. The first permanent failure stops the
+        workflow: running steps are cancelled and steps that can no longer
+        run are marked as skipped.
+        """
+        running: Dict[asyncio.Task, WorkflowStep] = {}
+        
+        try:
+            while True:
+                if workflow.state == WorkflowState.CANCELLED:
+                    break
+                
+                for step in workflow.get_ready_steps():
+                    # Mark as running before the task starts so it is not picked twice
+                    step.status = WorkflowStepStatus.RUNNING
+                    task = asyncio.create_task(self._execute_workflow_step(workflow, step))
+                    running[task] = step
+                
+                if not running:
+                    break
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = running.pop(task)
+                    error = task.exception()
+                    if error is not None or step.is_failed:
+                        workflow.state = WorkflowState.FAILED
+                        workflow.error_message = step.error_message or str(error)
+                        
+                        self.logger.error(
+                            f"Step execution failed: {step.step_id}",
+                            extra={"error": workflow.error_message, "workflow_id": workflow.workflow_id}
+                        )
+                
+                if workflow.state == WorkflowState.FAILED:
+                    break
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            for task, step in running.items():
+                if step.status == WorkflowStepStatus.RUNNING:
+                    step.status = WorkflowStepStatus.FAILED
+                    step.error_message = step.error_message or "Cancelled"
+                    step.end_time = datetime.now()
+        
+        if workflow.state in (WorkflowState.FAILED, WorkflowState.CANCELLED):
+            for step in workflow.steps:
+                if step.status == WorkflowStepStatus.PENDING:
+                    step.status = WorkflowStepStatus.SKIPPED
+    
+    def _retry_delay(self, retry_count: int) -> float:
+        """Exponential backoff with full jitter for step retries."""
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * (2 ** retry_count))
+        return random.uniform(0, ceiling)
+    
     async def _execute_workflow_step(
         self,
         workflow: Workflow,
         step: WorkflowStep
     ) -> None:
-        """Execute a single workflow step."""
+        """
+        Execute a single workflow step, retrying failed attempts in place.
+        
+        Each attempt holds a slot of the agent type's concurrency limit; the
+        slot is released during the retry backoff so other workflows can use
+        the agent meanwhile.
+        """
         step.status = WorkflowStepStatus.RUNNING
         step.start_time = datetime.now()
         
@@ -495,57 +646,61 @@ class ParentAgent(BaseAgent):
                 "gcode_file": slicer_step.output_data.get("gcode_file") if slicer_step else None
             }
         
-        try:
-            # Send message to target agent
-            response = await self._send_agent_message(
-                step.agent_type,
-                step.step_id,
-                step.input_data
-            )
-            
-            if response.get("success", False):
-                step.status = WorkflowStepStatus.COMPLETED
-                step.output_data = response.get("data", {})
-                step.end_time = datetime.now()
+        while True:
+            try:
+                # Send message to target agent
+                async with self._agent_slot(step.agent_type):
+                    response = await self._send_agent_message(
+                        step.agent_type,
+                        step.step_id,
+                        step.input_data
+                    )
+                
+                if response.get("success", False):
+                    step.status = WorkflowStepStatus.COMPLETED
+                    step.output_data = response.get("data", {})
+                    step.end_time = datetime.now()
+                    
+                    self.logger.info(
+                        f"Step completed: {step.step_id}",
+                        extra={
+                            "workflow_id": workflow.workflow_id,
+                            "duration": str(step.duration)
+                        }
+                    )
+                    return
                 
-                self.logger.info(
-                    f"Step completed: {step.step_id}",
-                    extra={
-                        "workflow_id": workflow.workflow_id,
-                        "duration": str(step.duration)
-                    }
-                )
-            else:
                 raise AgentCommunicationError(
                     response.get("error", "Agent execution failed"),
                     error_code="AGENT_EXECUTION_FAILED"
                 )
                 
-        except Exception as e:
-            step.status = WorkflowStepStatus.FAILED
-            step.error_message = str(e)
-            step.end_time = datetime.now()
-            step.retry_count += 1
-            
-            if step.can_retry:
+            except Exception as e:
+                step.status = WorkflowStepStatus.FAILED
+                step.error_message = str(e)
+                step.end_time = datetime.now()
+                step.retry_count += 1
+                
+                if not step.can_retry:
+                    self.logger.error(
+                        f"Step failed permanently: {step.step_id}",
+                        extra={"error": str(e)}
+                    )
+                    raise
+                
+                delay = self._retry_delay(step.retry_count)
                 self.logger.warning(
                     f"Step failed, retrying: {step.step_id}",
                     extra={
                         "retry_count": step.retry_count,
                         "max_retries": step.max_retries,
+                        "retry_delay": round(delay, 3),
                         "error": str(e)
                     }
                 )
                 
-                # Retry after a short delay
-                await asyncio.sleep(2 ** step.retry_count)  # Exponential backoff
-                await self._execute_workflow_step(workflow, step)
-            else:
-                self.logger.error(
-                    f"Step failed permanently: {step.step_id}",
-                    extra={"error": str(e)}
-                )
-                raise
+                await asyncio.sleep(delay)
+                step.status = WorkflowStepStatus.RUNNING
     
     async def _send_agent_message(
         self,
@@ -560,43 +715,56 @@ class ParentAgent(BaseAgent):
                 error_code="AGENT_NOT_REGISTERED"
             )
         
-        # Create message
+        # Create message; responders echo the message id as correlation_id
+        message_id = str(uuid.uuid4())
         message = Message(
+            id=message_id,
             sender=self.agent_id,
             receiver=agent_type,
             message_type="task_request",
             payload={
                 "task_id": task_id,
                 "data": data,
-                "timeout": self.timeout
+                "timeout": self.timeout,
+                "correlation_id": message_id
             },
             priority=MessagePriority.HIGH
         )
         
-        # Send message
-        await self.message_queue.send(message)
-        
-        self.logger.info(
-            f"Sent task to {agent_type}",
-            extra={"task_id": task_id, "message_id": message.id}
-        )
-        
-        # Wait for response
-        response_timeout = self.timeout
-        start_time = asyncio.get_event_loop().time()
+        # Register the response future before sending so a fast reply
+        # cannot arrive ahead of it.
+        response_key = f"{agent_type}_{task_id}"
+        future = asyncio.get_running_loop().create_future()
+        self._pending_responses[message.id] = future
+        self._response_keys[response_key] = message.id
         
-        while (asyncio.get_event_loop().time() - start_time) < response_timeout:
-            response_key = f"{agent_type}_{task_id}"
+        try:
+            # Send message
+            await self.message_queue.send(message)
+            
+            self.logger.info(
+                f"Sent task to {agent_type}",
+                extra={"task_id": task_id, "message_id": message.id}
+            )
+            
+            # A response may already have been buffered for this task
             if response_key in self.agent_responses:
-                response = self.agent_responses.pop(response_key)
-                return response
+                return self.agent_responses.pop(response_key)
             
-            await asyncio.sleep(0.1)  # Check every 100ms
+            return await asyncio.wait_for(future, timeout=self.timeout)
         
-        raise AgentTimeoutError(
-            f"Timeout waiting for response from {agent_type}",
-            error_code="AGENT_RESPONSE_TIMEOUT"
-        )
+        except asyncio.TimeoutError:
+            raise AgentTimeoutError(
+                f"Timeout waiting for response from {agent_type}",
+                timeout_duration=self.timeout,
+                agent_name=agent_type,
+                error_code="AGENT_RESPONSE_TIMEOUT"
+            )
+        
+        finally:
+            self._pending_responses.pop(message.id, None)
+            if self._response_keys.get(response_key) == message.id:
+                del self._response_keys[response_key]
     
     async def _process_messages(self) -> None:
         """Background task to process incoming messages."""
@@ -616,11 +784,21 @@ class ParentAgent(BaseAgent):
     async def _handle_message(self, message: Message) -> None:
         """Handle incoming messages from other agents."""
         if message.message_type == "task_response":
-            # Store agent response
             task_id = message.payload.get("task_id")
             if task_id:
                 response_key = f"{message.sender}_{task_id}"
-                self.agent_responses[response_key] = message.payload
+                correlation_id = (
+                    message.payload.get("correlation_id")
+                    or self._response_keys.get(response_key)
+                )
+                future = self._pending_responses.get(correlation_id) if correlation_id else None
+                
+                if future is not None and not future.done():
+                    # Hand the response straight to the waiting step
+                    future.set_result(message.payload)
+                else:
+                    # Nobody is waiting (yet): keep it for a later request
+                    self.agent_responses[response_key] = message.payload
                 
                 self.logger.info(
                     f"Received response from {message.sender}",
@@ -660,6 +838,7 @@ class ParentAgent(BaseAgent):
                     "name": step.name,
                     "agent_type": step.agent_type,
                     "status": step.status.value,
+                    "depends_on": list(step.depends_on),
                     "start_time": step.start_time.isoformat() if step.start_time else None,
                     "end_time": step.end_time.isoformat() if step.end_time else None,
                     "duration": str(step.duration) if step.duration else None,
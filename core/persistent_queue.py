@@ -0,0 +1,924 @@
+"""
+Persistent Message Queue Backends for AI 3D Print System.
+
+This module provides durable ``QueueBackend`` implementations so queued print
+jobs survive a restart and can be shared by several API worker processes:
+
+- SQLiteQueueBackend: SQLite database in WAL mode with group-committed
+  (batched) inserts. Any number of processes may open the same database file.
+- RedisQueueBackend: Redis-protocol backend built on the reliable-queue
+  pattern (atomic LMOVE into a processing list). Works with ``redis.asyncio``
+  clients and API-compatible stubs such as ``fakeredis``.
+
+Both backends support:
+- Visibility timeouts: a claimed message that is neither acked nor nacked
+  within ``visibility_timeout`` seconds becomes visible to other consumers
+  again (e.g. after a worker crash)
+- ack/nack with retry accounting; a lease that expires counts as a retry,
+  so a message that keeps crashing its consumer is eventually dead-lettered
+- Dead-letter routing: messages that exhaust their retries are moved to the
+  ``dead_letter_queue``, where another consumer can inspect or replay them
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import redis as redis_sync
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import WatchError
+    REDIS_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    redis_sync = None
+    redis_asyncio = None
+    WatchError = None
+    REDIS_AVAILABLE = False
+
+try:
+    from .exceptions import (
+        MessageQueueError, MessageNotFoundError, QueueFullError, InvalidMessageError
+    )
+    from .logger import AgentLogger
+    from .message_queue import Message, MessagePriority, MessageStatus, QueueBackend
+except ImportError:  # pragma: no cover - legacy fallback paths
+    try:
+        from core.exceptions import (  # type: ignore
+            MessageQueueError, MessageNotFoundError, QueueFullError, InvalidMessageError
+        )
+        from core.logger import AgentLogger  # type: ignore
+        from core.message_queue import (  # type: ignore
+            Message, MessagePriority, MessageStatus, QueueBackend
+        )
+    except ImportError:
+        from exceptions import (  # type: ignore
+            MessageQueueError, MessageNotFoundError, QueueFullError, InvalidMessageError
+        )
+        from logger import AgentLogger  # type: ignore
+        from message_queue import Message, MessagePriority, MessageStatus, QueueBackend  # type: ignore
+
+
+def _serialize_message(message: Message) -> str:
+    """Serialize a message to JSON for storage."""
+    return json.dumps(message.to_dict(), default=str)
+
+
+def _deserialize_message(body: str) -> Message:
+    """Restore a message from its stored JSON form."""
+    return Message.from_dict(json.loads(body))
+
+
+def _priority_breakdown(counts: Dict[int, int]) -> Dict[str, int]:
+    """Map integer priority counts to the ``MessagePriority`` name breakdown."""
+    return {priority.name: counts.get(int(priority), 0) for priority in MessagePriority}
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """
+    Durable priority queue stored in SQLite.
+
+    The database runs in WAL mode so readers never block the writer, and
+    claims run inside ``BEGIN IMMEDIATE`` transactions so several consumer
+    processes can share one queue without double delivery. Concurrent
+    ``put()`` calls are coalesced into a single transaction (group commit).
+    Blocking calls run in a worker thread to keep the event loop free.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS queue_messages (
+            id TEXT PRIMARY KEY,
+            queue TEXT NOT NULL,
+            state TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            created_ts REAL NOT NULL,
+            expires_ts REAL,
+            lease_expires_ts REAL,
+            lease_owner TEXT,
+            retry_count INTEGER NOT NULL DEFAULT 0,
+            max_retries INTEGER NOT NULL DEFAULT 3,
+            body TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_queue_messages_ready
+            ON queue_messages (queue, state, priority, created_ts);
+        CREATE INDEX IF NOT EXISTS idx_queue_messages_lease
+            ON queue_messages (queue, state, lease_expires_ts);
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/message_queue.db",
+        queue_name: str = "default",
+        max_size: Optional[int] = None,
+        visibility_timeout: float = 300.0,
+        dead_letter_queue: Optional[str] = None,
+        batch_size: int = 500,
+        poll_interval: float = 0.25
+    ):
+        """
+        Initialize SQLite queue backend.
+
+        Args:
+            db_path: Path to the SQLite database file
+            queue_name: Logical queue name (one database can hold many queues)
+            max_size: Maximum queue size (None for unlimited)
+            visibility_timeout: Seconds a claimed message stays invisible
+            dead_letter_queue: Queue receiving permanently failed messages
+                (defaults to ``<queue_name>.dead_letter``)
+            batch_size: Maximum number of messages written per transaction
+            poll_interval: Poll period for messages put by other processes
+        """
+        self.db_path = str(db_path)
+        self.queue_name = queue_name
+        self.max_size = max_size
+        self.visibility_timeout = visibility_timeout
+        self.dead_letter_queue = dead_letter_queue or f"{queue_name}.dead_letter"
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.consumer_id = str(uuid.uuid4())
+        self.logger = AgentLogger("message_queue")
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path,
+            timeout=30.0,
+            isolation_level=None,  # explicit BEGIN/COMMIT
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+        # Group commit state
+        self._write_buffer: List[Tuple[Message, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Return the wake-up condition bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    async def _run(self, func, *args):
+        """Run a blocking database call in a worker thread."""
+        return await asyncio.to_thread(func, *args)
+
+    # ------------------------------------------------------------------
+    # Blocking database operations (executed under ``_db_lock``)
+    # ------------------------------------------------------------------
+
+    def _insert_batch(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """Insert messages in one transaction, returning a per-message error."""
+        results: List[Optional[Exception]] = []
+        with self._db_lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                queued = None
+                if self.max_size:
+                    queued = conn.execute(
+                        "SELECT COUNT(*) FROM queue_messages "
+                        "WHERE queue = ? AND state IN ('pending', 'processing')",
+                        (self.queue_name,)
+                    ).fetchone()[0]
+
+                for message in messages:
+                    if queued is not None and queued >= self.max_size:
+                        results.append(QueueFullError(
+                            f"Queue is full (max size: {self.max_size})",
+                            error_code="QUEUE_FULL"
+                        ))
+                        continue
+                    try:
+                        conn.execute(
+                            "INSERT INTO queue_messages (id, queue, state, priority, created_ts, "
+                            "expires_ts, retry_count, max_retries, body) "
+                            "VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?)",
+                            (
+                                message.id,
+                                self.queue_name,
+                                int(message.priority),
+                                message.created_at.timestamp(),
+                                message.expires_at.timestamp() if message.expires_at else None,
+                                message.retry_count,
+                                message.max_retries,
+                                _serialize_message(message)
+                            )
+                        )
+                    except sqlite3.IntegrityError:
+                        results.append(InvalidMessageError(
+                            f"Message with ID {message.id} already exists",
+                            error_code="DUPLICATE_MESSAGE"
+                        ))
+                        continue
+                    if queued is not None:
+                        queued += 1
+                    results.append(None)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return results
+
+    def _claim_next(self) -> Optional[Message]:
+        """Atomically claim the next visible message for this consumer."""
+        now = time.time()
+        with self._db_lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._release_expired_leases(conn, now)
+                conn.execute(
+                    "DELETE FROM queue_messages WHERE queue = ? AND state = 'pending' "
+                    "AND expires_ts IS NOT NULL AND expires_ts <= ?",
+                    (self.queue_name, now)
+                )
+                row = conn.execute(
+                    "SELECT id, retry_count, body FROM queue_messages "
+                    "WHERE queue = ? AND state = 'pending' "
+                    "ORDER BY priority, created_ts LIMIT 1",
+                    (self.queue_name,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                message_id, retry_count, body = row
+                conn.execute(
+                    "UPDATE queue_messages SET state = 'processing', "
+                    "lease_expires_ts = ?, lease_owner = ? WHERE id = ?",
+                    (now + self.visibility_timeout, self.consumer_id, message_id)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        message = _deserialize_message(body)
+        message.retry_count = retry_count
+        message.status = MessageStatus.PROCESSING
+        return message
+
+    def _release_expired_leases(self, conn: sqlite3.Connection, now: float) -> None:
+        """Redeliver messages whose visibility timeout elapsed, counting a retry."""
+        expired = conn.execute(
+            "SELECT id, retry_count, body FROM queue_messages WHERE queue = ? "
+            "AND state = 'processing' AND lease_expires_ts <= ?",
+            (self.queue_name, now)
+        ).fetchall()
+        for message_id, retry_count, body in expired:
+            message = self._requeue_row(conn, message_id, retry_count, body, requeue=True)
+            self.logger.warning(
+                "Message lease expired, redelivering" if message.status == MessageStatus.RETRYING
+                else "Message lease expired, moved to dead-letter queue",
+                extra={
+                    "message_id": message_id,
+                    "queue": self.queue_name,
+                    "retry_count": message.retry_count
+                }
+            )
+
+    def _requeue_row(self, conn: sqlite3.Connection, message_id: str, retry_count: int,
+                     body: str, requeue: bool) -> Message:
+        """Count a failed delivery and requeue or dead-letter the message."""
+        message = _deserialize_message(body)
+        message.retry_count = retry_count + 1
+
+        if requeue and message.can_retry():
+            message.status = MessageStatus.RETRYING
+            target_queue = self.queue_name
+        else:
+            message.status = MessageStatus.FAILED
+            target_queue = self.dead_letter_queue
+
+        conn.execute(
+            "UPDATE queue_messages SET queue = ?, state = 'pending', lease_owner = NULL, "
+            "lease_expires_ts = NULL, retry_count = ?, body = ? WHERE id = ?",
+            (target_queue, message.retry_count, _serialize_message(message), message_id)
+        )
+        return message
+
+    def _peek_next(self) -> Optional[Message]:
+        now = time.time()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT body FROM queue_messages WHERE queue = ? AND state = 'pending' "
+                "AND (expires_ts IS NULL OR expires_ts > ?) "
+                "ORDER BY priority, created_ts LIMIT 1",
+                (self.queue_name, now)
+            ).fetchone()
+        return _deserialize_message(row[0]) if row else None
+
+    def _ack(self, message_id: str) -> bool:
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "DELETE FROM queue_messages WHERE id = ? AND queue = ? "
+                "AND state = 'processing' AND lease_owner = ?",
+                (message_id, self.queue_name, self.consumer_id)
+            )
+        return cursor.rowcount == 1
+
+    def _nack(self, message_id: str, requeue: bool) -> Optional[Message]:
+        """Retry or dead-letter a claimed message; ``None`` if not claimed here."""
+        with self._db_lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT retry_count, body FROM queue_messages WHERE id = ? AND queue = ? "
+                    "AND state = 'processing' AND lease_owner = ?",
+                    (message_id, self.queue_name, self.consumer_id)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                message = self._requeue_row(conn, message_id, row[0], row[1], requeue)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return message
+
+    def _count(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT state, priority, COUNT(*) FROM queue_messages "
+                "WHERE queue = ? AND (expires_ts IS NULL OR expires_ts > ? OR state = 'processing') "
+                "GROUP BY state, priority",
+                (self.queue_name, now)
+            ).fetchall()
+            dead_letters = self._conn.execute(
+                "SELECT COUNT(*) FROM queue_messages WHERE queue = ?",
+                (self.dead_letter_queue,)
+            ).fetchone()[0]
+
+        pending: Dict[int, int] = {}
+        processing = 0
+        for state, priority, count in rows:
+            if state == 'pending':
+                pending[priority] = pending.get(priority, 0) + count
+            else:
+                processing += count
+        return {
+            "pending": pending,
+            "processing": processing,
+            "dead_letters": dead_letters
+        }
+
+    def _clear(self) -> None:
+        with self._db_lock:
+            self._conn.execute(
+                "DELETE FROM queue_messages WHERE queue = ?", (self.queue_name,)
+            )
+
+    # ------------------------------------------------------------------
+    # QueueBackend interface
+    # ------------------------------------------------------------------
+
+    async def put(self, message: Message) -> None:
+        """Add message to the queue (group-committed with concurrent puts)."""
+        future = asyncio.get_running_loop().create_future()
+        self._write_buffer.append((message, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_writes())
+        await future
+
+    async def put_many(self, messages: List[Message]) -> None:
+        """Add several messages in as few transactions as possible."""
+        await asyncio.gather(*(self.put(message) for message in messages))
+
+    async def _flush_writes(self) -> None:
+        """Write buffered messages, one transaction per ``batch_size`` chunk."""
+        # Yield once so puts issued in the same loop iteration join the batch
+        await asyncio.sleep(0)
+        while self._write_buffer:
+            batch = self._write_buffer[:self.batch_size]
+            del self._write_buffer[:self.batch_size]
+            try:
+                errors = await self._run(self._insert_batch, [m for m, _ in batch])
+            except Exception as e:
+                error = MessageQueueError(
+                    f"Failed to persist messages: {e}", error_code="QUEUE_WRITE_FAILED"
+                )
+                errors = [error] * len(batch)
+
+            for (message, future), error in zip(batch, errors):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+            self.logger.debug(
+                "Messages persisted",
+                extra={"queue": self.queue_name, "batch_size": len(batch)}
+            )
+
+        condition = self._get_condition()
+        async with condition:
+            condition.notify_all()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """Claim the next message, waiting up to ``timeout`` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        condition = self._get_condition()
+
+        while True:
+            message = await self._run(self._claim_next)
+            if message is not None:
+                self.logger.debug(
+                    "Message dequeued",
+                    extra={
+                        "message_id": message.id,
+                        "queue": self.queue_name,
+                        "consumer_id": self.consumer_id
+                    }
+                )
+                return message
+
+            wait_time = self.poll_interval
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                wait_time = min(wait_time, remaining)
+
+            # Local puts wake us immediately; other processes are polled
+            async with condition:
+                try:
+                    await asyncio.wait_for(condition.wait(), wait_time)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def peek(self) -> Optional[Message]:
+        """Peek at next message without claiming it."""
+        return await self._run(self._peek_next)
+
+    async def ack(self, message_id: str) -> None:
+        """Acknowledge and delete a message claimed by this consumer."""
+        if not await self._run(self._ack, message_id):
+            raise MessageNotFoundError(
+                f"Message {message_id} not found in processing queue",
+                error_code="MESSAGE_NOT_PROCESSING"
+            )
+
+    async def nack(self, message_id: str, requeue: bool = True) -> None:
+        """Requeue a claimed message for retry or route it to the dead-letter queue."""
+        message = await self._run(self._nack, message_id, requeue)
+        if message is None:
+            raise MessageNotFoundError(
+                f"Message {message_id} not found in processing queue",
+                error_code="MESSAGE_NOT_PROCESSING"
+            )
+
+        if message.status == MessageStatus.RETRYING:
+            self.logger.warning(
+                "Message requeued for retry",
+                extra={
+                    "message_id": message_id,
+                    "retry_count": message.retry_count,
+                    "max_retries": message.max_retries
+                }
+            )
+            condition = self._get_condition()
+            async with condition:
+                condition.notify()
+        else:
+            self.logger.error(
+                "Message moved to dead-letter queue",
+                extra={
+                    "message_id": message_id,
+                    "dead_letter_queue": self.dead_letter_queue,
+                    "retry_count": message.retry_count
+                }
+            )
+
+    async def size(self) -> int:
+        """Get total queue size (pending + processing)."""
+        counts = await self._run(self._count)
+        return sum(counts["pending"].values()) + counts["processing"]
+
+    async def clear(self) -> None:
+        """Clear all messages of this queue."""
+        await self._run(self._clear)
+        self.logger.info("Queue cleared", extra={"queue": self.queue_name})
+
+    async def get_stats_async(self) -> Dict[str, Any]:
+        """Get queue statistics without blocking the event loop."""
+        return await self._run(self.get_stats)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics (blocking; use get_stats_async() in coroutines)."""
+        counts = self._count()
+        queue_size = sum(counts["pending"].values())
+        return {
+            "queue_size": queue_size,
+            "processing_count": counts["processing"],
+            "total_size": queue_size + counts["processing"],
+            "priority_breakdown": _priority_breakdown(counts["pending"]),
+            "dead_letter_count": counts["dead_letters"],
+            "max_size": self.max_size
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._db_lock:
+            self._conn.close()
+
+
+class RedisQueueBackend(QueueBackend):
+    """
+    Distributed priority queue on a Redis-protocol server.
+
+    Layout (``<q>`` is the queue name):
+    - ``<q>:messages``: hash of message id -> serialized message
+    - ``<q>:pending:<priority>``: one FIFO list per priority level
+    - ``<q>:processing``: list of claimed message ids
+    - ``<q>:leases``: sorted set of claimed ids scored by lease deadline
+    - ``<q>:lease_owner:<id>``: consumer id holding the lease of a message
+
+    Claims use the reliable-queue pattern: ``LMOVE`` atomically moves an id
+    from a pending list into the processing list, so a message is never lost
+    or handed to two consumers. Ids whose lease expired are found through
+    the lease sorted set and pushed back to their pending list by any
+    consumer. ack and nack check the lease owner in a WATCH/MULTI
+    transaction, so a consumer whose lease expired cannot settle the
+    message of its new owner.
+
+    A claim is two commands (``LMOVE``, then the lease ``ZADD``). Once per
+    visibility timeout the processing list is scanned for ids without a
+    lease, so a consumer that dies between the two commands cannot strand
+    its message.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: str = "redis://localhost:6379/0",
+        queue_name: str = "default",
+        max_size: Optional[int] = None,
+        visibility_timeout: float = 300.0,
+        dead_letter_queue: Optional[str] = None,
+        poll_interval: float = 0.1,
+        sync_client: Any = None
+    ):
+        """
+        Initialize Redis queue backend.
+
+        Args:
+            client: ``redis.asyncio``-compatible client (e.g. fakeredis) to use
+            url: Redis URL, used when no client is given
+            queue_name: Key prefix of this queue
+            max_size: Soft maximum queue size (None for unlimited)
+            visibility_timeout: Seconds a claimed message stays invisible
+            dead_letter_queue: Queue receiving permanently failed messages
+            poll_interval: Poll period while the queue is empty
+            sync_client: Blocking client on the same server, used by
+                ``get_stats()``; created from ``url`` when no client is given
+        """
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise MessageQueueError(
+                    "redis package is required for the Redis queue backend",
+                    error_code="REDIS_NOT_AVAILABLE"
+                )
+            client = redis_asyncio.from_url(url, decode_responses=True)
+            if sync_client is None:
+                sync_client = redis_sync.from_url(url, decode_responses=True)
+
+        self.client = client
+        self.sync_client = sync_client
+        self.queue_name = queue_name
+        self.max_size = max_size
+        self.visibility_timeout = visibility_timeout
+        self.dead_letter_queue = dead_letter_queue or f"{queue_name}.dead_letter"
+        self.poll_interval = poll_interval
+        self.consumer_id = str(uuid.uuid4())
+        self.logger = AgentLogger("message_queue")
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next_stranded_scan = 0.0
+
+    def _key(self, suffix: str, queue: Optional[str] = None) -> str:
+        return f"{queue or self.queue_name}:{suffix}"
+
+    def _owner_key(self, message_id: str) -> str:
+        return self._key(f"lease_owner:{message_id}")
+
+    def _pending_key(self, priority: int, queue: Optional[str] = None) -> str:
+        return self._key(f"pending:{int(priority)}", queue)
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Return the wake-up condition bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    @staticmethod
+    def _text(value: Any) -> Optional[str]:
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+
+    async def _pending_counts(self) -> Dict[int, int]:
+        pipe = self.client.pipeline()
+        for priority in MessagePriority:
+            pipe.llen(self._pending_key(priority))
+        lengths = await pipe.execute()
+        return {int(priority): length for priority, length in zip(MessagePriority, lengths)}
+
+    async def _release_expired_leases(self) -> None:
+        """Redeliver messages whose lease has expired, counting a retry."""
+        now = time.time()
+        if now >= self._next_stranded_scan:
+            # Lease claimed ids that have none (their consumer died mid-claim);
+            # such a lease could not have expired sooner anyway
+            self._next_stranded_scan = now + self.visibility_timeout
+            processing = await self.client.lrange(self._key("processing"), 0, -1)
+            if processing:
+                await self.client.zadd(
+                    self._key("leases"),
+                    {self._text(raw_id): now + self.visibility_timeout for raw_id in processing},
+                    nx=True
+                )
+
+        expired = await self.client.zrangebyscore(self._key("leases"), "-inf", now)
+        for raw_id in expired:
+            message_id = self._text(raw_id)
+            # ZREM returning 1 means this consumer won the right to release it
+            if not await self.client.zrem(self._key("leases"), message_id):
+                continue
+            # The former owner can no longer ack or nack
+            await self.client.delete(self._owner_key(message_id))
+            if not await self.client.lrem(self._key("processing"), 1, message_id):
+                continue
+            body = await self.client.hget(self._key("messages"), message_id)
+            if body is None:
+                continue
+            message = _deserialize_message(self._text(body))
+            message.retry_count += 1
+            await self._retry_or_dead_letter(message, requeue=True)
+            self.logger.warning(
+                "Message lease expired, redelivering" if message.status == MessageStatus.RETRYING
+                else "Message lease expired, moved to dead-letter queue",
+                extra={
+                    "message_id": message_id,
+                    "queue": self.queue_name,
+                    "retry_count": message.retry_count
+                }
+            )
+
+    async def _retry_or_dead_letter(self, message: Message, requeue: bool) -> None:
+        """Push a released message back for retry or to the dead-letter queue."""
+        if requeue and message.can_retry():
+            message.status = MessageStatus.RETRYING
+            await self.client.hset(self._key("messages"), message.id, _serialize_message(message))
+            # Retries go to the consumer end of the list so they run next
+            await self.client.rpush(self._pending_key(message.priority), message.id)
+            return
+
+        message.status = MessageStatus.FAILED
+        pipe = self.client.pipeline()
+        pipe.hdel(self._key("messages"), message.id)
+        pipe.hset(
+            self._key("messages", self.dead_letter_queue), message.id, _serialize_message(message)
+        )
+        pipe.lpush(self._pending_key(message.priority, self.dead_letter_queue), message.id)
+        await pipe.execute()
+
+    async def put(self, message: Message) -> None:
+        """Add message to the queue."""
+        if self.max_size:
+            queued = sum((await self._pending_counts()).values())
+            queued += await self.client.llen(self._key("processing"))
+            if queued >= self.max_size:
+                raise QueueFullError(
+                    f"Queue is full (max size: {self.max_size})",
+                    error_code="QUEUE_FULL"
+                )
+
+        if not await self.client.hsetnx(
+            self._key("messages"), message.id, _serialize_message(message)
+        ):
+            raise InvalidMessageError(
+                f"Message with ID {message.id} already exists",
+                error_code="DUPLICATE_MESSAGE"
+            )
+        await self.client.lpush(self._pending_key(message.priority), message.id)
+
+        condition = self._get_condition()
+        async with condition:
+            condition.notify()
+
+    async def _claim_next(self) -> Optional[Message]:
+        await self._release_expired_leases()
+
+        for priority in MessagePriority:
+            while True:
+                raw_id = await self.client.lmove(
+                    self._pending_key(priority), self._key("processing"), "RIGHT", "LEFT"
+                )
+                if raw_id is None:
+                    break
+
+                message_id = self._text(raw_id)
+                pipe = self.client.pipeline()
+                pipe.zadd(self._key("leases"), {message_id: time.time() + self.visibility_timeout})
+                pipe.set(self._owner_key(message_id), self.consumer_id)
+                await pipe.execute()
+                body = await self.client.hget(self._key("messages"), message_id)
+                if body is None:
+                    await self._drop(message_id)
+                    continue
+
+                message = _deserialize_message(self._text(body))
+                if message.is_expired():
+                    await self._drop(message_id)
+                    self.logger.warning(
+                        "Message expired",
+                        extra={"message_id": message_id, "queue": self.queue_name}
+                    )
+                    continue
+
+                message.status = MessageStatus.PROCESSING
+                return message
+        return None
+
+    async def _drop(self, message_id: str) -> bool:
+        """Remove a claimed message; returns False if it was not claimed."""
+        removed = await self.client.lrem(self._key("processing"), 1, message_id)
+        pipe = self.client.pipeline()
+        pipe.zrem(self._key("leases"), message_id)
+        pipe.delete(self._owner_key(message_id))
+        pipe.hdel(self._key("messages"), message_id)
+        await pipe.execute()
+        return bool(removed)
+
+    async def _end_claim(self, message_id: str, delete: bool) -> bool:
+        """
+        End this consumer's claim of a message in one transaction.
+
+        Returns False if the consumer does not hold the message's lease
+        (never claimed, already settled, or expired and released).
+        """
+        owner_key = self._owner_key(message_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(owner_key)
+                    if self._text(await pipe.get(owner_key)) != self.consumer_id:
+                        return False
+                    pipe.multi()
+                    pipe.lrem(self._key("processing"), 1, message_id)
+                    pipe.zrem(self._key("leases"), message_id)
+                    pipe.delete(owner_key)
+                    if delete:
+                        pipe.hdel(self._key("messages"), message_id)
+                    removed = (await pipe.execute())[0]
+                    return bool(removed)
+                except WatchError:
+                    continue
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """Claim the next message, waiting up to ``timeout`` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        condition = self._get_condition()
+
+        while True:
+            message = await self._claim_next()
+            if message is not None:
+                return message
+
+            wait_time = self.poll_interval
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                wait_time = min(wait_time, remaining)
+
+            async with condition:
+                try:
+                    await asyncio.wait_for(condition.wait(), wait_time)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def peek(self) -> Optional[Message]:
+        """Peek at next message without claiming it."""
+        for priority in MessagePriority:
+            raw_id = await self.client.lindex(self._pending_key(priority), -1)
+            if raw_id is None:
+                continue
+            body = await self.client.hget(self._key("messages"), self._text(raw_id))
+            if body is not None:
+                return _deserialize_message(self._text(body))
+        return None
+
+    async def ack(self, message_id: str) -> None:
+        """Acknowledge and delete a message claimed by this consumer."""
+        if not await self._end_claim(message_id, delete=True):
+            raise MessageNotFoundError(
+                f"Message {message_id} not found in processing queue",
+                error_code="MESSAGE_NOT_PROCESSING"
+            )
+
+    async def nack(self, message_id: str, requeue: bool = True) -> None:
+        """Requeue a claimed message for retry or route it to the dead-letter queue."""
+        if not await self._end_claim(message_id, delete=False):
+            raise MessageNotFoundError(
+                f"Message {message_id} not found in processing queue",
+                error_code="MESSAGE_NOT_PROCESSING"
+            )
+
+        body = await self.client.hget(self._key("messages"), message_id)
+        if body is None:
+            return
+        message = _deserialize_message(self._text(body))
+        message.retry_count += 1
+        await self._retry_or_dead_letter(message, requeue)
+
+        if message.status == MessageStatus.RETRYING:
+            self.logger.warning(
+                "Message requeued for retry",
+                extra={
+                    "message_id": message_id,
+                    "retry_count": message.retry_count,
+                    "max_retries": message.max_retries
+                }
+            )
+            condition = self._get_condition()
+            async with condition:
+                condition.notify()
+        else:
+            self.logger.error(
+                "Message moved to dead-letter queue",
+                extra={
+                    "message_id": message_id,
+                    "dead_letter_queue": self.dead_letter_queue,
+                    "retry_count": message.retry_count
+                }
+            )
+
+    async def size(self) -> int:
+        """Get total queue size (pending + processing)."""
+        pending = sum((await self._pending_counts()).values())
+        return pending + await self.client.llen(self._key("processing"))
+
+    async def clear(self) -> None:
+        """Clear all messages of this queue."""
+        keys = [self._key("messages"), self._key("processing"), self._key("leases")]
+        keys.extend(self._pending_key(priority) for priority in MessagePriority)
+        keys.extend([key async for key in self.client.scan_iter(match=self._owner_key("*"))])
+        await self.client.delete(*keys)
+        self.logger.info("Queue cleared", extra={"queue": self.queue_name})
+
+    async def get_stats_async(self) -> Dict[str, Any]:
+        """Get queue statistics."""
+        pipe = self.client.pipeline()
+        self._queue_stat_commands(pipe)
+        return self._stats_from_replies(await pipe.execute())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics (blocking, through ``sync_client``)."""
+        if self.sync_client is None:
+            raise MessageQueueError(
+                "RedisQueueBackend.get_stats() needs a sync_client; use get_stats_async()",
+                error_code="REDIS_SYNC_CLIENT_REQUIRED"
+            )
+        pipe = self.sync_client.pipeline()
+        self._queue_stat_commands(pipe)
+        return self._stats_from_replies(pipe.execute())
+
+    def _queue_stat_commands(self, pipe: Any) -> None:
+        for priority in MessagePriority:
+            pipe.llen(self._pending_key(priority))
+        pipe.llen(self._key("processing"))
+        pipe.hlen(self._key("messages", self.dead_letter_queue))
+
+    def _stats_from_replies(self, replies: List[int]) -> Dict[str, Any]:
+        pending = {int(priority): length for priority, length in zip(MessagePriority, replies)}
+        processing, dead_letters = replies[len(pending):]
+        queue_size = sum(pending.values())
+        return {
+            "queue_size": queue_size,
+            "processing_count": processing,
+            "total_size": queue_size + processing,
+            "priority_breakdown": _priority_breakdown(pending),
+            "dead_letter_count": dead_letters,
+            "max_size": self.max_size
+        }
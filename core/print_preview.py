@@ -25,6 +25,9 @@ import io
 from PIL import Image
 
 from core.logger import get_logger
+from core.gcode_parser import ParsedGCode, parse_gcode_text
+from core.print_time_estimator import MotionLimits, PrintEstimate, estimate_print
+from core.stl_reader import read_stl
 
 logger = get_logger(__name__)
 
@@ -52,6 +55,8 @@ class LayerInfo:
     movements: List[Dict[str, Any]]
     temperatures: Dict[str, float]
     speeds: Dict[str, float]
+    move_start: int = 0  # Index range of the layer's moves in ParsedGCode
+    move_end: int = 0
 
 @dataclass
 class PrintAnalysis:
@@ -75,119 +80,45 @@ class STLParser:
         """
         Parse STL file and extract vertices, normals, and triangles
         
+        Binary files are memory-mapped (see core.stl_reader), so the returned
+        arrays may be read-only views of the file.
+        
         Args:
             file_path: Path to STL file
             
         Returns:
-            Dictionary containing geometry data
+            Dictionary containing geometry data: ``vertices`` as a (3n, 3)
+            array, ``normals`` as a (n, 3) array, ``triangle_count`` and
+            ``bounds``
         """
         try:
-            # Check if file is binary or ASCII STL
-            with open(file_path, 'rb') as f:
-                header = f.read(80)
-                if header.startswith(b'solid '):
-                    return self._parse_ascii_stl(file_path)
-                else:
-                    return self._parse_binary_stl(file_path)
+            return read_stl(file_path).to_geometry_data()
                     
         except Exception as e:
             self.logger.error(f"Error parsing STL file {file_path}: {e}")
             raise
     
-    def _parse_binary_stl(self, file_path: Path) -> Dict[str, Any]:
-        """Parse binary STL file"""
-        vertices = []
-        normals = []
-        
-        with open(file_path, 'rb') as f:
-            # Skip header (80 bytes)
-            f.read(80)
-            
-            # Read number of triangles
-            triangle_count = int.from_bytes(f.read(4), byteorder='little')
-            
-            for _ in range(triangle_count):
-                # Read normal vector (3 floats)
-                normal = []
-                for _ in range(3):
-                    normal.append(float(np.frombuffer(f.read(4), dtype=np.float32)[0]))
-                normals.append(normal)
-                
-                # Read triangle vertices (9 floats)
-                triangle_vertices = []
-                for _ in range(3):
-                    vertex = []
-                    for _ in range(3):
-                        vertex.append(float(np.frombuffer(f.read(4), dtype=np.float32)[0]))
-                    triangle_vertices.append(vertex)
-                vertices.extend(triangle_vertices)
-                
-                # Skip attribute byte count
-                f.read(2)
-        
-        return {
-            'vertices': vertices,
-            'normals': normals,
-            'triangle_count': triangle_count,
-            'bounds': self._calculate_bounds(vertices)
-        }
-    
-    def _parse_ascii_stl(self, file_path: Path) -> Dict[str, Any]:
-        """Parse ASCII STL file"""
-        vertices = []
-        normals = []
-        
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
-            
-        current_normal = None
-        triangle_vertices = []
-        triangle_count = 0
-        
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith('facet normal'):
-                parts = line.split()
-                current_normal = [float(parts[2]), float(parts[3]), float(parts[4])]
-                
-            elif line.startswith('vertex'):
-                parts = line.split()
-                vertex = [float(parts[1]), float(parts[2]), float(parts[3])]
-                triangle_vertices.append(vertex)
-                
-            elif line.startswith('endfacet'):
-                if current_normal and len(triangle_vertices) == 3:
-                    normals.append(current_normal)
-                    vertices.extend(triangle_vertices)
-                    triangle_count += 1
-                triangle_vertices = []
-                current_normal = None
-        
-        return {
-            'vertices': vertices,
-            'normals': normals,
-            'triangle_count': triangle_count,
-            'bounds': self._calculate_bounds(vertices)
-        }
-    
-    def _calculate_bounds(self, vertices: List[List[float]]) -> Dict[str, Tuple[float, float]]:
+    def _calculate_bounds(self, vertices: Union[np.ndarray, List[List[float]]]) -> Dict[str, Tuple[float, float]]:
         """Calculate bounding box of the geometry"""
-        if not vertices:
+        vertices_array = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        if len(vertices_array) == 0:
             return {'x': (0, 0), 'y': (0, 0), 'z': (0, 0)}
         
-        vertices_array = np.array(vertices)
+        lower = vertices_array.min(axis=0)
+        upper = vertices_array.max(axis=0)
         return {
-            'x': (float(vertices_array[:, 0].min()), float(vertices_array[:, 0].max())),
-            'y': (float(vertices_array[:, 1].min()), float(vertices_array[:, 1].max())),
-            'z': (float(vertices_array[:, 2].min()), float(vertices_array[:, 2].max()))
+            'x': (float(lower[0]), float(upper[0])),
+            'y': (float(lower[1]), float(upper[1])),
+            'z': (float(lower[2]), float(upper[2]))
         }
 
 class GCodeAnalyzer:
     """Analyzer for G-code files to extract layer and printing information"""
     
-    def __init__(self):
+    def __init__(self, motion_limits: Optional[MotionLimits] = None, material: str = 'PLA'):
         self.logger = get_logger(f"{__name__}.GCodeAnalyzer")
+        self.motion_limits = motion_limits or MotionLimits()
+        self.material = material
     
     def analyze_gcode(self, gcode_content: str) -> Tuple[List[LayerInfo], PrintAnalysis]:
         """
@@ -200,120 +131,85 @@ class GCodeAnalyzer:
             Tuple of (layer_info_list, print_analysis)
         """
         try:
-            lines = gcode_content.split('\n')
-            layers = []
-            current_layer = None
-            total_time = 0
-            material_usage = {}
-            
-            # Track current state
-            current_z = 0
-            current_temp = {}
-            current_speed = {}
-            layer_number = 0
-            
-            for line_num, line in enumerate(lines):
-                line = line.strip()
-                if not line or line.startswith(';'):
-                    # Check for layer comments
-                    if line.startswith(';LAYER:'):
-                        if current_layer:
-                            layers.append(current_layer)
-                        layer_number += 1
-                        current_layer = LayerInfo(
-                            layer_number=layer_number,
-                            layer_height=0.2,  # Default, will be calculated
-                            z_position=current_z,
-                            print_time=0,
-                            material_usage=0,
-                            movements=[],
-                            temperatures=current_temp.copy(),
-                            speeds=current_speed.copy()
-                        )
-                    continue
-                
-                # Parse G-code commands
-                command_info = self._parse_gcode_line(line)
-                if command_info and current_layer:
-                    current_layer.movements.append(command_info)
-                    
-                    # Update current state
-                    if 'Z' in command_info.get('params', {}):
-                        current_z = command_info['params']['Z']
-                        current_layer.z_position = current_z
-                
-                # Track temperatures
-                if line.startswith('M104') or line.startswith('M109'):
-                    temp_match = self._extract_temperature(line)
-                    if temp_match:
-                        current_temp['extruder'] = temp_match
-                
-                if line.startswith('M140') or line.startswith('M190'):
-                    temp_match = self._extract_temperature(line)
-                    if temp_match:
-                        current_temp['bed'] = temp_match
-            
-            # Add last layer
-            if current_layer:
-                layers.append(current_layer)
-            
-            # Calculate analysis
-            analysis = self._calculate_print_analysis(layers, lines)
-            
-            return layers, analysis
+            return self.analyze_parsed(parse_gcode_text(gcode_content))
             
         except Exception as e:
             self.logger.error(f"Error analyzing G-code: {e}")
             raise
     
-    def _parse_gcode_line(self, line: str) -> Optional[Dict[str, Any]]:
-        """Parse a single G-code line and extract command information"""
-        parts = line.split()
-        if not parts:
-            return None
+    def analyze_parsed(self, parsed: ParsedGCode) -> Tuple[List[LayerInfo], PrintAnalysis]:
+        """
+        Analyze already parsed G-code (see core.gcode_parser)
         
-        command = parts[0]
-        params = {}
+        Args:
+            parsed: Parsed G-code program
+            
+        Returns:
+            Tuple of (layer_info_list, print_analysis)
+        """
+        estimate = estimate_print(parsed, self.motion_limits, self.material)
+        layers = self.build_layers(parsed, estimate)
+        return layers, self._calculate_print_analysis(layers, estimate)
+    
+    def build_layers(self, parsed: ParsedGCode, estimate: Optional[PrintEstimate] = None) -> List[LayerInfo]:
+        """
+        Build per-layer summaries from parsed G-code arrays
         
-        for part in parts[1:]:
-            if len(part) >= 2:
-                param_name = part[0]
-                try:
-                    param_value = float(part[1:])
-                    params[param_name] = param_value
-                except ValueError:
-                    params[param_name] = part[1:]
+        Moves stay in the ParsedGCode arrays; each LayerInfo only records the
+        index range of its moves (``movements`` is left empty).
         
-        return {
-            'command': command,
-            'params': params,
-            'raw_line': line
-        }
-    
-    def _extract_temperature(self, line: str) -> Optional[float]:
-        """Extract temperature value from G-code line"""
-        if 'S' in line:
-            parts = line.split('S')
-            if len(parts) > 1:
-                try:
-                    return float(parts[1].split()[0])
-                except (ValueError, IndexError):
-                    pass
-        return None
+        Args:
+            parsed: Parsed G-code program
+            estimate: Kinematic estimate providing per-layer print times (seconds)
+            
+        Returns:
+            List of layer information
+        """
+        layers = []
+        previous_z = 0.0
+        temperature_events = parsed.temperature_events
+        event_index = 0
+        current_temp: Dict[str, float] = {}
+        
+        for layer_number, (start, end) in enumerate(parsed.layer_ranges(), start=1):
+            # Apply temperature changes issued before the layer starts
+            while event_index < len(temperature_events) and temperature_events[event_index][0] <= start:
+                _, heater, value = temperature_events[event_index]
+                current_temp[heater] = value
+                event_index += 1
+            
+            if end > start:
+                z_position = round(float(parsed.z[end - 1]), 4)
+                extrusion = parsed.e[start:end]
+                material = float(extrusion[extrusion > 0].sum(dtype=np.float64))
+                speeds = {'max_feedrate': float(parsed.f[start:end].max())}
+            else:
+                z_position = previous_z
+                material = 0.0
+                speeds = {}
+            
+            layers.append(LayerInfo(
+                layer_number=layer_number,
+                layer_height=round(z_position - previous_z, 4),
+                z_position=z_position,
+                print_time=estimate.layer_times[layer_number - 1] if estimate else 0,
+                material_usage=material,
+                movements=[],
+                temperatures=current_temp.copy(),
+                speeds=speeds,
+                move_start=start,
+                move_end=end
+            ))
+            previous_z = z_position
+        
+        return layers
     
-    def _calculate_print_analysis(self, layers: List[LayerInfo], gcode_lines: List[str]) -> PrintAnalysis:
+    def _calculate_print_analysis(self, layers: List[LayerInfo], estimate: PrintEstimate) -> PrintAnalysis:
         """Calculate comprehensive print analysis from layers"""
         total_layers = len(layers)
-        estimated_time = sum(layer.print_time for layer in layers)
+        estimated_time = estimate.total_time / 3600.0  # hours
         
-        # Estimate material usage (simplified)
-        total_extrusion = 0
-        for layer in layers:
-            for movement in layer.movements:
-                if movement['command'] in ['G1', 'G0'] and 'E' in movement.get('params', {}):
-                    total_extrusion += movement['params']['E']
-        
-        material_usage = {'PLA': total_extrusion * 0.001}  # Convert to grams (simplified)
+        material_usage = {self.material: round(estimate.filament_mass, 2)}  # grams
         
         # Calculate layer heights
         layer_heights = []
@@ -392,12 +288,15 @@ class Preview3DRenderer:
             self.logger.error(f"Error generating STL preview: {e}")
             raise
     
-    def generate_layer_preview(self, layers: List[LayerInfo]) -> Dict[str, Any]:
+    def generate_layer_preview(self, layers: List[LayerInfo],
+                               parsed: Optional[ParsedGCode] = None) -> Dict[str, Any]:
         """
         Generate layer-by-layer preview data
         
         Args:
             layers: List of layer information
+            parsed: Parsed G-code arrays; when given, paths are built from the
+                layer's move range instead of ``layer.movements``
             
         Returns:
             Layer preview data for visualization
@@ -407,7 +306,10 @@ class Preview3DRenderer:
             
             for layer in layers:
                 # Extract path information for layer
-                paths = self._extract_layer_paths(layer)
+                if parsed is not None:
+                    paths = self._extract_parsed_layer_paths(parsed, layer)
+                else:
+                    paths = self._extract_layer_paths(layer)
                 
                 layer_preview = {
                     'layer_number': layer.layer_number,
@@ -435,29 +337,19 @@ class Preview3DRenderer:
             self.logger.error(f"Error generating layer preview: {e}")
             raise
     
-    def _flatten_vertices(self, vertices: List[List[float]]) -> List[float]:
+    def _flatten_vertices(self, vertices: Union[np.ndarray, List[List[float]]]) -> List[float]:
         """Flatten vertex array for Three.js"""
-        flattened = []
-        for vertex in vertices:
-            flattened.extend(vertex)
-        return flattened
+        return np.asarray(vertices, dtype=np.float32).ravel().tolist()
     
-    def _flatten_normals(self, normals: List[List[float]]) -> List[float]:
+    def _flatten_normals(self, normals: Union[np.ndarray, List[List[float]]]) -> List[float]:
         """Flatten normal array for Three.js"""
-        flattened = []
-        for normal in normals:
-            # Repeat normal for each vertex of triangle
-            flattened.extend(normal)
-            flattened.extend(normal)
-            flattened.extend(normal)
-        return flattened
+        # Repeat normal for each vertex of triangle
+        normal_array = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+        return np.repeat(normal_array, 3, axis=0).ravel().tolist()
     
     def _generate_face_indices(self, vertex_count: int) -> List[int]:
         """Generate face indices for Three.js geometry"""
-        indices = []
-        for i in range(0, vertex_count, 3):
-            indices.extend([i, i + 1, i + 2])
-        return indices
+        return np.arange(vertex_count - vertex_count % 3).tolist()
     
     def _calculate_center(self, bounds: Dict[str, Tuple[float, float]]) -> Tuple[float, float, float]:
         """Calculate center point of geometry"""
@@ -542,6 +434,32 @@ class Preview3DRenderer:
         
         return paths
 
+    def _extract_parsed_layer_paths(self, parsed: ParsedGCode, layer: LayerInfo) -> List[Dict[str, Any]]:
+        """Split a layer's moves into travel/extrusion paths with array operations"""
+        start, end = layer.move_start, layer.move_end
+        if end <= start:
+            return []
+        
+        points = np.column_stack((parsed.x[start:end], parsed.y[start:end], parsed.z[start:end]))
+        points = np.round(points.astype(np.float64), 4)
+        extruding = parsed.e[start:end] > 0
+        feedrates = parsed.f[start:end]
+        
+        # A new path starts wherever the extrusion state flips
+        breaks = np.flatnonzero(extruding[1:] != extruding[:-1]) + 1
+        bounds = np.concatenate(([0], breaks, [end - start]))
+        
+        paths = []
+        for path_start, path_end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            is_extruding = bool(extruding[path_start])
+            paths.append({
+                'type': 'extrusion' if is_extruding else 'travel',
+                'points': points[path_start:path_end].tolist(),
+                'speed': float(feedrates[path_start]),
+                'extrusion': is_extruding
+            })
+        return paths
+
 class PrintPreviewManager:
     """Main manager for 3D print preview functionality"""
     
@@ -554,12 +472,15 @@ class PrintPreviewManager:
         self.renderer = Preview3DRenderer()
         self.logger = get_logger(f"{__name__}.PrintPreviewManager")
     
-    def generate_stl_preview(self, stl_file_path: Path) -> Dict[str, Any]:
+    def generate_stl_preview(self, stl_file_path: Path,
+                             geometry_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Generate complete STL file preview
         
         Args:
             stl_file_path: Path to STL file
+            geometry_data: Already parsed geometry of the file (parsed here
+                when omitted), e.g. to share it with the design analysis
             
         Returns:
             Complete preview data
@@ -568,7 +489,8 @@ class PrintPreviewManager:
             self.logger.info(f"Generating STL preview for {stl_file_path}")
             
             # Parse STL geometry
-            geometry_data = self.stl_parser.parse_stl_file(stl_file_path)
+            if geometry_data is None:
+                geometry_data = self.stl_parser.parse_stl_file(stl_file_path)
             
             # Generate 3D preview
             preview_data = self.renderer.generate_stl_preview(geometry_data)
@@ -601,10 +523,11 @@ class PrintPreviewManager:
             self.logger.info("Generating G-code preview")
             
             # Analyze G-code
-            layers, analysis = self.gcode_analyzer.analyze_gcode(gcode_content)
+            parsed = parse_gcode_text(gcode_content)
+            layers, analysis = self.gcode_analyzer.analyze_parsed(parsed)
             
             # Generate layer preview
-            layer_preview = self.renderer.generate_layer_preview(layers)
+            layer_preview = self.renderer.generate_layer_preview(layers, parsed)
             
             # Combine data
             preview_data = {
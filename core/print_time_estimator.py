@@ -0,0 +1,258 @@
+"""
+Kinematic Print Time Estimator for AI Agent 3D Print System
+
+Estimates print duration and filament consumption from parsed G-code
+(see core.gcode_parser) using the same motion model as the firmware planner:
+
+- Every move follows a trapezoidal velocity profile (accelerate, cruise,
+  decelerate) limited by its feedrate and the per-axis maximum feedrate and
+  acceleration of the printer.
+- Junction speeds between consecutive moves are limited by the per-axis jerk
+  (maximum instantaneous velocity change), as in Marlin's classic jerk.
+- Entry/exit speeds are made reachable with a forward and a backward pass.
+  Both passes are min-plus recurrences on squared speeds, which are solved
+  in closed form with prefix sums and ``np.minimum.accumulate`` so that the
+  whole estimate is vectorized (10M moves take a few seconds).
+
+Limits come from ``PrinterProfile`` (printer_support/multi_printer_support.py)
+via ``MotionLimits.from_printer_profile``.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .gcode_parser import ParsedGCode
+except ImportError:
+    from core.gcode_parser import ParsedGCode
+
+# Filament densities in g/cm³
+MATERIAL_DENSITIES = {
+    'PLA': 1.24,
+    'PETG': 1.27,
+    'ABS': 1.04,
+    'ASA': 1.07,
+    'TPU': 1.21,
+    'NYLON': 1.14,
+}
+
+DEFAULT_FILAMENT_DIAMETER = 1.75  # mm
+
+_AXIS_KEYS = ('X', 'Y', 'Z', 'E')
+
+
+@dataclass
+class MotionLimits:
+    """Kinematic limits of a printer (speeds in mm/s, accelerations in mm/s²)."""
+    max_feedrate: Dict[str, float] = field(
+        default_factory=lambda: {'X': 300.0, 'Y': 300.0, 'Z': 5.0, 'E': 25.0}
+    )
+    max_acceleration: Dict[str, float] = field(
+        default_factory=lambda: {'X': 1000.0, 'Y': 1000.0, 'Z': 100.0, 'E': 1000.0}
+    )
+    max_jerk: Dict[str, float] = field(
+        default_factory=lambda: {'X': 10.0, 'Y': 10.0, 'Z': 0.4, 'E': 5.0}
+    )
+    # Optional overall acceleration cap (e.g. the slicer's print acceleration)
+    acceleration: Optional[float] = None
+    # Used for moves that never received a feedrate
+    default_feedrate: float = 50.0
+
+    @classmethod
+    def from_printer_profile(cls, profile: Any, acceleration: Optional[float] = None) -> 'MotionLimits':
+        """
+        Build limits from a PrinterProfile.
+
+        Args:
+            profile: PrinterProfile (or any object with ``max_feedrate``,
+                ``max_acceleration`` and optionally ``max_jerk`` dicts)
+            acceleration: Optional overall acceleration cap in mm/s²
+
+        Returns:
+            MotionLimits for the printer
+        """
+        defaults = cls()
+
+        def merge(default: Dict[str, float], values: Optional[Dict[str, Any]]) -> Dict[str, float]:
+            merged = dict(default)
+            for axis, value in (values or {}).items():
+                if axis in merged and value:
+                    merged[axis] = float(value)
+            return merged
+
+        return cls(
+            max_feedrate=merge(defaults.max_feedrate, getattr(profile, 'max_feedrate', None)),
+            max_acceleration=merge(defaults.max_acceleration, getattr(profile, 'max_acceleration', None)),
+            max_jerk=merge(defaults.max_jerk, getattr(profile, 'max_jerk', None)),
+            acceleration=acceleration,
+        )
+
+
+@dataclass
+class PrintEstimate:
+    """Result of a kinematic print estimate."""
+    total_time: float  # seconds
+    layer_times: List[float]  # seconds per layer
+    filament_length: float  # mm of filament pushed (retractions excluded)
+    filament_volume: float  # mm³
+    filament_mass: float  # grams
+    extrusion_distance: float  # mm travelled while extruding
+    travel_distance: float  # mm travelled without extruding
+
+    @property
+    def total_minutes(self) -> float:
+        """Total print time in minutes."""
+        return self.total_time / 60.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the estimate (layer times omitted)."""
+        return {
+            'total_time_seconds': round(self.total_time, 1),
+            'total_time_minutes': round(self.total_minutes, 1),
+            'filament_length_mm': round(self.filament_length, 2),
+            'filament_volume_mm3': round(self.filament_volume, 2),
+            'filament_mass_g': round(self.filament_mass, 2),
+            'extrusion_distance_mm': round(self.extrusion_distance, 2),
+            'travel_distance_mm': round(self.travel_distance, 2),
+        }
+
+
+def filament_mass(length_mm: float, material: str = 'PLA',
+                  filament_diameter: float = DEFAULT_FILAMENT_DIAMETER) -> float:
+    """Mass in grams of ``length_mm`` of filament."""
+    density = MATERIAL_DENSITIES.get(str(material).upper(), MATERIAL_DENSITIES['PLA'])
+    area = math.pi * (filament_diameter / 2.0) ** 2
+    return length_mm * area * density / 1000.0
+
+
+def _limit_by_axes(components: np.ndarray, length: np.ndarray, limits: Dict[str, float]) -> np.ndarray:
+    """Largest path value such that every axis component stays within its limit."""
+    limit = np.full(length.shape[0], np.inf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for index, axis in enumerate(_AXIS_KEYS):
+            axis_share = components[index] / length
+            axis_limit = limits[axis] / axis_share
+            np.minimum(limit, np.where(axis_share > 0, axis_limit, np.inf), out=limit)
+    return limit
+
+
+def _reachable_forward(cap: np.ndarray, gain: np.ndarray) -> np.ndarray:
+    """
+    Solve w[k] = min(cap[k], w[k-1] + gain[k-1]) with w[0] = cap[0].
+
+    Unrolled, w[k] = S[k] + min_{j<=k}(cap[j] - S[j]) where S is the prefix
+    sum of ``gain``.
+    """
+    prefix = np.zeros(cap.shape[0])
+    np.cumsum(gain, out=prefix[1:])
+    return prefix + np.minimum.accumulate(cap - prefix)
+
+
+def estimate_print(parsed: ParsedGCode, limits: Optional[MotionLimits] = None,
+                   material: str = 'PLA',
+                   filament_diameter: float = DEFAULT_FILAMENT_DIAMETER) -> PrintEstimate:
+    """
+    Estimate print time and filament usage of a parsed G-code program.
+
+    Args:
+        parsed: Parsed G-code (core.gcode_parser)
+        limits: Printer motion limits (generic Marlin defaults if omitted)
+        material: Filament material for the mass calculation
+        filament_diameter: Filament diameter in mm
+
+    Returns:
+        PrintEstimate with total and per-layer times
+    """
+    limits = limits or MotionLimits()
+    count = parsed.move_count
+    if count == 0:
+        return PrintEstimate(0.0, [0.0] * parsed.layer_count, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    # Per-axis move components
+    deltas = np.empty((4, count))
+    for index, (axis, start) in enumerate(zip((parsed.x, parsed.y, parsed.z), parsed.start_position)):
+        positions = axis.astype(np.float64)
+        deltas[index] = np.diff(positions, prepend=start)
+    deltas[3] = parsed.e
+    components = np.abs(deltas)
+
+    xyz_length = np.sqrt((deltas[:3] ** 2).sum(axis=0))
+    # Extruder-only moves (retract/prime) are timed on the filament axis
+    length = np.where(xyz_length > 0, xyz_length, components[3])
+    moving = length > 0
+
+    # Cruise speed: programmed feedrate limited per axis
+    feedrate = parsed.f.astype(np.float64) / 60.0
+    feedrate = np.where(feedrate > 0, feedrate, limits.default_feedrate)
+    cruise = np.minimum(feedrate, _limit_by_axes(components, length, limits.max_feedrate))
+
+    acceleration = _limit_by_axes(components, length, limits.max_acceleration)
+    if limits.acceleration:
+        np.minimum(acceleration, limits.acceleration, out=acceleration)
+    acceleration = np.where(np.isfinite(acceleration) & (acceleration > 0), acceleration, 1.0)
+
+    # Junction speed between move i-1 and i: the lower cruise speed, scaled
+    # down until no axis changes velocity by more than its jerk.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        direction = np.where(moving, deltas / length, 0.0)
+    junction = np.minimum(cruise[:-1], cruise[1:])
+    jerk_limit = np.full(count - 1, np.inf)
+    with np.errstate(divide='ignore'):
+        for index, axis in enumerate(_AXIS_KEYS):
+            change = np.abs(direction[index, 1:] - direction[index, :-1])
+            np.minimum(jerk_limit, np.where(change > 0, limits.max_jerk[axis] / change, np.inf), out=jerk_limit)
+    np.minimum(junction, jerk_limit, out=junction)
+
+    # Squared entry speeds: start/end of program at the jerk speed of the move
+    start_cap = np.minimum(cruise, _limit_by_axes(components, length, limits.max_jerk))
+    entry_cap = np.empty(count + 1)
+    entry_cap[0] = start_cap[0]
+    entry_cap[1:-1] = junction
+    entry_cap[-1] = start_cap[-1]
+    entry_cap = np.where(np.isfinite(entry_cap), entry_cap, 0.0) ** 2
+
+    gain = 2.0 * acceleration * length
+    squared = _reachable_forward(entry_cap, gain)
+    squared = _reachable_forward(squared[::-1], gain[::-1])[::-1]
+    entry = np.sqrt(np.maximum(squared[:-1], 0.0))
+    exit_ = np.sqrt(np.maximum(squared[1:], 0.0))
+
+    # Trapezoid (or triangle when the cruise speed is never reached)
+    cruise = np.maximum(cruise, np.maximum(entry, exit_))
+    accel_distance = (cruise ** 2 - entry ** 2) / (2.0 * acceleration)
+    decel_distance = (cruise ** 2 - exit_ ** 2) / (2.0 * acceleration)
+    cruise_distance = length - accel_distance - decel_distance
+    peak = np.where(
+        cruise_distance >= 0,
+        cruise,
+        np.sqrt(np.maximum((2.0 * acceleration * length + entry ** 2 + exit_ ** 2) / 2.0, 0.0))
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        times = (
+            (peak - entry) / acceleration
+            + (peak - exit_) / acceleration
+            + np.where(cruise_distance > 0, cruise_distance / cruise, 0.0)
+        )
+    times = np.where(moving, times, 0.0)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(times)))
+    layer_times = [
+        float(cumulative[end] - cumulative[start]) for start, end in parsed.layer_ranges()
+    ]
+
+    extruding = parsed.e > 0
+    filament_length = float(parsed.e[extruding].sum(dtype=np.float64))
+    volume = filament_length * math.pi * (filament_diameter / 2.0) ** 2
+
+    return PrintEstimate(
+        total_time=float(cumulative[-1]),
+        layer_times=layer_times,
+        filament_length=filament_length,
+        filament_volume=volume,
+        filament_mass=filament_mass(filament_length, material, filament_diameter),
+        extrusion_distance=float(xyz_length[extruding].sum()),
+        travel_distance=float(xyz_length[~extruding].sum()),
+    )
@@ -0,0 +1,167 @@
+"""
+Throttled Progress Publisher for AI Agent 3D Print System
+
+Worker threads (e.g. G-code streaming) report progress far more often than
+clients can use it. ProgressPublisher coalesces those reports:
+
+- An update is emitted only when the layer changed or the percentage moved by
+  at least ``min_percent_delta``, and no more often than ``max_rate`` per
+  second. Suppressed reports are counted as dropped; the latest state always
+  wins because the payload is built only when an update is emitted.
+- Forced updates (state changes, completion) bypass the throttle.
+- Coroutine callbacks are handed to their event loop with
+  ``loop.call_soon_threadsafe``; plain callbacks run in the reporting thread.
+  The publisher holds the resulting tasks until they finish.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from core.logger import get_logger
+
+
+@dataclass
+class ProgressPublisherStats:
+    """Delivery counters of a ProgressPublisher."""
+    reported: int = 0
+    published: int = 0
+    dropped: int = 0
+    delivered: int = 0
+    callback_errors: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class ProgressPublisher:
+    """Coalescing, rate-limited fan-out of progress updates to callbacks."""
+
+    def __init__(self, max_rate: float = 4.0, min_percent_delta: float = 1.0):
+        """
+        Initialize the publisher.
+
+        Args:
+            max_rate: Maximum emitted updates per second (0 disables the limit)
+            min_percent_delta: Minimum percentage change that triggers an update
+        """
+        self.max_rate = max_rate
+        self.min_percent_delta = min_percent_delta
+        self.logger = get_logger(f"{__name__}.ProgressPublisher")
+        self.stats = ProgressPublisherStats()
+
+        self._lock = threading.Lock()
+        self._callbacks: List[Tuple[Callable, Optional[asyncio.AbstractEventLoop]]] = []
+        self._last_emit = 0.0
+        self._last_percent: Optional[float] = None
+        self._last_layer: Optional[int] = None
+        # The event loop only keeps weak references to tasks
+        self._tasks: Set["asyncio.Future"] = set()
+
+    @property
+    def min_interval(self) -> float:
+        return 1.0 / self.max_rate if self.max_rate > 0 else 0.0
+
+    def add_callback(self, callback: Callable, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Register a progress callback.
+
+        Args:
+            callback: Function or coroutine function taking the progress dict
+            loop: Event loop that runs coroutine callbacks (defaults to the
+                running loop of the registering thread)
+        """
+        if loop is None and asyncio.iscoroutinefunction(callback):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        with self._lock:
+            self._callbacks.append((callback, loop))
+
+    def clear_callbacks(self) -> None:
+        """Remove all callbacks and reset the throttle state."""
+        with self._lock:
+            self._callbacks = []
+            self._last_emit = 0.0
+            self._last_percent = None
+            self._last_layer = None
+
+    @property
+    def has_callbacks(self) -> bool:
+        return bool(self._callbacks)
+
+    def report(self, percent: float, layer: Optional[int],
+               build_payload: Callable[[], Dict[str, Any]], force: bool = False) -> bool:
+        """
+        Report the current progress; emit it if the throttle allows.
+
+        Args:
+            percent: Current progress percentage
+            layer: Current layer number
+            build_payload: Builds the progress dict (only called when emitting)
+            force: Emit regardless of rate and deltas
+
+        Returns:
+            True if the update was emitted
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.stats.reported += 1
+            if not self._callbacks:
+                return False
+
+            if not force:
+                layer_changed = layer != self._last_layer
+                percent_changed = (
+                    self._last_percent is None
+                    or abs(percent - self._last_percent) >= self.min_percent_delta
+                )
+                too_soon = now - self._last_emit < self.min_interval
+                if too_soon or not (layer_changed or percent_changed):
+                    self.stats.dropped += 1
+                    return False
+
+            self._last_emit = now
+            self._last_percent = percent
+            self._last_layer = layer
+            self.stats.published += 1
+            callbacks = list(self._callbacks)
+
+        payload = build_payload()
+        for callback, loop in callbacks:
+            self._deliver(callback, loop, payload)
+        return True
+
+    def _deliver(self, callback: Callable, loop: Optional[asyncio.AbstractEventLoop],
+                 payload: Dict[str, Any]) -> None:
+        try:
+            if asyncio.iscoroutinefunction(callback):
+                if loop is None or loop.is_closed():
+                    self.stats.callback_errors += 1
+                    self.logger.debug("No event loop available for async progress callback")
+                    return
+                loop.call_soon_threadsafe(self._schedule, callback, dict(payload))
+            else:
+                callback(payload)
+            self.stats.delivered += 1
+        except Exception as e:
+            self.stats.callback_errors += 1
+            self.logger.error(f"Progress callback error: {e}")
+
+    def _schedule(self, callback: Callable, payload: Dict[str, Any]) -> None:
+        """Runs on the callback's event loop."""
+        task = asyncio.ensure_future(callback(payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._log_task_error)
+
+    def _log_task_error(self, task: "asyncio.Future") -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats.callback_errors += 1
+            self.logger.error(f"Progress callback error: {task.exception()}")
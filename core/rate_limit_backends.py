@@ -0,0 +1,345 @@
+"""
+Rate Limit Storage Backends for AI 3D Print System.
+
+``AdvancedRateLimiter`` keeps one token bucket per limited key (global, user,
+IP, endpoint). A bucket is two numbers, the token count and the time it was
+last updated, so memory per key is constant and a check costs O(1)
+regardless of the request volume. Tokens are refilled lazily from the
+elapsed time whenever a bucket is read.
+
+A bucket that has not been touched for as long as it takes to refill
+completely is indistinguishable from a missing one, so every backend drops
+buckets idle for ``idle_timeout`` seconds without changing any decision:
+
+- MemoryRateLimitBackend: per-process dictionary in least-recently-used
+  order; idle buckets are popped from its front.
+- SQLiteRateLimitBackend: one row per bucket in a WAL database that any
+  number of worker processes can open, so they enforce one shared limit.
+- RedisRateLimitBackend: one hash per bucket, updated in a WATCH/MULTI
+  transaction and expired by Redis itself. Works with ``redis.asyncio``
+  clients and API-compatible stubs such as ``fakeredis``.
+
+All backends take every bucket of a request in one atomic step: the request
+consumes a token from each bucket only if all of them have one left.
+"""
+
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import WatchError
+    REDIS_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    redis_asyncio = None
+    WatchError = None
+    REDIS_AVAILABLE = False
+
+try:
+    from .exceptions import ConfigurationError
+except ImportError:  # pragma: no cover - legacy fallback paths
+    from core.exceptions import ConfigurationError  # type: ignore
+
+# (key, capacity, refill rate in tokens per second)
+BucketSpec = Tuple[str, float, float]
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    """Token count of a bucket at ``now``; clock steps backwards add nothing."""
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+def _decide(levels: List[float]) -> Tuple[bool, List[float]]:
+    """Consume one token from every bucket if all of them have one."""
+    if all(tokens >= 1.0 for tokens in levels):
+        return True, [tokens - 1.0 for tokens in levels]
+    return False, levels
+
+
+class RateLimitBackend(ABC):
+    """Abstract base class for token bucket storage."""
+
+    idle_timeout: Optional[float] = None
+
+    @abstractmethod
+    async def acquire(self, buckets: Sequence[BucketSpec], now: float) -> Tuple[bool, List[float]]:
+        """
+        Take one token from each bucket, or none if any bucket is empty.
+
+        Args:
+            buckets: Buckets of the request; unknown keys start full
+            now: Current time in seconds
+
+        Returns:
+            (allowed, tokens left in each bucket after the decision)
+        """
+        pass
+
+    @abstractmethod
+    async def size(self) -> int:
+        """Number of buckets currently stored."""
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+        return {'backend': self.__class__.__name__, 'idle_timeout': self.idle_timeout}
+
+    def close(self) -> None:
+        """Release backend resources."""
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Buckets of a single process, evicted in least-recently-used order."""
+
+    def __init__(self, idle_timeout: Optional[float] = None):
+        """
+        Initialize in-memory backend.
+
+        Args:
+            idle_timeout: Seconds after which an untouched bucket is dropped
+                (default: set by the limiter to its longest refill time)
+        """
+        self.idle_timeout = idle_timeout
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.evicted = 0
+
+    async def acquire(self, buckets: Sequence[BucketSpec], now: float) -> Tuple[bool, List[float]]:
+        stored = self._buckets
+        levels = []
+        for key, capacity, rate in buckets:
+            state = stored.get(key)
+            levels.append(capacity if state is None else _refill(state[0], state[1], now, capacity, rate))
+
+        allowed, levels = _decide(levels)
+        for (key, _, _), tokens in zip(buckets, levels):
+            stored[key] = (tokens, now)
+            stored.move_to_end(key)
+        self._evict(now)
+        return allowed, levels
+
+    def _evict(self, now: float) -> None:
+        if self.idle_timeout is None:
+            return
+        stored = self._buckets
+        horizon = now - self.idle_timeout
+        while stored:
+            key, (_, updated) = next(iter(stored.items()))
+            if updated > horizon:
+                break
+            del stored[key]
+            self.evicted += 1
+
+    async def size(self) -> int:
+        return len(self._buckets)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({'buckets': len(self._buckets), 'evicted': self.evicted})
+        return stats
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared by all processes that open the same SQLite database.
+
+    A request's buckets are read and written in one ``BEGIN IMMEDIATE``
+    transaction, so concurrent workers never both spend the last token.
+    Transactions run in a worker thread: waiting for another process's
+    write lock (up to ``busy_timeout``) must not stall the event loop.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated
+            ON rate_limit_buckets (updated);
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/rate_limits.db",
+        idle_timeout: Optional[float] = None,
+        sweep_interval: float = 60.0,
+        busy_timeout: float = 5.0
+    ):
+        """
+        Initialize SQLite backend.
+
+        Args:
+            db_path: Database file shared by the workers
+            idle_timeout: Seconds after which an untouched bucket is dropped
+                (default: set by the limiter to its longest refill time)
+            sweep_interval: Seconds between deletions of idle buckets
+            busy_timeout: Seconds to wait for the write lock of another worker
+        """
+        self.db_path = str(db_path)
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._last_sweep = float('-inf')
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path,
+            timeout=busy_timeout,
+            isolation_level=None,  # explicit BEGIN/COMMIT
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+    async def acquire(self, buckets: Sequence[BucketSpec], now: float) -> Tuple[bool, List[float]]:
+        return await asyncio.to_thread(self._acquire, buckets, now)
+
+    def _acquire(self, buckets: Sequence[BucketSpec], now: float) -> Tuple[bool, List[float]]:
+        keys = [key for key, _, _ in buckets]
+        with self._db_lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = dict((key, (tokens, updated)) for key, tokens, updated in conn.execute(
+                    f"SELECT key, tokens, updated FROM rate_limit_buckets "
+                    f"WHERE key IN ({','.join('?' * len(keys))})", keys))
+                levels = []
+                for key, capacity, rate in buckets:
+                    state = rows.get(key)
+                    levels.append(capacity if state is None else _refill(state[0], state[1], now, capacity, rate))
+                allowed, levels = _decide(levels)
+                conn.executemany(
+                    "INSERT INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    [(key, tokens, now) for key, tokens in zip(keys, levels)])
+                if self.idle_timeout is not None and now - self._last_sweep >= self.sweep_interval:
+                    conn.execute("DELETE FROM rate_limit_buckets WHERE updated <= ?", (now - self.idle_timeout,))
+                    self._last_sweep = now
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, levels
+
+    async def size(self) -> int:
+        return await asyncio.to_thread(self._size)
+
+    def _size(self) -> int:
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats['db_path'] = self.db_path
+        return stats
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._conn.close()
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared through Redis.
+
+    Each bucket is a hash ``<prefix>:<key>`` with ``tokens`` and ``updated``
+    fields. A request's buckets are watched, read and written in one
+    MULTI/EXEC transaction that is retried if another worker changed one of
+    them in between. Every write sets the key to expire after
+    ``idle_timeout``, so Redis drops idle buckets on its own.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "ratelimit",
+        idle_timeout: Optional[float] = None
+    ):
+        """
+        Initialize Redis backend.
+
+        Args:
+            client: ``redis.asyncio``-compatible client (e.g. fakeredis) to use
+            url: Redis URL, used when no client is given
+            prefix: Key prefix of the buckets
+            idle_timeout: Seconds after which an untouched bucket expires
+                (default: set by the limiter to its longest refill time)
+
+        Raises:
+            ConfigurationError: No client is given and redis is not installed
+        """
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise ConfigurationError(
+                    "redis package is required for the Redis rate limit backend",
+                    error_code="REDIS_NOT_AVAILABLE"
+                )
+            client = redis_asyncio.from_url(url, decode_responses=True)
+
+        self.client = client
+        self.prefix = prefix
+        self.idle_timeout = idle_timeout
+        self.conflicts = 0
+
+    async def acquire(self, buckets: Sequence[BucketSpec], now: float) -> Tuple[bool, List[float]]:
+        names = [f"{self.prefix}:{key}" for key, _, _ in buckets]
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(*names)
+                    levels = []
+                    for name, (_, capacity, rate) in zip(names, buckets):
+                        tokens, updated = await pipe.hmget(name, "tokens", "updated")
+                        levels.append(capacity if tokens is None else
+                                      _refill(float(tokens), float(updated), now, capacity, rate))
+                    allowed, levels = _decide(levels)
+                    pipe.multi()
+                    for name, tokens in zip(names, levels):
+                        pipe.hset(name, mapping={"tokens": tokens, "updated": now})
+                        if self.idle_timeout is not None:
+                            pipe.pexpire(name, max(1, int(self.idle_timeout * 1000)))
+                    await pipe.execute()
+                    return allowed, levels
+                except WatchError:
+                    self.conflicts += 1
+                    continue
+
+    async def size(self) -> int:
+        count = 0
+        async for _ in self.client.scan_iter(match=f"{self.prefix}:*"):
+            count += 1
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({'prefix': self.prefix, 'conflicts': self.conflicts})
+        return stats
+
+
+def create_rate_limit_backend(backend_type: str = "memory", **kwargs) -> RateLimitBackend:
+    """
+    Factory function to create rate limit backends.
+
+    Args:
+        backend_type: Type of backend ("memory", "sqlite", "redis")
+        **kwargs: Backend-specific parameters (e.g. ``db_path``,
+            ``url``/``client``, ``idle_timeout``)
+
+    Returns:
+        RateLimitBackend instance
+    """
+    if backend_type == "memory":
+        return MemoryRateLimitBackend(**kwargs)
+    if backend_type == "sqlite":
+        return SQLiteRateLimitBackend(**kwargs)
+    if backend_type == "redis":
+        return RedisRateLimitBackend(**kwargs)
+    raise ValueError(f"Unknown rate limit backend: {backend_type}")
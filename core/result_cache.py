@@ -0,0 +1,543 @@
+"""
+Two-Tier Result Cache for AI Agent 3D Print System
+
+Image-to-3D conversions are deterministic for a given image and parameter
+set, yet every request recomputed them (or kept them in an unbounded dict
+per agent instance). ResultCache is shared by the image processing
+consumers and keeps results in two tiers:
+
+- memory: an LRU of encoded results bounded by their byte size
+- disk: one compressed ``.npz`` file per entry; an in-memory index of
+  their sizes in recency order (built from one directory scan on first
+  use) bounds the tier without rescanning the directory on every store
+
+Both tiers hold the encoded form: mesh data (vertex, face and normal lists,
+depth maps) as typed arrays and the remaining structure as a JSON skeleton,
+so a mesh costs a fraction of its JSON size and loads without parsing
+millions of floats. Every lookup decodes a fresh result, so callers may
+modify what they get without affecting the cached entry, and both tiers
+return the same types (tuples stay tuples).
+
+Entries expire after a TTL on both tiers. Keys are content addresses built
+with make_result_key (SHA-256 of the image bytes and the canonical
+parameters), so equal uploads share one entry whatever their file name.
+warm_from_directory precomputes results for the images in data/uploads.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from core.logger import get_logger
+
+DEFAULT_CACHE_DIR = "./cache/result_cache"
+DEFAULT_MAX_MEMORY_BYTES = 256 * 1024 * 1024  # 256 MiB
+DEFAULT_MAX_DISK_BYTES = 2 * 1024 * 1024 * 1024  # 2 GiB
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_WARM_DIRECTORY = "data/uploads"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp')
+
+# Numeric lists shorter than this stay in the JSON skeleton
+_MIN_ARRAY_LENGTH = 16
+_SKELETON = "__skeleton__"
+_CREATED = "__created__"
+
+# Shared caches keyed by resolved directory (see get_result_cache)
+_CACHES: Dict[str, "ResultCache"] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def make_result_key(namespace: str, data: bytes, params: Dict[str, Any]) -> str:
+    """
+    Content address of a processing result.
+
+    Args:
+        namespace: Producer of the result (results of different consumers
+            never collide)
+        data: Input bytes, usually the uploaded image
+        params: Parameters that influence the result
+
+    Returns:
+        Hex key
+    """
+    canonical_params = json.dumps(params, sort_keys=True, default=str, separators=(',', ':'))
+    hasher = hashlib.sha256()
+    for part in (namespace.encode('utf-8'), hashlib.sha256(data).digest(),
+                 canonical_params.encode('utf-8')):
+        hasher.update(part)
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+def _numeric_array(value: Union[list, tuple]) -> Optional[np.ndarray]:
+    """Array form of a long, rectangular numeric list (None otherwise)."""
+    if len(value) < _MIN_ARRAY_LENGTH:
+        return None
+    first = value[0]
+    while isinstance(first, (list, tuple)) and first:
+        first = first[0]
+    if isinstance(first, (bool, str, bytes)) or not isinstance(first, (int, float, np.number)):
+        return None
+    try:
+        array = np.asarray(value)
+    except ValueError:  # ragged
+        return None
+    if array.dtype.kind not in 'iuf':
+        return None
+    return array
+
+
+def _nesting(value: Union[list, tuple], ndim: int) -> Optional[str]:
+    """Container type per nesting level ('l' list, 't' tuple), None if mixed."""
+    codes = []
+    level = [value]
+    for depth in range(ndim):
+        kinds = {type(item) for item in level}
+        if kinds == {list}:
+            codes.append('l')
+        elif kinds == {tuple}:
+            codes.append('t')
+        else:
+            return None
+        if depth < ndim - 1:
+            level = [child for item in level for child in item]
+    return ''.join(codes)
+
+
+def _restore_nesting(value: list, nesting: str) -> Union[list, tuple]:
+    """Turn the levels of ``array.tolist()`` marked 't' back into tuples."""
+    if len(nesting) > 1:
+        value = [_restore_nesting(item, nesting[1:]) for item in value]
+    return tuple(value) if nesting[0] == 't' else value
+
+
+def _encode(value: Any, arrays: Dict[str, np.ndarray]) -> Any:
+    """JSON skeleton of a result; large numeric data moves to ``arrays``."""
+    if isinstance(value, np.ndarray):
+        name = f"a{len(arrays)}"
+        arrays[name] = value.copy()
+        return {'__ndarray__': name}
+    if isinstance(value, dict):
+        return {str(key): _encode(item, arrays) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        array = _numeric_array(value)
+        nesting = _nesting(value, array.ndim) if array is not None else None
+        if nesting is not None:
+            name = f"a{len(arrays)}"
+            arrays[name] = array
+            if 't' in nesting:
+                return {'__list__': name, '__nesting__': nesting}
+            return {'__list__': name}
+        items = [_encode(item, arrays) for item in value]
+        return {'__tuple__': items} if isinstance(value, tuple) else items
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode(value: Any, arrays: Dict[str, np.ndarray]) -> Any:
+    if isinstance(value, dict):
+        if '__list__' in value and len(value) == 2 and '__nesting__' in value:
+            return _restore_nesting(arrays[value['__list__']].tolist(), value['__nesting__'])
+        if len(value) == 1:
+            if '__ndarray__' in value:
+                return arrays[value['__ndarray__']].copy()
+            if '__list__' in value:
+                return arrays[value['__list__']].tolist()
+            if '__tuple__' in value:
+                return tuple(_decode(item, arrays) for item in value['__tuple__'])
+        return {key: _decode(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item, arrays) for item in value]
+    return value
+
+
+def encode_result(value: Any) -> Tuple[str, Dict[str, np.ndarray]]:
+    """
+    Split a result into a JSON skeleton and its numeric arrays.
+
+    Args:
+        value: Result made of dicts, lists, tuples, scalars and arrays
+
+    Returns:
+        (skeleton JSON, arrays by name)
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    skeleton = json.dumps(_encode(value, arrays), default=str)
+    return skeleton, arrays
+
+
+def decode_result(skeleton: str, arrays: Dict[str, np.ndarray]) -> Any:
+    """Inverse of encode_result."""
+    return _decode(json.loads(skeleton), arrays)
+
+
+class ResultCache:
+    """Byte-bounded in-memory LRU backed by ``.npz`` files on disk."""
+
+    def __init__(self, cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+                 compress: bool = True):
+        """
+        Initialize the cache (the directory is created on first store).
+
+        Args:
+            cache_dir: Directory of the disk tier (None keeps results in memory only)
+            max_memory_bytes: Maximum estimated size of the memory tier
+            max_disk_bytes: Maximum total size of the disk tier
+            ttl_seconds: Lifetime of an entry (None for no expiry)
+            compress: Compress the ``.npz`` files
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.compress = compress
+        self.logger = get_logger(f"{__name__}.ResultCache")
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'errors': 0
+        }
+
+        # key -> ((skeleton, arrays), size in bytes, created timestamp)
+        self._memory: "OrderedDict[str, Tuple[Tuple[str, Dict[str, np.ndarray]], int, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        # key -> (file size, last use) of the disk tier, least recently used
+        # first; loaded on first use and guarded by _disk_lock
+        self._disk_index: "Optional[OrderedDict[str, Tuple[int, float]]]" = None
+        self._disk_bytes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a result, memory tier first.
+
+        Each call returns a newly decoded result that the caller owns.
+
+        Args:
+            key: Key from make_result_key
+
+        Returns:
+            The cached result or None on a miss
+        """
+        now = time.time()
+        expired = False
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                encoded, size, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return decode_result(*encoded)
+                self._drop_memory(key)
+                self.stats['expirations'] += 1
+                expired = True
+
+        loaded = self._load(key, now, count_expired=not expired)
+        if loaded is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        encoded, size, created = loaded
+        with self._lock:
+            self.stats['disk_hits'] += 1
+            self._remember(key, encoded, size, created)
+        return decode_result(*encoded)
+
+    def put(self, key: str, value: Any) -> bool:
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: Key from make_result_key
+            value: Result made of dicts, lists, tuples, scalars and arrays
+
+        Returns:
+            True if the result was stored
+        """
+        try:
+            skeleton, arrays = encode_result(value)
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            self.logger.warning(f"Result cache could not encode entry: {e}")
+            return False
+
+        size = len(skeleton) + sum(array.nbytes for array in arrays.values())
+        created = time.time()
+        with self._lock:
+            self._remember(key, (skeleton, arrays), size, created)
+            self.stats['stores'] += 1
+
+        if self.cache_dir is not None:
+            self._save(key, skeleton, arrays, created)
+        return True
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get() without blocking the event loop on disk reads and decoding."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def put_async(self, key: str, value: Any) -> bool:
+        """put() without blocking the event loop on encoding and disk writes."""
+        return await asyncio.to_thread(self.put, key, value)
+
+    def _remember(self, key: str, encoded: Tuple[str, Dict[str, np.ndarray]],
+                  size: int, created: float) -> None:
+        """Insert into the memory tier (caller holds the lock)."""
+        if key in self._memory:
+            self._drop_memory(key)
+        if size > self.max_memory_bytes:
+            return
+        self._memory[key] = (encoded, size, created)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            oldest = next(iter(self._memory))
+            self._drop_memory(oldest)
+            self.stats['evictions'] += 1
+
+    def _drop_memory(self, key: str) -> None:
+        _, size, _ = self._memory.pop(key)
+        self._memory_bytes -= size
+
+    def _load(self, key: str, now: float,
+              count_expired: bool = True) -> Optional[Tuple[Tuple[str, Dict[str, np.ndarray]], int, float]]:
+        """Read an encoded entry from the disk tier."""
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                created = float(data[_CREATED])
+                if self._expired(created, now):
+                    path.unlink(missing_ok=True)
+                    with self._disk_lock:
+                        self._track_disk(key, None, now)
+                    if count_expired:
+                        with self._lock:
+                            self.stats['expirations'] += 1
+                    return None
+                skeleton = str(data[_SKELETON])
+                arrays = {name: data[name] for name in data.files
+                          if name not in (_SKELETON, _CREATED)}
+            os.utime(path)  # recency for the index of a later process
+            with self._disk_lock:
+                index = self._disk_entries()
+                if key in index:
+                    index[key] = (index[key][0], now)
+                    index.move_to_end(key)
+                else:
+                    self._track_disk(key, path.stat().st_size, now)
+            size = len(skeleton) + sum(array.nbytes for array in arrays.values())
+            return (skeleton, arrays), size, created
+
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            self.logger.warning(f"Result cache entry {key[:12]} unreadable, removing: {e}")
+            path.unlink(missing_ok=True)
+            with self._disk_lock:
+                self._track_disk(key, None, now)
+            return None
+
+    def _save(self, key: str, skeleton: str, arrays: Dict[str, np.ndarray], created: float) -> None:
+        """Write an entry to the disk tier and enforce its size limit."""
+        try:
+            buffer = io.BytesIO()
+            writer = np.savez_compressed if self.compress else np.savez
+            writer(buffer, **{_SKELETON: np.array(skeleton), _CREATED: np.array(created)}, **arrays)
+            if buffer.tell() > self.max_disk_bytes:
+                return
+
+            with self._disk_lock:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                target = self._path(key)
+                # Write under a temporary name so readers never see a partial file
+                partial = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.partial")
+                partial.write_bytes(buffer.getvalue())
+                os.replace(partial, target)
+                self._track_disk(key, buffer.tell(), time.time())
+                self._evict_disk()
+
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            self.logger.warning(f"Result cache store failed: {e}")
+
+    def _disk_entries(self) -> "OrderedDict[str, Tuple[int, float]]":
+        """The disk tier index, scanned from the directory on first use (caller holds _disk_lock)."""
+        if self._disk_index is None:
+            entries = []
+            if self.cache_dir.exists():
+                for path in self.cache_dir.glob("*.npz"):
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, path.stem, stat.st_size))
+            self._disk_index = OrderedDict(
+                (key, (size, used)) for used, key, size in sorted(entries)
+            )
+            self._disk_bytes = sum(size for _, _, size in entries)
+        return self._disk_index
+
+    def _track_disk(self, key: str, size: Optional[int], used: float) -> None:
+        """Record a stored (size) or removed (None) file in the index (caller holds _disk_lock)."""
+        index = self._disk_entries()
+        previous = index.pop(key, None)
+        if previous is not None:
+            self._disk_bytes -= previous[0]
+        if size is not None:
+            index[key] = (size, used)
+            self._disk_bytes += size
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used files until the size limit holds (caller holds _disk_lock)."""
+        now = time.time()
+        index = self._disk_entries()
+        while self._disk_bytes > self.max_disk_bytes and index:
+            key, (size, used) = index.popitem(last=False)
+            self._disk_bytes -= size
+            self._path(key).unlink(missing_ok=True)
+            with self._lock:
+                if self.ttl_seconds is not None and now - used > self.ttl_seconds:
+                    self.stats['expirations'] += 1
+                else:
+                    self.stats['evictions'] += 1
+
+    def invalidate(self, key: str) -> None:
+        """Remove one entry from both tiers."""
+        with self._lock:
+            if key in self._memory:
+                self._drop_memory(key)
+        if self.cache_dir is not None:
+            with self._disk_lock:
+                self._path(key).unlink(missing_ok=True)
+                self._track_disk(key, None, time.time())
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.cache_dir is not None and self.cache_dir.exists():
+            with self._disk_lock:
+                for path in self.cache_dir.glob("*.npz"):
+                    path.unlink(missing_ok=True)
+                self._disk_index = OrderedDict()
+                self._disk_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics (counters are per process)."""
+        disk_entries, disk_bytes = 0, 0
+        if self.cache_dir is not None:
+            with self._disk_lock:
+                disk_entries, disk_bytes = len(self._disk_entries()), self._disk_bytes
+
+        with self._lock:
+            hits = self.stats['memory_hits'] + self.stats['disk_hits']
+            lookups = hits + self.stats['misses']
+            return {
+                'hit_rate': hits / lookups if lookups > 0 else 0,
+                'memory_hit_rate': self.stats['memory_hits'] / lookups if lookups > 0 else 0,
+                **self.stats,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'max_memory_bytes': self.max_memory_bytes,
+                'disk_entries': disk_entries,
+                'disk_bytes': disk_bytes,
+                'max_disk_bytes': self.max_disk_bytes,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+def iter_images(directory: Union[str, Path] = DEFAULT_WARM_DIRECTORY,
+                extensions: Iterable[str] = IMAGE_EXTENSIONS) -> Iterable[Path]:
+    """Image files below a directory, in a stable order."""
+    root = Path(directory)
+    if not root.is_dir():
+        return []
+    suffixes = {extension.lower() for extension in extensions}
+    return sorted(path for path in root.rglob("*")
+                  if path.is_file() and path.suffix.lower() in suffixes)
+
+
+async def warm_from_directory(process: Callable[[bytes, str], Awaitable[Any]],
+                              directory: Union[str, Path] = DEFAULT_WARM_DIRECTORY,
+                              limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Precompute cached results for the images in a directory.
+
+    The consumer's ``process`` coroutine does the lookup and store itself,
+    so images that are already cached cost one lookup.
+
+    Args:
+        process: Coroutine taking (image bytes, file name)
+        directory: Directory searched recursively for images
+        limit: Maximum number of images to process
+
+    Returns:
+        Counts of processed and failed images
+    """
+    logger = get_logger(f"{__name__}.warm_from_directory")
+    summary = {'images': 0, 'failed': 0}
+    for path in iter_images(directory):
+        if limit is not None and summary['images'] >= limit:
+            break
+        summary['images'] += 1
+        try:
+            image_data = await asyncio.to_thread(path.read_bytes)
+            await process(image_data, path.name)
+        except Exception as e:
+            summary['failed'] += 1
+            logger.warning(f"Cache warming failed for {path}: {e}")
+    logger.info(f"Cache warming done: {summary['images']} images, {summary['failed']} failed")
+    return summary
+
+
+def get_result_cache(cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                     max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                     max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+                     ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS) -> ResultCache:
+    """
+    Get the process-wide cache for a directory.
+
+    All consumers share one instance (and its counters); the limits of the
+    first call win.
+    """
+    resolved = os.path.realpath(cache_dir)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(resolved)
+        if cache is None:
+            cache = ResultCache(cache_dir, max_memory_bytes, max_disk_bytes, ttl_seconds)
+            _CACHES[resolved] = cache
+        return cache
@@ -16,10 +16,13 @@ import asyncio
 import hashlib
 import json
 import logging
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterable, List, Any, Optional, Pattern, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
+from collections import OrderedDict
+from pathlib import Path
+import yaml
 import pyotp
 import qrcode
 from io import BytesIO
@@ -27,9 +30,12 @@ import base64
 
 from core.exceptions import SecurityViolationError, RateLimitExceededError
 from core.logger import get_logger
+from core.rate_limit_backends import MemoryRateLimitBackend, RateLimitBackend, create_rate_limit_backend
 
 logger = get_logger(__name__)
 
+SECURITY_CONFIG_PATH = Path(__file__).parent.parent / "config" / "security_performance.yaml"
+
 class ThreatLevel(Enum):
     """Security threat level classification"""
     LOW = "low"
@@ -50,71 +56,207 @@ class SecurityEvent:
     blocked: bool = False
     details: Dict[str, Any] = field(default_factory=dict)
 
+@dataclass(frozen=True)
+class ThreatPattern:
+    """A compiled threat pattern and the threat categories it counts for"""
+    regex: Pattern[str]
+    categories: Tuple[str, ...]
+    triggers: Optional[Tuple[Tuple[str, ...], ...]] = None
+
+def _literal_trie(literals: Iterable[str]) -> str:
+    """Regex source matching the longest of ``literals`` at a position, as nested alternations"""
+    root: Dict[str, dict] = {}
+    for literal in literals:
+        node = root
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+    
+    return build(root)
+
+class ThreatScanner:
+    """
+    Detects many threat patterns with a single pass over the input.
+    
+    Every pattern lists trigger literals its matches cannot do without. One
+    trie automaton over the lower-cased input finds all trigger literals
+    that occur, and only the patterns whose triggers are present are
+    confirmed with their own compiled regex. Benign input therefore costs
+    one linear pass however many patterns there are. A pattern shared by
+    several categories is compiled and confirmed once.
+    
+    Non-ASCII input skips the prefilter, because lower-casing can change
+    its length and differs from case-insensitive matching, and confirms
+    every pattern.
+    """
+    
+    def __init__(self, patterns: Iterable[Tuple[str, str, int, Optional[Sequence[Sequence[str]]]]]):
+        """
+        Compile threat patterns
+        
+        Args:
+            patterns: (category, regex, flags, triggers) in declaration order.
+                triggers lists alternative groups of lower-case literals; the
+                regex can only match if all literals of one group occur.
+                None confirms the regex on every input.
+        """
+        self.patterns: List[ThreatPattern] = []
+        index: Dict[Tuple[str, int], int] = {}
+        for category, regex, flags, triggers in patterns:
+            # Flags do not matter for patterns without letters, e.g. r"\.\./"
+            key = (regex, flags if re.search(r"[a-z]", re.sub(r"\\.", "", regex), re.IGNORECASE) else 0)
+            if key in index:
+                pattern = self.patterns[index[key]]
+                if category not in pattern.categories:
+                    self.patterns[index[key]] = ThreatPattern(
+                        pattern.regex, pattern.categories + (category,), pattern.triggers)
+                continue
+            index[key] = len(self.patterns)
+            self.patterns.append(ThreatPattern(
+                re.compile(regex, flags), (category,),
+                None if triggers is None else tuple(tuple(group) for group in triggers)))
+        
+        literals = {literal for pattern in self.patterns if pattern.triggers
+                    for group in pattern.triggers for literal in group}
+        # The automaton reports the longest literal starting at a position;
+        # the literals that are its prefixes start there as well
+        self._prefixes = {literal: {other for other in literals if literal.startswith(other)}
+                          for literal in literals}
+        self._literal_scan = re.compile(f"(?=({_literal_trie(literals)}))") if literals else None
+    
+    def matching(self, data: str) -> List[ThreatPattern]:
+        """
+        Patterns that match somewhere in the input
+        
+        Args:
+            data: Input string to scan
+            
+        Returns:
+            Matching patterns in declaration order
+        """
+        candidates = self.patterns
+        if data.isascii():
+            present = set()
+            if self._literal_scan is not None:
+                for literal in set(self._literal_scan.findall(data.lower())):
+                    present |= self._prefixes[literal]
+            candidates = [pattern for pattern in candidates if pattern.triggers is None
+                          or any(present.issuperset(group) for group in pattern.triggers)]
+        return [pattern for pattern in candidates if pattern.regex.search(data)]
+    
+    def remove(self, data: str, matched: Optional[List[ThreatPattern]] = None) -> str:
+        """
+        Remove every pattern match from the input
+        
+        Removing a match can join the text around it into a new match, so
+        the result is scanned again until it is clean.
+        
+        Args:
+            data: Input string to clean
+            matched: Result of ``matching(data)`` if already known
+            
+        Returns:
+            The input without pattern matches
+        """
+        matched = self.matching(data) if matched is None else matched
+        while matched:
+            cleaned = data
+            for pattern in matched:
+                cleaned = pattern.regex.sub("", cleaned)
+            if cleaned == data:
+                break
+            data = cleaned
+            matched = self.matching(data)
+        return data
+
 class InputSanitizer:
     """Advanced input sanitization and validation"""
     
     def __init__(self):
         """Initialize input sanitizer with threat patterns"""
-        self.sql_injection_patterns = [
-            r"('|(\\'))|(\;)|(\-\-)|(\s+(or|and)\s+.*(=|like))",
-            r"(union\s+select|union\s+all\s+select)",
-            r"(drop\s+table|truncate\s+table|delete\s+from)",
-            r"(exec(\s|\+)+(s|x)p\w+)",
-            r"(insert\s+into|update\s+.+\s+set)",
-            r"(create\s+(table|database|index|view))",
-            r"(alter\s+(table|database|index|view))",
-            r"(grant\s+|revoke\s+)",
-            r"(information_schema|sysobjects|syscolumns)"
-        ]
-        
-        self.xss_patterns = [
-            r"<script[^>]*>.*?</script>",
-            r"<iframe[^>]*>.*?</iframe>",
-            r"<object[^>]*>.*?</object>",
-            r"<embed[^>]*>.*?</embed>",
-            r"<link[^>]*>",
-            r"<meta[^>]*>",
-            r"javascript:",
-            r"vbscript:",
-            r"data:text/html",
-            r"on\w+\s*=",
-            r"<\s*\w+[^>]*on\w+[^>]*>",
-            r"expression\s*\(",
-            r"url\s*\(",
-            r"@import"
-        ]
+        # (regex, triggers) per category: the regex can only match if every
+        # lower-case literal of one trigger group occurs in the input
+        self.threat_patterns = {
+            'sql_injection': [
+                (r"('|(\\'))|(\;)|(\-\-)|(\s+(or|and)\s+.*(=|like))",
+                 [("'",), (";",), ("--",), ("or", "="), ("or", "like"), ("and", "="), ("and", "like")]),
+                (r"(union\s+select|union\s+all\s+select)", [("union", "select")]),
+                (r"(drop\s+table|truncate\s+table|delete\s+from)",
+                 [("drop", "table"), ("truncate", "table"), ("delete", "from")]),
+                (r"(exec(\s|\+)+(s|x)p\w+)", [("exec",)]),
+                (r"(insert\s+into|update\s+.+\s+set)", [("insert", "into"), ("update", "set")]),
+                (r"(create\s+(table|database|index|view))", [("create",)]),
+                (r"(alter\s+(table|database|index|view))", [("alter",)]),
+                (r"(grant\s+|revoke\s+)", [("grant",), ("revoke",)]),
+                (r"(information_schema|sysobjects|syscolumns)",
+                 [("information_schema",), ("sysobjects",), ("syscolumns",)]),
+            ],
+            'xss': [
+                (r"<script[^>]*>.*?</script>", [("<script", "</script>")]),
+                (r"<iframe[^>]*>.*?</iframe>", [("<iframe", "</iframe>")]),
+                (r"<object[^>]*>.*?</object>", [("<object", "</object>")]),
+                (r"<embed[^>]*>.*?</embed>", [("<embed", "</embed>")]),
+                (r"<link[^>]*>", [("<link", ">")]),
+                (r"<meta[^>]*>", [("<meta", ">")]),
+                (r"javascript:", [("javascript:",)]),
+                (r"vbscript:", [("vbscript:",)]),
+                (r"data:text/html", [("data:text/html",)]),
+                (r"on\w+\s*=", [("on", "=")]),
+                (r"<\s*\w+[^>]*on\w+[^>]*>", [("<", "on", ">")]),
+                (r"expression\s*\(", [("expression", "(")]),
+                (r"url\s*\(", [("url", "(")]),
+                (r"@import", [("@import",)]),
+            ],
+            'command_injection': [
+                (r"[;&|`$]", [(";",), ("&",), ("|",), ("`",), ("$",)]),
+                (r"\.\./", [("../",)]),
+                (r"system\s*\(", [("system", "(")]),
+                (r"exec\s*\(", [("exec", "(")]),
+                (r"eval\s*\(", [("eval", "(")]),
+                (r"popen\s*\(", [("popen", "(")]),
+                (r"subprocess\s*\.", [("subprocess", ".")]),
+                (r"os\.(system|popen|exec)", [("os.",)]),
+                (r"__(import|eval)__", [("__import__",), ("__eval__",)]),
+                (r"getattr\s*\(", [("getattr", "(")]),
+                (r"setattr\s*\(", [("setattr", "(")]),
+                (r"delattr\s*\(", [("delattr", "(")]),
+                (r"globals\s*\(", [("globals", "(")]),
+                (r"locals\s*\(", [("locals", "(")]),
+                (r"vars\s*\(", [("vars", "(")]),
+                (r"dir\s*\(", [("dir", "(")]),
+            ],
+            'path_traversal': [
+                (r"\.\./", [("../",)]),
+                (r"\.\.\\", [("..\\",)]),
+                (r"%2e%2e%2f", [("%2e%2e%2f",)]),
+                (r"%2e%2e%5c", [("%2e%2e%5c",)]),
+                (r"\\.\\.\\", [("\\",)]),
+                (r"/etc/passwd", [("/etc/passwd",)]),
+                (r"/etc/shadow", [("/etc/shadow",)]),
+                (r"c:\\windows\\system32", [("c:\\windows\\system32",)]),
+                (r"..%252f", [("%252f",)]),
+                (r"..%255c", [("%255c",)]),
+            ],
+        }
+        case_sensitive = {'command_injection'}
         
-        self.command_injection_patterns = [
-            r"[;&|`$]",
-            r"\.\./",
-            r"system\s*\(",
-            r"exec\s*\(",
-            r"eval\s*\(",
-            r"popen\s*\(",
-            r"subprocess\s*\.",
-            r"os\.(system|popen|exec)",
-            r"__(import|eval)__",
-            r"getattr\s*\(",
-            r"setattr\s*\(",
-            r"delattr\s*\(",
-            r"globals\s*\(",
-            r"locals\s*\(",
-            r"vars\s*\(",
-            r"dir\s*\("
-        ]
+        self.sql_injection_patterns = [regex for regex, _ in self.threat_patterns['sql_injection']]
+        self.xss_patterns = [regex for regex, _ in self.threat_patterns['xss']]
+        self.command_injection_patterns = [regex for regex, _ in self.threat_patterns['command_injection']]
+        self.path_traversal_patterns = [regex for regex, _ in self.threat_patterns['path_traversal']]
         
-        self.path_traversal_patterns = [
-            r"\.\./",
-            r"\.\.\\",
-            r"%2e%2e%2f",
-            r"%2e%2e%5c",
-            r"\\.\\.\\",
-            r"/etc/passwd",
-            r"/etc/shadow",
-            r"c:\\windows\\system32",
-            r"..%252f",
-            r"..%255c"
-        ]
+        self.scanner = ThreatScanner(
+            (category, regex, 0 if category in case_sensitive else re.IGNORECASE, triggers)
+            for category, patterns in self.threat_patterns.items()
+            for regex, triggers in patterns
+        )
         
         self.threat_scores = {
             'sql_injection': 8,
@@ -128,6 +270,9 @@ class InputSanitizer:
         """
         Sanitize input data and detect threats
         
+        Threats are detected on the original input; every matching pattern
+        adds the score of each category it belongs to.
+        
         Args:
             data: Input string to sanitize
             strict_mode: If True, apply strict sanitization
@@ -143,41 +288,16 @@ class InputSanitizer:
         detected_threats = []
         sanitization_applied = []
         
-        # Check for SQL injection
-        for pattern in self.sql_injection_patterns:
-            if re.search(pattern, data, re.IGNORECASE):
-                detected_threats.append('sql_injection')
-                threat_score += self.threat_scores['sql_injection']
+        matched = self.scanner.matching(data)
+        for pattern in matched:
+            for category in pattern.categories:
+                detected_threats.append(category)
+                threat_score += self.threat_scores[category]
                 if strict_mode:
-                    data = re.sub(pattern, "", data, flags=re.IGNORECASE)
-                    sanitization_applied.append('sql_injection_removed')
-        
-        # Check for XSS
-        for pattern in self.xss_patterns:
-            if re.search(pattern, data, re.IGNORECASE):
-                detected_threats.append('xss')
-                threat_score += self.threat_scores['xss']
-                if strict_mode:
-                    data = re.sub(pattern, "", data, flags=re.IGNORECASE)
-                    sanitization_applied.append('xss_removed')
-        
-        # Check for command injection
-        for pattern in self.command_injection_patterns:
-            if re.search(pattern, data):
-                detected_threats.append('command_injection')
-                threat_score += self.threat_scores['command_injection']
-                if strict_mode:
-                    data = re.sub(pattern, "", data)
-                    sanitization_applied.append('command_injection_removed')
-        
-        # Check for path traversal
-        for pattern in self.path_traversal_patterns:
-            if re.search(pattern, data, re.IGNORECASE):
-                detected_threats.append('path_traversal')
-                threat_score += self.threat_scores['path_traversal']
-                if strict_mode:
-                    data = re.sub(pattern, "", data, flags=re.IGNORECASE)
-                    sanitization_applied.append('path_traversal_removed')
+                    sanitization_applied.append(f'{category}_removed')
+        
+        if strict_mode and matched:
+            data = self.scanner.remove(data, matched)
         
         # Determine threat level
         if threat_score >= 15:
@@ -199,7 +319,7 @@ class InputSanitizer:
             'original_data': original_data,
             'threat_score': threat_score,
             'threat_level': threat_level,
-            'detected_threats': list(set(detected_threats)),
+            'detected_threats': list(dict.fromkeys(detected_threats)),
             'sanitization_applied': sanitization_applied,
             'is_safe': threat_score == 0
         }
@@ -229,10 +349,22 @@ class RateLimitConfig:
 class AdvancedRateLimiter:
     """
     Advanced rate limiter with multiple layers and progressive penalties
+    
+    Every limit is a token bucket holding ``requests + burst_allowance``
+    tokens and refilling at ``requests / window`` tokens per second. The
+    buckets live in a ``RateLimitBackend``; pass a shared one (SQLite,
+    Redis) to make several worker processes enforce one limit.
     """
     
-    def __init__(self):
-        """Initialize rate limiter with default configurations"""
+    def __init__(self, backend: Optional[RateLimitBackend] = None, penalty_duration: float = 300.0):
+        """
+        Initialize rate limiter with default configurations
+        
+        Args:
+            backend: Bucket storage (default: in-memory, per process)
+            penalty_duration: Seconds without violations after which a
+                repeat violator's progressive delay is forgiven
+        """
         self.limits = {
             'global': RateLimitConfig(requests=1000, window=3600, burst_allowance=10),
             'per_user': RateLimitConfig(requests=100, window=3600, burst_allowance=5),
@@ -245,28 +377,29 @@ class AdvancedRateLimiter:
             }
         }
         
-        # In-memory storage for rate limiting (in production, use Redis)
-        self.request_history = {
-            'global': [],
-            'users': {},
-            'ips': {},
-            'endpoints': {}
-        }
+        self.backend = backend or MemoryRateLimitBackend()
+        if self.backend.idle_timeout is None:
+            # A bucket idle for its full refill time is full, i.e. as good as new
+            configs = [self.limits['global'], self.limits['per_user'], self.limits['per_ip'],
+                       *self.limits['endpoints'].values()]
+            self.backend.idle_timeout = max(capacity / rate for capacity, rate in map(self._bucket, configs))
         
-        self.violation_penalties = {}  # Track repeat violators
+        self.penalty_duration = penalty_duration
+        # Repeat violators: key -> (violations, time of the last one), oldest first
+        self.violation_penalties: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
     
     def _get_current_time(self) -> float:
         """Get current timestamp"""
         return time.time()
     
-    def _clean_old_requests(self, requests: List[float], window: int) -> List[float]:
-        """Remove requests outside the time window"""
-        current_time = self._get_current_time()
-        return [req_time for req_time in requests if current_time - req_time < window]
+    @staticmethod
+    def _bucket(config: RateLimitConfig) -> Tuple[float, float]:
+        """Token bucket capacity and refill rate (tokens per second) of a limit"""
+        return config.requests + config.burst_allowance, config.requests / config.window
     
     def _apply_progressive_penalty(self, identifier: str) -> float:
         """Apply progressive delay for repeat violators"""
-        violations = self.violation_penalties.get(identifier, 0)
+        violations, _ = self.violation_penalties.get(identifier, (0, 0.0))
         if violations == 0:
             return 0
         
@@ -274,6 +407,20 @@ class AdvancedRateLimiter:
         delay = min(2 ** (violations - 1), 60)
         return delay
     
+    def _record_violation(self, identifier: str, current_time: float):
+        """Count a violation of a repeat-violator key"""
+        violations, _ = self.violation_penalties.pop(identifier, (0, 0.0))
+        self.violation_penalties[identifier] = (violations + 1, current_time)
+    
+    def _forget_violators(self, current_time: float):
+        """Drop violators without a violation for ``penalty_duration``"""
+        horizon = current_time - self.penalty_duration
+        while self.violation_penalties:
+            key, (_, last_violation) = next(iter(self.violation_penalties.items()))
+            if last_violation > horizon:
+                break
+            del self.violation_penalties[key]
+    
     async def check_rate_limit(self, 
                              user_id: Optional[str] = None,
                              ip_address: Optional[str] = None,
@@ -290,93 +437,52 @@ class AdvancedRateLimiter:
             Dictionary with rate limit status and metadata
         """
         current_time = self._get_current_time()
-        violations = []
-        delays = []
+        self._forget_violators(current_time)
         
-        # Check global rate limit
-        self.request_history['global'] = self._clean_old_requests(
-            self.request_history['global'], 
-            self.limits['global'].window
-        )
-        
-        if len(self.request_history['global']) >= self.limits['global'].requests:
-            violations.append('global')
-        
-        # Check per-user rate limit
+        # (limit name, remaining-requests name, bucket key, config)
+        layers = [('global', 'global', 'global', self.limits['global'])]
         if user_id:
-            if user_id not in self.request_history['users']:
-                self.request_history['users'][user_id] = []
-            
-            self.request_history['users'][user_id] = self._clean_old_requests(
-                self.request_history['users'][user_id],
-                self.limits['per_user'].window
-            )
-            
-            if len(self.request_history['users'][user_id]) >= self.limits['per_user'].requests:
-                violations.append('per_user')
-                delays.append(self._apply_progressive_penalty(f"user:{user_id}"))
-        
-        # Check per-IP rate limit
+            layers.append(('per_user', 'user', f"user:{user_id}", self.limits['per_user']))
         if ip_address:
-            if ip_address not in self.request_history['ips']:
-                self.request_history['ips'][ip_address] = []
-            
-            self.request_history['ips'][ip_address] = self._clean_old_requests(
-                self.request_history['ips'][ip_address],
-                self.limits['per_ip'].window
-            )
-            
-            if len(self.request_history['ips'][ip_address]) >= self.limits['per_ip'].requests:
-                violations.append('per_ip')
-                delays.append(self._apply_progressive_penalty(f"ip:{ip_address}"))
-        
-        # Check endpoint-specific rate limit
-        if endpoint and endpoint in self.limits['endpoints']:
+            layers.append(('per_ip', 'ip', f"ip:{ip_address}", self.limits['per_ip']))
+        endpoint_limit = self.limits['endpoints'].get(endpoint) if endpoint else None
+        if endpoint_limit:
             endpoint_key = f"{endpoint}:{user_id or ip_address}"
-            if endpoint_key not in self.request_history['endpoints']:
-                self.request_history['endpoints'][endpoint_key] = []
-            
-            self.request_history['endpoints'][endpoint_key] = self._clean_old_requests(
-                self.request_history['endpoints'][endpoint_key],
-                self.limits['endpoints'][endpoint].window
-            )
-            
-            endpoint_limit = self.limits['endpoints'][endpoint]
-            if len(self.request_history['endpoints'][endpoint_key]) >= endpoint_limit.requests:
-                violations.append('endpoint')
-                if endpoint_limit.progressive_delay:
-                    delays.append(self._apply_progressive_penalty(f"endpoint:{endpoint_key}"))
+            layers.append(('endpoint', 'endpoint', f"endpoint:{endpoint_key}", endpoint_limit))
         
-        # Determine if request should be allowed
-        is_allowed = len(violations) == 0
-        max_delay = max(delays) if delays else 0
+        is_allowed, tokens = await self.backend.acquire(
+            [(key, *self._bucket(config)) for _, _, key, config in layers], current_time)
         
+        violations = []
+        delays = []
         if not is_allowed:
+            for (name, _, _, config), left in zip(layers, tokens):
+                if left >= 1:
+                    continue
+                violations.append(name)
+                if name == 'per_user':
+                    delays.append(self._apply_progressive_penalty(f"user:{user_id}"))
+                elif name == 'per_ip':
+                    delays.append(self._apply_progressive_penalty(f"ip:{ip_address}"))
+                elif name == 'endpoint' and config.progressive_delay:
+                    delays.append(self._apply_progressive_penalty(f"endpoint:{endpoint_key}"))
+            
             # Record violation for progressive penalties
             for violation_type in violations:
                 if user_id:
-                    key = f"user:{user_id}"
-                    self.violation_penalties[key] = self.violation_penalties.get(key, 0) + 1
+                    self._record_violation(f"user:{user_id}", current_time)
                 if ip_address:
-                    key = f"ip:{ip_address}"
-                    self.violation_penalties[key] = self.violation_penalties.get(key, 0) + 1
-        else:
-            # Record successful request
-            self.request_history['global'].append(current_time)
-            if user_id:
-                self.request_history['users'][user_id].append(current_time)
-            if ip_address:
-                self.request_history['ips'][ip_address].append(current_time)
-            if endpoint and endpoint in self.limits['endpoints']:
-                endpoint_key = f"{endpoint}:{user_id or ip_address}"
-                self.request_history['endpoints'][endpoint_key].append(current_time)
+                    self._record_violation(f"ip:{ip_address}", current_time)
+        
+        max_delay = max(delays) if delays else 0
         
         return {
             'allowed': is_allowed,
             'violations': violations,
             'delay_seconds': max_delay,
             'retry_after': current_time + max_delay if max_delay > 0 else None,
-            'remaining_requests': self._calculate_remaining_requests(user_id, ip_address, endpoint),
+            'remaining_requests': {remaining: max(0, int(left))
+                                   for (_, remaining, _, _), left in zip(layers, tokens)},
             'reset_time': current_time + max(
                 self.limits['global'].window,
                 self.limits['per_user'].window if user_id else 0,
@@ -384,34 +490,14 @@ class AdvancedRateLimiter:
             )
         }
     
-    def _calculate_remaining_requests(self, 
-                                    user_id: Optional[str],
-                                    ip_address: Optional[str],
-                                    endpoint: Optional[str]) -> Dict[str, int]:
-        """Calculate remaining requests for different limits"""
-        remaining = {}
-        
-        # Global remaining
-        remaining['global'] = max(0, self.limits['global'].requests - len(self.request_history['global']))
-        
-        # User remaining
-        if user_id and user_id in self.request_history['users']:
-            remaining['user'] = max(0, self.limits['per_user'].requests - len(self.request_history['users'][user_id]))
-        
-        # IP remaining
-        if ip_address and ip_address in self.request_history['ips']:
-            remaining['ip'] = max(0, self.limits['per_ip'].requests - len(self.request_history['ips'][ip_address]))
-        
-        # Endpoint remaining
-        if endpoint and endpoint in self.limits['endpoints']:
-            endpoint_key = f"{endpoint}:{user_id or ip_address}"
-            if endpoint_key in self.request_history['endpoints']:
-                remaining['endpoint'] = max(0, 
-                    self.limits['endpoints'][endpoint].requests - 
-                    len(self.request_history['endpoints'][endpoint_key])
-                )
-        
-        return remaining
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiter statistics"""
+        stats = self.backend.get_stats()
+        stats.update({
+            'active_buckets': await self.backend.size(),
+            'violators': len(self.violation_penalties)
+        })
+        return stats
 
 class SecurityAuditLogger:
     """Security event audit logger"""
@@ -569,18 +655,51 @@ class MFAManager:
         
         return False
 
+def create_rate_limiter(config_path: Optional[Union[str, Path]] = None) -> AdvancedRateLimiter:
+    """
+    Build the rate limiter configured under ``security.rate_limiting``.
+
+    ``backend`` selects the bucket storage ("memory", "sqlite", "redis") and
+    ``backend_options`` is passed to ``create_rate_limit_backend``. A
+    missing file or an unusable backend falls back to in-memory buckets.
+
+    Args:
+        config_path: YAML file (default: config/security_performance.yaml)
+
+    Returns:
+        Configured AdvancedRateLimiter
+    """
+    path = Path(config_path) if config_path else SECURITY_CONFIG_PATH
+    settings: Dict[str, Any] = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            settings = ((yaml.safe_load(f) or {}).get('security') or {}).get('rate_limiting') or {}
+    except (OSError, yaml.YAMLError) as e:
+        logger.warning(f"Could not load rate limit settings from {path}: {e}")
+
+    backend_type = settings.get('backend', 'memory')
+    try:
+        backend = create_rate_limit_backend(backend_type, **(settings.get('backend_options') or {}))
+    except Exception as e:
+        logger.warning(f"Rate limit backend '{backend_type}' unavailable, using memory: {e}")
+        backend = MemoryRateLimitBackend()
+    return AdvancedRateLimiter(backend, penalty_duration=float(settings.get('penalty_duration', 300.0)))
+
 # Global instances
 input_sanitizer = InputSanitizer()
-rate_limiter = AdvancedRateLimiter()
+rate_limiter = create_rate_limiter()
 audit_logger = SecurityAuditLogger()
 mfa_manager = MFAManager()
 
 __all__ = [
     'ThreatLevel',
     'SecurityEvent',
+    'ThreatPattern',
+    'ThreatScanner',
     'InputSanitizer',
     'RateLimitConfig',
     'AdvancedRateLimiter',
+    'create_rate_limiter',
     'SecurityAuditLogger',
     'MFAManager',
     'input_sanitizer',
@@ -0,0 +1,350 @@
+"""
+Content-Addressed Slice Cache for AI Agent 3D Print System
+
+Slicing the same model with the same settings always produces the same
+G-code, yet print farms re-slice identical jobs again and again. SliceCache
+stores slicer output on disk under a key derived from the content of the
+job:
+
+- SHA-256 of the model file bytes (memoized per path, size and mtime, so a
+  large STL is hashed once)
+- the effective slicer settings (canonical JSON)
+- the slicer engine and version
+
+Entries consist of the G-code file plus the analysis metrics of the slicing
+result. A SQLite index (WAL mode, shared by several processes) tracks sizes
+and access times; the least recently used entries are evicted once the
+total size or entry count exceeds its limit.
+
+Hits are handed out as a hard link (or copy) in the temp directory, so
+callers own the returned file and eviction never removes G-code that is
+about to be printed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from core.logger import get_logger
+
+DEFAULT_CACHE_DIR = "./cache/slice_cache"
+DEFAULT_MAX_SIZE_BYTES = 2 * 1024 * 1024 * 1024  # 2 GiB
+DEFAULT_MAX_ENTRIES = 1000
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Model digests keyed by (realpath, size, mtime_ns)
+_DIGEST_MEMO: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_DIGEST_MEMO_SIZE = 256
+_DIGEST_LOCK = threading.Lock()
+
+# Shared caches keyed by resolved directory (see get_slice_cache)
+_CACHES: Dict[str, "SliceCache"] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def file_digest(file_path: Union[str, Path]) -> str:
+    """
+    SHA-256 of a file's content, memoized while the file is unchanged.
+
+    Args:
+        file_path: File to hash
+
+    Returns:
+        Hex digest
+    """
+    path = os.path.realpath(file_path)
+    stat = os.stat(path)
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    with _DIGEST_LOCK:
+        digest = _DIGEST_MEMO.get(memo_key)
+        if digest is not None:
+            _DIGEST_MEMO.move_to_end(memo_key)
+            return digest
+
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+
+    with _DIGEST_LOCK:
+        _DIGEST_MEMO[memo_key] = digest
+        while len(_DIGEST_MEMO) > _DIGEST_MEMO_SIZE:
+            _DIGEST_MEMO.popitem(last=False)
+    return digest
+
+
+def compute_slice_key(model_path: Union[str, Path], settings: Dict[str, Any],
+                      slicer_version: str) -> str:
+    """
+    Content address of a slicing job.
+
+    Args:
+        model_path: Model file to slice
+        settings: Effective slicer settings
+        slicer_version: Slicer engine and version string
+
+    Returns:
+        Hex key identifying the job's output
+    """
+    canonical_settings = json.dumps(settings, sort_keys=True, default=str, separators=(',', ':'))
+    hasher = hashlib.sha256()
+    for part in (file_digest(model_path), canonical_settings, slicer_version):
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+class SliceCache:
+    """Size-bounded LRU cache of slicer output on disk."""
+
+    # Suffix of the cached files, the result field pointing to them and
+    # result fields that are not stored
+    FILE_SUFFIX = '.gcode'
+    FILE_FIELD = 'gcode_file_path'
+    TRANSIENT_FIELDS = ('gcode_file_path', 'gcode_content')
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS slice_entries (
+            key TEXT PRIMARY KEY,
+            size_bytes INTEGER NOT NULL,
+            created_ts REAL NOT NULL,
+            last_access_ts REAL NOT NULL,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            result TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_slice_entries_access
+            ON slice_entries (last_access_ts);
+    """
+
+    def __init__(self, cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache (the directory is created on first use).
+
+        Args:
+            cache_dir: Directory holding the G-code files and the index
+            max_size_bytes: Maximum total size of cached G-code
+            max_entries: Maximum number of cached jobs
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.max_entries = max_entries
+        self.logger = get_logger(f"{__name__}.{self.__class__.__name__}")
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'errors': 0
+        }
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.cache_dir / "index.db"),
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self._SCHEMA)
+        return self._conn
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.FILE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a slicing result.
+
+        Args:
+            key: Key from compute_slice_key
+
+        Returns:
+            The stored result with ``gcode_file_path`` pointing to a new
+            file owned by the caller, or None on a miss
+        """
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT result FROM slice_entries WHERE key = ?", (key,)
+                ).fetchone()
+                cached_file = self._entry_path(key)
+                if row is None or not cached_file.exists():
+                    if row is not None:
+                        # The G-code file was removed behind our back
+                        conn.execute("DELETE FROM slice_entries WHERE key = ?", (key,))
+                    self.stats['misses'] += 1
+                    return None
+
+                conn.execute(
+                    "UPDATE slice_entries SET last_access_ts = ?, hit_count = hit_count + 1 "
+                    "WHERE key = ?",
+                    (time.time(), key)
+                )
+                result = json.loads(row[0])
+                result[self.FILE_FIELD] = self._checkout(cached_file)
+                self.stats['hits'] += 1
+                return result
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.warning(f"Slice cache lookup failed: {e}")
+            return None
+
+    def put(self, key: str, gcode_file_path: Union[str, Path], result: Dict[str, Any]) -> bool:
+        """
+        Store a slicing result.
+
+        Args:
+            key: Key from compute_slice_key
+            gcode_file_path: Generated G-code (copied into the cache)
+            result: Slicing result metrics (must be JSON serializable;
+                ``gcode_file_path`` and ``gcode_content`` are not stored)
+
+        Returns:
+            True if the result was stored
+        """
+        try:
+            size = os.path.getsize(gcode_file_path)
+            if size > self.max_size_bytes:
+                return False
+            stored = {
+                name: value for name, value in result.items()
+                if name not in self.TRANSIENT_FIELDS
+            }
+            body = json.dumps(stored, default=str)
+
+            with self._lock:
+                conn = self._connection()
+                target = self._entry_path(key)
+                # Write under a temporary name so readers never see a partial file
+                partial = target.with_suffix(f".{os.getpid()}.partial")
+                shutil.copyfile(gcode_file_path, partial)
+                os.replace(partial, target)
+
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO slice_entries "
+                    "(key, size_bytes, created_ts, last_access_ts, hit_count, result) "
+                    "VALUES (?, ?, ?, ?, 0, ?)",
+                    (key, size, now, now, body)
+                )
+                self.stats['stores'] += 1
+                self._evict(conn)
+            return True
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.warning(f"Slice cache store failed: {e}")
+            return False
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Remove least recently used entries until both limits hold."""
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM slice_entries"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_size_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT key, size_bytes FROM slice_entries ORDER BY last_access_ts ASC"
+        ).fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_size_bytes:
+                break
+            conn.execute("DELETE FROM slice_entries WHERE key = ?", (key,))
+            try:
+                self._entry_path(key).unlink()
+            except FileNotFoundError:
+                pass
+            count -= 1
+            total -= size
+            self.stats['evictions'] += 1
+
+    def _checkout(self, cached_file: Path) -> str:
+        """Give the caller its own link to a cached file."""
+        handle, path = tempfile.mkstemp(suffix=self.FILE_SUFFIX)
+        os.close(handle)
+        os.unlink(path)
+        try:
+            os.link(cached_file, path)
+        except OSError:
+            # Different file systems or no hard link support
+            shutil.copyfile(cached_file, path)
+        return path
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            conn = self._connection()
+            for (key,) in conn.execute("SELECT key FROM slice_entries").fetchall():
+                try:
+                    self._entry_path(key).unlink()
+                except FileNotFoundError:
+                    pass
+            conn.execute("DELETE FROM slice_entries")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics (counters are per process)."""
+        entries, total_size = 0, 0
+        if self._conn is not None or (self.cache_dir / "index.db").exists():
+            with self._lock:
+                entries, total_size = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM slice_entries"
+                ).fetchone()
+
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'hit_rate': self.stats['hits'] / lookups if lookups > 0 else 0,
+            **self.stats,
+            'entries': entries,
+            'total_size': total_size,
+            'max_size': self.max_size_bytes,
+            'max_entries': self.max_entries
+        }
+
+    def close(self) -> None:
+        """Close the index database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def get_slice_cache(cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                    max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                    max_entries: int = DEFAULT_MAX_ENTRIES) -> SliceCache:
+    """
+    Get the process-wide cache for a directory.
+
+    Agents created per request share one instance (and its counters); the
+    limits of the first call win.
+    """
+    resolved = os.path.realpath(cache_dir)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(resolved)
+        if cache is None:
+            cache = SliceCache(cache_dir, max_size_bytes, max_entries)
+            _CACHES[resolved] = cache
+        return cache
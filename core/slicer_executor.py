@@ -0,0 +1,396 @@
+"""
+Async Slicer Process Pool for AI Agent 3D Print System
+
+Runs slicer command lines with ``asyncio.create_subprocess_exec`` so slicing
+never blocks the event loop of the API server:
+
+- At most ``max_concurrent`` slicer processes run at once (default: the
+  number of CPU cores); further jobs wait in a priority queue ordered by
+  ``MessagePriority`` (lower value first, FIFO within a priority).
+- The slicer's stdout and stderr are read line by line while it runs;
+  percentages in its log lines (e.g. ``[info] 40% => Generating perimeters``)
+  become progress events for the job.
+- Cancelling a job removes it from the queue or kills the running child
+  process; waiting callers get ``SlicerJobCancelledError``. A caller whose
+  task is cancelled (e.g. a disconnected HTTP client) cancels its job as
+  well.
+- Jobs that exceed their timeout are killed and fail with
+  ``SlicerExecutionError``.
+
+Futures and tasks belong to one event loop, so ``get_slicer_process_pool``
+keeps one pool per running loop.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import re
+import time
+import uuid
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+try:
+    from .exceptions import SlicerExecutionError, SlicerJobCancelledError
+    from .logger import get_logger
+    from .message_queue import MessagePriority
+except ImportError:
+    from core.exceptions import SlicerExecutionError, SlicerJobCancelledError
+    from core.logger import get_logger
+    from core.message_queue import MessagePriority
+
+_PROGRESS_RE = re.compile(r'(\d{1,3}(?:\.\d+)?)\s*%')
+
+# Lines of slicer output kept per stream
+OUTPUT_TAIL_LINES = 200
+
+
+@dataclass
+class SlicerProcessResult:
+    """Outcome of a finished slicer process."""
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+
+
+@dataclass
+class SlicerJob:
+    """A slicer command line queued in or running on the pool."""
+    job_id: str
+    command: List[str]
+    priority: MessagePriority
+    timeout: Optional[float]
+    on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None
+    state: str = 'queued'  # queued, running, completed, failed, cancelled
+    progress: float = 0.0
+    message: str = ''
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    future: Optional[asyncio.Future] = None
+    process: Optional[asyncio.subprocess.Process] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in ('completed', 'failed', 'cancelled')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job status."""
+        return {
+            'job_id': self.job_id,
+            'state': self.state,
+            'priority': self.priority.name,
+            'progress': self.progress,
+            'message': self.message,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'pid': self.process.pid if self.process else None
+        }
+
+
+class SlicerProcessPool:
+    """Bounded, prioritized pool of slicer subprocesses."""
+
+    def __init__(self, max_concurrent: Optional[int] = None, history_size: int = 100):
+        """
+        Initialize the pool.
+
+        Args:
+            max_concurrent: Maximum concurrently running slicer processes
+                (defaults to the number of CPU cores)
+            history_size: Finished jobs kept for status queries
+        """
+        self.max_concurrent = max(1, max_concurrent or os.cpu_count() or 1)
+        self.history_size = history_size
+        self.logger = get_logger(f"{__name__}.SlicerProcessPool")
+
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._running: Dict[str, SlicerJob] = {}
+        self._jobs: "OrderedDict[str, SlicerJob]" = OrderedDict()
+        self._tasks: set = set()
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'timeouts': 0,
+            'max_running': 0
+        }
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    @property
+    def queued_count(self) -> int:
+        return sum(1 for _, _, job in self._queue if job.state == 'queued')
+
+    def submit(self, command: List[str], priority: MessagePriority = MessagePriority.NORMAL,
+               timeout: Optional[float] = None,
+               on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
+               job_id: Optional[str] = None) -> SlicerJob:
+        """
+        Queue a slicer command line.
+
+        Must be called from a running event loop; ``job.future`` resolves to a
+        SlicerProcessResult.
+
+        Args:
+            command: Executable and arguments
+            priority: Scheduling priority
+            timeout: Seconds before the process is killed (None = no limit)
+            on_progress: Called with a progress event dict (may be a coroutine function)
+            job_id: Job identifier (generated if omitted)
+
+        Returns:
+            The queued job
+        """
+        job_id = job_id or str(uuid.uuid4())
+        existing = self._jobs.get(job_id)
+        if existing and not existing.done:
+            raise SlicerExecutionError(f"Slicer job {job_id} is already active")
+
+        job = SlicerJob(
+            job_id=job_id,
+            command=list(command),
+            priority=MessagePriority(priority),
+            timeout=timeout,
+            on_progress=on_progress,
+            future=asyncio.get_running_loop().create_future()
+        )
+        self._remember(job)
+        heapq.heappush(self._queue, (int(job.priority), next(self._sequence), job))
+        self.stats['submitted'] += 1
+        self._emit(job)
+        self._dispatch()
+        return job
+
+    async def run(self, command: List[str], priority: MessagePriority = MessagePriority.NORMAL,
+                  timeout: Optional[float] = None,
+                  on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                  job_id: Optional[str] = None) -> SlicerProcessResult:
+        """
+        Submit a command and wait for its result.
+
+        Cancelling the awaiting task cancels the job (killing the process).
+
+        Raises:
+            SlicerJobCancelledError: If the job is cancelled via cancel()
+            SlicerExecutionError: If the process cannot be started or times out
+        """
+        job = self.submit(command, priority, timeout, on_progress, job_id)
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            self.cancel(job.job_id)
+            raise
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            True if the job was active and is now cancelled
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+
+        if job.process is not None and job.process.returncode is None:
+            try:
+                job.process.kill()
+            except ProcessLookupError:
+                pass
+        self._finish(job, 'cancelled')
+        if not job.future.done():
+            job.future.set_exception(SlicerJobCancelledError(
+                f"Slicer job {job_id} was cancelled", job_id=job_id
+            ))
+        self.logger.info(f"Slicer job {job_id} cancelled")
+        return True
+
+    def get_job(self, job_id: str) -> Optional[SlicerJob]:
+        """Look up an active or recently finished job."""
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Status of all known jobs, most recent last."""
+        return [job.to_dict() for job in self._jobs.values()]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters and current load."""
+        return {
+            **self.stats,
+            'max_concurrent': self.max_concurrent,
+            'running': self.running_count,
+            'queued': self.queued_count
+        }
+
+    async def shutdown(self) -> None:
+        """Cancel every queued and running job."""
+        for job in list(self._jobs.values()):
+            self.cancel(job.job_id)
+        self._queue.clear()
+
+    def _remember(self, job: SlicerJob) -> None:
+        self._jobs[job.job_id] = job
+        self._jobs.move_to_end(job.job_id)
+        while len(self._jobs) > self.history_size:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.done:
+                break
+            del self._jobs[oldest_id]
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while there are free process slots."""
+        while self._queue and len(self._running) < self.max_concurrent:
+            _, _, job = heapq.heappop(self._queue)
+            if job.state != 'queued':
+                continue  # cancelled while waiting
+            self._running[job.job_id] = job
+            self.stats['max_running'] = max(self.stats['max_running'], len(self._running))
+            task = asyncio.ensure_future(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, job: SlicerJob) -> None:
+        job.state = 'running'
+        job.started_at = time.time()
+        self._emit(job)
+        stdout_tail: Deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+        stderr_tail: Deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+
+        try:
+            job.process = await asyncio.create_subprocess_exec(
+                *job.command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            if job.state == 'cancelled':
+                job.process.kill()
+                await job.process.wait()
+                return
+
+            await asyncio.wait_for(
+                asyncio.gather(
+                    self._read_stream(job, job.process.stdout, stdout_tail),
+                    self._read_stream(job, job.process.stderr, stderr_tail),
+                    job.process.wait()
+                ),
+                timeout=job.timeout
+            )
+
+            if job.state == 'cancelled':
+                return
+            self._finish(job, 'completed')
+            if not job.future.done():
+                job.future.set_result(SlicerProcessResult(
+                    returncode=job.process.returncode,
+                    stdout='\n'.join(stdout_tail),
+                    stderr='\n'.join(stderr_tail),
+                    duration=job.finished_at - job.started_at
+                ))
+
+        except asyncio.TimeoutError:
+            if job.process and job.process.returncode is None:
+                job.process.kill()
+                await job.process.wait()
+            self.stats['timeouts'] += 1
+            self._fail(job, SlicerExecutionError(
+                f"Slicer timed out after {job.timeout}s",
+                slicer_command=' '.join(job.command[:3]),
+                exit_code=-1
+            ))
+        except Exception as e:
+            if job.process and job.process.returncode is None:
+                job.process.kill()
+                await job.process.wait()
+            self._fail(job, e if isinstance(e, SlicerExecutionError) else SlicerExecutionError(
+                f"Failed to run slicer: {e}",
+                slicer_command=' '.join(job.command[:3])
+            ))
+        finally:
+            self._running.pop(job.job_id, None)
+            self._dispatch()
+
+    async def _read_stream(self, job: SlicerJob, stream: asyncio.StreamReader, tail: Deque[str]) -> None:
+        """Collect output lines and turn percentages into progress events."""
+        while True:
+            raw = await stream.readline()
+            if not raw:
+                return
+            line = raw.decode('utf-8', errors='replace').rstrip()
+            tail.append(line)
+            match = _PROGRESS_RE.search(line)
+            if match:
+                progress = min(float(match.group(1)), 100.0)
+                if progress >= job.progress:
+                    job.progress = progress
+                    job.message = line.split('=>', 1)[-1].strip()
+                    self._emit(job)
+
+    def _fail(self, job: SlicerJob, error: Exception) -> None:
+        self._finish(job, 'failed')
+        job.message = str(error)
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    def _finish(self, job: SlicerJob, state: str) -> None:
+        if job.done:
+            return
+        job.state = state
+        job.finished_at = time.time()
+        if state == 'completed':
+            job.progress = 100.0
+        self.stats[state] += 1
+        self._emit(job)
+
+    def _emit(self, job: SlicerJob) -> None:
+        """Deliver a progress event to the job's callback."""
+        if not job.on_progress:
+            return
+        try:
+            result = job.on_progress(job.to_dict())
+            if asyncio.iscoroutine(result):
+                task = asyncio.ensure_future(result)
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except Exception as e:
+            self.logger.warning(f"Slicer progress callback failed: {e}")
+
+
+_POOLS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SlicerProcessPool]" = weakref.WeakKeyDictionary()
+_DETACHED_POOL: Optional[SlicerProcessPool] = None
+_MAX_CONCURRENT: Optional[int] = None
+
+
+def get_slicer_process_pool(max_concurrent: Optional[int] = None) -> SlicerProcessPool:
+    """
+    Get the slicer pool of the running event loop.
+
+    All agents share it so the concurrency limit holds across requests; the
+    first limit given wins. Outside an event loop an idle pool is returned
+    for job lookups (submitting needs a running loop).
+    """
+    global _DETACHED_POOL, _MAX_CONCURRENT
+    if _MAX_CONCURRENT is None:
+        _MAX_CONCURRENT = max_concurrent
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if _DETACHED_POOL is None:
+            _DETACHED_POOL = SlicerProcessPool(_MAX_CONCURRENT)
+        return _DETACHED_POOL
+
+    pool = _POOLS.get(loop)
+    if pool is None:
+        pool = _POOLS[loop] = SlicerProcessPool(_MAX_CONCURRENT)
+    return pool
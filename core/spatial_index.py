@@ -0,0 +1,237 @@
+"""
+Spatial Queries on Triangle Meshes for AI Agent 3D Print System
+
+KD-tree (scipy ``cKDTree``) based queries used by the design analysis,
+replacing pairwise loops over vertices and triangles:
+
+- count_crowded_points: points with many neighbours within a radius
+  (clusters of tiny features), one tree query instead of a loop over all
+  point pairs
+- TriangleIndex.cast: first intersection of many rays with a triangle
+  soup (STL data needs no shared vertices). Rays are marched through
+  windows of doubling length; the triangles near a window are looked up
+  in a KD-tree of triangle centroids and tested with a vectorized
+  Moller-Trumbore test. Triangles much larger than the typical one are
+  kept out of the tree and tested against every ray, so a few large
+  faces do not inflate the search radius for all others.
+- TriangleIndex.wall_thickness: distance from sampled faces along their
+  inward normal to the opposite surface of the part
+"""
+
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+from numpy.typing import ArrayLike
+from scipy.spatial import cKDTree
+
+# Bound on the (ray, sample point) and (ray, triangle) pairs handled at once
+_MAX_PAIRS = 2_000_000
+
+# Sample points per ray over the full search distance; fewer, larger
+# neighbourhood queries are cheaper than many small ones
+_SAMPLES_PER_RAY = 64
+
+
+def count_crowded_points(points: ArrayLike, radius: float, min_neighbors: int) -> int:
+    """
+    Count points with more than ``min_neighbors`` other points within ``radius``.
+
+    Args:
+        points: (n, 3) positions
+        radius: Neighbourhood radius
+        min_neighbors: Neighbour count a point must exceed
+
+    Returns:
+        Number of crowded points
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if len(points) == 0:
+        return 0
+    neighbours = cKDTree(points).query_ball_point(points, radius, return_length=True) - 1
+    return int(np.count_nonzero(neighbours > min_neighbors))
+
+
+def ray_triangle_distance(origins: np.ndarray, directions: np.ndarray,
+                          triangles: np.ndarray) -> np.ndarray:
+    """
+    Moller-Trumbore intersection of rays with triangles, pair by pair.
+
+    Args:
+        origins: (n, 3) ray origins
+        directions: (n, 3) ray directions (unit length for distances)
+        triangles: (n, 3, 3) triangle corners
+
+    Returns:
+        (n,) ray parameter of the hit, ``inf`` where the ray misses
+    """
+    v0 = triangles[:, 0]
+    edge1 = triangles[:, 1] - v0
+    edge2 = triangles[:, 2] - v0
+    p = np.cross(directions, edge2)
+    det = np.einsum('ij,ij->i', edge1, p)
+    valid = np.abs(det) > 1e-12
+    inverse = np.divide(1.0, det, out=np.zeros_like(det), where=valid)
+
+    s = origins - v0
+    u = np.einsum('ij,ij->i', s, p) * inverse
+    q = np.cross(s, edge1)
+    v = np.einsum('ij,ij->i', directions, q) * inverse
+    t = np.einsum('ij,ij->i', edge2, q) * inverse
+
+    hit = valid & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0)
+    return np.where(hit, t, np.inf)
+
+
+class TriangleIndex:
+    """KD-tree over the triangles of a mesh for ray queries."""
+
+    def __init__(self, triangles: ArrayLike, normals: Optional[ArrayLike] = None,
+                 large_factor: float = 4.0):
+        """
+        Build the index.
+
+        Args:
+            triangles: (m, 3, 3) triangle corners (or a flat vertex list)
+            normals: Optional (m, 3) reference normals (e.g. from the STL
+                file); geometric normals pointing against them are flipped
+            large_factor: Triangles whose extent exceeds this multiple of
+                the median are tested against every ray instead of being
+                indexed
+        """
+        vertex_array = np.asarray(triangles, dtype=np.float64).reshape(-1, 3)
+        self.triangles = vertex_array[:len(vertex_array) // 3 * 3].reshape(-1, 3, 3)
+        self.centroids = self.triangles.mean(axis=1)
+
+        cross = np.cross(self.triangles[:, 1] - self.triangles[:, 0],
+                         self.triangles[:, 2] - self.triangles[:, 0])
+        lengths = np.linalg.norm(cross, axis=1, keepdims=True)
+        self.normals = np.divide(cross, lengths, out=np.zeros_like(cross), where=lengths > 0)
+        if normals is not None:
+            reference = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+            if len(reference) == len(self.normals):
+                flip = np.einsum('ij,ij->i', self.normals, reference) < 0
+                self.normals[flip] *= -1.0
+
+        if len(self.triangles):
+            corners = self.triangles.reshape(-1, 3)
+            self.diagonal = float(np.linalg.norm(corners.max(axis=0) - corners.min(axis=0)))
+        else:
+            self.diagonal = 0.0
+
+        # Distance from the centroid to the farthest corner
+        reach = np.linalg.norm(self.triangles - self.centroids[:, None, :], axis=2).max(axis=1) \
+            if len(self.triangles) else np.zeros(0)
+        typical = float(np.median(reach)) if len(reach) else 0.0
+        large = reach > large_factor * typical if typical > 0 else np.zeros(len(reach), dtype=bool)
+        self._large = np.flatnonzero(large)
+        self._small = np.flatnonzero(~large)
+        self.step = float(reach[self._small].max()) if len(self._small) else 0.0
+        self._tree = cKDTree(self.centroids[self._small]) if self.step > 0 else None
+
+    def __len__(self) -> int:
+        return len(self.triangles)
+
+    def _closest_hits(self, best: np.ndarray, ray_ids: np.ndarray, face_ids: np.ndarray,
+                      origins: np.ndarray, directions: np.ndarray, ignore: np.ndarray,
+                      epsilon: float, limit: float) -> None:
+        """Lower ``best`` by the hits of the given (ray, triangle) pairs up to ``limit``."""
+        for start in range(0, len(ray_ids), _MAX_PAIRS):
+            rays = ray_ids[start:start + _MAX_PAIRS]
+            faces = face_ids[start:start + _MAX_PAIRS]
+            distance = ray_triangle_distance(origins[rays], directions[rays], self.triangles[faces])
+            distance[(faces == ignore[rays]) | (distance <= epsilon) | (distance > limit)] = np.inf
+            np.minimum.at(best, rays, distance)
+
+    def cast(self, origins: ArrayLike, directions: ArrayLike,
+             max_distance: Optional[float] = None,
+             ignore: Optional[ArrayLike] = None) -> np.ndarray:
+        """
+        Distance to the first triangle hit by each ray.
+
+        Args:
+            origins: (n, 3) ray origins
+            directions: (n, 3) unit ray directions
+            max_distance: Search limit (default: the mesh diagonal)
+            ignore: (n,) triangle index to skip per ray (the face a ray
+                starts on), -1 for none
+
+        Returns:
+            (n,) distances, ``inf`` for rays without a hit
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        count = len(origins)
+        best = np.full(count, np.inf)
+        if count == 0 or len(self.triangles) == 0:
+            return best
+        ignore = np.full(count, -1) if ignore is None else np.asarray(ignore, dtype=np.int64)
+        limit = self.diagonal if max_distance is None else min(float(max_distance), self.diagonal)
+        epsilon = 1e-9 * max(self.diagonal, 1.0)
+
+        # Large triangles: every ray against every one of them
+        if len(self._large):
+            rays_per_chunk = max(1, _MAX_PAIRS // len(self._large))
+            for start in range(0, count, rays_per_chunk):
+                rays = np.arange(start, min(start + rays_per_chunk, count))
+                self._closest_hits(best, np.repeat(rays, len(self._large)), np.tile(self._large, len(rays)),
+                                   origins, directions, ignore, epsilon, limit)
+
+        if self._tree is None:
+            return best
+
+        # Indexed triangles: march the rays in windows of doubling length.
+        # Sample points are ``step`` apart; every triangle crossing a window
+        # has its centroid within step / 2 + its reach of one of them.
+        step = max(self.step, limit / _SAMPLES_PER_RAY)
+        radius = 0.5 * step + self.step
+        active = np.arange(count)
+        window_start, window_length = 0.0, 2.0 * step
+        while active.size and window_start < limit:
+            window_end = min(window_start + window_length, limit)
+            samples = np.arange(window_start + 0.5 * step, window_end + 0.5 * step, step)
+            rays_per_chunk = max(1, _MAX_PAIRS // (4 * len(samples)))
+            for start in range(0, len(active), rays_per_chunk):
+                rays = active[start:start + rays_per_chunk]
+                points = origins[rays, None, :] + directions[rays, None, :] * samples[None, :, None]
+                neighbours = self._tree.query_ball_point(points.reshape(-1, 3), radius)
+                lengths = np.fromiter((len(found) for found in neighbours), dtype=np.int64,
+                                      count=len(neighbours))
+                total = int(lengths.sum())
+                if total == 0:
+                    continue
+                faces = self._small[np.fromiter(chain.from_iterable(neighbours), dtype=np.int64, count=total)]
+                ray_ids = np.repeat(np.repeat(rays, len(samples)), lengths)
+                # A triangle is usually found from several sample points
+                pairs = np.unique(ray_ids * len(self.triangles) + faces)
+                self._closest_hits(best, pairs // len(self.triangles), pairs % len(self.triangles),
+                                   origins, directions, ignore, epsilon, window_end)
+            # Hits beyond the window may hide closer ones found later
+            active = active[best[active] > window_end]
+            window_start, window_length = window_end, window_length * 2.0
+        return best
+
+    def wall_thickness(self, samples: int = 2048, seed: int = 0) -> np.ndarray:
+        """
+        Wall thickness at sampled faces.
+
+        A ray from each sampled face centroid along the inward normal is
+        cast to the opposite surface; the distance is the local thickness.
+
+        Args:
+            samples: Maximum number of faces measured (all faces if fewer)
+            seed: Seed of the face sampling
+
+        Returns:
+            Distances, ``inf`` where no opposite surface was hit (open
+            meshes, inverted faces)
+        """
+        count = len(self.triangles)
+        if count == 0:
+            return np.zeros(0)
+        if count > samples:
+            faces = np.sort(np.random.default_rng(seed).choice(count, samples, replace=False))
+        else:
+            faces = np.arange(count)
+        faces = faces[np.any(self.normals[faces] != 0, axis=1)]
+        return self.cast(self.centroids[faces], -self.normals[faces], ignore=faces)
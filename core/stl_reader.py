@@ -0,0 +1,244 @@
+"""
+NumPy STL Reader for AI Agent 3D Print System
+
+Reads binary and ASCII STL files into NumPy arrays without per-triangle
+Python work, for the print preview and the AI design analysis.
+
+- Binary files are memory-mapped and viewed through a single structured
+  dtype (normal, three vertices, attribute count), so opening a
+  million-triangle file costs no more than mapping it.
+- ASCII files are read in fixed-size chunks cut at ``endfacet`` boundaries;
+  keywords are blanked with ``bytes.translate`` and all numbers of a chunk
+  are converted by a single ``np.fromstring`` call (a regular expression
+  pass handles unusual formatting).
+- Bounds come from array reductions over the vertex array.
+
+A file is treated as binary when its size matches the triangle count in
+its header, even if the header starts with ``solid`` (as many exporters
+write it).
+"""
+
+import re
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+# Read size for ASCII parsing (4 MiB)
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+BINARY_HEADER_SIZE = 80
+
+# One binary STL record: 12 little-endian float32 values and a uint16
+STL_BINARY_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attributes', '<u2'),
+])
+
+_ASCII_VECTOR_RE = re.compile(rb'(?:normal|vertex)\s+(\S+)\s+(\S+)\s+(\S+)', re.IGNORECASE)
+
+# Maps whitespace and every lowercase letter except 'e' to a space
+_KEYWORD_TABLE = bytes.maketrans(
+    b'abcdfghijklmnopqrstuvwxyz\t\r\n',
+    b' ' * 28
+)
+_ENDFACET = b'endfacet'
+
+
+@dataclass
+class STLMesh:
+    """Triangle soup of an STL file."""
+    triangles: np.ndarray  # (n, 3, 3) float32, may be a read-only file mapping
+    normals: np.ndarray  # (n, 3) float32
+
+    @property
+    def triangle_count(self) -> int:
+        """Number of triangles."""
+        return int(self.triangles.shape[0])
+
+    @property
+    def vertices(self) -> np.ndarray:
+        """
+        Triangle corners as a (3n, 3) array (three rows per triangle).
+
+        The records of a mapped binary file are interleaved with normals, so
+        this is a contiguous copy for binary files.
+        """
+        return self.triangles.reshape(-1, 3)
+
+    @property
+    def bounds(self) -> Dict[str, Tuple[float, float]]:
+        """Axis-aligned bounding box as ``{'x': (min, max), ...}``."""
+        if self.triangle_count == 0:
+            return {'x': (0, 0), 'y': (0, 0), 'z': (0, 0)}
+        # Reduce over the (possibly strided) triangle view without copying
+        lower = self.triangles.min(axis=(0, 1))
+        upper = self.triangles.max(axis=(0, 1))
+        return {
+            axis: (float(lower[index]), float(upper[index]))
+            for index, axis in enumerate(('x', 'y', 'z'))
+        }
+
+    def to_geometry_data(self) -> Dict[str, object]:
+        """Geometry dict consumed by the preview renderer and design analysis."""
+        return {
+            'vertices': self.vertices,
+            'normals': self.normals,
+            'triangle_count': self.triangle_count,
+            'bounds': self.bounds,
+        }
+
+
+def is_binary_stl(file_path: Union[str, Path]) -> bool:
+    """Check whether a file is a binary STL (size matches the header count)."""
+    path = Path(file_path)
+    size = path.stat().st_size
+    with open(path, 'rb') as f:
+        header = f.read(BINARY_HEADER_SIZE + 4)
+
+    if len(header) == BINARY_HEADER_SIZE + 4:
+        count = int.from_bytes(header[BINARY_HEADER_SIZE:], byteorder='little')
+        if size == BINARY_HEADER_SIZE + 4 + count * STL_BINARY_DTYPE.itemsize:
+            return True
+    return not header.lstrip().startswith(b'solid')
+
+
+def read_stl(file_path: Union[str, Path], use_mmap: bool = True,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> STLMesh:
+    """
+    Read a binary or ASCII STL file.
+
+    Args:
+        file_path: Path to the STL file
+        use_mmap: Map binary files instead of reading them into memory
+        chunk_size: Read size for ASCII files
+
+    Returns:
+        STLMesh with triangle and normal arrays
+    """
+    if is_binary_stl(file_path):
+        return read_binary_stl(file_path, use_mmap)
+    return read_ascii_stl(file_path, chunk_size)
+
+
+def read_binary_stl(file_path: Union[str, Path], use_mmap: bool = True) -> STLMesh:
+    """
+    Read a binary STL file as one structured array.
+
+    Args:
+        file_path: Path to the STL file
+        use_mmap: Map the file (read-only) instead of reading it
+
+    Returns:
+        STLMesh whose arrays are views of the records
+    """
+    path = Path(file_path)
+    size = path.stat().st_size
+    with open(path, 'rb') as f:
+        header = f.read(BINARY_HEADER_SIZE + 4)
+    if len(header) < BINARY_HEADER_SIZE + 4:
+        raise ValueError(f"Binary STL file is truncated: {path}")
+
+    count = int.from_bytes(header[BINARY_HEADER_SIZE:], byteorder='little')
+    available = (size - BINARY_HEADER_SIZE - 4) // STL_BINARY_DTYPE.itemsize
+    if available < count:
+        raise ValueError(
+            f"Binary STL file is truncated: header declares {count} triangles, found {available}"
+        )
+
+    if count == 0:
+        records = np.zeros(0, dtype=STL_BINARY_DTYPE)
+    elif use_mmap:
+        records = np.memmap(path, dtype=STL_BINARY_DTYPE, mode='r',
+                            offset=BINARY_HEADER_SIZE + 4, shape=(count,))
+    else:
+        records = np.fromfile(path, dtype=STL_BINARY_DTYPE, count=count,
+                              offset=BINARY_HEADER_SIZE + 4)
+
+    return STLMesh(triangles=records['vertices'], normals=records['normal'])
+
+
+def read_ascii_stl(file_path: Union[str, Path], chunk_size: int = DEFAULT_CHUNK_SIZE) -> STLMesh:
+    """
+    Read an ASCII STL file in chunks.
+
+    Args:
+        file_path: Path to the STL file
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        STLMesh with float32 triangle and normal arrays
+    """
+    blocks = []
+    pending = b''
+    with open(file_path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            buffer = pending + data
+            if not data:
+                if buffer.strip():
+                    blocks.append(_parse_ascii_block(buffer))
+                break
+
+            # Only complete facets are parsed; the rest waits for more data
+            cut = buffer.rfind(_ENDFACET)
+            if cut < 0:
+                pending = buffer
+                continue
+            cut += len(_ENDFACET)
+            blocks.append(_parse_ascii_block(buffer[:cut]))
+            pending = buffer[cut:]
+
+    facets = np.concatenate(blocks) if blocks else np.zeros((0, 4, 3), dtype=np.float32)
+    return STLMesh(
+        triangles=np.ascontiguousarray(facets[:, 1:]),
+        normals=np.ascontiguousarray(facets[:, 0]),
+    )
+
+
+def _parse_ascii_block(block: bytes) -> np.ndarray:
+    """Parse complete facets into a (n, 4, 3) array of normal and vertices."""
+    facets = _parse_ascii_numbers(block)
+    if facets is not None:
+        return facets
+
+    # Uppercase keywords
+    lowered = block.lower()
+    if _ENDFACET not in lowered:
+        return np.zeros((0, 4, 3), dtype=np.float32)
+    facets = _parse_ascii_numbers(lowered)
+    if facets is not None:
+        return facets
+
+    # Unusual formatting (e.g. extra tokens between the numbers)
+    facet_count = lowered.count(_ENDFACET)
+    matches = _ASCII_VECTOR_RE.findall(block)
+    if len(matches) != facet_count * 4:
+        raise ValueError("Malformed ASCII STL: every facet needs a normal and three vertices")
+    return np.array(matches, dtype=np.bytes_).astype(np.float32).reshape(-1, 4, 3)
+
+
+def _parse_ascii_numbers(block: bytes) -> Optional[np.ndarray]:
+    """
+    Blank out the (lowercase) keywords and parse all numbers in one call.
+
+    The only letter of the keywords that survives the translation is a
+    standalone 'e' (exponents always follow a digit), which is blanked as
+    well. Returns None if the numbers do not match the facet count.
+    """
+    start = block.find(b'facet')
+    if start < 0:
+        return None
+    block = block[start:]
+    facet_count = block.count(_ENDFACET)
+
+    numbers = block.translate(_KEYWORD_TABLE).replace(b' e', b'  ')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        values = np.fromstring(numbers, dtype=np.float32, sep=' ')
+    if values.size != facet_count * 12:
+        return None
+    return values.reshape(-1, 4, 3)
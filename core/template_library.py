@@ -6,7 +6,6 @@ This module provides a comprehensive library of pre-designed 3D model templates
 that users can quickly customize and print, accelerating the design process.
 """
 
-import json
 import asyncio
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
@@ -15,7 +14,12 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
 
+from core.agent_pool import get_agent_pool
 from core.logger import get_logger
+from core.template_store import LISTING_FIELDS, TemplateStore
+from core.template_model_cache import (
+    DEFAULT_QUANTUM, TemplateModelCache, compute_model_key, get_template_model_cache, normalize_parameters
+)
 
 logger = get_logger(__name__)
 
@@ -85,6 +89,18 @@ class Template:
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Template":
+        """Rebuild a template from its to_dict() form"""
+        return cls(**{
+            **data,
+            "category": TemplateCategory(data["category"]),
+            "difficulty": PrintDifficulty(data["difficulty"]),
+            "parameters": [TemplateParameter(**param) for param in data.get("parameters", [])],
+            "created_at": datetime.fromisoformat(data["created_at"]),
+            "updated_at": datetime.fromisoformat(data["updated_at"])
+        })
 
 
 class TemplateLibrary:
@@ -103,7 +119,8 @@ class TemplateLibrary:
         self.templates: Dict[str, Template] = {}
         self.categories: Dict[TemplateCategory, List[str]] = {}
         
-    def __init__(self, library_path: str = "data/templates"):
+    def __init__(self, library_path: str = "data/templates",
+                 model_cache: Optional[TemplateModelCache] = None):
         self.logger = get_logger(f"{__name__}.TemplateLibrary")
         self.library_path = Path(library_path)
         
@@ -113,8 +130,14 @@ class TemplateLibrary:
         except (OSError, PermissionError) as e:
             self.logger.warning(f"Could not create template library directory: {e}")
         
-        self.templates: Dict[str, Template] = {}
-        self.categories: Dict[TemplateCategory, List[str]] = {}
+        # Templates live in an indexed SQLite store; queries and updates
+        # touch only the rows they need
+        self.store = TemplateStore(self.library_path / "templates.db")
+        
+        # Generated models; the shared cache is resolved on first use so the
+        # application lifespan can configure it after this module is imported
+        self._model_cache = model_cache
+        self.parameter_quantum = DEFAULT_QUANTUM
         
         # Initialize with simple templates for now
         self._initialize_simple_templates()
@@ -124,7 +147,8 @@ class TemplateLibrary:
         try:
             # Create a simple gear template
             gear_template = Template(
-                id=str(uuid.uuid4()),
+                # Stable across restarts so cached models stay addressable
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, "ai-3d-print/templates/simple-gear")),
                 name="Simple Gear",
                 description="A basic gear template",
                 category=TemplateCategory.MECHANICAL,
@@ -142,8 +166,9 @@ class TemplateLibrary:
                 material_estimate=15.0
             )
             
-            self.templates[gear_template.id] = gear_template
-            self.logger.info(f"✅ Initialized {len(self.templates)} simple templates")
+            # Written when the store is opened, keeping its usage and ratings
+            self.store.builtin_templates.append(gear_template.to_dict())
+            self.logger.info(f"✅ Initialized {len(self.store.builtin_templates)} simple templates")
             
         except Exception as e:
             self.logger.error(f"❌ Failed to initialize simple templates: {e}")
@@ -339,128 +364,52 @@ class TemplateLibrary:
             
             self._save_template(template)
     
-    def _load_templates(self):
-        """Load templates from the library directory"""
-        try:
-            templates_file = self.library_path / "templates.json"
-            
-            if templates_file.exists():
-                with open(templates_file, 'r') as f:
-                    templates_data = json.load(f)
-                
-                for template_data in templates_data:
-                    # Reconstruct TemplateParameter objects
-                    parameters = []
-                    for param_data in template_data.get("parameters", []):
-                        parameters.append(TemplateParameter(**param_data))
-                    
-                    template = Template(
-                        id=template_data["id"],
-                        name=template_data["name"],
-                        description=template_data["description"],
-                        category=TemplateCategory(template_data["category"]),
-                        difficulty=PrintDifficulty(template_data["difficulty"]),
-                        parameters=parameters,
-                        preview_image=template_data["preview_image"],
-                        model_file=template_data["model_file"],
-                        tags=template_data["tags"],
-                        author=template_data["author"],
-                        created_at=datetime.fromisoformat(template_data["created_at"]),
-                        updated_at=datetime.fromisoformat(template_data["updated_at"]),
-                        usage_count=template_data.get("usage_count", 0),
-                        rating=template_data.get("rating", 0.0),
-                        rating_count=template_data.get("rating_count", 0),
-                        print_time_estimate=template_data.get("print_time_estimate"),
-                        material_estimate=template_data.get("material_estimate")
-                    )
-                    
-                    self.templates[template.id] = template
-            
-            self._organize_by_categories()
-            self.logger.info(f"✅ Loaded {len(self.templates)} templates from library")
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to load templates: {e}")
-    
     def _save_template(self, template: Template):
         """Save a single template to the library"""
-        self.templates[template.id] = template
-        self._save_all_templates()
-    
-    def _save_all_templates(self):
-        """Save all templates to the library file"""
-        try:
-            templates_file = self.library_path / "templates.json"
-            
-            # Convert templates to serializable format
-            templates_data = []
-            for template in self.templates.values():
-                template_dict = template.to_dict()
-                # Convert TemplateParameter objects to dicts
-                template_dict["parameters"] = [asdict(param) for param in template.parameters]
-                templates_data.append(template_dict)
-            
-            with open(templates_file, 'w') as f:
-                json.dump(templates_data, f, indent=2, default=str)
-                
-            self.logger.info(f"💾 Saved {len(templates_data)} templates to library")
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to save templates: {e}")
-    
-    def _organize_by_categories(self):
-        """Organize templates by categories"""
-        self.categories = {category: [] for category in TemplateCategory}
-        
-        for template in self.templates.values():
-            self.categories[template.category].append(template.id)
+        self.store.upsert(template.to_dict())
     
     async def get_templates(self, 
                            category: Optional[TemplateCategory] = None,
                            difficulty: Optional[PrintDifficulty] = None,
                            tags: Optional[List[str]] = None,
-                           search_query: Optional[str] = None) -> List[Template]:
-        """Get templates with optional filtering"""
-        
-        templates = list(self.templates.values())
-        
-        # Filter by category
-        if category:
-            templates = [t for t in templates if t.category == category]
-        
-        # Filter by difficulty
-        if difficulty:
-            templates = [t for t in templates if t.difficulty == difficulty]
-        
-        # Filter by tags
-        if tags:
-            templates = [t for t in templates if any(tag in t.tags for tag in tags)]
-        
-        # Filter by search query
-        if search_query:
-            query_lower = search_query.lower()
-            templates = [
-                t for t in templates 
-                if query_lower in t.name.lower() 
-                or query_lower in t.description.lower()
-                or any(query_lower in tag.lower() for tag in t.tags)
-            ]
-        
-        # Sort by popularity (usage count and rating)
-        templates.sort(key=lambda t: (t.usage_count * t.rating), reverse=True)
-        
-        return templates
+                           search_query: Optional[str] = None,
+                           limit: Optional[int] = None,
+                           offset: int = 0) -> List[Template]:
+        """Get templates with optional filtering, most popular (usage count and rating) first"""
+        records = await asyncio.to_thread(
+            self.store.query,
+            category=category.value if category else None,
+            difficulty=difficulty.value if difficulty else None,
+            tags=tags,
+            text=search_query,
+            order_by="score",
+            limit=limit,
+            offset=offset
+        )
+        return [Template.from_dict(record) for record in records]
+    
+    @property
+    def model_cache(self) -> TemplateModelCache:
+        """Cache of generated models (the process-wide one unless given)"""
+        if self._model_cache is None:
+            self._model_cache = get_template_model_cache()
+        return self._model_cache
+    
+    @model_cache.setter
+    def model_cache(self, cache: TemplateModelCache) -> None:
+        self._model_cache = cache
     
     async def get_template(self, template_id: str) -> Optional[Template]:
         """Get a specific template by ID"""
-        return self.templates.get(template_id)
+        record = await asyncio.to_thread(self.store.get, template_id)
+        return Template.from_dict(record) if record else None
     
     async def customize_template(self, 
                                 template_id: str, 
                                 parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Customize a template with given parameters"""
         try:
-            template = self.templates.get(template_id)
+            template = await self.get_template(template_id)
             if not template:
                 return {"success": False, "error": "Template not found"}
             
@@ -473,8 +422,7 @@ class TemplateLibrary:
             customized_model = await self._generate_customized_model(template, parameters)
             
             # Update usage statistics
-            template.usage_count += 1
-            self._save_all_templates()
+            template.usage_count = await asyncio.to_thread(self.store.record_usage, template_id)
             
             self.logger.info(f"🎨 Customized template: {template.name}")
             
@@ -697,53 +645,74 @@ class TemplateLibrary:
             size = parameters.get('size', 20)
             shape = parameters.get('shape', 'cube')
             
-            design_spec = {
-                'object_type': shape,
-                'primary_shape': shape,
-                'dimensions': {'x': size, 'y': size, 'z': size},
-                'material_type': 'PLA'
-            }
+            if shape == 'sphere':
+                dimensions = {'radius': size / 2}
+            elif shape == 'cylinder':
+                dimensions = {'radius': size / 2, 'height': size}
+            else:
+                dimensions = {'x': size, 'y': size, 'z': size}
             
+            # create_primitive reads the shape from specifications.geometry
             return await cad_agent.execute_task({
                 'operation': 'create_primitive',
-                'design_specifications': design_spec
+                'specifications': {
+                    'geometry': {'base_shape': shape, 'dimensions': dimensions}
+                },
+                'requirements': {}
             })
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
     async def _generate_customized_model(self, template: Template, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Get a customized 3D model, generating it only if it is not cached"""
+        # Requests that differ only in defaults, float noise or whitespace
+        # share one model, generated from the normalized parameters
+        parameters = normalize_parameters(template.parameters, parameters, self.parameter_quantum)
+        key = compute_model_key(template, parameters)
+        
+        model, cache_hit = await self.model_cache.get_or_create(
+            key,
+            lambda: self._build_customized_model(template, parameters),
+            # Simulated fallbacks have no model worth keeping
+            cacheable=lambda result: result.get("generation_method") == "real_cad"
+        )
+        
+        if cache_hit:
+            self.logger.info(f"Reusing cached model {model['model_id']} for template '{template.name}'")
+        return {**model, "cache_hit": cache_hit}
+    
+    async def _build_customized_model(self, template: Template, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a customized 3D model using real CAD operations"""
         try:
-            # Import CAD agent for actual 3D model generation
-            from agents.cad_agent import CADAgent
-            
             model_id = str(uuid.uuid4())
             self.logger.info(f"Generating customized model for template '{template.name}' with ID {model_id}")
             
-            # Create CAD agent instance for model generation
-            cad_agent = CADAgent(f"template_cad_{model_id}")
-            
-            # Generate model based on template type
-            if template.name == "Phone Stand":
-                result = await self._generate_phone_stand(cad_agent, parameters)
-            elif template.name == "Simple Gear":
-                result = await self._generate_gear(cad_agent, parameters)
-            elif template.name == "Pencil Holder":
-                result = await self._generate_pencil_holder(cad_agent, parameters)
-            elif template.name == "Storage Box":
-                result = await self._generate_storage_box(cad_agent, parameters)
-            elif template.name == "Cable Management":
-                result = await self._generate_cable_manager(cad_agent, parameters)
-            elif template.name == "Desk Organizer":
-                result = await self._generate_desk_organizer(cad_agent, parameters)
-            elif template.name == "Custom Bracket":
-                result = await self._generate_bracket(cad_agent, parameters)
-            else:
-                # Fallback to basic cube
-                result = await self._generate_basic_shape(cad_agent, parameters)
+            # Generate model based on template type with the shared CAD agent
+            async with get_agent_pool().acquire("cad") as cad_agent:
+                if template.name == "Phone Stand":
+                    result = await self._generate_phone_stand(cad_agent, parameters)
+                elif template.name == "Simple Gear":
+                    result = await self._generate_gear(cad_agent, parameters)
+                elif template.name == "Pencil Holder":
+                    result = await self._generate_pencil_holder(cad_agent, parameters)
+                elif template.name == "Storage Box":
+                    result = await self._generate_storage_box(cad_agent, parameters)
+                elif template.name == "Cable Management":
+                    result = await self._generate_cable_manager(cad_agent, parameters)
+                elif template.name == "Desk Organizer":
+                    result = await self._generate_desk_organizer(cad_agent, parameters)
+                elif template.name == "Custom Bracket":
+                    result = await self._generate_bracket(cad_agent, parameters)
+                else:
+                    # Fallback to basic cube
+                    result = await self._generate_basic_shape(cad_agent, parameters)
+            
+            if not isinstance(result, dict):
+                # CADAgent.execute_task returns a TaskResult
+                result = {**result.data, 'success': result.success, 'error': result.error_message}
             
             if result.get('success', False):
-                output_file = result.get('output_file', '')
+                output_file = result.get('output_file') or result.get('model_file', '')
                 
                 # Ensure output directory exists
                 output_dir = Path("/tmp/customized_models")
@@ -785,6 +754,30 @@ class TemplateLibrary:
                 "error": str(e)
             }
     
+    async def prewarm_model_cache(self, limit: int = 3) -> Dict[str, bool]:
+        """
+        Generate the default models of the most popular templates.
+        
+        Args:
+            limit: Number of templates to warm
+            
+        Returns:
+            Template name -> whether its model was already cached
+        """
+        warmed = {}
+        for template in await self.get_popular_templates(limit):
+            defaults = {param.name: param.default_value for param in template.parameters}
+            try:
+                model = await self._generate_customized_model(template, defaults)
+                warmed[template.name] = model["cache_hit"]
+                # Callers own the returned file; the cache keeps its own copy
+                Path(model["file_path"]).unlink(missing_ok=True)
+            except Exception as e:
+                self.logger.warning(f"Could not pre-warm template '{template.name}': {e}")
+        
+        self.logger.info(f"🔥 Pre-warmed model cache for {len(warmed)} templates")
+        return warmed
+    
     def _estimate_print_time(self, template: Template, parameters: Dict[str, Any]) -> int:
         """Estimate print time based on template and parameters"""
         
@@ -824,24 +817,18 @@ class TemplateLibrary:
     async def rate_template(self, template_id: str, rating: float) -> Dict[str, Any]:
         """Rate a template (1-5 stars)"""
         try:
-            template = self.templates.get(template_id)
-            if not template:
-                return {"success": False, "error": "Template not found"}
-            
             if not 1 <= rating <= 5:
                 return {"success": False, "error": "Rating must be between 1 and 5"}
             
             # Update rating statistics
-            total_rating = template.rating * template.rating_count + rating
-            template.rating_count += 1
-            template.rating = total_rating / template.rating_count
-            
-            self._save_all_templates()
+            updated = await asyncio.to_thread(self.store.add_rating, template_id, rating)
+            if not updated:
+                return {"success": False, "error": "Template not found"}
             
             return {
                 "success": True,
-                "new_rating": round(template.rating, 1),
-                "rating_count": template.rating_count
+                "new_rating": round(updated["rating"], 1),
+                "rating_count": updated["rating_count"]
             }
             
         except Exception as e:
@@ -850,102 +837,69 @@ class TemplateLibrary:
     
     async def get_popular_templates(self, limit: int = 10) -> List[Template]:
         """Get the most popular templates"""
-        templates = list(self.templates.values())
-        
-        # Sort by popularity score (usage count * rating)
-        templates.sort(key=lambda t: t.usage_count * max(t.rating, 1), reverse=True)
-        
-        return templates[:limit]
+        # Sorted by popularity score (usage count * rating)
+        records = await asyncio.to_thread(self.store.query, order_by="popularity", limit=limit)
+        return [Template.from_dict(record) for record in records]
     
     async def get_recent_templates(self, limit: int = 10) -> List[Template]:
         """Get the most recently added templates"""
-        templates = list(self.templates.values())
-        
-        # Sort by creation date
-        templates.sort(key=lambda t: t.created_at, reverse=True)
-        
-        return templates[:limit]
+        records = await asyncio.to_thread(self.store.query, order_by="recent", limit=limit)
+        return [Template.from_dict(record) for record in records]
     
-    def get_categories_summary(self) -> Dict[str, Any]:
+    async def get_categories_summary(self) -> Dict[str, Any]:
         """Get summary of templates by category"""
+        stored = await asyncio.to_thread(self.store.category_summary)
         summary = {}
         
         for category in TemplateCategory:
-            category_templates = [t for t in self.templates.values() if t.category == category]
-            
+            category_summary = stored.get(category.value, {})
             summary[category.value] = {
-                "count": len(category_templates),
-                "avg_rating": round(
-                    sum(t.rating for t in category_templates) / max(len(category_templates), 1), 1
-                ),
-                "total_usage": sum(t.usage_count for t in category_templates)
+                "count": category_summary.get("count", 0),
+                "avg_rating": round(category_summary.get("avg_rating", 0.0), 1),
+                "total_usage": category_summary.get("total_usage", 0)
             }
         
         return summary
     
-    async def list_templates(self) -> List[Dict[str, Any]]:
-        """List all available templates"""
-        templates = []
-        for template in self.templates.values():
-            templates.append({
-                "id": template.id,
-                "name": template.name,
-                "description": template.description,
-                "category": template.category.value,
-                "difficulty": template.difficulty.value,
-                "rating": template.rating,
-                "print_count": template.usage_count,
-                "preview_image": template.preview_image,
-                "model_path": template.model_file,
-                "estimated_print_time": template.print_time_estimate,
-                "recommended_material": template.material_estimate
-            })
-        
-        return sorted(templates, key=lambda x: x.get("rating", 0), reverse=True)
+    async def list_templates(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """List all available templates, best rated first"""
+        records = await asyncio.to_thread(
+            self.store.query, limit=limit, offset=offset, fields=LISTING_FIELDS
+        )
+        return [self._summarize(record) for record in records]
     
-    async def search_templates(self, category=None, difficulty=None, search_term=None, tags=None) -> List[Dict[str, Any]]:
-        """Search templates with filters"""
-        templates = list(self.templates.values())
-        
-        # Apply category filter
-        if category:
-            templates = [t for t in templates if t.category.value == category]
-        
-        # Apply difficulty filter
-        if difficulty:
-            templates = [t for t in templates if t.difficulty.value == difficulty]
-        
-        # Apply search term filter
-        if search_term:
-            search_lower = search_term.lower()
-            templates = [t for t in templates if 
-                        search_lower in t.name.lower() or 
-                        search_lower in t.description.lower() or
-                        any(search_lower in tag.lower() for tag in t.tags)]
-        
-        # Apply tags filter
-        if tags:
-            for tag in tags:
-                templates = [t for t in templates if tag.lower() in [t.lower() for t in t.tags]]
-        
-        # Convert to dict format
-        result = []
-        for template in templates:
-            result.append({
-                "id": template.id,
-                "name": template.name,
-                "description": template.description,
-                "category": template.category.value,
-                "difficulty": template.difficulty.value,
-                "rating": template.rating,
-                "print_count": template.usage_count,
-                "preview_image": template.preview_image,
-                "model_path": template.model_file,
-                "estimated_print_time": template.print_time_estimate,
-                "recommended_material": template.material_estimate
-            })
-        
-        return sorted(result, key=lambda x: x.get("rating", 0), reverse=True)
+    async def search_templates(self, category=None, difficulty=None, search_term=None, tags=None,
+                               limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Search templates with filters (templates must carry every given tag)"""
+        records = await asyncio.to_thread(
+            self.store.query,
+            category=category,
+            difficulty=difficulty,
+            tags=tags,
+            match_all_tags=True,
+            text=search_term,
+            limit=limit,
+            offset=offset,
+            fields=LISTING_FIELDS
+        )
+        return [self._summarize(record) for record in records]
+    
+    @staticmethod
+    def _summarize(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Listing entry of a stored template (or of its LISTING_FIELDS)"""
+        return {
+            "id": record["id"],
+            "name": record["name"],
+            "description": record["description"],
+            "category": record["category"],
+            "difficulty": record["difficulty"],
+            "rating": record["rating"],
+            "print_count": record["usage_count"],
+            "preview_image": record["preview_image"],
+            "model_path": record["model_file"],
+            "estimated_print_time": record["print_time_estimate"],
+            "recommended_material": record["material_estimate"]
+        }
     
     async def get_categories(self) -> List[Dict[str, str]]:
         """Get all template categories"""
@@ -956,7 +910,7 @@ class TemplateLibrary:
     
     async def generate_preview(self, template_id: str) -> Dict[str, Any]:
         """Generate a preview of a template"""
-        template = self.templates.get(template_id)
+        template = await self.get_template(template_id)
         if not template:
             return {"error": "Template not found"}
         
@@ -0,0 +1,238 @@
+"""
+Template Model Cache for AI Agent 3D Print System
+
+Customizing a template with the parameters somebody else already used
+produces the same model, yet every request used to build a CAD agent and
+regenerate the mesh from scratch. TemplateModelCache stores generated
+models on disk under a key derived from:
+
+- the template id and a digest of its definition (name, model file,
+  category and parameter specs), so editing a template invalidates its
+  models while usage counts and ratings do not
+- the normalized parameters: defaults filled in, numbers quantized to
+  ``quantum`` (0.01 mm by default) and strings stripped, so ``20``,
+  ``20.0`` and ``20.001`` share one model
+- GENERATOR_VERSION, bumped whenever the generators change their output
+
+Entries consist of the STL file plus the generation result (printability
+score, volume, material weight, ...). Storage, LRU eviction and the
+per-caller file checkout are those of SliceCache. On top of that,
+concurrent requests for the same key are single-flighted: one of them
+generates the model while the others wait for its result.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple, Union
+
+try:
+    from .slice_cache import SliceCache
+except ImportError:
+    from core.slice_cache import SliceCache
+
+DEFAULT_CACHE_DIR = "./cache/template_models"
+DEFAULT_MAX_SIZE_BYTES = 512 * 1024 * 1024  # 512 MiB
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_QUANTUM = 0.01
+
+# Bump when a template generator changes the models it produces
+GENERATOR_VERSION = "1"
+
+# Shared caches keyed by resolved directory (see get_template_model_cache)
+_CACHES: Dict[str, "TemplateModelCache"] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def _quantize(value: float, quantum: float) -> Union[int, float]:
+    if not math.isfinite(value) or quantum <= 0:
+        return value
+    # Round again to drop the float noise of the multiplication
+    quantized = round(round(value / quantum) * quantum, 10)
+    return int(quantized) if quantized.is_integer() else quantized
+
+
+def normalize_parameters(parameter_specs: Iterable[Any], parameters: Dict[str, Any],
+                         quantum: float = DEFAULT_QUANTUM) -> Dict[str, Any]:
+    """
+    Canonical form of customization parameters.
+
+    Args:
+        parameter_specs: The template's TemplateParameter definitions
+        parameters: Parameters of the request
+        quantum: Resolution numbers are rounded to
+
+    Returns:
+        Parameters with defaults filled in, numbers quantized (integral
+        values as int) and strings stripped, sorted by name
+    """
+    merged = {spec.name: spec.default_value for spec in parameter_specs}
+    merged.update(parameters)
+
+    normalized = {}
+    for name in sorted(merged):
+        value = merged[name]
+        if isinstance(value, bool) or value is None:
+            pass
+        elif isinstance(value, (int, float)):
+            value = _quantize(float(value), quantum)
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized[name] = value
+    return normalized
+
+
+def template_version(template: Any) -> str:
+    """
+    Digest of the parts of a template that shape its models.
+
+    Args:
+        template: Template to describe
+
+    Returns:
+        Short hex digest
+    """
+    category = getattr(template.category, 'value', template.category)
+    definition = {
+        'name': template.name,
+        'model_file': template.model_file,
+        'category': category,
+        'parameters': [
+            {
+                'name': spec.name,
+                'type': spec.parameter_type,
+                'default': spec.default_value,
+                'min': spec.min_value,
+                'max': spec.max_value,
+                'choices': spec.choices
+            }
+            for spec in template.parameters
+        ]
+    }
+    canonical = json.dumps(definition, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def compute_model_key(template: Any, normalized_parameters: Dict[str, Any]) -> str:
+    """
+    Key of a customized model.
+
+    Args:
+        template: Template being customized
+        normalized_parameters: Output of normalize_parameters
+
+    Returns:
+        Hex key identifying the generated model
+    """
+    canonical_parameters = json.dumps(normalized_parameters, sort_keys=True, default=str,
+                                      separators=(',', ':'))
+    hasher = hashlib.sha256()
+    for part in (template.id, template_version(template), canonical_parameters, GENERATOR_VERSION):
+        hasher.update(str(part).encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+class TemplateModelCache(SliceCache):
+    """Size-bounded LRU cache of generated template models on disk."""
+
+    FILE_SUFFIX = '.stl'
+    FILE_FIELD = 'file_path'
+    TRANSIENT_FIELDS = ('file_path',)
+
+    def __init__(self, cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache (the directory is created on first use).
+
+        Args:
+            cache_dir: Directory holding the STL files and the index
+            max_size_bytes: Maximum total size of cached models
+            max_entries: Maximum number of cached models
+        """
+        super().__init__(cache_dir, max_size_bytes, max_entries)
+        self.stats['coalesced'] = 0
+        self._in_flight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+
+    async def get_or_create(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[Dict[str, Any]]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Look up a model, generating it once if it is missing.
+
+        Concurrent calls for a key that is being generated wait for that
+        generation instead of starting their own.
+
+        Args:
+            key: Key from compute_model_key
+            generate: Coroutine function producing a result whose
+                ``file_path`` is the generated STL
+            cacheable: Whether a generated result may be stored
+
+        Returns:
+            (result, whether it came from the cache or another request);
+            ``file_path`` of a shared result is a file owned by the caller
+        """
+        cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            return cached, True
+
+        loop = asyncio.get_running_loop()
+        pending = self._in_flight.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            self.stats['coalesced'] += 1
+            result = await asyncio.shield(pending)
+            return await asyncio.to_thread(self._share, key, result), True
+
+        pending = loop.create_task(self._create(key, generate, cacheable))
+        self._in_flight[key] = pending
+        pending.add_done_callback(functools.partial(self._forget, key))
+        # Waiters keep the generation alive if the caller that started it is cancelled
+        return await asyncio.shield(pending), False
+
+    async def _create(self, key: str, generate: Callable[[], Awaitable[Dict[str, Any]]],
+                      cacheable: Callable[[Dict[str, Any]], bool]) -> Dict[str, Any]:
+        result = await generate()
+        model_file = result.get(self.FILE_FIELD)
+        if cacheable(result) and model_file and os.path.exists(model_file):
+            await asyncio.to_thread(self.put, key, model_file, result)
+        return result
+
+    def _forget(self, key: str, task: "asyncio.Future[Dict[str, Any]]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def _share(self, key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of another request's result with its own model file."""
+        shared = dict(result)
+        cached_file = self._entry_path(key)
+        if cached_file.exists():
+            shared[self.FILE_FIELD] = self._checkout(cached_file)
+        return shared
+
+
+def get_template_model_cache(cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                             max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                             max_entries: int = DEFAULT_MAX_ENTRIES) -> TemplateModelCache:
+    """
+    Get the process-wide model cache for a directory.
+
+    Template libraries share one instance, so single-flighting spans all of
+    them; the limits of the first call win.
+    """
+    resolved = os.path.realpath(cache_dir)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(resolved)
+        if cache is None:
+            cache = TemplateModelCache(cache_dir, max_size_bytes, max_entries)
+            _CACHES[resolved] = cache
+        return cache
@@ -0,0 +1,431 @@
+"""
+Indexed Template Store for AI Agent 3D Print System
+
+The template library used to keep every template in memory and rewrite
+the whole of templates.json whenever one of them changed, including each
+rating and customization. Listing and searching scanned every template.
+TemplateStore keeps templates in a SQLite database instead:
+
+- one row per template: the definition as JSON plus the columns queries
+  filter and sort on (category, difficulty, rating, usage count, creation
+  time), each indexed
+- a tag table indexed by tag, for any-of and all-of tag filters
+- an FTS5 index with the trigram tokenizer over name, description and
+  tags, so case-insensitive substring search uses the index for terms of
+  three or more characters (shorter terms fall back to LIKE)
+
+Changes touch only their own row: ratings and usage counts are single
+UPDATE statements. The database runs in WAL mode, so several API workers
+can share it.
+
+The store works on the plain dicts of Template.to_dict; the template
+library converts them.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from core.logger import get_logger
+
+# Sort orders of query(); the row id keeps ties in insertion order
+ORDERINGS = {
+    'rating': "rating DESC",
+    'score': "usage_count * rating DESC",
+    'popularity': "usage_count * max(rating, 1) DESC",
+    'recent': "created_ts DESC",
+}
+
+# Trigram FTS cannot match terms shorter than this
+_MIN_FTS_TERM = 3
+
+# Fields kept in their own columns rather than read from the JSON definition
+_STAT_FIELDS = ('usage_count', 'rating', 'rating_count')
+
+# Columns query() can return instead of whole templates, which saves
+# decoding the definitions of long result lists
+LISTING_FIELDS = (
+    'id', 'name', 'description', 'category', 'difficulty', 'usage_count', 'rating',
+    'rating_count', 'preview_image', 'model_file', 'print_time_estimate', 'material_estimate'
+)
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _normalize_tags(tags: Iterable[str]) -> List[str]:
+    return sorted({tag.strip().lower() for tag in tags if tag and tag.strip()})
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+class TemplateStore:
+    """SQLite-backed template storage with indexed queries."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS templates (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            tags TEXT NOT NULL,
+            created_ts REAL NOT NULL,
+            usage_count INTEGER NOT NULL DEFAULT 0,
+            rating REAL NOT NULL DEFAULT 0,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            preview_image TEXT,
+            model_file TEXT,
+            print_time_estimate INTEGER,
+            material_estimate REAL,
+            data TEXT NOT NULL
+        );
+        -- Descending, so walking an index yields ties in rowid order
+        CREATE INDEX IF NOT EXISTS idx_templates_category
+            ON templates (category, rating DESC);
+        CREATE INDEX IF NOT EXISTS idx_templates_difficulty
+            ON templates (difficulty, rating DESC);
+        CREATE INDEX IF NOT EXISTS idx_templates_rating
+            ON templates (rating DESC);
+        CREATE INDEX IF NOT EXISTS idx_templates_usage
+            ON templates (usage_count DESC);
+        CREATE INDEX IF NOT EXISTS idx_templates_score
+            ON templates (usage_count * rating DESC);
+        CREATE INDEX IF NOT EXISTS idx_templates_popularity
+            ON templates (usage_count * max(rating, 1) DESC);
+        CREATE INDEX IF NOT EXISTS idx_templates_created
+            ON templates (created_ts DESC);
+
+        CREATE TABLE IF NOT EXISTS template_tags (
+            tag TEXT NOT NULL,
+            template_id TEXT NOT NULL,
+            PRIMARY KEY (tag, template_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_template_tags_template
+            ON template_tags (template_id);
+    """
+
+    _FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS templates_fts USING fts5(
+            name, description, tags,
+            content='templates', content_rowid='rowid', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS templates_fts_insert AFTER INSERT ON templates BEGIN
+            INSERT INTO templates_fts (rowid, name, description, tags)
+                VALUES (new.rowid, new.name, new.description, new.tags);
+        END;
+        CREATE TRIGGER IF NOT EXISTS templates_fts_delete AFTER DELETE ON templates BEGIN
+            INSERT INTO templates_fts (templates_fts, rowid, name, description, tags)
+                VALUES ('delete', old.rowid, old.name, old.description, old.tags);
+        END;
+        CREATE TRIGGER IF NOT EXISTS templates_fts_update
+            AFTER UPDATE OF name, description, tags ON templates BEGIN
+            INSERT INTO templates_fts (templates_fts, rowid, name, description, tags)
+                VALUES ('delete', old.rowid, old.name, old.description, old.tags);
+            INSERT INTO templates_fts (rowid, name, description, tags)
+                VALUES (new.rowid, new.name, new.description, new.tags);
+        END;
+    """
+
+    def __init__(self, db_path: Union[str, Path],
+                 builtin_templates: Sequence[Dict[str, Any]] = ()):
+        """
+        Initialize the store (the database is opened on first use).
+
+        Args:
+            db_path: SQLite database file
+            builtin_templates: Templates written whenever the database is
+                opened; their stored usage counts and ratings are kept
+        """
+        self.db_path = Path(db_path)
+        self.builtin_templates = list(builtin_templates)
+        self.logger = get_logger(f"{__name__}.TemplateStore")
+        self.fts_enabled = False
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            try:
+                conn.executescript(self._FTS_SCHEMA)
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                # SQLite without FTS5 or the trigram tokenizer (< 3.34)
+                self.logger.warning(f"Full-text index unavailable, searching with LIKE: {e}")
+            self._conn = conn
+            if self.builtin_templates:
+                self._write(self.builtin_templates, keep_stats=True)
+        return self._conn
+
+    def upsert(self, template: Dict[str, Any]) -> None:
+        """
+        Insert or replace a template.
+
+        Args:
+            template: Template.to_dict() of the template
+        """
+        self.upsert_many([template])
+
+    def upsert_many(self, templates: Iterable[Dict[str, Any]]) -> None:
+        """Insert or replace templates in one transaction."""
+        with self._lock:
+            self._connection()
+            self._write(list(templates), keep_stats=False)
+
+    def _write(self, templates: List[Dict[str, Any]], keep_stats: bool) -> None:
+        update_stats = "" if keep_stats else (
+            ", usage_count = excluded.usage_count, rating = excluded.rating,"
+            " rating_count = excluded.rating_count"
+        )
+        rows, tag_rows = [], []
+        for template in templates:
+            definition = {name: value for name, value in template.items() if name not in _STAT_FIELDS}
+            rows.append((
+                template['id'], template['name'], template['description'],
+                template['category'], template['difficulty'],
+                '\n'.join(template.get('tags', [])),
+                _timestamp(template['created_at']),
+                template.get('usage_count', 0), template.get('rating', 0.0),
+                template.get('rating_count', 0),
+                template.get('preview_image'), template.get('model_file'),
+                template.get('print_time_estimate'), template.get('material_estimate'),
+                json.dumps(definition, default=str)
+            ))
+            tag_rows.extend((tag, template['id']) for tag in _normalize_tags(template.get('tags', [])))
+
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f"""INSERT INTO templates (id, name, description, category, difficulty, tags,
+                                           created_ts, usage_count, rating, rating_count,
+                                           preview_image, model_file, print_time_estimate,
+                                           material_estimate, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        name = excluded.name, description = excluded.description,
+                        category = excluded.category, difficulty = excluded.difficulty,
+                        tags = excluded.tags, created_ts = excluded.created_ts,
+                        preview_image = excluded.preview_image, model_file = excluded.model_file,
+                        print_time_estimate = excluded.print_time_estimate,
+                        material_estimate = excluded.material_estimate,
+                        data = excluded.data{update_stats}""",
+                rows
+            )
+            conn.executemany(
+                "DELETE FROM template_tags WHERE template_id = ?",
+                [(row[0],) for row in rows]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO template_tags (tag, template_id) VALUES (?, ?)",
+                tag_rows
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, template_id: str) -> bool:
+        """Remove a template; returns whether it existed."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = conn.execute("DELETE FROM templates WHERE id = ?", (template_id,)).rowcount
+                conn.execute("DELETE FROM template_tags WHERE template_id = ?", (template_id,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return deleted > 0
+
+    def get(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """Get a template by id."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT data, usage_count, rating, rating_count FROM templates WHERE id = ?",
+                (template_id,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def query(self,
+              category: Optional[str] = None,
+              difficulty: Optional[str] = None,
+              tags: Optional[Sequence[str]] = None,
+              match_all_tags: bool = False,
+              text: Optional[str] = None,
+              order_by: str = 'rating',
+              limit: Optional[int] = None,
+              offset: int = 0,
+              fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Find templates.
+
+        Args:
+            category: Category value to match
+            difficulty: Difficulty value to match
+            tags: Tags to match (case-insensitive)
+            match_all_tags: Require every tag instead of any of them
+            text: Case-insensitive substring of name, description or a tag
+            order_by: One of ORDERINGS
+            limit: Maximum number of templates (all if None)
+            offset: Number of matching templates to skip
+            fields: Return only these LISTING_FIELDS instead of whole templates
+
+        Returns:
+            Matching templates as Template.to_dict() dicts (or dicts of
+            ``fields``)
+        """
+        if fields is not None and not set(fields) <= set(LISTING_FIELDS):
+            raise ValueError(f"Unknown template fields: {sorted(set(fields) - set(LISTING_FIELDS))}")
+
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if difficulty:
+            clauses.append("difficulty = ?")
+            params.append(difficulty)
+
+        wanted_tags = _normalize_tags(tags or [])
+        if wanted_tags:
+            if match_all_tags:
+                subquery = " INTERSECT ".join(
+                    ["SELECT template_id FROM template_tags WHERE tag = ?"] * len(wanted_tags)
+                )
+            else:
+                placeholders = ', '.join('?' * len(wanted_tags))
+                subquery = f"SELECT template_id FROM template_tags WHERE tag IN ({placeholders})"
+            clauses.append(f"id IN ({subquery})")
+            params.extend(wanted_tags)
+
+        with self._lock:
+            conn = self._connection()
+            if text:
+                if self.fts_enabled and len(text) >= _MIN_FTS_TERM:
+                    # A quoted FTS phrase; trigram matching makes it a substring search
+                    clauses.append("rowid IN (SELECT rowid FROM templates_fts WHERE templates_fts MATCH ?)")
+                    params.append('"' + text.replace('"', '""') + '"')
+                else:
+                    clauses.append(
+                        "(name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\' OR tags LIKE ? ESCAPE '\\')"
+                    )
+                    params.extend([_like_pattern(text)] * 3)
+
+            columns = ', '.join(fields) if fields is not None else "data, usage_count, rating, rating_count"
+            sql = f"SELECT {columns} FROM templates"
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            sql += f" ORDER BY {ORDERINGS[order_by]}, rowid"
+            if limit is not None or offset:
+                sql += " LIMIT ? OFFSET ?"
+                params.extend([-1 if limit is None else limit, offset])
+
+            rows = conn.execute(sql, params).fetchall()
+        if fields is not None:
+            return [dict(zip(fields, row)) for row in rows]
+        return [self._record(row) for row in rows]
+
+    def record_usage(self, template_id: str) -> Optional[int]:
+        """
+        Count a use of a template.
+
+        Returns:
+            New usage count, or None if the template does not exist
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE templates SET usage_count = usage_count + 1 WHERE id = ?", (template_id,)
+                )
+                row = conn.execute(
+                    "SELECT usage_count FROM templates WHERE id = ?", (template_id,)
+                ).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return row[0] if row else None
+
+    def add_rating(self, template_id: str, rating: float) -> Optional[Dict[str, Any]]:
+        """
+        Fold a rating into a template's average.
+
+        Returns:
+            {'rating': ..., 'rating_count': ...} after the update, or None
+            if the template does not exist
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    """UPDATE templates
+                       SET rating = (rating * rating_count + ?) / (rating_count + 1),
+                           rating_count = rating_count + 1
+                       WHERE id = ?""",
+                    (rating, template_id)
+                )
+                row = conn.execute(
+                    "SELECT rating, rating_count FROM templates WHERE id = ?", (template_id,)
+                ).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return {'rating': row[0], 'rating_count': row[1]} if row else None
+
+    def category_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Template count, average rating and total usage per category value."""
+        with self._lock:
+            rows = self._connection().execute(
+                """SELECT category, COUNT(*), AVG(rating), SUM(usage_count)
+                   FROM templates GROUP BY category"""
+            ).fetchall()
+        return {
+            category: {'count': count, 'avg_rating': avg_rating, 'total_usage': total_usage}
+            for category, count, avg_rating, total_usage in rows
+        }
+
+    def count(self) -> int:
+        """Number of stored templates."""
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM templates").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _record(row: Sequence[Any]) -> Dict[str, Any]:
+        record = json.loads(row[0])
+        record.update(zip(_STAT_FIELDS, row[1:]))
+        return record
@@ -21,6 +21,7 @@ sys.path.insert(0, str(project_root))
 
 # Core system imports
 from core.parent_agent import ParentAgent
+from core.message_queue import create_message_queue_from_config
 from core.logger import get_logger
 from core.exceptions import WorkflowError
 from agents.research_agent import ResearchAgent
@@ -81,7 +82,10 @@ class WorkflowOrchestrator:
             self.printer_agent = PrinterAgent("printer_agent")
             
             # Initialize parent agent
-            self.parent_agent = ParentAgent("parent_agent")
+            self.parent_agent = ParentAgent(
+                "parent_agent",
+                message_queue=create_message_queue_from_config(self.config.get("job_queue", {}))
+            )
             await self.parent_agent.startup()
             
             # Initialize agents with actual instances
@@ -7,7 +7,7 @@ import re
 import time
 import asyncio
 from typing import Dict, List, Optional, Union, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import serial
 import serial.tools.list_ports
@@ -37,7 +37,7 @@ class PrinterProfile:
     brand: PrinterBrand
     firmware_type: PrinterType
     build_volume: tuple  # (x, y, z) in mm
-    max_feedrate: Dict[str, int]  # mm/min for X,Y,Z,E
+    max_feedrate: Dict[str, int]  # mm/s for X,Y,Z,E (firmware M203 units)
     max_acceleration: Dict[str, int]  # mm/s²
     temperature_limits: Dict[str, tuple]  # (min, max) for hotend, bed
     auto_level: bool
@@ -45,6 +45,9 @@ class PrinterProfile:
     power_resume: bool
     firmware_commands: Dict[str, str]  # Custom G-code commands
     connection_settings: Dict[str, Any]  # Baudrate, timeout, etc.
+    max_jerk: Dict[str, float] = field(
+        default_factory=lambda: {"X": 10.0, "Y": 10.0, "Z": 0.4, "E": 5.0}
+    )  # mm/s for X,Y,Z,E
 
 class PrinterProfileManager:
     """Manages different printer profiles and auto-detection."""
@@ -65,6 +68,7 @@ class PrinterProfileManager:
             build_volume=(220, 220, 250),
             max_feedrate={"X": 500, "Y": 500, "Z": 5, "E": 25},
             max_acceleration={"X": 500, "Y": 500, "Z": 100, "E": 1000},
+            max_jerk={"X": 8.0, "Y": 8.0, "Z": 0.4, "E": 5.0},
             temperature_limits={"hotend": (0, 260), "bed": (0, 80)},
             auto_level=False,
             filament_sensor=False,
@@ -91,6 +95,7 @@ class PrinterProfileManager:
             build_volume=(250, 210, 210),
             max_feedrate={"X": 200, "Y": 200, "Z": 12, "E": 120},
             max_acceleration={"X": 1000, "Y": 1000, "Z": 200, "E": 5000},
+            max_jerk={"X": 8.0, "Y": 8.0, "Z": 0.4, "E": 4.5},
             temperature_limits={"hotend": (0, 300), "bed": (0, 120)},
             auto_level=True,
             filament_sensor=True,
@@ -118,6 +123,7 @@ class PrinterProfileManager:
             build_volume=(200, 200, 200),
             max_feedrate={"X": 300, "Y": 300, "Z": 5, "E": 25},
             max_acceleration={"X": 800, "Y": 800, "Z": 100, "E": 1000},
+            max_jerk={"X": 10.0, "Y": 10.0, "Z": 0.4, "E": 5.0},
             temperature_limits={"hotend": (0, 250), "bed": (0, 80)},
             auto_level=False,
             filament_sensor=False,
@@ -142,6 +148,7 @@ class PrinterProfileManager:
             build_volume=(220, 220, 250),
             max_feedrate={"X": 300, "Y": 300, "Z": 10, "E": 50},
             max_acceleration={"X": 3000, "Y": 3000, "Z": 300, "E": 5000},
+            max_jerk={"X": 5.0, "Y": 5.0, "Z": 0.4, "E": 5.0},
             temperature_limits={"hotend": (0, 300), "bed": (0, 120)},
             auto_level=True,
             filament_sensor=False,
@@ -5,8 +5,10 @@ Printer Emulator Module for AI Agent 3D Print System
 This module provides printer emulation for testing and development purposes.
 """
 
+import re
 import time
 import threading
+from collections import deque
 from typing import Dict, Any, Optional, List
 from enum import Enum
 from dataclasses import dataclass
@@ -280,6 +282,179 @@ class PrinterEmulator:
         }
 
 
+class EmulatedSerialPort:
+    """
+    Serial-port view of a PrinterEmulator with Marlin line protocol timing.
+
+    Implements the parts of the pyserial ``Serial`` API used for streaming
+    (``write``, ``flush``, ``readline``, ``in_waiting``, ``close``). Written
+    bytes take ``len * 10 / baudrate`` seconds on the wire and land in a
+    bounded RX buffer (overflowing bytes are lost, as on real hardware). A
+    firmware thread executes one command every ``command_time`` seconds,
+    checks ``N<line> ...*<checksum>`` framing and answers ``ok`` (with
+    ``N/P/B`` fields when ``advanced_ok`` is set) or ``Error`` plus
+    ``Resend: N``. Responses become readable after ``latency`` seconds.
+    ``corrupt_every`` flips a byte in every n-th received line to exercise
+    resend handling.
+    """
+
+    def __init__(
+        self,
+        emulator: Optional[PrinterEmulator] = None,
+        baudrate: int = 115200,
+        rx_buffer_size: int = 128,
+        command_buffer_size: int = 4,
+        command_time: float = 0.0005,
+        latency: float = 0.001,
+        advanced_ok: bool = False,
+        corrupt_every: int = 0,
+        timeout: float = 1.0
+    ):
+        self.emulator = emulator or PrinterEmulator()
+        if not self.emulator.is_connected:
+            self.emulator.connect()
+        self.baudrate = baudrate
+        self.rx_buffer_size = rx_buffer_size
+        self.command_buffer_size = command_buffer_size
+        self.command_time = command_time
+        self.latency = latency
+        self.advanced_ok = advanced_ok
+        self.corrupt_every = corrupt_every
+        self.timeout = timeout
+
+        self.stats = {"lines_received": 0, "overflow_bytes": 0, "checksum_errors": 0, "line_errors": 0}
+        self._rx = bytearray()
+        self._responses: deque = deque()  # (ready_time, bytes)
+        self._condition = threading.Condition()
+        self._expected_line = 1
+        self._received = 0
+        self._open = True
+        self._firmware = threading.Thread(target=self._firmware_loop, daemon=True)
+        self._firmware.start()
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    @property
+    def in_waiting(self) -> int:
+        now = time.monotonic()
+        with self._condition:
+            return sum(len(data) for ready, data in self._responses if ready <= now)
+
+    def write(self, data: bytes) -> int:
+        """Transmit bytes; blocks for the wire time at the configured baudrate."""
+        time.sleep(len(data) * 10.0 / self.baudrate)
+        with self._condition:
+            room = self.rx_buffer_size - len(self._rx)
+            if len(data) > room:
+                self.stats["overflow_bytes"] += len(data) - max(room, 0)
+                data = data[:max(room, 0)]
+            self._rx.extend(data)
+            self._condition.notify_all()
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def readline(self) -> bytes:
+        """Return the next response line, or b'' after ``timeout``."""
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self._responses and self._responses[0][0] <= now:
+                    return self._responses.popleft()[1]
+                if now >= deadline or not self._open:
+                    return b""
+                wait = deadline - now
+                if self._responses:
+                    wait = min(wait, self._responses[0][0] - now)
+                self._condition.wait(wait)
+
+    def reset_input_buffer(self) -> None:
+        with self._condition:
+            self._responses.clear()
+
+    def close(self) -> None:
+        with self._condition:
+            self._open = False
+            self._condition.notify_all()
+        self._firmware.join(timeout=1.0)
+
+    def _respond(self, *lines: str) -> None:
+        ready = time.monotonic() + self.latency
+        for line in lines:
+            self._responses.append((ready, f"{line}\n".encode("utf-8")))
+        self._condition.notify_all()
+
+    def _firmware_loop(self) -> None:
+        while True:
+            with self._condition:
+                while self._open and b"\n" not in self._rx:
+                    self._condition.wait()
+                if not self._open:
+                    return
+                cut = self._rx.index(b"\n")
+                raw = bytes(self._rx[:cut])
+                del self._rx[:cut + 1]
+
+            if self.command_time:
+                time.sleep(self.command_time)
+
+            with self._condition:
+                self._process_line(raw)
+
+    def _process_line(self, raw: bytes) -> None:
+        self._received += 1
+        self.stats["lines_received"] += 1
+        if self.corrupt_every and self._received % self.corrupt_every == 0 and len(raw) > 2:
+            raw = raw[:1] + bytes([raw[1] ^ 0x01]) + raw[2:]
+
+        line = raw.decode("utf-8", errors="replace").strip()
+        command = line.split(";", 1)[0].strip()
+        if not command:
+            return  # Comment-only lines are not acknowledged
+
+        match = re.match(r"^N(-?\d+)\s+(.*)\*(\d+)$", command)
+        if command.startswith("N"):
+            if not match:
+                self._line_error("No Checksum with line number")
+                return
+            body = command[:command.rindex("*")]
+            checksum = 0
+            for byte in body.encode("utf-8"):
+                checksum ^= byte
+            if checksum != int(match.group(3)):
+                self.stats["checksum_errors"] += 1
+                self._line_error("checksum mismatch")
+                return
+            number = int(match.group(1))
+            command = match.group(2).strip()
+            if command.upper().startswith("M110"):
+                self._expected_line = number + 1
+            elif number != self._expected_line:
+                self.stats["line_errors"] += 1
+                self._line_error("Line Number is not Last Line Number+1")
+                return
+            else:
+                self._expected_line += 1
+
+        response = self.emulator.send_command(command)
+        if response.startswith("ok") and self.advanced_ok:
+            free_slots = self.command_buffer_size - (1 if b"\n" in self._rx else 0)
+            response = f"ok N{self._expected_line - 1} P15 B{free_slots}" + response[2:]
+        elif not response.startswith("ok"):
+            response = f"{response}\nok"
+        self._respond(*response.split("\n"))
+
+    def _line_error(self, message: str) -> None:
+        # Marlin flushes the RX buffer and asks for the next expected line
+        last_line = self._expected_line - 1
+        self._rx.clear()
+        self._respond(f"Error:{message}, Last Line: {last_line}", f"Resend: {last_line + 1}", "ok")
+
+
 class PrinterEmulatorManager:
     """Manages multiple printer emulators."""
 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Per-request agent overhead with and without the shared agent pool.
+
+Measures what an API request pays before it can do any work:
+
+- ``per-request``: constructing the agent in the handler, as the slicer and
+  cat routes used to (executable discovery, profile setup, CAD backend
+  initialization)
+- ``pooled``: ``AgentPool.acquire()`` of an agent that was built once at
+  startup (the startup cost is reported separately)
+
+Usage (from repository root):
+
+    python scripts/benchmarks/agent_pool_benchmark.py --requests 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.agent_pool import AgentPool, register_default_agents  # noqa: E402
+from core.agent_pool import _build_cad_agent, _build_slicer_agent  # noqa: E402
+
+
+def _summary(samples: List[float]) -> str:
+    millis = sorted(sample * 1000 for sample in samples)
+    p95 = millis[min(len(millis) - 1, int(len(millis) * 0.95))]
+    return f"{statistics.mean(millis):>9.3f} {p95:>9.3f}"
+
+
+def _per_request(factory: Callable[[], object], requests: int) -> List[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        agent = factory()
+        samples.append(time.perf_counter() - start)
+        cleanup = getattr(agent, 'cleanup', None)
+        if callable(cleanup):
+            cleanup()
+    return samples
+
+
+async def _pooled(pool: AgentPool, name: str, requests: int) -> List[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with pool.acquire(name):
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _run(requests: int) -> None:
+    pool = AgentPool()
+    register_default_agents(pool)
+
+    start = time.perf_counter()
+    timings = await pool.warm_up()
+    startup = time.perf_counter() - start
+    print(f"startup warm-up: {startup * 1000:.1f} ms "
+          + ", ".join(f"{name}={seconds * 1000:.1f} ms" for name, seconds in timings.items()))
+
+    print(f"{'agent':>7} {'mode':>12} {'mean ms':>9} {'p95 ms':>9}")
+    for name, factory in (("slicer", _build_slicer_agent), ("cad", _build_cad_agent)):
+        print(f"{name:>7} {'per-request':>12} {_summary(_per_request(factory, requests))}")
+        print(f"{name:>7} {'pooled':>12} {_summary(await _pooled(pool, name, requests))}")
+    await pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50, help="Simulated requests per agent and mode")
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
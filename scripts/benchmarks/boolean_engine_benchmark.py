@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Speed and result validity of the mesh boolean engines.
+
+Runs union, difference and intersection of two overlapping spheres, and a
+union of ``--parts`` spheres in a row, through:
+
+- manifold: manifold3d, all operands in one batch call
+- manifold-pairwise: manifold3d folding the operands two at a time
+- trimesh: ``trimesh.boolean`` folded pairwise
+- voxel: the sparse voxel fallback at its adaptive pitch
+
+and reports time, watertightness and the volume error against the exact
+manifold result.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/boolean_engine_benchmark.py --subdivisions 4 --parts 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from functools import reduce
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import trimesh
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.boolean_engine import manifold_boolean, voxel_boolean  # noqa: E402
+
+TRIMESH_OPERATIONS = {
+    'union': trimesh.boolean.union,
+    'difference': trimesh.boolean.difference,
+    'intersection': trimesh.boolean.intersection,
+}
+
+
+def _engines() -> Dict[str, Callable[[List[trimesh.Trimesh], str], trimesh.Trimesh]]:
+    return {
+        'manifold': manifold_boolean,
+        'manifold-pairwise': lambda meshes, operation: reduce(
+            lambda a, b: manifold_boolean([a, b], operation), meshes),
+        'trimesh': lambda meshes, operation: reduce(
+            lambda a, b: TRIMESH_OPERATIONS[operation]([a, b]), meshes),
+        'voxel': voxel_boolean,
+    }
+
+
+def _spheres(count: int, subdivisions: int) -> List[trimesh.Trimesh]:
+    spheres = []
+    for index in range(count):
+        sphere = trimesh.creation.icosphere(subdivisions=subdivisions, radius=10.0)
+        sphere.apply_translation([index * 12.0, 0.0, 0.0])
+        spheres.append(sphere)
+    return spheres
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subdivisions", type=int, default=4, help="Icosphere subdivisions per operand")
+    parser.add_argument("--parts", type=int, default=16, help="Spheres in the multi-part union")
+    parser.add_argument("--skip-voxel", action="store_true", help="Leave out the voxel engine")
+    args = parser.parse_args()
+
+    cases = [(f"{operation} x2", operation, _spheres(2, args.subdivisions))
+             for operation in ('union', 'difference', 'intersection')]
+    cases.append((f"union x{args.parts}", 'union', _spheres(args.parts, args.subdivisions)))
+
+    print(f"{'case':>16} {'engine':>18} {'seconds':>9} {'watertight':>10} {'volume err %':>12}")
+    for label, operation, meshes in cases:
+        reference = manifold_boolean(meshes, operation).volume
+        for name, engine in _engines().items():
+            if args.skip_voxel and name == 'voxel':
+                continue
+            start = time.perf_counter()
+            try:
+                result = engine(meshes, operation)
+            except Exception as e:
+                print(f"{label:>16} {name:>18} {'failed':>9}  {e}")
+                continue
+            seconds = time.perf_counter() - start
+            error = abs(result.volume - reference) / reference * 100 if reference else 0.0
+            print(f"{label:>16} {name:>18} {seconds:>9.3f} {str(result.is_watertight):>10} {error:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Throughput of concurrent heightmap conversions, threads vs. process pool.
+
+Runs ``--jobs`` concurrent ``build_heightmap_model`` tasks (the meshing,
+repair and STL export behind ``/api/cat``) through ``CPUExecutor`` once in
+thread mode (``max_workers=0``, what ``asyncio.to_thread`` would give) and
+once with worker processes. Worker start-up is excluded by warming the
+pool first.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/cpu_executor_benchmark.py --jobs 8 --size 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from agents.cad_agent import build_heightmap_model  # noqa: E402
+from core.cpu_executor import CPUExecutor  # noqa: E402
+
+
+async def _run(executor: CPUExecutor, jobs: int, size: int, out_dir: str) -> float:
+    rng = np.random.default_rng(3)
+    heightmaps = [rng.uniform(2.0, 7.0, size=(size, size)).astype(np.float32) for _ in range(jobs)]
+    await executor.warm_up()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        executor.run(build_heightmap_model, heightmap, 0.3, os.path.join(out_dir, f"{index}.stl"))
+        for index, heightmap in enumerate(heightmaps)
+    ))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=8, help="Concurrent conversions")
+    parser.add_argument("--size", type=int, default=256, help="Heightmap edge length in pixels")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU cores)")
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'workers':>8} {'jobs':>5} {'seconds':>9} {'jobs/s':>8}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        for executor in (CPUExecutor(max_workers=0), CPUExecutor(max_workers=args.workers)):
+            try:
+                seconds = asyncio.run(_run(executor, args.jobs, args.size, out_dir))
+            finally:
+                executor.shutdown()
+            stats = executor.get_stats()
+            print(f"{stats['mode']:>10} {stats['max_workers']:>8} {args.jobs:>5} "
+                  f"{seconds:>9.2f} {args.jobs / seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
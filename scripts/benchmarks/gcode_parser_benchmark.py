@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Speed and memory benchmark for the streaming G-code parser.
+
+Writes synthetic G-code files with the given number of lines (layer markers,
+extruding moves, travels and retractions in a typical slicer mix), then
+parses each one with ``core.gcode_parser.parse_gcode_file`` and with the
+previous line-by-line approach (``str.split('\\n')`` plus a dict per command)
+and reports wall time and peak traced memory.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/gcode_parser_benchmark.py --lines 1000000 5000000 20000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.gcode_parser import parse_gcode_file  # noqa: E402
+
+MOVES_PER_LAYER = 5000
+
+
+def _write_synthetic_gcode(path: Path, line_count: int) -> None:
+    """Write roughly ``line_count`` lines of slicer-like G-code."""
+    rng = random.Random(42)
+    with open(path, 'w') as handle:
+        handle.write("M104 S210\nM140 S60\nG28\nG90\nM82\nG92 E0\n")
+        written, layer, e = 6, 0, 0.0
+        while written < line_count:
+            z = 0.2 * (layer + 1)
+            lines = [f";LAYER:{layer}\n", f"G1 Z{z:.3f} F3000\n"]
+            for index in range(MOVES_PER_LAYER):
+                x, y = rng.uniform(10, 190), rng.uniform(10, 190)
+                if index % 50 == 0:
+                    lines.append(f"G1 E{e - 0.8:.5f} F2100\n")
+                    lines.append(f"G0 X{x:.3f} Y{y:.3f} F7200\n")
+                    lines.append(f"G1 E{e:.5f} F2100\n")
+                else:
+                    e += rng.uniform(0.01, 0.2)
+                    lines.append(f"G1 X{x:.3f} Y{y:.3f} E{e:.5f} F1800\n")
+            handle.writelines(lines)
+            written += len(lines)
+            layer += 1
+
+
+def _legacy_parse(path: Path) -> int:
+    """Line-by-line parse as previously done by the preview analyzer."""
+    with open(path, 'r') as handle:
+        content = handle.read()
+    movements = []
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line or line.startswith(';'):
+            continue
+        parts = line.split()
+        params = {}
+        for part in parts[1:]:
+            try:
+                params[part[0]] = float(part[1:])
+            except ValueError:
+                params[part[0]] = part[1:]
+        movements.append({'command': parts[0], 'params': params, 'raw_line': line})
+    return len(movements)
+
+
+def _measure(func: Callable[[Path], object], path: Path) -> Tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(path)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--lines", type=int, nargs="+", default=[1_000_000, 5_000_000],
+        help="Number of G-code lines per synthetic file",
+    )
+    parser.add_argument(
+        "--skip-legacy", action="store_true",
+        help="Only run the streaming parser (the legacy parser needs a lot of RAM)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'lines':>11} {'MB':>8} {'parser':>10} {'seconds':>9} {'peak MiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for line_count in args.lines:
+            path = Path(tmp) / f"bench_{line_count}.gcode"
+            _write_synthetic_gcode(path, line_count)
+            size_mb = path.stat().st_size / 1e6
+
+            runs: Dict[str, Callable[[Path], object]] = {"streaming": parse_gcode_file}
+            if not args.skip_legacy:
+                runs["legacy"] = _legacy_parse
+            for name, func in runs.items():
+                seconds, peak = _measure(func, path)
+                print(f"{line_count:>11} {size_mb:>8.1f} {name:>10} {seconds:>9.2f} {peak:>10.1f}")
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
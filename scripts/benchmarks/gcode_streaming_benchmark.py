@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Lines-per-second benchmark for G-code streaming against the printer emulator.
+
+Streams short, framed G1 segments to ``EmulatedSerialPort`` (Marlin line
+protocol with wire time, response latency and per-command execution time)
+using:
+
+- legacy: one line, then poll ``in_waiting`` with ``time.sleep(0.01)`` until
+  ``ok`` (the previous ``PrinterAgent._send_gcode_line_sync`` loop)
+- stop-and-wait: ``WindowedGCodeStreamer`` with a window of one line
+- windowed: character counting against the RX buffer and BUFSIZE
+- advanced-ok: windowed, with the emulator reporting free slots (ADVANCED_OK)
+- windowed+noise: windowed with every 50th received line corrupted (resends)
+
+Usage (from repository root):
+
+    python scripts/benchmarks/gcode_streaming_benchmark.py --lines 2000 --baudrate 250000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.gcode_streaming import WindowedGCodeStreamer, frame_gcode_line, stream_lines  # noqa: E402
+from printer_support.printer_emulator import EmulatedSerialPort  # noqa: E402
+
+
+def _build_lines(count: int) -> List[str]:
+    lines = [frame_gcode_line("M110 N0", 0)]
+    for index in range(1, count + 1):
+        x, y = 50 + (index % 40) * 0.25, 50 + (index % 17) * 0.4
+        lines.append(frame_gcode_line(f"G1 X{x:.2f} Y{y:.2f} E{index * 0.02:.4f}", index))
+    return lines
+
+
+def _legacy_stream(port: EmulatedSerialPort, lines: List[str]) -> None:
+    for line in lines:
+        port.write(f"{line}\n".encode("utf-8"))
+        port.flush()
+        while True:
+            if port.in_waiting > 0:
+                response = port.readline().decode("utf-8").strip()
+                if response.startswith("ok") or response.startswith("Error"):
+                    break
+            time.sleep(0.01)
+
+
+def _windowed(max_lines: int) -> Callable[[EmulatedSerialPort, List[str]], None]:
+    def run(port: EmulatedSerialPort, lines: List[str]) -> None:
+        stream_lines(WindowedGCodeStreamer(port, max_lines_in_flight=max_lines), lines)
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000, help="G1 segments per run")
+    parser.add_argument("--baudrate", type=int, default=250000)
+    parser.add_argument("--latency", type=float, default=0.002, help="Response latency in seconds")
+    parser.add_argument("--command-time", type=float, default=0.0005, help="Firmware time per command")
+    args = parser.parse_args()
+
+    lines = _build_lines(args.lines)
+    port_options = dict(baudrate=args.baudrate, latency=args.latency, command_time=args.command_time)
+    scenarios: Dict[str, tuple] = {
+        "legacy": (_legacy_stream, {}),
+        "stop-and-wait": (_windowed(1), {}),
+        "windowed": (_windowed(4), {}),
+        "advanced-ok": (_windowed(4), {"advanced_ok": True}),
+        "windowed+noise": (_windowed(4), {"corrupt_every": 50}),
+    }
+
+    wire_limit = args.baudrate / 10 / (sum(len(line) + 1 for line in lines) / len(lines))
+    print(f"Wire limit at {args.baudrate} baud: {wire_limit:,.0f} lines/s\n")
+    print(f"{'mode':>15} {'lines/s':>10} {'seconds':>9}")
+    for name, (run, extra) in scenarios.items():
+        port = EmulatedSerialPort(**port_options, **extra)
+        start = time.perf_counter()
+        run(port, lines)
+        seconds = time.perf_counter() - start
+        port.close()
+        print(f"{name:>15} {len(lines) / seconds:>10,.0f} {seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Speed of the design geometry analysis on large meshes.
+
+Builds spheres with up to ~1.3M triangles as STL-style triangle arrays and
+times ``GeometryAnalyzer.analyze_stl_geometry`` as a whole plus its
+KD-tree based parts (small-feature clustering, ray-cast wall thickness).
+For reference the previous pairwise small-feature loop is timed on its
+1000-vertex sample.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/geometry_analysis_benchmark.py --subdivisions 5 6 7 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Tuple
+
+import numpy as np
+import trimesh
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ai_design_enhancer import GeometryAnalyzer  # noqa: E402
+
+
+def _legacy_small_features(vertices: np.ndarray) -> int:
+    """Pairwise loop over the 1000-vertex sample, as previously used."""
+    sample = vertices[np.random.choice(len(vertices), min(1000, len(vertices)), replace=False)]
+    small_features = 0
+    for i, vertex in enumerate(sample):
+        close_count = 0
+        for j, other in enumerate(sample):
+            if i != j and np.linalg.norm(vertex - other) < 0.5:
+                close_count += 1
+        if close_count > 5:
+            small_features += 1
+    return small_features
+
+
+def _timed(func: Callable[[], object]) -> Tuple[float, object]:
+    start = time.perf_counter()
+    value = func()
+    return time.perf_counter() - start, value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subdivisions", type=int, nargs="+", default=[5, 6, 7, 8],
+                        help="Icosphere subdivisions (8 gives ~1.3M triangles)")
+    parser.add_argument("--legacy", action="store_true", help="Also time the pairwise small-feature loop")
+    args = parser.parse_args()
+
+    analyzer = GeometryAnalyzer()
+    print(f"{'triangles':>10} {'total s':>8} {'features s':>10} {'walls s':>8} "
+          f"{'wall min':>9} {'wall avg':>9} {'legacy s':>9}")
+    for subdivisions in args.subdivisions:
+        sphere = trimesh.creation.icosphere(subdivisions=subdivisions, radius=40.0)
+        triangles = np.asarray(sphere.vertices, dtype=np.float32)[sphere.faces]
+        normals = np.asarray(sphere.face_normals, dtype=np.float32)
+        vertices = triangles.reshape(-1, 3)
+        lower, upper = vertices.min(axis=0), vertices.max(axis=0)
+        geometry = {
+            'vertices': vertices,
+            'normals': normals,
+            'triangle_count': len(triangles),
+            'bounds': {axis: (float(lower[i]), float(upper[i])) for i, axis in enumerate('xyz')},
+        }
+
+        total, _ = _timed(lambda: analyzer.analyze_stl_geometry(geometry))
+        features, _ = _timed(lambda: analyzer._count_small_features(vertices))
+        walls, (wall_min, wall_avg) = _timed(lambda: analyzer._analyze_wall_thickness(vertices, normals))
+        legacy = f"{_timed(lambda: _legacy_small_features(vertices))[0]:>9.2f}" if args.legacy else f"{'-':>9}"
+        print(f"{len(triangles):>10} {total:>8.2f} {features:>10.3f} {walls:>8.2f} "
+              f"{wall_min:>9.2f} {wall_avg:>9.2f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Face count, STL size and time of adaptive vs. per-pixel heightmap meshing.
+
+Converts grayscale images the way ``CADAgent._create_from_image_task``
+does (0-255 to ``--height-scale`` mm on top of a 2 mm base, resized to
+``--size`` pixels) and meshes them twice:
+
+- grid: two triangles per pixel, as the image conversion used before
+  (top surface only, without walls and bottom)
+- adaptive: ``core.heightmap_mesher.heightmap_to_solid``, a watertight
+  solid whose top surface deviates at most ``--max-error`` mm
+
+Without image arguments the procedural cat heightmap is used.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/heightmap_mesher_benchmark.py --size 512 data/uploads/cats/*.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import trimesh
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.cat_heightmap import generate_cat_heightmap  # noqa: E402
+from core.heightmap_mesher import heightmap_to_solid  # noqa: E402
+from core.mesh_kernels import grid_faces, grid_vertices  # noqa: E402
+
+
+def _heightmap(path: Path, size: int, height_scale: float) -> np.ndarray:
+    image = Image.open(path).convert("L")
+    image.thumbnail((size, size))
+    return np.asarray(image, dtype=np.float32) / 255.0 * height_scale + 2.0
+
+
+def _stl_bytes(vertices: np.ndarray, faces: np.ndarray) -> int:
+    buffer = io.BytesIO()
+    trimesh.Trimesh(vertices=vertices, faces=faces, process=False).export(buffer, file_type="stl")
+    return buffer.tell()
+
+
+def _grid(heights: np.ndarray, pixel_size: float) -> Tuple[np.ndarray, np.ndarray]:
+    return grid_vertices(heights, pixel_size, pixel_size), grid_faces(*heights.shape)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="*", type=Path, help="Grayscale images (default: procedural cat)")
+    parser.add_argument("--size", type=int, default=512, help="Longest image side in pixels")
+    parser.add_argument("--height-scale", type=float, default=5.0, help="Relief height in mm")
+    parser.add_argument("--pixel-size", type=float, default=0.3, help="Pixel size in mm")
+    parser.add_argument("--max-error", type=float, default=0.05, help="Surface tolerance in mm")
+    args = parser.parse_args()
+
+    images: List[Path] = list(args.images)
+    with tempfile.TemporaryDirectory() as scratch:
+        if not images:
+            images = [generate_cat_heightmap(Path(scratch) / "cat.png", size=args.size)]
+
+        print(f"{'image':>28} {'pixels':>9} {'grid faces':>10} {'faces':>8} {'ratio':>6} "
+              f"{'grid MB':>8} {'MB':>6} {'seconds':>8} {'watertight':>10}")
+        for path in images:
+            heights = _heightmap(path, args.size, args.height_scale)
+            grid_vertices_, grid_faces_ = _grid(heights, args.pixel_size)
+            start = time.perf_counter()
+            vertices, faces = heightmap_to_solid(heights, args.pixel_size, max_error=args.max_error)
+            seconds = time.perf_counter() - start
+            watertight = trimesh.Trimesh(vertices=vertices, faces=faces, process=False).is_watertight
+            print(f"{path.name[-28:]:>28} {heights.size:>9} {len(grid_faces_):>10} {len(faces):>8} "
+                  f"{len(grid_faces_) / len(faces):>6.1f} {_stl_bytes(grid_vertices_, grid_faces_) / 1e6:>8.1f} "
+                  f"{_stl_bytes(vertices, faces) / 1e6:>6.1f} {seconds:>8.3f} {str(watertight):>10}")
+
+
+if __name__ == "__main__":
+    main()
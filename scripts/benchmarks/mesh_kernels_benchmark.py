@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Speed benchmark for the sparse mesh kernels.
+
+Builds heightmap grid surfaces with 10k to 1M vertices and times
+adjacency construction, Laplacian and Taubin smoothing, surface area and
+volume with ``core.mesh_kernels``. For small meshes the previous
+per-vertex implementation of ``AdvancedImageProcessor`` (a scan over all
+faces for every vertex, O(V*F) per iteration) is timed as well.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/mesh_kernels_benchmark.py --vertices 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.mesh_kernels import (  # noqa: E402
+    grid_faces, grid_vertices, laplacian_smooth, mesh_volume, smoothing_operator,
+    surface_area, taubin_smooth
+)
+
+
+def _legacy_smooth(vertices: np.ndarray, faces: List[List[int]], iterations: int) -> np.ndarray:
+    """Per-vertex neighbour search as previously used by the image processor."""
+    for _ in range(iterations):
+        new_vertices = vertices.copy()
+        for i in range(len(vertices)):
+            neighbors = []
+            for face in faces:
+                if i in face:
+                    neighbors.extend(j for j in face if j != i)
+            if neighbors:
+                new_vertices[i] = np.mean(vertices[neighbors], axis=0)
+        vertices = new_vertices
+    return vertices
+
+
+def _legacy_area(vertices: np.ndarray, faces: List[List[int]]) -> float:
+    total = 0.0
+    for face in faces:
+        v1, v2, v3 = vertices[face[0]], vertices[face[1]], vertices[face[2]]
+        total += 0.5 * np.linalg.norm(np.cross(v2 - v1, v3 - v1))
+    return total
+
+
+def _time(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--vertices", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+        help="Approximate vertex counts (square grids)",
+    )
+    parser.add_argument("--iterations", type=int, default=10, help="Smoothing iterations")
+    parser.add_argument(
+        "--legacy-limit", type=int, default=2_500,
+        help="Largest vertex count timed with the legacy implementation",
+    )
+    args = parser.parse_args()
+
+    print(f"{'vertices':>9} {'faces':>9} {'operation':>16} {'kernel s':>9} {'legacy s':>9}")
+    rng = np.random.default_rng(7)
+    sizes = sorted(set(args.vertices) | {args.legacy_limit})
+    for requested in sizes:
+        side = max(2, int(round(requested ** 0.5)))
+        vertices = grid_vertices(rng.uniform(0, 10, size=(side, side)))
+        faces = grid_faces(side, side)
+
+        operator = None
+
+        def build():
+            nonlocal operator
+            operator = smoothing_operator(faces, len(vertices))
+
+        timings = {
+            "adjacency": _time(build),
+            "laplacian": _time(lambda: laplacian_smooth(vertices, faces, args.iterations, operator=operator)),
+            "taubin": _time(lambda: taubin_smooth(vertices, faces, args.iterations, operator=operator)),
+            "area": _time(lambda: surface_area(vertices, faces)),
+            "volume": _time(lambda: mesh_volume(vertices, faces)),
+        }
+        legacy = {}
+        if len(vertices) <= args.legacy_limit:
+            face_list = faces.tolist()
+            legacy["laplacian"] = _time(lambda: _legacy_smooth(vertices, face_list, args.iterations))
+            legacy["area"] = _time(lambda: _legacy_area(vertices, face_list))
+
+        for name, seconds in timings.items():
+            legacy_text = f"{legacy[name]:>9.3f}" if name in legacy else f"{'-':>9}"
+            print(f"{len(vertices):>9} {len(faces):>9} {name:>16} {seconds:>9.4f} {legacy_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for the in-memory message queue backend.
+
+Fills an ``InMemoryQueueBackend`` with N messages of mixed priority (a share
+of them carrying an expiry deadline), then drains it again and reports
+put/get throughput. A second scenario measures the wake-up latency of a
+consumer blocked in ``get()``.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/message_queue_benchmark.py --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.message_queue import (  # noqa: E402
+    InMemoryQueueBackend,
+    Message,
+    MessagePriority,
+)
+
+
+def _build_messages(count: int, expiring_ratio: float) -> List[Message]:
+    """Create ``count`` messages with random priorities."""
+    priorities = list(MessagePriority)
+    expires_at = datetime.now() + timedelta(hours=1)
+    messages = []
+    for index in range(count):
+        message = Message(
+            id=f"bench-{index}",
+            sender="bench",
+            receiver="bench",
+            message_type="bench_task",
+            payload={"index": index},
+            priority=random.choice(priorities),
+        )
+        if random.random() < expiring_ratio:
+            message.expires_at = expires_at
+        messages.append(message)
+    return messages
+
+
+async def _run_throughput(count: int, expiring_ratio: float) -> Dict[str, float]:
+    backend = InMemoryQueueBackend()
+    messages = _build_messages(count, expiring_ratio)
+
+    start = time.perf_counter()
+    for message in messages:
+        await backend.put(message)
+    put_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(count):
+        message = await backend.get(timeout=0)
+        await backend.ack(message.id)
+    get_seconds = time.perf_counter() - start
+
+    return {
+        "put_per_sec": count / put_seconds,
+        "get_ack_per_sec": count / get_seconds,
+    }
+
+
+async def _run_wakeup_latency(rounds: int) -> float:
+    backend = InMemoryQueueBackend()
+    latencies = []
+    for index in range(rounds):
+        consumer = asyncio.create_task(backend.get(timeout=5.0))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        await backend.put(Message(
+            id=f"wake-{index}", sender="bench", receiver="bench",
+            message_type="bench_task", payload={},
+        ))
+        message = await consumer
+        latencies.append(time.perf_counter() - start)
+        await backend.ack(message.id)
+    return sum(latencies) / len(latencies)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+        help="Number of messages per run",
+    )
+    parser.add_argument(
+        "--expiring-ratio", type=float, default=0.25,
+        help="Share of messages that carry an expiry deadline",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    print(f"{'messages':>10} {'put/s':>12} {'get+ack/s':>12}")
+    for size in args.sizes:
+        result = await _run_throughput(size, args.expiring_ratio)
+        print(f"{size:>10} {result['put_per_sec']:>12,.0f} {result['get_ack_per_sec']:>12,.0f}")
+
+    latency = await _run_wakeup_latency(1000)
+    print(f"\nMean consumer wake-up latency: {latency * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Dashboard query latency of the metric store against JSON metric blobs.
+
+Stores ``--days`` of samples taken every ``--interval`` seconds twice:
+
+- json: one ``metrics_json`` row per sample in ``system_metrics``, read the
+  way ``_get_historical_data`` read it before the metric store (every row
+  of the range parsed once per metric)
+- store: ``MetricStore`` with the SystemMetrics columns and rollups
+
+and times the analytics queries over the 24h, 7d and 30d ranges:
+
+- aggregated: /metrics/aggregated for three metrics (avg)
+- p95: the 95th percentile of one metric (the JSON path sorts in Python)
+- export: /export/metrics, the series of five metrics
+
+Usage (from repository root):
+
+    python scripts/benchmarks/metric_store_benchmark.py --days 30 --interval 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.advanced_analytics import SYSTEM_METRIC_COLUMNS, TIME_RANGES  # noqa: E402
+from core.metric_store import MetricStore  # noqa: E402
+
+AGGREGATED = ["cpu_usage", "memory_usage", "response_time_avg"]
+EXPORTED = ["cpu_usage", "memory_usage", "response_time_avg", "cache_hit_rate", "error_rate"]
+
+
+def _samples(days: int, interval: int, rng: random.Random) -> List[Tuple[datetime, Dict]]:
+    now = datetime.now()
+    count = days * 86400 // interval
+    samples = []
+    for index in range(count):
+        samples.append((now - timedelta(seconds=(count - index) * interval), {
+            "cpu_usage": rng.uniform(5, 95), "memory_usage": rng.uniform(30, 80),
+            "disk_usage": 61.5, "network_io": {"bytes_sent": index * 1000, "bytes_recv": index * 3000},
+            "cache_hit_rate": rng.uniform(40, 99), "active_requests": rng.randrange(20),
+            "response_time_avg": rng.uniform(20, 900), "error_rate": rng.uniform(0, 3),
+            "workflow_count": {"pending": 0, "completed": index}, "queue_size": 0, "temperature": None
+        }))
+    return samples
+
+
+def _json_history(conn: sqlite3.Connection, metric_name: str, time_range: str) -> List[Tuple[datetime, float]]:
+    """_get_historical_data before the metric store."""
+    start_time = datetime.now() - TIME_RANGES[time_range]
+    data_points = []
+    for timestamp_str, metrics_json in conn.execute(
+        "SELECT timestamp, metrics_json FROM system_metrics WHERE timestamp >= ? ORDER BY timestamp",
+        (start_time.isoformat(),)
+    ):
+        metrics_data = json.loads(metrics_json)
+        if metric_name in metrics_data:
+            data_points.append((datetime.fromisoformat(timestamp_str), float(metrics_data[metric_name])))
+    return data_points
+
+
+def _time(operation: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=30, help="Days of stored samples")
+    parser.add_argument("--interval", type=int, default=10, help="Seconds between samples")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per query (median reported)")
+    args = parser.parse_args()
+
+    samples = _samples(args.days, args.interval, random.Random(0))
+
+    with tempfile.TemporaryDirectory() as scratch:
+        conn = sqlite3.connect(Path(scratch) / "legacy.db")
+        conn.execute("CREATE TABLE system_metrics (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "timestamp TEXT NOT NULL, metrics_json TEXT NOT NULL)")
+        start = time.perf_counter()
+        conn.executemany("INSERT INTO system_metrics (timestamp, metrics_json) VALUES (?, ?)",
+                         [(moment.isoformat(), json.dumps({**values, "timestamp": moment}, default=str))
+                          for moment, values in samples])
+        conn.commit()
+        json_load = time.perf_counter() - start
+
+        store = MetricStore(Path(scratch) / "analytics.db", SYSTEM_METRIC_COLUMNS, batch_size=1000)
+        start = time.perf_counter()
+        store.record_many(samples)
+        store.flush()
+        store_load = time.perf_counter() - start
+        print(f"{len(samples)} samples written in one transaction: json {json_load:.1f} s, "
+              f"store {store_load:.1f} s (raw rows and rollups)\n")
+
+        print(f"{'query':>12} {'range':>6} {'resolution':>10} {'json ms':>9} {'store ms':>9} {'speedup':>8}")
+        for time_range in ("24h", "7d", "30d"):
+            since = (datetime.now() - TIME_RANGES[time_range]).timestamp()
+            queries = [
+                ("aggregated",
+                 lambda: {m: statistics.mean(v for _, v in _json_history(conn, m, time_range)) for m in AGGREGATED},
+                 lambda: store.aggregate(AGGREGATED, ["avg"], since)),
+                ("p95",
+                 lambda: sorted(v for _, v in _json_history(conn, "cpu_usage", time_range)),
+                 lambda: store.aggregate(["cpu_usage"], ["p95"], since)),
+                ("export",
+                 lambda: {m: _json_history(conn, m, time_range) for m in EXPORTED},
+                 lambda: store.series(EXPORTED, since)),
+            ]
+            for name, legacy, query in queries:
+                json_ms = _time(legacy, args.repeat)
+                store_ms = _time(query, args.repeat)
+                print(f"{name:>12} {time_range:>6} {store.resolution_for(since, time.time()):>10} "
+                      f"{json_ms:>9.1f} {store_ms:>9.2f} {json_ms / store_ms:>7.0f}x")
+        store.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
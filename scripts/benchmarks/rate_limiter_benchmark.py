@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Per-request overhead and memory of AdvancedRateLimiter backends.
+
+Replays ``--requests`` checks from ``--clients`` users, each with its own
+IP, against ``/api/workflows`` and reports p50/p99 latency of
+``check_rate_limit`` and the number of stored keys for:
+
+- timestamp log: per-key lists of request times rebuilt on every check,
+  the way the limiter worked before token buckets
+- memory: ``MemoryRateLimitBackend``
+- sqlite: ``SQLiteRateLimitBackend`` on a temporary database, the shared
+  backend for several worker processes
+
+The limits are raised so that every request is allowed and the global
+timestamp list keeps growing, as it does under production traffic.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/rate_limiter_benchmark.py --requests 20000 --clients 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.rate_limit_backends import MemoryRateLimitBackend, SQLiteRateLimitBackend  # noqa: E402
+from core.security import AdvancedRateLimiter, RateLimitConfig  # noqa: E402
+
+ENDPOINT = "/api/workflows"
+
+
+class TimestampLogLimiter:
+    """Sliding log per key, pruned by rebuilding the list on every check."""
+
+    def __init__(self, limits: Dict[str, RateLimitConfig]):
+        self.limits = limits
+        self.history: Dict[str, List[float]] = {}
+
+    async def check_rate_limit(self, user_id: str, ip_address: str, endpoint: str) -> bool:
+        now = time.time()
+        layers = [('global', self.limits['global']), (f"user:{user_id}", self.limits['per_user']),
+                  (f"ip:{ip_address}", self.limits['per_ip']),
+                  (f"endpoint:{endpoint}:{user_id}", self.limits['endpoints'][endpoint])]
+        allowed = True
+        for key, config in layers:
+            requests = [t for t in self.history.get(key, []) if now - t < config.window]
+            self.history[key] = requests
+            allowed = allowed and len(requests) < config.requests
+        if allowed:
+            for key, _ in layers:
+                self.history[key].append(now)
+        return allowed
+
+
+def _raise_limits(limiter) -> None:
+    for config in (limiter.limits['global'], limiter.limits['per_user'], limiter.limits['per_ip'],
+                   limiter.limits['endpoints'][ENDPOINT]):
+        config.requests = 10 ** 9
+
+
+async def _replay(limiter, traffic: List[Tuple[str, str]]) -> List[float]:
+    latencies = []
+    for user_id, ip_address in traffic:
+        start = time.perf_counter()
+        await limiter.check_rate_limit(user_id=user_id, ip_address=ip_address, endpoint=ENDPOINT)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000, help="Checks to replay")
+    parser.add_argument("--clients", type=int, default=500, help="Distinct users/IPs")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    traffic = [(f"user{n}", f"10.0.{n // 256}.{n % 256}")
+               for n in (rng.randrange(args.clients) for _ in range(args.requests))]
+
+    with tempfile.TemporaryDirectory() as scratch:
+        limiters = {
+            'timestamp log': None,
+            'memory': AdvancedRateLimiter(MemoryRateLimitBackend()),
+            'sqlite': AdvancedRateLimiter(SQLiteRateLimitBackend(str(Path(scratch) / "limits.db"))),
+        }
+        reference = AdvancedRateLimiter()
+        _raise_limits(reference)
+        limiters['timestamp log'] = TimestampLogLimiter(reference.limits)
+
+        print(f"{'limiter':>14} {'p50 us':>8} {'p99 us':>8} {'keys':>6} {'stored values':>13}")
+        for name, limiter in limiters.items():
+            if isinstance(limiter, AdvancedRateLimiter):
+                _raise_limits(limiter)
+            latencies = asyncio.run(_replay(limiter, traffic))
+            if isinstance(limiter, TimestampLogLimiter):
+                keys = len(limiter.history)
+                values = sum(len(times) for times in limiter.history.values())
+            else:
+                keys = asyncio.run(limiter.backend.size())
+                values = 2 * keys
+            print(f"{name:>14} {_percentile(latencies, 0.5) * 1e6:>8.1f} "
+                  f"{_percentile(latencies, 0.99) * 1e6:>8.1f} {keys:>6} {values:>13}")
+            if not isinstance(limiter, TimestampLogLimiter):
+                limiter.backend.close()
+
+
+if __name__ == "__main__":
+    main()
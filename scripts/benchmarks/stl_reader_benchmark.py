@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Speed and memory benchmark for the NumPy STL reader.
+
+Writes synthetic binary and ASCII STL files with the given number of
+triangles, then reads each one with ``core.stl_reader.read_stl`` and with
+the previous per-triangle reader (12 ``np.frombuffer`` calls per triangle
+into nested lists) and reports wall time and peak traced memory. The
+bounding box is computed in every run.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/stl_reader_benchmark.py --triangles 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.stl_reader import STL_BINARY_DTYPE, read_stl  # noqa: E402
+
+
+def _write_synthetic_stl(path: Path, triangle_count: int, ascii_format: bool) -> None:
+    """Write ``triangle_count`` random triangles."""
+    rng = np.random.default_rng(42)
+    records = np.zeros(triangle_count, dtype=STL_BINARY_DTYPE)
+    records['vertices'] = rng.uniform(0, 100, size=(triangle_count, 3, 3))
+    records['normal'] = rng.normal(size=(triangle_count, 3))
+
+    if not ascii_format:
+        with open(path, 'wb') as handle:
+            handle.write(b'synthetic benchmark'.ljust(80, b' '))
+            handle.write(np.uint32(triangle_count).tobytes())
+            records.tofile(handle)
+        return
+
+    values = np.concatenate([records['normal'][:, None], records['vertices']], axis=1).reshape(-1, 12)
+    facet = (
+        "facet normal {:e} {:e} {:e}\n outer loop\n"
+        "  vertex {:e} {:e} {:e}\n  vertex {:e} {:e} {:e}\n  vertex {:e} {:e} {:e}\n"
+        " endloop\nendfacet\n"
+    )
+    with open(path, 'w') as handle:
+        handle.write("solid synthetic\n")
+        for row in values.tolist():
+            handle.write(facet.format(*row))
+        handle.write("endsolid synthetic\n")
+
+
+def _legacy_read(path: Path) -> int:
+    """Per-triangle reader as previously used by the print preview."""
+    vertices, normals = [], []
+    with open(path, 'rb') as handle:
+        handle.read(80)
+        count = int.from_bytes(handle.read(4), byteorder='little')
+        for _ in range(count):
+            normals.append([float(np.frombuffer(handle.read(4), dtype=np.float32)[0]) for _ in range(3)])
+            for _ in range(3):
+                vertices.append([float(np.frombuffer(handle.read(4), dtype=np.float32)[0]) for _ in range(3)])
+            handle.read(2)
+    array = np.array(vertices)
+    array.min(axis=0), array.max(axis=0)
+    return count
+
+
+def _numpy_read(path: Path) -> int:
+    mesh = read_stl(path)
+    mesh.bounds
+    return mesh.triangle_count
+
+
+def _measure(func: Callable[[Path], object], path: Path) -> Tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(path)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--triangles", type=int, nargs="+", default=[100_000, 1_000_000],
+        help="Number of triangles per synthetic file",
+    )
+    parser.add_argument(
+        "--skip-legacy", action="store_true",
+        help="Only run the NumPy reader (the legacy reader takes minutes for 1M triangles)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'triangles':>10} {'format':>7} {'MB':>8} {'reader':>8} {'seconds':>9} {'peak MiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for triangle_count in args.triangles:
+            for ascii_format in (False, True):
+                label = "ascii" if ascii_format else "binary"
+                path = Path(tmp) / f"bench_{triangle_count}_{label}.stl"
+                _write_synthetic_stl(path, triangle_count, ascii_format)
+                size_mb = path.stat().st_size / 1e6
+
+                runs: Dict[str, Callable[[Path], object]] = {"numpy": _numpy_read}
+                if not args.skip_legacy and not ascii_format:
+                    runs["legacy"] = _legacy_read
+                for name, func in runs.items():
+                    seconds, peak = _measure(func, path)
+                    print(f"{triangle_count:>10} {label:>7} {size_mb:>8.1f} {name:>8} "
+                          f"{seconds:>9.2f} {peak:>10.1f}")
+                path.unlink()
+
+
+if __name__ == "__main__":
+    main()
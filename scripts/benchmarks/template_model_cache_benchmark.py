@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Latency of template customization with and without the model cache.
+
+Customizes a parametric cube template (generated through CADAgent's
+``create_primitive``) with a stream of requests drawn from ``--distinct``
+parameter sets, the way repeated customizations of popular templates
+arrive:
+
+- uncached: every request generates its model, as before the cache
+- cached: ``TemplateLibrary`` with a fresh ``TemplateModelCache``
+- concurrent: ``--concurrency`` identical requests at once on an empty
+  cache, showing how many generations single-flighting leaves
+
+Usage (from repository root):
+
+    python scripts/benchmarks/template_model_cache_benchmark.py --requests 200 --distinct 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.template_library import (  # noqa: E402
+    PrintDifficulty, Template, TemplateCategory, TemplateLibrary, TemplateParameter
+)
+from core.template_model_cache import TemplateModelCache  # noqa: E402
+
+
+def _template() -> Template:
+    return Template(
+        id="benchmark-cube", name="Benchmark Cube", description="", category=TemplateCategory.EDUCATIONAL,
+        difficulty=PrintDifficulty.BEGINNER,
+        parameters=[TemplateParameter("size", "Size", "number", 20, min_value=5, max_value=60)],
+        preview_image="", model_file="", tags=[], author="benchmark",
+        created_at=datetime.now(), updated_at=datetime.now()
+    )
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _run(library: TemplateLibrary, template: Template, sizes: List[float], cached: bool) -> List[float]:
+    latencies = []
+    for size in sizes:
+        start = time.perf_counter()
+        if cached:
+            model = await library._generate_customized_model(template, {"size": size})
+        else:
+            model = await library._build_customized_model(template, {"size": size})
+        latencies.append(time.perf_counter() - start)
+        Path(model["file_path"]).unlink(missing_ok=True)
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Customization requests per run")
+    parser.add_argument("--distinct", type=int, default=10, help="Distinct parameter sets in the stream")
+    parser.add_argument("--concurrency", type=int, default=8, help="Identical requests issued at once")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    choices = [10 + 2 * index for index in range(args.distinct)]
+    sizes = [rng.choice(choices) for _ in range(args.requests)]
+    template = _template()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        library = TemplateLibrary(str(Path(scratch) / "templates"),
+                                  model_cache=TemplateModelCache(Path(scratch) / "cache"))
+        # Build the pooled CAD agent outside the measurement
+        await _run(library, template, [20], cached=False)
+
+        print(f"{'mode':>10} {'requests':>8} {'generated':>9} {'mean ms':>8} {'p50 ms':>7} {'p99 ms':>7}")
+        for mode in ("uncached", "cached"):
+            latencies = await _run(library, template, sizes, cached=mode == "cached")
+            generated = len(sizes) if mode == "uncached" else library.model_cache.stats["stores"]
+            print(f"{mode:>10} {len(sizes):>8} {generated:>9} {statistics.mean(latencies) * 1000:>8.2f} "
+                  f"{_percentile(latencies, 0.5) * 1000:>7.2f} {_percentile(latencies, 0.99) * 1000:>7.2f}")
+
+        stores = library.model_cache.stats["stores"]
+        start = time.perf_counter()
+        models = await asyncio.gather(*[
+            library._generate_customized_model(template, {"size": 59}) for _ in range(args.concurrency)
+        ])
+        seconds = time.perf_counter() - start
+        for model in models:
+            Path(model["file_path"]).unlink(missing_ok=True)
+        print(f"{'concurrent':>10} {args.concurrency:>8} {library.model_cache.stats['stores'] - stores:>9} "
+              f"{seconds * 1000 / args.concurrency:>8.2f} {'-':>7} {'-':>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
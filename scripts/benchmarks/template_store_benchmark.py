@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Query and update latency of the template store against in-memory scans.
+
+Fills a library with ``--templates`` user-created templates and times the
+operations the template routes perform:
+
+- scan: the templates in a dict, filtered and sorted by Python on every
+  call, with every change rewriting the whole of templates.json (the
+  library before TemplateStore)
+- store: ``TemplateStore`` on a temporary SQLite database, returning the
+  listing columns as the template routes do
+
+Listings fetch the first page of ``--page`` templates; searches return
+every match, as the search route does without a limit, or one page.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/template_store_benchmark.py --templates 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.template_library import (  # noqa: E402
+    PrintDifficulty, Template, TemplateCategory, TemplateParameter
+)
+from core.template_store import LISTING_FIELDS, TemplateStore  # noqa: E402
+
+WORDS = ["phone", "stand", "gear", "box", "hook", "clip", "holder", "bracket", "tray", "mount",
+         "cable", "desk", "lid", "hinge", "knob", "spool", "vase", "planter", "sign", "case"]
+
+
+def _templates(count: int, rng: random.Random) -> List[Template]:
+    categories, difficulties = list(TemplateCategory), list(PrintDifficulty)
+    start = datetime(2025, 1, 1)
+    templates = []
+    for index in range(count):
+        words = rng.sample(WORDS, 3)
+        templates.append(Template(
+            id=f"user-{index}", name=f"{words[0].title()} {words[1].title()} {index}",
+            description=f"A printable {words[0]} {words[1]} with a {words[2]}",
+            category=rng.choice(categories), difficulty=rng.choice(difficulties),
+            parameters=[TemplateParameter("width", "Width", "number", 50, 10, 200, unit="mm")],
+            preview_image="", model_file="", tags=rng.sample(WORDS, 2), author=f"user{index % 500}",
+            created_at=start + timedelta(minutes=index), updated_at=start + timedelta(minutes=index),
+            usage_count=rng.randrange(1000), rating=round(rng.uniform(1, 5), 1), rating_count=rng.randrange(50)
+        ))
+    return templates
+
+
+def _scan(templates: Dict[str, Template], category=None, search_term=None, tags=None) -> List[Template]:
+    """search_templates as it filtered the in-memory templates."""
+    found = list(templates.values())
+    if category:
+        found = [t for t in found if t.category.value == category]
+    if search_term:
+        search_lower = search_term.lower()
+        found = [t for t in found if search_lower in t.name.lower() or search_lower in t.description.lower()
+                 or any(search_lower in tag.lower() for tag in t.tags)]
+    if tags:
+        for tag in tags:
+            found = [t for t in found if tag.lower() in [x.lower() for x in t.tags]]
+    return sorted(found, key=lambda t: t.rating, reverse=True)
+
+
+def _rewrite(templates: Dict[str, Template], path: Path) -> None:
+    """_save_all_templates, run after every rating and customization."""
+    with open(path, 'w') as f:
+        json.dump([t.to_dict() for t in templates.values()], f, indent=2, default=str)
+
+
+def _time(operation: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templates", type=int, default=100000, help="User-created templates in the library")
+    parser.add_argument("--page", type=int, default=50, help="Templates per listing page")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per operation (median reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    templates = _templates(args.templates, rng)
+    by_id = {template.id: template for template in templates}
+
+    with tempfile.TemporaryDirectory() as scratch:
+        store = TemplateStore(Path(scratch) / "templates.db")
+        start = time.perf_counter()
+        store.upsert_many(template.to_dict() for template in templates)
+        print(f"loaded {args.templates} templates into the store in {time.perf_counter() - start:.1f} s\n")
+
+        json_path = Path(scratch) / "templates.json"
+        operations = [
+            ("list first page",
+             lambda: _scan(by_id)[:args.page],
+             lambda: store.query(limit=args.page, fields=LISTING_FIELDS)),
+            ("category page",
+             lambda: _scan(by_id, category="mechanical")[:args.page],
+             lambda: store.query(category="mechanical", limit=args.page, fields=LISTING_FIELDS)),
+            ("search 'bracket'",
+             lambda: _scan(by_id, search_term="bracket"),
+             lambda: store.query(text="bracket", fields=LISTING_FIELDS)),
+            ("search page 'bracket'",
+             lambda: _scan(by_id, search_term="bracket")[:args.page],
+             lambda: store.query(text="bracket", limit=args.page, fields=LISTING_FIELDS)),
+            ("search '7 with a h'",
+             lambda: _scan(by_id, search_term="7 with a h"),
+             lambda: store.query(text="7 with a h", fields=LISTING_FIELDS)),
+            ("tags hinge+knob",
+             lambda: _scan(by_id, tags=["hinge", "knob"]),
+             lambda: store.query(tags=["hinge", "knob"], match_all_tags=True, fields=LISTING_FIELDS)),
+            ("rate template",
+             lambda: _rewrite(by_id, json_path),
+             lambda: store.add_rating("user-42", 4)),
+        ]
+
+        print(f"{'operation':>22} {'matches':>8} {'scan ms':>9} {'store ms':>9} {'speedup':>8}")
+        for name, scan, query in operations:
+            result = query()
+            matches = len(result) if isinstance(result, list) else 1
+            scan_ms = _time(scan, args.repeat)
+            store_ms = _time(query, args.repeat)
+            print(f"{name:>22} {matches:>8} {scan_ms:>9.2f} {store_ms:>9.2f} {scan_ms / store_ms:>7.1f}x")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
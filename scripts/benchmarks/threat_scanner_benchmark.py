@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Throughput of InputSanitizer threat detection, per-pattern loop vs. scanner.
+
+Scans JSON-like request payloads of 1 KB to 1 MB, benign or with an
+injection snippet every few kilobytes, with:
+
+- loop: every pattern as its own ``re.search`` (plus ``re.sub`` in
+  strict mode), the way ``InputSanitizer.sanitize_input`` worked before
+- scanner: ``InputSanitizer.sanitize_input``, one trigger-literal pass
+  plus regex confirmation of the candidate patterns
+
+for detection only (``detect_threats``) and for strict sanitization.
+The loop backtracks quadratically on long single-line payloads, so it is
+timed once above 64 KB and skipped above ``--loop-max-kb``.
+
+Usage (from repository root):
+
+    python scripts/benchmarks/threat_scanner_benchmark.py --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.security import InputSanitizer  # noqa: E402
+
+SIZES = [1 << 10, 16 << 10, 256 << 10, 1 << 20]
+RECORD = ('{"name": "cat figurine", "height_mm": 42.5, "infill": 0.2, '
+          '"notes": "print with 0.2mm layers and tree supports on overhangs"}, ')
+ATTACKS = ["' OR 1=1 --", "<script>alert(1)</script>", "../../etc/passwd", "os.system('ls')"]
+
+
+def _payload(size: int, attacks: bool) -> str:
+    records = []
+    length = 0
+    while length < size:
+        record = RECORD
+        if attacks and len(records) % 32 == 31:
+            record = record.replace("tree supports", ATTACKS[len(records) // 32 % len(ATTACKS)])
+        records.append(record)
+        length += len(record)
+    return "".join(records)[:size]
+
+
+def _loop(sanitizer: InputSanitizer, data: str, strict_mode: bool) -> List[str]:
+    threats = []
+    for category, patterns in sanitizer.threat_patterns.items():
+        flags = 0 if category == 'command_injection' else re.IGNORECASE
+        for regex, _ in patterns:
+            if re.search(regex, data, flags):
+                threats.append(category)
+                if strict_mode:
+                    data = re.sub(regex, "", data, flags=flags)
+    return threats
+
+
+def _best(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is reported)")
+    parser.add_argument("--loop-max-kb", type=int, default=256, help="Largest payload timed with the loop")
+    args = parser.parse_args()
+
+    sanitizer = InputSanitizer()
+    cases: List[Tuple[str, bool, bool]] = [
+        ("benign", False, False), ("attacks", True, False), ("attacks strict", True, True),
+    ]
+    print(f"{'payload':>15} {'size':>8} {'loop ms':>9} {'scanner ms':>10} {'speedup':>8} {'MB/s':>7}")
+    for label, attacks, strict_mode in cases:
+        for size in SIZES:
+            data = _payload(size, attacks)
+            loop = None
+            if size <= args.loop_max_kb << 10:
+                loop = _best(lambda: _loop(sanitizer, data, strict_mode), args.repeat if size <= 64 << 10 else 1)
+            if strict_mode:
+                scanner = _best(lambda: sanitizer.sanitize_input(data), args.repeat)
+            else:
+                scanner = _best(lambda: sanitizer.detect_threats(data), args.repeat)
+            loop_ms = f"{loop * 1e3:>9.2f}" if loop is not None else f"{'-':>9}"
+            speedup = f"{loop / scanner:>7.1f}x" if loop is not None else f"{'-':>8}"
+            print(f"{label:>15} {size // 1024:>6}KB {loop_ms} {scanner * 1e3:>10.2f} "
+                  f"{speedup} {size / scanner / 1e6:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Tests for the shared agent pool used by the API routes.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.agent_pool import AgentPool, register_default_agents
+
+
+class DummyAgent:
+    def __init__(self):
+        self.healthy = True
+        self.cleaned_up = False
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+
+class TestAgentPool:
+    """Lazy construction, concurrency limits and health checks."""
+
+    @pytest.mark.asyncio
+    async def test_agent_is_built_once(self):
+        builds = []
+        pool = AgentPool()
+        pool.register('dummy', lambda: builds.append(DummyAgent()) or builds[-1])
+
+        assert not pool.get_stats()['dummy']['created']
+        async with pool.acquire('dummy') as first:
+            pass
+        async with pool.acquire('dummy') as second:
+            pass
+
+        assert first is second
+        assert len(builds) == 1
+        stats = pool.get_stats()['dummy']
+        assert (stats['builds'], stats['acquisitions']) == (1, 2)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_use_builds_once(self):
+        builds = []
+        pool = AgentPool()
+        pool.register('dummy', lambda: builds.append(DummyAgent()) or builds[-1], max_concurrent=4)
+
+        agents = await asyncio.gather(*(pool.get('dummy') for _ in range(8)))
+
+        assert len(builds) == 1
+        assert all(agent is agents[0] for agent in agents)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        pool = AgentPool()
+        pool.register('dummy', DummyAgent, max_concurrent=2)
+        active, peak = 0, 0
+
+        async def request():
+            nonlocal active, peak
+            async with pool.acquire('dummy'):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+
+        await asyncio.gather(*(request() for _ in range(6)))
+
+        assert peak == 2
+        assert pool.get_stats()['dummy']['acquisitions'] == 6
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_agent_is_rebuilt(self):
+        pool = AgentPool()
+        pool.register('dummy', DummyAgent, health_check=lambda agent: agent.healthy)
+        first = await pool.get('dummy')
+
+        first.healthy = False
+        report = await pool.health_check()
+
+        assert report['status'] == 'degraded'
+        assert not report['agents']['dummy']['healthy']
+        second = await pool.get('dummy')
+        assert second is not first
+        assert first.cleaned_up
+        assert (await pool.health_check())['status'] == 'healthy'
+
+    @pytest.mark.asyncio
+    async def test_warm_up_and_shutdown(self):
+        pool = AgentPool()
+        pool.register('dummy', DummyAgent)
+        pool.register('broken', lambda: 1 / 0)
+
+        timings = await pool.warm_up()
+
+        assert list(timings) == ['dummy']
+        assert pool.get_stats()['broken']['failures'] == 1
+        agent = await pool.get('dummy')
+        await pool.shutdown()
+        assert agent.cleaned_up
+        assert not pool.get_stats()['dummy']['created']
+
+
+class TestSlicerRoutesUsePool:
+    """Slicer routes share one agent across requests."""
+
+    @pytest.mark.asyncio
+    async def test_handlers_reuse_agent(self):
+        from api.slicer_routes import get_slicer_agent, list_profiles
+        from core.agent_pool import get_agent_pool
+
+        builds_before = get_agent_pool().get_stats()['slicer']['builds']
+        agents = []
+        for _ in range(2):
+            dependency = get_slicer_agent()
+            agent = await dependency.__anext__()
+            agents.append(agent)
+            profiles = await list_profiles(agent=agent)
+            await dependency.aclose()
+
+        assert agents[0] is agents[1]
+        assert "ender3_pla_standard" in profiles["profiles"]
+        stats = get_agent_pool().get_stats()['slicer']
+        assert stats['builds'] - builds_before <= 1 and stats['active'] == 0
+        await get_agent_pool().shutdown()
+
+    @pytest.mark.asyncio
+    async def test_returned_gcode_outlives_the_pooled_agent(self, tmp_path):
+        model = tmp_path / "cube.stl"
+        model.write_text("solid cube\nfacet normal 0 0 1\n  outer loop\n    vertex 0 0 0\n"
+                         "    vertex 1 0 0\n    vertex 1 1 0\n  endloop\nendfacet\nendsolid cube\n")
+        pool = AgentPool()
+        register_default_agents(pool)
+
+        async with pool.acquire('slicer') as agent:
+            result = await agent.slice_stl(str(model), "ender3_pla_standard")
+        await pool.shutdown()
+
+        gcode = Path(result["gcode_file_path"])
+        assert gcode.exists()
+        assert not getattr(agent, '_temp_files', [])
+        gcode.unlink()
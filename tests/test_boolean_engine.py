@@ -0,0 +1,117 @@
+"""
+Tests for the manifold3d and sparse voxel boolean engines and their use in
+the CAD agent.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+import trimesh
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.boolean_engine import adaptive_pitch, csg, manifold_boolean, voxel_boolean
+from core.exceptions import BooleanOperationError
+
+
+def _box(size=10.0, offset=(0.0, 0.0, 0.0)):
+    box = trimesh.creation.box(extents=[size] * 3)
+    box.apply_translation(offset)
+    return box
+
+
+class TestManifoldEngine:
+    """Exact booleans on closed meshes."""
+
+    @pytest.mark.parametrize("operation, volume", [
+        ('union', 1500.0), ('difference', 500.0), ('intersection', 500.0),
+    ])
+    def test_two_boxes(self, operation, volume):
+        result = manifold_boolean([_box(), _box(offset=(5, 0, 0))], operation)
+
+        assert result.is_watertight
+        assert result.volume == pytest.approx(volume)
+
+    def test_batch_of_operands(self):
+        parts = [_box(offset=(8 * index, 0, 0)) for index in range(5)]
+
+        union = manifold_boolean(parts, 'union')
+        # Difference subtracts every further operand from the first
+        carved = manifold_boolean([_box(40.0), _box(offset=(-10, 0, 0)), _box(offset=(10, 0, 0))], 'difference')
+
+        assert union.volume == pytest.approx(10 * 10 * 42)
+        assert carved.volume == pytest.approx(40 ** 3 - 2000)
+
+    def test_rejects_open_mesh_and_unknown_operation(self):
+        box = _box()
+        open_box = trimesh.Trimesh(box.vertices, box.faces[2:], process=False)
+
+        with pytest.raises(BooleanOperationError):
+            manifold_boolean([open_box, _box(offset=(5, 0, 0))], 'union')
+        with pytest.raises(BooleanOperationError):
+            manifold_boolean([box, box], 'xor')
+
+
+class TestVoxelEngine:
+    """Approximate booleans on a shared sparse grid."""
+
+    @pytest.mark.parametrize("operation, volume", [
+        ('union', 1500.0), ('difference', 500.0), ('intersection', 500.0),
+    ])
+    def test_two_boxes(self, operation, volume):
+        result = voxel_boolean([_box(), _box(offset=(5, 0, 0))], operation)
+
+        assert result.is_watertight
+        assert result.volume == pytest.approx(volume, rel=0.1)
+
+    def test_adaptive_pitch_respects_budget(self):
+        small, large = _box(1.0), _box(1000.0)
+
+        assert adaptive_pitch([small, small]) == pytest.approx(1.0 / 64)
+        assert adaptive_pitch([small, large], voxel_budget=1000) >= 1000.0 / 10 * 0.99
+
+    def test_disjoint_intersection_is_empty(self):
+        result = voxel_boolean([_box(), _box(offset=(50, 0, 0))], 'intersection')
+
+        assert len(result.faces) == 0
+
+    def test_csg_falls_back_for_open_input(self):
+        box = _box()
+        open_box = trimesh.Trimesh(box.vertices, box.faces[2:], process=False)
+
+        _, engine = csg([_box(offset=(5, 0, 0)), open_box], 'union')
+
+        assert engine == 'voxel'
+
+
+class TestCADAgentBooleanEngine:
+    """The boolean task runs all operands through manifold3d."""
+
+    @pytest.mark.asyncio
+    async def test_multi_operand_task(self):
+        from agents.cad_agent import CADAgent
+        from core.api_schemas import CADAgentInput
+        agent = CADAgent("test_boolean_engine")
+        paths = []
+        for index in range(3):
+            handle, path = tempfile.mkstemp(suffix=".stl")
+            os.close(handle)
+            _box(offset=(8 * index, 0, 0)).export(path)
+            paths.append(path)
+        cad_input = CADAgentInput(specifications={
+            'boolean_operation': {'operation_type': 'union', 'operands': paths, 'auto_repair': False},
+        }, requirements={})
+
+        try:
+            result = await agent._boolean_operation_task(cad_input)
+        finally:
+            for path in paths:
+                os.unlink(path)
+        os.unlink(result['result_file_path'])
+
+        assert (result['boolean_engine'], result['operand_count']) == ('manifold', 3)
+        assert result['volume'] == pytest.approx(10 * 10 * 26)
+        assert result['is_watertight']
@@ -0,0 +1,174 @@
+"""
+Tests for the process-pool CPU executor.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.cpu_executor import CPUExecutor, SHARED_MEMORY_MIN_BYTES, _run_in_worker
+from core.exceptions import CPUTaskTimeoutError
+
+
+# Task functions must be importable by the spawned workers
+
+def scale_array(values, factor):
+    return {'scaled': values * factor, 'total': float(values.sum()), 'pid': os.getpid()}
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def worker_pid():
+    return os.getpid()
+
+
+def fail():
+    raise ValueError("bad mesh")
+
+
+@pytest.fixture
+def executor():
+    executor = CPUExecutor(max_workers=2, max_tasks_per_child=None, task_timeout=60)
+    yield executor
+    executor.shutdown()
+
+
+class TestCPUExecutor:
+    """Shared memory transfer, timeouts and worker recycling."""
+
+    @pytest.mark.asyncio
+    async def test_arrays_pass_through_shared_memory(self, executor):
+        values = np.arange(200_000, dtype=np.float64).reshape(-1, 4)
+
+        result = await executor.run(scale_array, values, factor=2.0)
+
+        assert result['pid'] != os.getpid()
+        np.testing.assert_array_equal(result['scaled'], values * 2.0)
+        assert result['total'] == pytest.approx(values.sum())
+        assert executor.get_stats()['shared_bytes'] >= values.nbytes > SHARED_MEMORY_MIN_BYTES
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self, executor):
+        with pytest.raises(ValueError, match="bad mesh"):
+            await executor.run(fail)
+
+        stats = executor.get_stats()
+        assert (stats['failed'], stats['completed']) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_workers(self, executor):
+        with pytest.raises(CPUTaskTimeoutError) as info:
+            await executor.run(sleep_for, 30, timeout=1.0)
+
+        assert info.value.details['timeout_seconds'] == 1.0
+        assert await executor.run(sleep_for, 0) == 0
+        stats = executor.get_stats()
+        assert (stats['timeouts'], stats['pool_restarts']) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_timeout_spares_other_tasks(self, executor):
+        # Started workers keep spawn time out of the timeout margin
+        assert await executor.warm_up() == 2
+        runaway = executor.run(sleep_for, 30, timeout=2.0)
+        other = executor.run(sleep_for, 4)
+
+        results = await asyncio.gather(runaway, other, return_exceptions=True)
+
+        assert isinstance(results[0], CPUTaskTimeoutError)
+        # The other task lost its worker with the pool and was resubmitted
+        assert results[1] == 4
+        stats = executor.get_stats()
+        assert (stats['timeouts'], stats['completed'], stats['pool_restarts']) == (1, 1, 1)
+
+    def test_task_started_after_timeout_is_aborted(self, executor):
+        slot = shared_memory.SharedMemory(create=True, size=16)
+        try:
+            np.ndarray((2,), dtype=np.int64, buffer=slot.buf)[:] = 0
+            # Timed out before any worker published its pid
+            assert executor._kill_worker(executor._pool(), slot) is False
+
+            # The worker that picks the task up late does not run it
+            assert _run_in_worker(fail, (), {}, slot.name) is None
+            assert np.ndarray((2,), dtype=np.int64, buffer=slot.buf)[0] == os.getpid()
+        finally:
+            slot.close()
+            slot.unlink()
+
+    @pytest.mark.asyncio
+    async def test_workers_are_recycled(self):
+        executor = CPUExecutor(max_workers=1, max_tasks_per_child=2)
+        try:
+            pids = [await executor.run(worker_pid) for _ in range(4)]
+        finally:
+            executor.shutdown()
+
+        assert len(set(pids)) == 2
+
+    @pytest.mark.asyncio
+    async def test_thread_mode(self):
+        executor = CPUExecutor(max_workers=0)
+
+        result = await executor.run(scale_array, np.ones(4), 3.0)
+
+        assert result['pid'] == os.getpid()
+        assert result['scaled'].tolist() == [3.0] * 4
+        assert executor.get_stats()['mode'] == 'threads'
+
+
+class TestCADAgentUsesExecutor:
+    """Image conversion runs its meshing in the executor."""
+
+    @pytest.mark.asyncio
+    async def test_create_from_image(self, tmp_path):
+        from PIL import Image
+        from agents.cad_agent import CADAgent
+
+        image_path = tmp_path / "gradient.png"
+        gradient = np.tile(np.linspace(0, 255, 64, dtype=np.uint8), (48, 1))
+        Image.fromarray(gradient).save(image_path)
+        agent = CADAgent("test_cpu_executor")
+        agent.cpu_executor = CPUExecutor(max_workers=1)
+        try:
+            result = await agent._create_from_image_task({'image_path': str(image_path), 'pixel_size_mm': 0.5})
+        finally:
+            agent.cpu_executor.shutdown()
+
+        assert agent.cpu_executor.get_stats()['completed'] == 1
+        # The planar gradient is decimated to far fewer faces than two per pixel
+        assert 0 < result['faces'] < 2 * 47 * 63
+        assert result['mesh_info']['is_watertight']
+        assert result['dimensions']['width'] == pytest.approx(63 * 0.5)
+        assert os.path.getsize(result['stl_file']) > 0
+        os.unlink(result['stl_file'])
+
+    @pytest.mark.asyncio
+    async def test_failed_conversion_removes_its_stl(self, tmp_path, monkeypatch):
+        from PIL import Image
+        from agents.cad_agent import CADAgent
+
+        image_path = tmp_path / "gradient.png"
+        Image.fromarray(np.tile(np.arange(64, dtype=np.uint8), (48, 1))).save(image_path)
+        scratch = tmp_path / "scratch"
+        scratch.mkdir()
+        monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+        agent = CADAgent("test_cpu_executor")
+        agent.cpu_executor = CPUExecutor(max_workers=1, task_timeout=0.01)
+        try:
+            with pytest.raises(CPUTaskTimeoutError):
+                await agent._create_from_image_task({'image_path': str(image_path)})
+        finally:
+            agent.cpu_executor.shutdown()
+
+        assert list(scratch.glob("*.stl")) == []
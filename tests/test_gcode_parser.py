@@ -0,0 +1,131 @@
+"""
+Unit tests for the streaming G-code parser.
+
+Tests cover:
+- Absolute/relative positioning and extrusion modes
+- G92 resets and retractions
+- Comments, checksums and lower-case commands
+- Layer markers and temperature events
+- Chunk boundaries in streaming mode
+"""
+
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.gcode_parser import GCodeStreamParser, parse_gcode_file, parse_gcode_text
+from core.print_preview import GCodeAnalyzer
+
+
+SAMPLE_GCODE = """; header
+M104 S200 ; hot
+M140 S60
+G28
+G90
+M82
+;LAYER:0
+G1 Z0.2 F3000
+G1 X50 Y50 E1 F1500
+G1 X100 Y50 E2
+G1 E1.2 F2100 ; retract
+G92 E0
+G1 F1500 X10 Y10 E0.5 ; out of order
+;LAYER:1
+G91
+G1 Z5
+G90
+G0 X0 Y0
+M83
+N12 G1 X5 E.3*55
+g1 x6 e0.3"""
+
+
+class TestGCodeStreamParser:
+    """Test parsing of G-code into move arrays."""
+    
+    def test_positions_and_modes(self):
+        """Absolute and relative moves resolve to absolute positions."""
+        parsed = parse_gcode_text(SAMPLE_GCODE)
+        
+        assert parsed.move_count == 9
+        assert parsed.total_lines == 21
+        np.testing.assert_allclose(parsed.x, [0, 50, 100, 100, 10, 10, 0, 5, 6])
+        np.testing.assert_allclose(parsed.y, [0, 50, 50, 50, 10, 10, 0, 0, 0])
+        np.testing.assert_allclose(parsed.z, [0.2] * 5 + [5.2] * 4, rtol=1e-6)
+        np.testing.assert_allclose(parsed.f, [3000, 1500, 1500, 2100, 1500, 1500, 1500, 1500, 1500])
+        assert parsed.rapid.tolist() == [False] * 6 + [True, False, False]
+    
+    def test_extrusion_deltas(self):
+        """E deltas honour retractions, G92 resets and M83 relative mode."""
+        parsed = parse_gcode_text(SAMPLE_GCODE)
+        
+        np.testing.assert_allclose(parsed.e, [0, 1, 1, -0.8, 0.5, 0, 0, 0.3, 0.3], atol=1e-6)
+        assert parsed.extruded_length == pytest.approx(2.3, abs=1e-5)
+    
+    def test_layers_and_temperatures(self):
+        """Layer markers and heater commands are indexed by move."""
+        parsed = parse_gcode_text(SAMPLE_GCODE)
+        
+        assert parsed.layer_count == 2
+        assert parsed.layer_ranges() == [(0, 5), (5, 9)]
+        assert parsed.first_temperature('extruder') == 200
+        assert parsed.first_temperature('bed') == 60
+    
+    def test_header_comments_are_not_layers(self):
+        """Header settings such as ;Layer height: do not start a layer."""
+        gcode = ";Layer height: 0.2\n;LAYER_COUNT:2\n" + SAMPLE_GCODE.replace(
+            ";LAYER:1", ";LAYER_CHANGE\n;Z:5.2"
+        )
+        parsed = parse_gcode_text(gcode)
+        
+        assert parsed.layer_count == 2
+        assert parsed.layer_ranges() == [(0, 5), (5, 9)]
+        
+        numbered = parse_gcode_text("; Layer Height: 0.2mm\n; Layer 1\nG1 X1\n; Layer 2\nG1 X2")
+        assert numbered.layer_ranges() == [(0, 1), (1, 2)]
+    
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64])
+    def test_chunk_boundaries(self, chunk_size):
+        """Results do not depend on how the input is split."""
+        expected = parse_gcode_text(SAMPLE_GCODE)
+        parsed = parse_gcode_text(SAMPLE_GCODE, chunk_size=chunk_size)
+        
+        for name in ('x', 'y', 'z', 'e', 'f', 'rapid', 'layer_starts'):
+            np.testing.assert_array_equal(getattr(parsed, name), getattr(expected, name))
+        assert parsed.temperature_events == expected.temperature_events
+    
+    def test_parse_file(self, tmp_path):
+        """Files are streamed from disk."""
+        path = tmp_path / "sample.gcode"
+        path.write_text(SAMPLE_GCODE)
+        
+        parsed = parse_gcode_file(path, chunk_size=16)
+        
+        assert parsed.move_count == 9
+        assert parsed.layer_count == 2
+    
+    def test_empty_input(self):
+        """Empty programs produce empty arrays."""
+        parsed = GCodeStreamParser().finish()
+        
+        assert parsed.move_count == 0
+        assert parsed.layer_count == 0
+        assert parsed.extruded_length == 0.0
+
+
+class TestGCodeAnalyzer:
+    """Test the preview analyzer built on the parser."""
+    
+    def test_layer_summary(self):
+        """Layers carry z position, material and temperatures."""
+        layers, analysis = GCodeAnalyzer().analyze_gcode(SAMPLE_GCODE)
+        
+        assert analysis.total_layers == 2
+        assert layers[0].z_position == pytest.approx(0.2)
+        assert layers[1].z_position == pytest.approx(5.2)
+        assert layers[0].material_usage == pytest.approx(2.5, abs=1e-5)
+        assert layers[0].temperatures == {'extruder': 200, 'bed': 60}
+        assert (layers[1].move_start, layers[1].move_end) == (5, 9)
@@ -0,0 +1,85 @@
+"""
+Tests for the adaptive quadtree heightmap mesher.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import trimesh
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.heightmap_mesher import heightmap_to_solid, quadtree_leaves
+from core.spatial_index import TriangleIndex
+
+
+def _solid(heights, **kwargs):
+    vertices, faces = heightmap_to_solid(heights, **kwargs)
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+
+class TestHeightmapMesher:
+    """Watertight solids with error-bounded top surfaces."""
+
+    @pytest.mark.parametrize("shape", [(2, 2), (3, 5), (17, 9), (40, 33)])
+    def test_random_maps_give_closed_outward_solids(self, shape):
+        heights = np.random.default_rng(0).uniform(1.0, 3.0, size=shape)
+
+        mesh = _solid(heights, pixel_size=0.5)
+
+        assert mesh.is_watertight and mesh.is_winding_consistent
+        assert mesh.volume > 0
+        assert mesh.bounds.ravel() == pytest.approx(
+            [0, 0, 0, (shape[1] - 1) * 0.5, (shape[0] - 1) * 0.5, heights.max()])
+
+    def test_plane_collapses_to_few_faces(self):
+        rows, cols = np.mgrid[0:65, 0:65]
+        heights = 2.0 + 0.1 * cols + 0.05 * rows
+
+        mesh = _solid(heights, max_error=1e-9)
+
+        assert len(quadtree_leaves(heights, 1e-9)) == 1
+        assert len(mesh.faces) < 2 * 64 * 64 / 100
+        assert mesh.volume == pytest.approx(64 * 64 * (2.0 + 0.1 * 32 + 0.05 * 32))
+
+    def test_surface_error_is_bounded(self):
+        rows, cols = np.mgrid[0:50, 0:70]
+        heights = 5.0 + 2.0 * np.sin(cols / 9.0) * np.cos(rows / 7.0)
+
+        mesh = _solid(heights, max_error=0.05)
+        origins = np.column_stack([cols.ravel(), rows.ravel(), np.full(rows.size, 20.0)])
+        # Nudge rays off shared edges and vertices, into the grid
+        origins[:, :2] += np.where(origins[:, :2] < [69, 49], 1.0, -1.0) * [1e-4, 2e-4]
+        depth = TriangleIndex(mesh.triangles).cast(origins, np.tile([0.0, 0.0, -1.0], (rows.size, 1)))
+
+        assert len(mesh.faces) < 2 * 49 * 69
+        assert np.abs((20.0 - depth) - heights.ravel()).max() <= 0.05 + 1e-3
+
+    def test_leaves_cover_every_cell_once(self):
+        heights = np.random.default_rng(1).normal(size=(23, 37)).cumsum(axis=1)
+        coverage = np.zeros((22, 36), dtype=int)
+
+        for row, col, size in quadtree_leaves(heights, 0.5):
+            coverage[row:row + size, col:col + size] += 1
+
+        assert np.all(coverage == 1)
+
+    def test_rejects_degenerate_maps(self):
+        with pytest.raises(ValueError):
+            heightmap_to_solid(np.ones((1, 10)))
+
+
+class TestLocalDepthBackendMesh:
+    """The local depth backend meshes through the adaptive mesher."""
+
+    def test_heightmap_to_mesh_is_watertight(self):
+        from core.ai_backends.local_depth_backend import LocalDepthBackend
+        heights = np.tile(np.linspace(0.0, 10.0, 64), (48, 1))
+
+        mesh = LocalDepthBackend()._heightmap_to_mesh(heights, base_thickness=2.0)
+
+        assert mesh.is_watertight
+        assert mesh.volume == pytest.approx(47 * 63 * 7.0)
+        assert len(mesh.faces) < 2 * 47 * 63
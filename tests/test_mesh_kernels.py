@@ -0,0 +1,144 @@
+"""
+Tests for the sparse mesh kernels and their use in the AdvancedImageProcessor.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.mesh_kernels import (
+    grid_faces, grid_vertices, laplacian_smooth, mesh_volume, signed_volume,
+    smoothing_operator, surface_area, taubin_smooth, vertex_adjacency
+)
+
+# Unit cube (outward faces)
+CUBE_VERTICES = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=float)
+CUBE_FACES = np.array([
+    [0, 2, 1], [0, 3, 2], [4, 5, 6], [4, 6, 7],
+    [0, 1, 5], [0, 5, 4], [2, 3, 7], [2, 7, 6],
+    [0, 4, 7], [0, 7, 3], [1, 2, 6], [1, 6, 5],
+])
+
+
+def _sphere(subdivisions=3):
+    import trimesh
+    mesh = trimesh.creation.icosphere(subdivisions=subdivisions, radius=10.0)
+    return np.asarray(mesh.vertices), np.asarray(mesh.faces)
+
+
+class TestMeshKernels:
+    """Adjacency, smoothing and measures."""
+
+    def test_adjacency_counts_unique_edges(self):
+        adjacency = vertex_adjacency(CUBE_FACES, 8)
+
+        assert (adjacency != adjacency.T).nnz == 0
+        assert set(adjacency.data) == {1.0}
+        # 12 cube edges + 6 face diagonals, both directions
+        assert adjacency.nnz == 2 * 18
+        assert sorted(adjacency[0].indices.tolist()) == [1, 2, 3, 4, 5, 7]
+
+    def test_area_and_volume(self):
+        assert surface_area(CUBE_VERTICES * 10, CUBE_FACES) == pytest.approx(600.0)
+        assert signed_volume(CUBE_VERTICES * 10, CUBE_FACES) == pytest.approx(1000.0)
+        assert mesh_volume(CUBE_VERTICES, CUBE_FACES[:, ::-1]) == pytest.approx(1.0)
+
+    def test_laplacian_step_is_neighbour_mean(self):
+        rng = np.random.default_rng(0)
+        vertices = rng.normal(size=(8, 3))
+
+        smoothed = laplacian_smooth(vertices, CUBE_FACES, iterations=1, lam=1.0)
+
+        adjacency = vertex_adjacency(CUBE_FACES, 8).toarray()
+        for index in range(8):
+            neighbours = np.flatnonzero(adjacency[index])
+            np.testing.assert_allclose(smoothed[index], vertices[neighbours].mean(axis=0))
+
+    def test_isolated_vertices_stay_in_place(self):
+        vertices = np.vstack([CUBE_VERTICES, [[5.0, 5.0, 5.0]]])
+
+        smoothed = laplacian_smooth(vertices, CUBE_FACES, iterations=3)
+
+        np.testing.assert_array_equal(smoothed[8], [5.0, 5.0, 5.0])
+
+    def test_taubin_keeps_volume(self):
+        vertices, faces = _sphere()
+        rng = np.random.default_rng(1)
+        noisy = vertices + rng.normal(scale=0.2, size=vertices.shape)
+        original = mesh_volume(vertices, faces)
+        operator = smoothing_operator(faces, len(vertices))
+
+        laplacian = laplacian_smooth(noisy, faces, iterations=10, lam=0.5, operator=operator)
+        taubin = taubin_smooth(noisy, faces, iterations=10, operator=operator)
+
+        def roughness(points):
+            return np.linalg.norm(operator @ points - points, axis=1).mean()
+
+        assert roughness(taubin) < roughness(noisy) / 2
+        laplacian_loss = abs(mesh_volume(laplacian, faces) - original)
+        taubin_loss = abs(mesh_volume(taubin, faces) - original)
+        assert taubin_loss < laplacian_loss / 5
+
+    def test_taubin_rejects_shrinking_parameters(self):
+        with pytest.raises(ValueError):
+            taubin_smooth(CUBE_VERTICES, CUBE_FACES, lam=0.5, mu=-0.4)
+
+    def test_grid_matches_quad_loop(self):
+        rows, cols = 4, 5
+        expected = []
+        for y in range(rows - 1):
+            for x in range(cols - 1):
+                v1, v2 = y * cols + x, y * cols + x + 1
+                v3, v4 = (y + 1) * cols + x, (y + 1) * cols + x + 1
+                expected += [[v1, v2, v3], [v2, v4, v3]]
+
+        assert grid_faces(rows, cols).tolist() == expected
+        heights = np.arange(rows * cols, dtype=float).reshape(rows, cols)
+        vertices = grid_vertices(heights, scale_x=2.0, scale_y=3.0)
+        assert vertices[7].tolist() == [4.0, 3.0, 7.0]
+
+
+class TestAdvancedImageProcessorMeshOps:
+    """The image processor uses the kernels."""
+
+    @pytest.fixture
+    def processor(self):
+        from agents.advanced_image_processor import AdvancedImageProcessor
+        return AdvancedImageProcessor()
+
+    def test_measures(self, processor):
+        vertices, faces = (CUBE_VERTICES * 10).tolist(), CUBE_FACES.tolist()
+
+        assert processor._calculate_surface_area(vertices, faces) == pytest.approx(600.0)
+        assert processor._calculate_volume(vertices, faces) == pytest.approx(1000.0)
+        assert processor._calculate_volume([], []) == 0.0
+
+    def test_smoothing_methods(self, processor):
+        vertices, faces = _sphere(2)
+
+        laplacian, same_faces = processor._apply_surface_smoothing(vertices.tolist(), faces.tolist(), iterations=2)
+        taubin, _ = processor._apply_surface_smoothing(vertices.tolist(), faces.tolist(), iterations=2,
+                                                       method='taubin', lam=0.5, mu=-0.53)
+
+        assert same_faces == faces.tolist()
+        assert mesh_volume(taubin, faces) > mesh_volume(laplacian, faces)
+
+    @pytest.mark.asyncio
+    async def test_surface_mode_mesh(self, processor):
+        image = (np.indices((32, 48)).sum(axis=0) % 256).astype(np.uint8)
+
+        result = await processor._process_surface_mode(image, {'resolution': 2})
+
+        assert result['status'] == 'completed'
+        assert result['mesh_info']['vertex_count'] == 16 * 24
+        assert result['mesh_info']['face_count'] == 2 * 15 * 23
+        assert len(result['normals']) == result['mesh_info']['face_count']
+        assert result['vertices'][1][0] == 2.0
+        assert result['mesh_info']['surface_area'] > 30 * 46
@@ -0,0 +1,122 @@
+"""
+Tests for the memoized mesh topology analysis and its use in the CAD
+agent quality report.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import trimesh
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.mesh_topology import MeshTopologyCache, analyze_topology, mesh_buffer_key
+
+
+class TestAnalyzeTopology:
+    """Edge incidence, duplicates and size measures."""
+
+    def test_closed_box_matches_trimesh(self):
+        box = trimesh.creation.box(extents=[10, 20, 30])
+
+        topology = analyze_topology(box.vertices, box.faces)
+
+        assert topology.is_watertight and topology.is_manifold
+        assert (topology.boundary_edges, topology.non_manifold_edges) == (0, 0)
+        assert topology.edge_count == len(box.edges_unique)
+        assert topology.volume == pytest.approx(box.volume)
+        assert topology.surface_area == pytest.approx(box.area)
+        assert not topology.has_degenerate_geometry
+
+    def test_open_box_has_boundary_edges(self):
+        box = trimesh.creation.box(extents=[10, 10, 10])
+        top = np.asarray(box.face_normals)[:, 2] > 0.9
+        faces = np.asarray(box.faces)[~top]
+
+        topology = analyze_topology(box.vertices, faces)
+
+        assert topology.boundary_edges == 4
+        assert not topology.is_watertight
+        assert topology.is_manifold
+
+    def test_non_manifold_fin_and_duplicates(self):
+        vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1],
+                             [0, 0, 0]], dtype=float)
+        # Three faces share the edge 0-1; the last face repeats the first
+        faces = np.array([[0, 1, 2], [1, 0, 3], [0, 1, 4], [2, 1, 0], [0, 5, 1]])
+
+        topology = analyze_topology(vertices, faces)
+
+        assert topology.non_manifold_edges == 1
+        assert topology.duplicate_faces == 1
+        assert topology.duplicate_vertices == 1
+        assert topology.degenerate_faces == 1
+        assert topology.has_degenerate_geometry and not topology.is_manifold
+
+    def test_empty_mesh(self):
+        topology = analyze_topology(np.zeros((0, 3)), np.zeros((0, 3), dtype=int))
+
+        assert topology.face_count == 0
+        assert not topology.is_watertight
+
+
+class TestTopologyCache:
+    """Memoization by buffer hash."""
+
+    def test_hits_until_the_mesh_changes(self):
+        cache = MeshTopologyCache(max_entries=2)
+        mesh = trimesh.creation.box(extents=[5, 5, 5])
+
+        first = cache.get(mesh)
+        assert cache.get(mesh) is first
+        assert cache.get(mesh.copy()) is first
+
+        mesh.vertices = mesh.vertices * 2.0
+        scaled = cache.get(mesh)
+
+        assert scaled.volume == pytest.approx(first.volume * 8)
+        assert cache.get_stats()['hits'] == 2
+        assert cache.get_stats()['misses'] == 2
+
+    def test_lru_eviction(self):
+        cache = MeshTopologyCache(max_entries=1)
+        box = trimesh.creation.box()
+        sphere = trimesh.creation.icosphere(subdivisions=1)
+
+        cache.get(box)
+        cache.get(sphere)
+
+        assert cache.get_stats()['evictions'] == 1
+        assert cache.get_stats()['entries'] == 1
+
+    def test_key_ignores_array_dtype(self):
+        box = trimesh.creation.box()
+
+        assert mesh_buffer_key(box.vertices, box.faces) == \
+            mesh_buffer_key(box.vertices.astype(np.float32).astype(np.float64), box.faces.astype(np.int32))
+
+
+class TestCADAgentQualityReport:
+    """The quality report and the checks share one analysis per mesh."""
+
+    def test_report_uses_cached_topology(self):
+        from agents.cad_agent import CADAgent
+        agent = CADAgent("test_mesh_topology")
+        agent.topology_cache = MeshTopologyCache()
+        box = trimesh.creation.box(extents=[10, 10, 10])
+        open_box = trimesh.Trimesh(box.vertices, box.faces[2:], process=False)
+
+        report = agent._generate_mesh_quality_report(open_box)
+        # The report hashes the mesh buffers once and hands the analysis to its checks
+        assert agent.topology_cache.get_stats()['misses'] == 1
+        assert agent.topology_cache.get_stats()['hits'] == 0
+        agent._assess_stl_printability(open_box, "unused.stl")
+
+        assert report['boundary_edges'] == 4
+        assert report['non_manifold_edges'] == 0
+        assert report['is_watertight'] is False
+        assert report['surface_area'] == pytest.approx(open_box.area)
+        stats = agent.topology_cache.get_stats()
+        assert stats['misses'] == 1 and stats['hits'] == 1
@@ -386,6 +386,36 @@ class TestInMemoryQueueBackend:
         assert result is None
         assert 0.1 <= elapsed <= 0.2  # Should respect timeout
     
+    @pytest.mark.asyncio
+    async def test_waiting_consumer_wakes_on_put(self, backend, messages):
+        """Test that a blocked get() returns as soon as a message is queued."""
+        consumer = asyncio.create_task(backend.get(timeout=5.0))
+        await asyncio.sleep(0.01)
+        
+        start_time = time.time()
+        await backend.put(messages[0])
+        retrieved = await consumer
+        
+        assert retrieved.id == messages[0].id
+        assert time.time() - start_time < 0.05  # No polling interval
+    
+    @pytest.mark.asyncio
+    async def test_expired_messages_free_capacity(self):
+        """Test that expired messages are dropped lazily and do not count."""
+        backend = InMemoryQueueBackend(max_size=2)
+        
+        for _ in range(2):
+            msg = create_test_message()
+            msg.expires_at = datetime.now() + timedelta(milliseconds=20)
+            await backend.put(msg)
+        
+        await asyncio.sleep(0.05)
+        
+        assert await backend.size() == 0
+        assert await backend.peek() is None
+        await backend.put(create_test_message())
+        assert backend.get_stats()["queue_size"] == 1
+    
     @pytest.mark.asyncio
     async def test_ack_unknown_message(self, backend):
         """Test acknowledging unknown message."""
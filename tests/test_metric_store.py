@@ -0,0 +1,185 @@
+"""
+Tests for the time-series metric store and its use in AdvancedAnalytics.
+"""
+
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.advanced_analytics import AdvancedAnalytics
+from core.metric_store import MetricStore
+
+METRICS = {"cpu_usage": "REAL", "queue_size": "INTEGER", "temperature": "REAL"}
+
+# An hour boundary keeps the rollup buckets predictable; recent enough to
+# be within every retention period
+HOUR = float((int(time.time()) // 3600 - 3) * 3600)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetricStore(tmp_path / "metrics.db", METRICS, batch_size=1000)
+    # Two samples per minute for two hours: cpu_usage counts up, temperature every other sample
+    store.record_many(
+        (HOUR + 30 * i, {"cpu_usage": float(i), "queue_size": i % 3,
+                         "temperature": None if i % 2 else 40.0})
+        for i in range(240)
+    )
+    yield store
+    store.close()
+
+
+class TestMetricStore:
+    """Batched writes, rollups and SQL aggregation."""
+
+    def test_writes_are_batched(self, tmp_path):
+        store = MetricStore(tmp_path / "metrics.db", METRICS, batch_size=3, flush_interval=3600)
+
+        store.record(HOUR, {"cpu_usage": 1.0, "unknown": 5, "queue_size": "busy"})
+        store.record(HOUR + 1, {"cpu_usage": float("nan")})
+        assert store.get_stats()["buffered"] == 2 and store.get_stats()["flushes"] == 0
+
+        store.record(HOUR + 2, {"cpu_usage": 3.0})
+        assert store.get_stats()["flushes"] == 1
+        assert store.aggregate(["cpu_usage", "queue_size"], ["count"], HOUR, HOUR + 10, "raw") == {
+            "cpu_usage": {"count": 2}, "queue_size": {"count": 0}
+        }
+        store.close()
+
+    def test_rollups_match_raw_aggregates(self, store):
+        end = HOUR + 7200
+        aggregations = ["avg", "min", "max", "sum", "count"]
+        raw = store.aggregate(list(METRICS), aggregations, HOUR, end, "raw")
+
+        for resolution in ("1m", "1h", "1d"):
+            rolled_up = store.aggregate(list(METRICS), aggregations, HOUR, end, resolution)
+            for name in METRICS:
+                assert rolled_up[name] == pytest.approx(raw[name])
+        assert raw["cpu_usage"] == {"avg": 119.5, "min": 0.0, "max": 239.0, "sum": 28680.0, "count": 240}
+        assert raw["temperature"]["count"] == 120
+        assert store.count("1m") == 120 and store.count("1h") == 2
+
+    def test_percentiles(self, store):
+        end = HOUR + 7200
+
+        raw = store.aggregate(["cpu_usage"], ["p50", "p95", "p100"], HOUR, end, "raw")["cpu_usage"]
+        hourly = store.aggregate(["cpu_usage"], ["p50"], HOUR, end, "1h")["cpu_usage"]
+
+        assert raw == {"p50": 119.0, "p95": 227.0, "p100": 239.0}
+        # Rollup percentiles rank the bucket averages (59.5 and 179.5)
+        assert hourly == {"p50": 59.5}
+        with pytest.raises(ValueError):
+            store.aggregate(["cpu_usage"], ["median"], HOUR, end)
+
+    def test_series_and_empty_ranges(self, store):
+        series = store.series(["cpu_usage", "temperature"], HOUR, HOUR + 7200, "1h")
+
+        assert series["cpu_usage"] == [(datetime.fromtimestamp(HOUR), 59.5),
+                                       (datetime.fromtimestamp(HOUR + 3600), 179.5)]
+        assert len(store.series(["temperature"], HOUR, HOUR + 7200, "raw")["temperature"]) == 120
+        assert store.aggregate(["cpu_usage"], ["avg", "sum", "p50"], 0, 10) == {
+            "cpu_usage": {"avg": None, "sum": None, "p50": None}
+        }
+        with pytest.raises(ValueError):
+            store.series(["cpu_usage; DROP TABLE metric_samples"], HOUR)
+
+    def test_resolution_follows_range_and_retention(self, tmp_path):
+        store = MetricStore(tmp_path / "metrics.db", METRICS)
+        expiring = MetricStore(tmp_path / "metrics.db", METRICS, retention={"raw": 1800, "1m": 3600})
+        now = time.time()
+
+        assert store.resolution_for(now - 3600, now) == "raw"
+        assert store.resolution_for(now - 86400, now) == "1m"
+        assert store.resolution_for(now - 30 * 86400, now) == "1h"
+        assert store.resolution_for(now - 365 * 86400, now) == "1d"
+        # Neither raw samples nor 1-minute buckets reach back two hours here
+        assert expiring.resolution_for(now - 7200, now) == "1h"
+
+    def test_retention_deletes_old_rows(self, store):
+        deleted = store.apply_retention(now=HOUR + 7200 + 7 * 86400)
+
+        assert deleted == 240
+        assert store.count("raw") == 0 and store.count("1h") == 2
+
+    def test_new_metrics_get_columns(self, tmp_path, store):
+        store.close()
+        reopened = MetricStore(store.db_path, {**METRICS, "error_rate": "REAL"})
+        reopened.record(HOUR, {"error_rate": 2.5})
+        reopened.flush()
+
+        assert reopened.aggregate(["error_rate", "cpu_usage"], ["count"], HOUR, HOUR + 7200, "1h") == {
+            "error_rate": {"count": 1}, "cpu_usage": {"count": 240}
+        }
+        reopened.close()
+
+
+class TestAdvancedAnalyticsMetrics:
+    """AdvancedAnalytics reads its history from the metric store."""
+
+    @pytest.mark.asyncio
+    async def test_collected_metrics_are_queryable(self, tmp_path):
+        analytics = AdvancedAnalytics(tmp_path)
+        for _ in range(3):
+            await analytics.collect_metrics()
+
+        history = await analytics._get_historical_data("cpu_usage", "1h")
+        aggregated = await analytics.aggregate_metrics(["cpu_usage", "network_io"], "24h", ("count", "p95", "mode"))
+
+        assert len(history) == 3
+        assert aggregated["cpu_usage"]["count"] == 3 and aggregated["cpu_usage"]["p95"] is not None
+        assert aggregated["cpu_usage"]["mode"] is None
+        assert aggregated["network_io"] == {"count": None, "p95": None, "mode": None}
+        assert (await analytics._get_period_summary("24h"))["data_points"] == 3
+        analytics.metric_store.close()
+
+    @staticmethod
+    def _legacy_samples(db_path, start):
+        """JSON samples as stored before the metric store: one per minute and one broken row"""
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE system_metrics (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            timestamp TEXT NOT NULL, metrics_json TEXT NOT NULL,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP)""")
+            for minute in range(20):
+                stamp = start + timedelta(minutes=minute)
+                conn.execute("INSERT INTO system_metrics (timestamp, metrics_json) VALUES (?, ?)",
+                             (stamp.isoformat(), json.dumps({"cpu_usage": minute, "network_io": {"bytes_sent": 1}})))
+            conn.execute("INSERT INTO system_metrics (timestamp, metrics_json) VALUES (?, ?)",
+                         (start.isoformat(), "not json"))
+
+    @pytest.mark.asyncio
+    async def test_json_samples_are_migrated(self, tmp_path):
+        self._legacy_samples(tmp_path / "analytics.db", datetime.now() - timedelta(minutes=30))
+
+        analytics = AdvancedAnalytics(tmp_path)
+
+        history = await analytics._get_historical_data("cpu_usage", "1h")
+        assert [value for _, value in history] == [float(minute) for minute in range(20)]
+        trend = await analytics.analyze_performance_trends("cpu_usage", "1h")
+        assert trend.trend_direction == "increasing"
+        analytics.metric_store.close()
+
+        # The legacy table is gone, so a restart imports nothing
+        assert AdvancedAnalytics(tmp_path).metric_store.count() == 20
+
+    def test_expired_samples_are_migrated_once(self, tmp_path):
+        self._legacy_samples(tmp_path / "analytics.db", datetime.now() - timedelta(days=20))
+
+        first = AdvancedAnalytics(tmp_path).metric_store
+        # Raw retention (7 days) already dropped the imported samples; the rollups keep them
+        assert first.count() == 0
+        daily = first.aggregate(["cpu_usage"], ["count"], 0, time.time(), "1d")
+        assert daily == {"cpu_usage": {"count": 20}}
+        first.close()
+
+        second = AdvancedAnalytics(tmp_path).metric_store
+        assert second.aggregate(["cpu_usage"], ["count"], 0, time.time(), "1d") == daily
+        second.close()
+        with sqlite3.connect(tmp_path / "analytics.db") as conn:
+            assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'system_metrics'").fetchone() is None
@@ -22,7 +22,7 @@ from parent_agent import (
 )
 from core.api_schemas import TaskResult, AgentStatus
 from core.message_queue import Message, MessagePriority, create_message_queue
-from core.exceptions import WorkflowError, AgentCommunicationError, ValidationError
+from core.exceptions import WorkflowError, AgentCommunicationError, AgentTimeoutError, ValidationError
 
 
 @pytest.fixture
@@ -321,6 +321,59 @@ class TestParentAgent:
         assert response_key in parent_agent.agent_responses
         assert parent_agent.agent_responses[response_key]["success"] is True
     
+    @pytest.mark.asyncio
+    async def test_send_agent_message_resolves_on_response(self, parent_agent):
+        """Test that a task response wakes the waiting sender immediately."""
+        send_task = asyncio.create_task(
+            parent_agent._send_agent_message("cad_agent", "task_1", {"x": 1})
+        )
+        await asyncio.sleep(0)
+        
+        sent_message = parent_agent.message_queue.send.call_args[0][0]
+        assert sent_message.payload["correlation_id"] == sent_message.id
+        
+        await parent_agent._handle_message(Message(
+            sender="cad_agent",
+            receiver=parent_agent.agent_id,
+            message_type="task_response",
+            payload={
+                "task_id": "task_1",
+                "correlation_id": sent_message.id,
+                "success": True,
+                "data": {"model_file": "model.stl"}
+            }
+        ))
+        
+        response = await asyncio.wait_for(send_task, timeout=0.5)
+        assert response["data"]["model_file"] == "model.stl"
+        assert parent_agent._pending_responses == {}
+        assert parent_agent.agent_responses == {}
+    
+    @pytest.mark.asyncio
+    async def test_send_agent_message_timeout(self, parent_agent):
+        """Test that an unanswered request times out and cleans up."""
+        parent_agent.timeout = 0.05
+        with pytest.raises(AgentTimeoutError):
+            await parent_agent._send_agent_message("cad_agent", "task_2", {})
+        
+        assert parent_agent._pending_responses == {}
+        assert parent_agent._response_keys == {}
+    
+    @pytest.mark.asyncio
+    async def test_send_agent_message_cancellation(self, parent_agent):
+        """Test that cancelling a waiting sender unregisters its future."""
+        send_task = asyncio.create_task(
+            parent_agent._send_agent_message("cad_agent", "task_3", {})
+        )
+        await asyncio.sleep(0)
+        assert len(parent_agent._pending_responses) == 1
+        
+        send_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await send_task
+        
+        assert parent_agent._pending_responses == {}
+    
     @pytest.mark.asyncio
     async def test_workflow_step_execution_input_data(self, parent_agent):
         """Test workflow step input data preparation."""
@@ -343,6 +396,137 @@ class TestParentAgent:
         printer_step = workflow.steps[3]
         assert printer_step.agent_type == "printer_agent"
     
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self, parent_agent):
+        """Test that steps without mutual dependencies overlap."""
+        workflow_id = await parent_agent.create_workflow("Slice variants")
+        workflow = parent_agent.active_workflows[workflow_id]
+        research, cad, slicer, printer = workflow.steps
+        # Slicing and printing no longer wait on each other in this graph
+        slicer.depends_on = [research.step_id]
+        printer.depends_on = [research.step_id]
+        
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def fake_send(agent_type, task_id, data):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return {"success": True, "data": {}}
+        
+        with patch.object(parent_agent, "_send_agent_message", side_effect=fake_send):
+            result = await parent_agent.execute_workflow(workflow_id)
+        
+        assert result.success is True
+        assert max_in_flight == 3
+    
+    @pytest.mark.asyncio
+    async def test_agent_concurrency_limit(self, parent_agent):
+        """Test that per-agent-type limits hold across workflows."""
+        parent_agent.agent_concurrency["research_agent"] = 1
+        workflow_ids = [
+            await parent_agent.create_workflow(f"Request {i}") for i in range(2)
+        ]
+        
+        active_research = 0
+        max_active_research = 0
+        
+        async def fake_send(agent_type, task_id, data):
+            nonlocal active_research, max_active_research
+            if agent_type == "research_agent":
+                active_research += 1
+                max_active_research = max(max_active_research, active_research)
+                await asyncio.sleep(0.02)
+                active_research -= 1
+            return {"success": True, "data": {}}
+        
+        with patch.object(parent_agent, "_send_agent_message", side_effect=fake_send):
+            results = await asyncio.gather(
+                *(parent_agent.execute_workflow(wid) for wid in workflow_ids)
+            )
+        
+        assert all(result.success for result in results)
+        assert max_active_research == 1
+    
+    @pytest.mark.asyncio
+    async def test_retry_backoff_releases_agent_slot(self, parent_agent):
+        """Test that a step waiting to retry does not hold its agent's slot."""
+        parent_agent.agent_concurrency["cad_agent"] = 1
+        workflow_ids = [
+            await parent_agent.create_workflow(f"Request {i}") for i in range(2)
+        ]
+        parent_agent.active_workflows[workflow_ids[0]].steps[1].max_retries = 2
+        cad_calls = []
+        
+        async def fake_send(agent_type, task_id, data):
+            if agent_type != "cad_agent":
+                return {"success": True, "data": {}}
+            cad_calls.append(task_id)
+            if len(cad_calls) == 1:
+                return {"success": False, "error": "transient"}
+            return {"success": True, "data": {}}
+        
+        with patch.object(parent_agent, "_send_agent_message", side_effect=fake_send), \
+                patch.object(parent_agent, "_retry_delay", return_value=0.1):
+            results = await asyncio.gather(
+                *(parent_agent.execute_workflow(wid) for wid in workflow_ids)
+            )
+        
+        assert all(result.success for result in results)
+        # The second workflow's CAD step ran while the first one backed off
+        assert [call.rsplit("_", 1)[0] for call in cad_calls] == [
+            workflow_ids[0], workflow_ids[1], workflow_ids[0]
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_step_retry_with_jitter_and_skip_on_failure(self, parent_agent):
+        """Test in-place retries and skipping of dependent steps."""
+        workflow_id = await parent_agent.create_workflow("Create a cube")
+        workflow = parent_agent.active_workflows[workflow_id]
+        workflow.steps[1].max_retries = 3
+        
+        async def fake_send(agent_type, task_id, data):
+            if agent_type == "cad_agent":
+                return {"success": False, "error": "mesh generation failed"}
+            return {"success": True, "data": {}}
+        
+        with patch.object(parent_agent, "_send_agent_message", side_effect=fake_send), \
+                patch("asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            result = await parent_agent.execute_workflow(workflow_id)
+        
+        assert result.success is False
+        assert "mesh generation failed" in result.error_message
+        assert workflow.steps[1].retry_count == 3
+        assert mock_sleep.await_count == 2
+        for call in mock_sleep.await_args_list:
+            assert 0 <= call.args[0] <= parent_agent.retry_max_delay
+        assert workflow.steps[2].status == WorkflowStepStatus.SKIPPED
+        assert workflow.steps[3].status == WorkflowStepStatus.SKIPPED
+    
+    @pytest.mark.asyncio
+    async def test_finished_workflows_release_admission(self, parent_agent):
+        """Test that completed workflows do not count against the limit."""
+        for i in range(parent_agent.max_concurrent_workflows):
+            workflow_id = await parent_agent.create_workflow(f"Request {i}")
+            parent_agent.active_workflows[workflow_id].state = WorkflowState.COMPLETED
+        
+        # Should not raise now that earlier workflows are finished
+        await parent_agent.create_workflow("Next request")
+    
+    @pytest.mark.asyncio
+    async def test_dependency_cycle_rejected(self, parent_agent):
+        """Test that cyclic step graphs are rejected before execution."""
+        workflow_id = await parent_agent.create_workflow("Cyclic")
+        workflow = parent_agent.active_workflows[workflow_id]
+        workflow.steps[0].depends_on = [workflow.steps[3].step_id]
+        
+        with pytest.raises(WorkflowError) as exc_info:
+            await parent_agent.execute_workflow(workflow_id)
+        assert exc_info.value.error_code == "INVALID_WORKFLOW_DEPENDENCIES"
+    
     def test_string_representations(self, parent_agent):
         """Test string representations of ParentAgent."""
         str_repr = str(parent_agent)
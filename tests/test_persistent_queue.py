@@ -0,0 +1,340 @@
+"""
+Unit tests for the persistent message queue backends.
+
+Tests cover:
+- Durability across backend re-creation
+- Priority ordering and group-committed puts
+- Visibility timeouts and redelivery
+- Dead-letter routing
+- Multiple consumers sharing one queue
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.message_queue import (
+    MessagePriority, MessageQueue, MessageStatus, create_message_queue,
+    create_message_queue_from_config, create_test_message
+)
+from core.persistent_queue import RedisQueueBackend, SQLiteQueueBackend
+from core.exceptions import InvalidMessageError, MessageNotFoundError, QueueFullError
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Temporary SQLite database path."""
+    return str(tmp_path / "queue.db")
+
+
+@pytest.fixture
+def redis_server():
+    """In-process Redis server stub."""
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    """Async client of the Redis stub."""
+    import fakeredis
+    return fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+
+
+class TestSQLiteQueueBackend:
+    """Test SQLite queue backend."""
+    
+    @pytest.mark.asyncio
+    async def test_messages_survive_restart(self, db_path):
+        """Test that queued messages are persisted to disk."""
+        backend = SQLiteQueueBackend(db_path, queue_name="jobs")
+        message = create_test_message(payload={"gcode": "part.gcode"})
+        await backend.put(message)
+        backend.close()
+        
+        reopened = SQLiteQueueBackend(db_path, queue_name="jobs")
+        retrieved = await reopened.get(timeout=0.1)
+        assert retrieved.id == message.id
+        assert retrieved.payload == {"gcode": "part.gcode"}
+        assert retrieved.status == MessageStatus.PROCESSING
+        
+        await reopened.ack(retrieved.id)
+        assert await reopened.size() == 0
+    
+    @pytest.mark.asyncio
+    async def test_priority_ordering_with_batched_puts(self, db_path):
+        """Test that concurrent puts are committed and dequeued by priority."""
+        backend = SQLiteQueueBackend(db_path)
+        messages = [
+            create_test_message(priority=MessagePriority.LOW),
+            create_test_message(priority=MessagePriority.HIGH),
+            create_test_message(priority=MessagePriority.CRITICAL),
+        ]
+        await backend.put_many(messages)
+        
+        order = [(await backend.get(timeout=0.1)).priority for _ in messages]
+        assert order == [MessagePriority.CRITICAL, MessagePriority.HIGH, MessagePriority.LOW]
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_and_full(self, db_path):
+        """Test duplicate detection and size limit."""
+        backend = SQLiteQueueBackend(db_path, max_size=1)
+        message = create_test_message()
+        await backend.put(message)
+        
+        with pytest.raises(InvalidMessageError):
+            await SQLiteQueueBackend(db_path, max_size=2).put(message)
+        with pytest.raises(QueueFullError):
+            await backend.put(create_test_message())
+    
+    @pytest.mark.asyncio
+    async def test_visibility_timeout_redelivers(self, db_path):
+        """Test that an unacknowledged message becomes visible again."""
+        crashed_worker = SQLiteQueueBackend(db_path, visibility_timeout=0.05)
+        other_worker = SQLiteQueueBackend(db_path, visibility_timeout=0.05)
+        await crashed_worker.put(create_test_message())
+        
+        claimed = await crashed_worker.get(timeout=0.1)
+        assert await other_worker.get(timeout=0) is None
+        
+        await asyncio.sleep(0.1)
+        redelivered = await other_worker.get(timeout=0.1)
+        assert redelivered.id == claimed.id
+        
+        # The original lease is gone, so the first worker may not ack
+        with pytest.raises(MessageNotFoundError):
+            await crashed_worker.ack(claimed.id)
+        await other_worker.ack(redelivered.id)
+    
+    @pytest.mark.asyncio
+    async def test_expired_leases_count_as_retries(self, db_path):
+        """Test that a message that keeps crashing its consumer is dead-lettered."""
+        backend = SQLiteQueueBackend(db_path, queue_name="jobs", visibility_timeout=0.02)
+        message = create_test_message()
+        message.max_retries = 2
+        await backend.put(message)
+        
+        assert (await backend.get(timeout=0.1)).retry_count == 0
+        await asyncio.sleep(0.05)
+        assert (await backend.get(timeout=0.1)).retry_count == 1
+        await asyncio.sleep(0.05)
+        assert await backend.get(timeout=0) is None
+        
+        assert backend.get_stats()["dead_letter_count"] == 1
+        dead = await SQLiteQueueBackend(db_path, queue_name="jobs.dead_letter").get(timeout=0.1)
+        assert dead.id == message.id and dead.retry_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_nack_routes_to_dead_letter_queue(self, db_path):
+        """Test retries followed by dead-letter routing."""
+        backend = SQLiteQueueBackend(db_path, queue_name="jobs")
+        message = create_test_message()
+        message.max_retries = 2
+        await backend.put(message)
+        
+        first = await backend.get(timeout=0.1)
+        await backend.nack(first.id)
+        retry = await backend.get(timeout=0.1)
+        assert retry.retry_count == 1
+        await backend.nack(retry.id)
+        
+        assert await backend.size() == 0
+        assert backend.get_stats()["dead_letter_count"] == 1
+        
+        dead_letters = SQLiteQueueBackend(db_path, queue_name="jobs.dead_letter")
+        dead = await dead_letters.get(timeout=0.1)
+        assert dead.id == message.id
+        assert dead.status == MessageStatus.PROCESSING
+        assert dead.retry_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_expired_messages_are_skipped(self, db_path):
+        """Test that expired messages are never delivered."""
+        backend = SQLiteQueueBackend(db_path)
+        expired = create_test_message()
+        expired.expires_at = datetime.now() - timedelta(seconds=1)
+        valid = create_test_message()
+        await backend.put_many([expired, valid])
+        
+        assert (await backend.get(timeout=0.1)).id == valid.id
+        assert await backend.get(timeout=0) is None
+    
+    @pytest.mark.asyncio
+    async def test_competing_consumers_receive_each_message_once(self, db_path):
+        """Test that consumers sharing a database never double-deliver."""
+        producer = SQLiteQueueBackend(db_path)
+        await producer.put_many([create_test_message() for _ in range(50)])
+        
+        consumers = [SQLiteQueueBackend(db_path) for _ in range(3)]
+        
+        async def drain(backend):
+            received = []
+            while (message := await backend.get(timeout=0.05)) is not None:
+                received.append(message.id)
+                await backend.ack(message.id)
+            return received
+        
+        results = await asyncio.gather(*(drain(consumer) for consumer in consumers))
+        delivered = [message_id for result in results for message_id in result]
+        assert len(delivered) == 50
+        assert len(set(delivered)) == 50
+    
+    def test_factory_creates_sqlite_queue(self, db_path):
+        """Test creating an SQLite-backed queue through the factory."""
+        queue = create_message_queue(queue_type="sqlite", name="jobs", db_path=db_path)
+        assert isinstance(queue, MessageQueue)
+        assert isinstance(queue.backend, SQLiteQueueBackend)
+        assert queue.backend.queue_name == "jobs"
+    
+    def test_queue_from_job_queue_settings(self, db_path):
+        """Test that the job_queue settings reach the backend."""
+        queue = create_message_queue_from_config(
+            {"type": "sqlite", "sqlite_path": db_path, "visibility_timeout": 42}
+        )
+        assert isinstance(queue.backend, SQLiteQueueBackend)
+        assert queue.backend.db_path == db_path
+        assert queue.backend.visibility_timeout == 42.0
+        assert create_message_queue_from_config({}).backend.__class__.__name__ == "InMemoryQueueBackend"
+    
+    @pytest.mark.asyncio
+    async def test_async_statistics(self, db_path):
+        """Test that statistics can be read without blocking the event loop."""
+        backend = SQLiteQueueBackend(db_path)
+        queue = MessageQueue(backend=backend)
+        await backend.put(create_test_message())
+        
+        stats = await queue.get_statistics_async()
+        assert stats == {**stats, **backend.get_stats()}
+        assert stats["queue_size"] == 1
+
+
+class TestRedisQueueBackend:
+    """Test Redis queue backend against an in-process stub."""
+    
+    @pytest.mark.asyncio
+    async def test_put_get_ack(self, redis_client):
+        """Test basic lifecycle and priority ordering."""
+        backend = RedisQueueBackend(client=redis_client, queue_name="jobs")
+        low = create_test_message(priority=MessagePriority.LOW)
+        high = create_test_message(priority=MessagePriority.HIGH)
+        await backend.put(low)
+        await backend.put(high)
+        
+        with pytest.raises(InvalidMessageError):
+            await backend.put(low)
+        
+        assert (await backend.peek()).id == high.id
+        first = await backend.get(timeout=0.1)
+        assert first.id == high.id
+        assert await backend.size() == 2
+        
+        await backend.ack(first.id)
+        assert await backend.size() == 1
+        with pytest.raises(MessageNotFoundError):
+            await backend.ack(first.id)
+    
+    @pytest.mark.asyncio
+    async def test_visibility_timeout_and_dead_letter(self, redis_client):
+        """Test lease expiry redelivery and dead-letter routing."""
+        backend = RedisQueueBackend(
+            client=redis_client, queue_name="jobs", visibility_timeout=0.05
+        )
+        message = create_test_message()
+        message.max_retries = 2
+        await backend.put(message)
+        
+        claimed = await backend.get(timeout=0.1)
+        await asyncio.sleep(0.1)
+        redelivered = await backend.get(timeout=0.1)
+        assert redelivered.id == claimed.id
+        assert redelivered.retry_count == 1
+        
+        await backend.nack(redelivered.id)
+        stats = await backend.get_stats_async()
+        assert stats["total_size"] == 0
+        assert stats["dead_letter_count"] == 1
+        
+        dead_letters = RedisQueueBackend(client=redis_client, queue_name="jobs.dead_letter")
+        dead = await dead_letters.get(timeout=0.1)
+        assert dead.id == message.id
+        assert dead.retry_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_claim_without_lease_is_redelivered(self, redis_client):
+        """Test recovery from a consumer that died between LMOVE and ZADD."""
+        backend = RedisQueueBackend(
+            client=redis_client, queue_name="jobs", visibility_timeout=0.05
+        )
+        message = create_test_message()
+        await backend.put(message)
+        await redis_client.lmove(
+            backend._pending_key(message.priority), "jobs:processing", "RIGHT", "LEFT"
+        )
+        
+        # The stranded id is leased by the next claim attempt, then redelivered
+        assert await backend.get(timeout=0) is None
+        await asyncio.sleep(0.1)
+        redelivered = await backend.get(timeout=0.1)
+        assert redelivered.id == message.id
+        assert redelivered.retry_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_expired_owner_cannot_settle_redelivered_message(self, redis_client):
+        """Test that ack and nack require the current lease."""
+        slow, fast = (
+            RedisQueueBackend(client=redis_client, queue_name="jobs", visibility_timeout=0.05)
+            for _ in range(2)
+        )
+        message = create_test_message()
+        await slow.put(message)
+        
+        await slow.get(timeout=0.1)
+        await asyncio.sleep(0.1)
+        assert (await fast.get(timeout=0.1)).id == message.id
+        
+        with pytest.raises(MessageNotFoundError):
+            await slow.ack(message.id)
+        with pytest.raises(MessageNotFoundError):
+            await slow.nack(message.id)
+        await fast.ack(message.id)
+        assert await fast.size() == 0
+        assert await redis_client.exists(fast._owner_key(message.id)) == 0
+    
+    @pytest.mark.asyncio
+    async def test_processing_list_is_scanned_once_per_timeout(self, redis_client):
+        """Test that claims look up expired leases without reading the processing list."""
+        backend = RedisQueueBackend(client=redis_client, queue_name="jobs", visibility_timeout=60)
+        for _ in range(3):
+            await backend.put(create_test_message())
+        scans = []
+        lrange = redis_client.lrange
+        
+        async def counting_lrange(*args):
+            scans.append(args)
+            return await lrange(*args)
+        
+        redis_client.lrange = counting_lrange
+        for _ in range(3):
+            assert await backend.get(timeout=0.1) is not None
+        assert len(scans) == 1
+    
+    @pytest.mark.asyncio
+    async def test_sync_stats(self, redis_client, redis_server):
+        """Test that MessageQueue statistics include the Redis backend's counts."""
+        import fakeredis
+        backend = RedisQueueBackend(
+            client=redis_client, queue_name="jobs",
+            sync_client=fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+        )
+        queue = MessageQueue(backend=backend)
+        await backend.put(create_test_message(priority=MessagePriority.HIGH))
+        await backend.put(create_test_message())
+        await backend.get(timeout=0.1)
+        
+        stats = queue.get_statistics()
+        assert stats == {**stats, **await backend.get_stats_async()}
+        assert stats["processing_count"] == 1 and stats["priority_breakdown"]["NORMAL"] == 1
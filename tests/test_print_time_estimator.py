@@ -0,0 +1,136 @@
+"""
+Unit tests for the kinematic print time estimator.
+
+Tests cover:
+- Trapezoidal and triangular velocity profiles
+- Jerk-limited junction speeds
+- Per-axis feedrate limits
+- Filament length and mass integration
+- Printer profile limits and SlicerAgent integration
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.gcode_parser import parse_gcode_text
+from core.print_time_estimator import MotionLimits, estimate_print, filament_mass
+
+
+LIMITS = MotionLimits(
+    max_feedrate={'X': 200.0, 'Y': 200.0, 'Z': 5.0, 'E': 25.0},
+    max_acceleration={'X': 1000.0, 'Y': 1000.0, 'Z': 100.0, 'E': 1000.0},
+    max_jerk={'X': 10.0, 'Y': 10.0, 'Z': 0.4, 'E': 5.0},
+)
+
+
+class TestKinematicEstimate:
+    """Test motion timing."""
+    
+    def test_single_trapezoid(self):
+        """Accelerate from jerk speed, cruise, decelerate to jerk speed."""
+        estimate = estimate_print(parse_gcode_text("G1 X100 F6000\n"), LIMITS)
+        
+        # 2 * (100 - 10) / 1000 s ramps + (100 - 2 * 4.95) mm at 100 mm/s
+        assert estimate.total_time == pytest.approx(1.081)
+    
+    def test_triangle_profile(self):
+        """Short moves never reach the programmed speed."""
+        estimate = estimate_print(parse_gcode_text("G1 X1 F6000\n"), LIMITS)
+        
+        peak = (2 * 1000 * 1 + 10 ** 2 + 10 ** 2) ** 0.5 / 2 ** 0.5
+        assert estimate.total_time == pytest.approx(2 * (peak - 10) / 1000)
+    
+    def test_straight_junction_keeps_speed(self):
+        """Collinear moves are joined at full speed; corners slow down."""
+        straight = estimate_print(parse_gcode_text("G1 X100 F6000\nG1 X200\n"), LIMITS)
+        corner = estimate_print(parse_gcode_text("G1 X100 F6000\nG1 Y100\n"), LIMITS)
+        
+        assert straight.total_time == pytest.approx(2.081)
+        assert corner.total_time > straight.total_time
+    
+    def test_axis_feedrate_limit(self):
+        """Z moves are capped by the Z feedrate limit."""
+        estimate = estimate_print(parse_gcode_text("G1 Z10 F6000\n"), LIMITS)
+        
+        assert estimate.total_time >= 10 / 5.0
+    
+    def test_layer_times(self):
+        """Per-layer times add up to the layered part of the program."""
+        gcode = ";LAYER:0\nG1 X50 F3000 E1\n;LAYER:1\nG1 Y50 E2\nG1 X0 E3\n"
+        estimate = estimate_print(parse_gcode_text(gcode), LIMITS)
+        
+        assert len(estimate.layer_times) == 2
+        assert sum(estimate.layer_times) == pytest.approx(estimate.total_time)
+        assert estimate.layer_times[1] > estimate.layer_times[0]
+    
+    def test_empty_program(self):
+        """Programs without moves take no time."""
+        estimate = estimate_print(parse_gcode_text("M104 S200\n"))
+        
+        assert estimate.total_time == 0.0
+        assert estimate.filament_mass == 0.0
+
+
+class TestFilament:
+    """Test filament integration."""
+    
+    def test_retractions_excluded(self):
+        """Only positive extrusion counts towards usage."""
+        gcode = "G1 X10 E5 F1200\nG1 E4\nG1 E5\nG1 X20 E10\n"
+        estimate = estimate_print(parse_gcode_text(gcode), LIMITS)
+        
+        assert estimate.filament_length == pytest.approx(11.0)
+        assert estimate.filament_mass == pytest.approx(filament_mass(11.0, 'PLA'))
+    
+    def test_mass_by_material(self):
+        """One metre of 1.75 mm PLA weighs about 3 g."""
+        assert filament_mass(1000.0, 'PLA') == pytest.approx(2.98, abs=0.01)
+        assert filament_mass(1000.0, 'ABS') < filament_mass(1000.0, 'PLA')
+
+
+class TestProfileLimits:
+    """Test limits taken from printer profiles."""
+    
+    def test_from_printer_profile(self):
+        """Profile limits override the defaults."""
+        multi_printer_support = pytest.importorskip("printer_support.multi_printer_support")
+        profile = multi_printer_support.PrinterProfileManager().get_profile("ender3")
+        
+        limits = MotionLimits.from_printer_profile(profile, acceleration=800)
+        
+        assert limits.max_acceleration['X'] == 500
+        assert limits.max_jerk['X'] == 8.0
+        assert limits.acceleration == 800
+    
+    def test_slicer_analysis_uses_estimator(self, tmp_path):
+        """SlicerAgent reports kinematic time and filament mass."""
+        from agents.slicer_agent import SlicerAgent
+        
+        path = tmp_path / "part.gcode"
+        lines = [";LAYER:0", "G1 Z0.2 F3000"]
+        lines += [f"G1 X{100 * (i % 2)} Y{i} E{i + 1} F1800" for i in range(600)]
+        path.write_text("\n".join(lines) + "\n")
+        
+        agent = SlicerAgent("estimator_test_slicer")
+        analysis = agent._analyze_gcode_file(str(path), {'printer': 'ender3', 'material': 'PLA'})
+        
+        assert analysis["estimated_print_time"] >= 1
+        assert analysis["filament_length"] == pytest.approx(600.0)
+        assert analysis["material_usage"] == pytest.approx(filament_mass(600.0), abs=0.01)
+        assert agent._estimate_print_time({"gcode_file_path": str(path)}) >= 1.0
+        
+        # The analysis estimate is reused instead of simulating the file again
+        estimate = analysis["print_estimate"]
+        metrics = {"gcode_file_path": str(path)}
+        with patch.object(agent, '_estimate_from_gcode', side_effect=AssertionError):
+            assert agent._estimate_print_time(metrics, estimate) == max(estimate.total_minutes, 1.0)
+            assert agent._estimate_material_usage(metrics, estimate) == pytest.approx(filament_mass(600.0))
+        
+        # Profiles are loaded once per agent, not per estimate
+        profiles = agent._printer_profiles
+        assert agent._get_motion_limits({'printer': 'ender3'}).max_acceleration['X'] == 500
+        assert agent._printer_profiles is profiles
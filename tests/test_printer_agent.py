@@ -734,6 +734,196 @@ class TestPrinterAgentIntegration:
         assert 'success' in connect_result
 
 
+class TestWindowedStreaming:
+    """Test windowed G-code streaming over an emulated serial port."""
+    
+    def _serial_agent(self, port, **streaming):
+        agent = PrinterAgent("windowed_printer_agent", config={
+            'mock_mode': False,
+            'gcode': {'streaming': dict({'ack_timeout': 2}, **streaming)}
+        })
+        agent.serial_connection = port
+        agent.printer_status = PrinterStatus.CONNECTED
+        return agent
+    
+    @pytest.mark.asyncio
+    async def test_windowed_streaming_keeps_lines_in_flight(self, sample_gcode_file):
+        """Several lines are in flight and every line is acknowledged."""
+        from printer_support.printer_emulator import EmulatedSerialPort
+        port = EmulatedSerialPort(latency=0.005)
+        agent = self._serial_agent(port)
+        
+        try:
+            result = await agent.stream_gcode(sample_gcode_file)
+        finally:
+            port.close()
+        
+        assert result['success'] is True
+        assert agent.streaming_stats['max_lines_in_flight'] > 1
+        assert agent.streaming_stats['lines_acked'] == agent.streaming_stats['lines_sent']
+        assert port.stats['overflow_bytes'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_windowed_streaming_resends_corrupted_lines(self, sample_gcode_file):
+        """Checksum errors trigger a resend from the requested line."""
+        from printer_support.printer_emulator import EmulatedSerialPort
+        port = EmulatedSerialPort(corrupt_every=5)
+        agent = self._serial_agent(port)
+        
+        try:
+            result = await agent.stream_gcode(sample_gcode_file)
+        finally:
+            port.close()
+        
+        assert result['success'] is True
+        assert agent.streaming_stats['resend_requests'] > 0
+        # Every numbered line reached the firmware exactly once in order
+        assert port._expected_line == 18
+    
+    @pytest.mark.asyncio
+    async def test_pause_mid_stream_goes_through_window(self, sample_gcode_file):
+        """Pause and resume commands are tracked in the window, not written around it."""
+        from printer_support.printer_emulator import EmulatedSerialPort
+        port = EmulatedSerialPort(command_time=0.05)
+        agent = self._serial_agent(port)
+        
+        try:
+            stream = asyncio.create_task(agent.stream_gcode(sample_gcode_file))
+            await asyncio.sleep(0.15)
+            assert (await agent.pause_streaming())['success'] is True
+            await asyncio.sleep(0.2)
+            assert (await agent.resume_streaming())['success'] is True
+            result = await stream
+        finally:
+            port.close()
+        
+        assert result['success'] is True
+        stats = agent.streaming_stats
+        # M110, 17 numbered lines, M25 and M24
+        assert stats['lines_sent'] == port.stats['lines_received'] == 20
+        assert stats['lines_acked'] == stats['lines_sent']
+        assert port._expected_line == 18
+        assert port.stats['overflow_bytes'] == 0
+        assert agent.streaming_queue.empty()
+    
+    def test_resend_request_for_unknown_line_fails(self):
+        """A resend request outside the history is a streaming error."""
+        from core.gcode_streaming import WindowedGCodeStreamer
+        streamer = WindowedGCodeStreamer(Mock())
+        
+        with pytest.raises(GCodeStreamingError):
+            streamer._handle_response("Resend: 42")
+
+    def test_failed_resend_is_requested_again(self):
+        """A request caused by the resent line itself is not taken for a stale one."""
+        from core.gcode_streaming import WindowedGCodeStreamer, frame_gcode_line
+        streamer = WindowedGCodeStreamer(Mock())
+        lines = [frame_gcode_line(f"G1 X{n}", n) for n in (1, 2, 3)]
+        for line in lines:
+            streamer.send(line)
+
+        streamer._handle_response("ok")
+        streamer._handle_response("Resend: 2")  # N2 corrupted, N3 still on the wire
+        streamer._handle_response("ok")
+        streamer._flush_resends()
+        assert streamer.stats.lines_resent == 2
+
+        streamer._handle_response("Resend: 2")  # stale request caused by the old N3
+        streamer._handle_response("ok")
+        assert not streamer._resend_queue
+
+        streamer._handle_response("Resend: 2")  # the resent N2 was corrupted as well
+        streamer._handle_response("ok")
+        assert list(streamer._resend_queue) == lines[1:]
+
+    def test_late_oks_for_earlier_lines_after_resend(self):
+        """Oks for lines before the resent one still acknowledge those lines."""
+        from core.gcode_streaming import WindowedGCodeStreamer, frame_gcode_line
+        streamer = WindowedGCodeStreamer(Mock())
+        lines = [frame_gcode_line(f"G1 X{n}", n) for n in (1, 2, 3, 4)]
+        for line in lines:
+            streamer.send(line)
+
+        streamer._handle_response("Resend: 3")  # N1 and N2 not acknowledged yet
+        streamer._handle_response("ok")
+        streamer._flush_resends()
+        streamer._handle_response("ok")  # N1
+        streamer._handle_response("ok")  # N2
+
+        assert [line for line, _ in streamer._in_flight] == lines[2:]
+        assert streamer.bytes_in_flight == sum(len(line) + 1 for line in lines[2:])
+        assert streamer.stats.lines_acked == 2
+
+
+class TestLazyGCodePreparation:
+    """Test the lazy G-code preparation pipeline."""
+    
+    def test_count_matches_prepared_lines(self, tmp_path):
+        """The byte-level count agrees with the lazy iterator."""
+        from core.gcode_streaming import count_streamable_lines, frame_gcode_line, iter_prepared_gcode
+        path = tmp_path / "mixed.gcode"
+        path.write_bytes(
+            b"; header\r\n\r\nG28 ; home\r\n   \n;LAYER:0\nG1 X1\n  ;comment\n;LAYER:1\nG1 X2"
+        )
+        
+        prepared = list(iter_prepared_gcode(path))
+        
+        assert prepared == [
+            frame_gcode_line("G28", 1), ";LAYER:0",
+            frame_gcode_line("G1 X1", 2), ";LAYER:1",
+            frame_gcode_line("G1 X2", 3)
+        ]
+        assert count_streamable_lines(path) == len(prepared)
+    
+    def test_line_count_index_file(self, tmp_path):
+        """Counts are persisted to the index directory."""
+        from core.gcode_streaming import count_streamable_lines
+        path = tmp_path / "part.gcode"
+        path.write_text("G28\nG1 X1\n")
+        index_dir = tmp_path / "index"
+        
+        assert count_streamable_lines(path, index_dir) == 2
+        assert len(list(index_dir.glob("*.json"))) == 1
+    
+    def test_prefetch_is_bounded(self):
+        """The producer never runs further ahead than the buffer size."""
+        from core.gcode_streaming import PrefetchIterator
+        produced = []
+        
+        def source():
+            for index in range(1000):
+                produced.append(index)
+                yield index
+        
+        iterator = PrefetchIterator(source(), max_buffered=8)
+        assert next(iterator) == 0
+        time.sleep(0.1)
+        
+        assert len(produced) <= 10
+        iterator.close()
+    
+    def test_prefetch_propagates_errors(self):
+        """Errors in the source reach the consumer."""
+        from core.gcode_streaming import PrefetchIterator
+        
+        def source():
+            yield "G28"
+            raise OSError("disk gone")
+        
+        iterator = PrefetchIterator(source())
+        assert next(iterator) == "G28"
+        with pytest.raises(OSError):
+            next(iterator)
+    
+    @pytest.mark.asyncio
+    async def test_streaming_reports_line_total(self, printer_agent, sample_gcode_file):
+        """Streaming jobs get lines_total without an eager preparation pass."""
+        result = await printer_agent.stream_gcode(sample_gcode_file)
+        
+        assert result['success'] is True
+        assert result['total_lines'] == len(printer_agent._prepare_gcode_file(sample_gcode_file))
+
+
 class TestMockPrinter:
     """Specific tests for MockPrinter class."""
     
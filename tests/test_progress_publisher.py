@@ -0,0 +1,140 @@
+"""
+Tests for the throttled progress publisher.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.progress_publisher import ProgressPublisher
+
+
+def _payload(percent):
+    return lambda: {'progress_percent': percent}
+
+
+class TestProgressPublisher:
+    """Throttling, coalescing and delivery of progress updates."""
+
+    def test_no_callbacks_builds_nothing(self):
+        publisher = ProgressPublisher()
+
+        def build():
+            raise AssertionError("payload must not be built without callbacks")
+
+        assert publisher.report(10.0, 1, build) is False
+        assert publisher.stats.reported == 1
+        assert publisher.stats.published == 0
+
+    def test_rate_limit_drops_bursts(self):
+        publisher = ProgressPublisher(max_rate=1.0, min_percent_delta=0.0)
+        updates = []
+        publisher.add_callback(updates.append)
+
+        for line in range(1000):
+            publisher.report(line / 10.0, line, _payload(line / 10.0))
+
+        # One update per second at most: only the first one goes through
+        assert len(updates) == 1
+        assert publisher.stats.dropped == 999
+        assert publisher.stats.delivered == 1
+
+    def test_emits_on_layer_change_or_percent_delta(self):
+        publisher = ProgressPublisher(max_rate=0, min_percent_delta=5.0)
+        updates = []
+        publisher.add_callback(updates.append)
+
+        publisher.report(0.0, 0, _payload(0.0))
+        publisher.report(1.0, 0, _payload(1.0))   # below delta, same layer
+        publisher.report(2.0, 1, _payload(2.0))   # layer change
+        publisher.report(6.0, 1, _payload(6.0))   # below delta since 2.0
+        publisher.report(7.5, 1, _payload(7.5))   # delta reached
+
+        assert [update['progress_percent'] for update in updates] == [0.0, 2.0, 7.5]
+        assert publisher.stats.dropped == 2
+
+    def test_forced_update_bypasses_throttle(self):
+        publisher = ProgressPublisher(max_rate=1.0)
+        updates = []
+        publisher.add_callback(updates.append)
+
+        publisher.report(50.0, 3, _payload(50.0))
+        publisher.report(100.0, 3, _payload(100.0), force=True)
+
+        assert updates[-1]['progress_percent'] == 100.0
+
+    def test_callback_errors_are_counted(self):
+        publisher = ProgressPublisher()
+        updates = []
+
+        def failing(progress):
+            raise RuntimeError("boom")
+
+        publisher.add_callback(failing)
+        publisher.add_callback(updates.append)
+        publisher.report(1.0, 0, _payload(1.0))
+
+        assert publisher.stats.callback_errors == 1
+        assert len(updates) == 1
+
+    @pytest.mark.asyncio
+    async def test_async_callback_from_worker_thread(self):
+        publisher = ProgressPublisher(max_rate=0)
+        received = []
+        done = asyncio.Event()
+        loop_thread = threading.get_ident()
+
+        async def callback(progress):
+            received.append((progress['progress_percent'], threading.get_ident()))
+            if progress['progress_percent'] == 100.0:
+                done.set()
+
+        publisher.add_callback(callback)
+
+        def worker():
+            for percent in (10.0, 50.0, 100.0):
+                publisher.report(percent, int(percent), _payload(percent))
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        await asyncio.wait_for(done.wait(), timeout=2.0)
+
+        assert [percent for percent, _ in received] == [10.0, 50.0, 100.0]
+        # Coroutines run on the event loop, not in the reporting thread
+        assert all(ident == loop_thread for _, ident in received)
+
+    @pytest.mark.asyncio
+    async def test_pending_async_callbacks_are_held(self):
+        publisher = ProgressPublisher(max_rate=0)
+        release = asyncio.Event()
+
+        async def callback(progress):
+            await release.wait()
+
+        publisher.add_callback(callback)
+        publisher.report(10.0, 1, _payload(10.0))
+        await asyncio.sleep(0)
+
+        assert len(publisher._tasks) == 1
+        release.set()
+        await asyncio.gather(*publisher._tasks)
+        await asyncio.sleep(0)
+        assert not publisher._tasks
+
+    def test_clear_callbacks_resets_throttle(self):
+        publisher = ProgressPublisher(max_rate=1.0)
+        updates = []
+        publisher.add_callback(updates.append)
+        publisher.report(10.0, 1, _payload(10.0))
+
+        publisher.clear_callbacks()
+        publisher.add_callback(updates.append)
+
+        assert publisher.report(0.0, 0, _payload(0.0)) is True
+        assert len(updates) == 2
@@ -0,0 +1,205 @@
+"""
+Unit tests for the token bucket rate limiter and its storage backends.
+
+Tests cover:
+- Capacity, refill and all-or-nothing consumption across layers
+- Eviction of idle buckets
+- Progressive penalties that expire
+- One limit shared by several workers (SQLite, Redis stub)
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# core.security imports the MFA dependencies at module level
+pytest.importorskip("pyotp")
+pytest.importorskip("qrcode")
+
+from core.rate_limit_backends import (
+    MemoryRateLimitBackend, RedisRateLimitBackend, SQLiteRateLimitBackend, create_rate_limit_backend
+)
+from core.security import AdvancedRateLimiter, RateLimitConfig, create_rate_limiter
+
+
+class Clock:
+    """Manually advanced time source."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limiter(backend=None, clock=None):
+    limiter = AdvancedRateLimiter(backend=backend)
+    limiter.limits['per_user'] = RateLimitConfig(requests=3, window=30)
+    limiter._get_current_time = clock or Clock()
+    return limiter
+
+
+@pytest.fixture
+def redis_client():
+    """In-process Redis stub."""
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+class TestTokenBuckets:
+    """Test limiter decisions on the in-memory backend."""
+
+    @pytest.mark.asyncio
+    async def test_capacity_then_refill(self):
+        clock = Clock()
+        limiter = _limiter(clock=clock)
+
+        results = [await limiter.check_rate_limit(user_id="alice") for _ in range(4)]
+        assert [r['allowed'] for r in results] == [True, True, True, False]
+        assert results[2]['remaining_requests']['user'] == 0
+        assert results[3]['violations'] == ['per_user']
+
+        clock.now += 10  # one token back at 3 tokens / 30 s
+        assert (await limiter.check_rate_limit(user_id="alice"))['allowed']
+        assert not (await limiter.check_rate_limit(user_id="alice"))['allowed']
+
+    @pytest.mark.asyncio
+    async def test_rejected_request_consumes_nothing(self):
+        limiter = _limiter()
+        limiter.limits['global'] = RateLimitConfig(requests=5, window=60)
+
+        for _ in range(4):
+            await limiter.check_rate_limit(user_id="alice")
+        result = await limiter.check_rate_limit(user_id="bob")
+
+        # alice was rejected once and did not spend a global token doing so
+        assert result['allowed']
+        assert result['remaining_requests']['global'] == 1
+
+    @pytest.mark.asyncio
+    async def test_idle_buckets_are_evicted(self):
+        clock = Clock()
+        backend = MemoryRateLimitBackend()
+        limiter = _limiter(backend, clock)
+        for index in range(50):
+            await limiter.check_rate_limit(ip_address=f"10.0.0.{index}")
+        assert await backend.size() == 51  # global + one per IP
+
+        clock.now += backend.idle_timeout + 1
+        await limiter.check_rate_limit(ip_address="10.0.1.1")
+
+        assert await backend.size() == 2
+        assert backend.idle_timeout == pytest.approx(3600 * 210 / 200)  # slowest refill: per IP
+
+    @pytest.mark.asyncio
+    async def test_progressive_penalty_expires(self):
+        clock = Clock()
+        limiter = _limiter(clock=clock)
+        for _ in range(3):
+            await limiter.check_rate_limit(user_id="alice")
+
+        delays = [(await limiter.check_rate_limit(user_id="alice"))['delay_seconds'] for _ in range(3)]
+        assert delays == [0, 1, 2]
+
+        clock.now += limiter.penalty_duration + 1
+        await limiter.check_rate_limit(user_id="bob")
+        assert "user:alice" not in limiter.violation_penalties
+
+
+class TestSharedBackends:
+    """Several limiters (workers) enforce one limit through a shared backend."""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_workers_share_buckets(self, tmp_path):
+        db_path = str(tmp_path / "limits.db")
+        clock = Clock()
+        workers = [_limiter(SQLiteRateLimitBackend(db_path), clock) for _ in range(2)]
+
+        allowed = [(await workers[index % 2].check_rate_limit(user_id="alice"))['allowed']
+                   for index in range(5)]
+
+        assert allowed == [True, True, True, False, False]
+        for worker in workers:
+            worker.backend.close()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_sweeps_idle_buckets(self, tmp_path):
+        backend = SQLiteRateLimitBackend(str(tmp_path / "limits.db"), idle_timeout=10, sweep_interval=0)
+        await backend.acquire([("a", 5, 1.0)], now=100.0)
+        await backend.acquire([("b", 5, 1.0)], now=115.0)
+
+        assert await backend.size() == 1
+        backend.close()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_lock_wait_does_not_block_the_loop(self, tmp_path):
+        db_path = str(tmp_path / "limits.db")
+        backend = SQLiteRateLimitBackend(db_path, busy_timeout=0.5)
+        other_worker = sqlite3.connect(db_path, isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        with pytest.raises(sqlite3.OperationalError):
+            await backend.acquire([("a", 5, 1.0)], now=100.0)
+        ticking.cancel()
+
+        assert ticks > 10
+        other_worker.execute("ROLLBACK")
+        other_worker.close()
+        backend.close()
+
+    @pytest.mark.asyncio
+    async def test_redis_workers_share_buckets(self, redis_client):
+        clock = Clock()
+        workers = [_limiter(RedisRateLimitBackend(client=redis_client), clock) for _ in range(2)]
+
+        allowed = [(await workers[index % 2].check_rate_limit(user_id="alice"))['allowed']
+                   for index in range(5)]
+
+        assert allowed == [True, True, True, False, False]
+        assert await redis_client.pttl("ratelimit:user:alice") > 0
+
+    def test_factory_rejects_unknown_backend(self):
+        assert isinstance(create_rate_limit_backend("memory"), MemoryRateLimitBackend)
+        with pytest.raises(ValueError):
+            create_rate_limit_backend("memcached")
+
+
+class TestConfiguredLimiter:
+    """The global limiter is built from security_performance.yaml."""
+
+    def test_backend_from_config(self, tmp_path):
+        config = tmp_path / "security.yaml"
+        config.write_text(
+            "security:\n"
+            "  rate_limiting:\n"
+            "    penalty_duration: 60\n"
+            "    backend: sqlite\n"
+            f"    backend_options: {{db_path: '{tmp_path / 'limits.db'}'}}\n"
+        )
+
+        limiter = create_rate_limiter(config)
+
+        assert isinstance(limiter.backend, SQLiteRateLimitBackend)
+        assert limiter.backend.db_path == str(tmp_path / "limits.db")
+        assert limiter.penalty_duration == 60.0
+        limiter.backend.close()
+
+    def test_unusable_config_falls_back_to_memory(self, tmp_path):
+        config = tmp_path / "security.yaml"
+        config.write_text("security:\n  rate_limiting:\n    backend: memcached\n")
+
+        assert isinstance(create_rate_limiter(config).backend, MemoryRateLimitBackend)
+        assert isinstance(create_rate_limiter(tmp_path / "missing.yaml").backend, MemoryRateLimitBackend)
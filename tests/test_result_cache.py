@@ -0,0 +1,240 @@
+"""
+Tests for the two-tier result cache shared by the image-to-3D consumers.
+"""
+
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.result_cache import ResultCache, decode_result, encode_result, make_result_key
+
+
+def _png(seed=0, size=64):
+    rng = np.random.default_rng(seed)
+    image = Image.fromarray(rng.integers(0, 255, size=(size, size), dtype=np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _mesh_result(vertex_count=1000):
+    rng = np.random.default_rng(vertex_count)
+    return {
+        'success': True,
+        'dimensions': (64, 48),
+        'vertices': rng.normal(size=(vertex_count, 3)).tolist(),
+        'faces': rng.integers(0, vertex_count, size=(vertex_count, 3)).tolist(),
+        'depth_map': rng.random((16, 16)).astype(np.float32),
+        'contours': [{'area': 12.5, 'points': [[1, 2], [3, 4]]}],
+        'metrics': {'volume': np.float64(1.5)}
+    }
+
+
+class TestResultEncoding:
+    """Mesh data is stored as arrays, everything else as JSON."""
+
+    def test_round_trip(self):
+        result = _mesh_result()
+
+        skeleton, arrays = encode_result(result)
+        decoded = decode_result(skeleton, arrays)
+
+        assert len(arrays) == 3
+        assert len(skeleton) < 1000
+        assert decoded['vertices'] == result['vertices']
+        assert decoded['faces'] == result['faces']
+        assert decoded['dimensions'] == (64, 48)
+        assert decoded['depth_map'].dtype == np.float32
+        np.testing.assert_array_equal(decoded['depth_map'], result['depth_map'])
+        assert decoded['contours'] == result['contours']
+        assert decoded['metrics'] == {'volume': 1.5}
+
+    def test_tuples_survive_array_storage(self):
+        rows = [(float(i), float(i + 1), float(i + 2)) for i in range(20)]
+        result = {'vertex_tuples': rows, 'bounds': tuple(range(20)), 'mixed': [(1, 2)] * 10 + [[3, 4]] * 10}
+
+        skeleton, arrays = encode_result(result)
+        decoded = decode_result(skeleton, arrays)
+
+        assert len(arrays) == 2
+        assert decoded == result
+        assert type(decoded['vertex_tuples'][0]) is tuple and type(decoded['bounds']) is tuple
+        assert type(decoded['mixed'][0]) is tuple and type(decoded['mixed'][-1]) is list
+
+    def test_key_depends_on_content_and_params(self):
+        key = make_result_key('ns', b'image', {'a': 1, 'b': 2})
+
+        assert key == make_result_key('ns', b'image', {'b': 2, 'a': 1})
+        assert key != make_result_key('ns', b'image', {'a': 1, 'b': 3})
+        assert key != make_result_key('ns', b'other', {'a': 1, 'b': 2})
+        assert key != make_result_key('other', b'image', {'a': 1, 'b': 2})
+
+
+class TestResultCache:
+    """Memory and disk tiers, limits and expiry."""
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        result = _mesh_result()
+        ResultCache(tmp_path).put('k', result)
+
+        cache = ResultCache(tmp_path)
+        first = cache.get('k')
+        second = cache.get('k')
+
+        assert first['vertices'] == result['vertices']
+        assert second['vertices'] == first['vertices'] and second is not first
+        stats = cache.get_stats()
+        assert (stats['disk_hits'], stats['memory_hits'], stats['misses']) == (1, 1, 0)
+        assert stats['hit_rate'] == 1.0
+        assert stats['disk_entries'] == 1
+
+    def test_callers_get_their_own_copy(self, tmp_path):
+        result = _mesh_result()
+        cache = ResultCache(tmp_path)
+        cache.put('k', result)
+        result['vertices'][0][0] = 99.0
+        result['depth_map'][0, 0] = 99.0
+
+        for hit in (cache.get('k'), ResultCache(tmp_path).get('k')):
+            assert hit['dimensions'] == (64, 48)
+            assert hit['vertices'][0][0] != 99.0 and hit['depth_map'][0, 0] != 99.0
+            hit['metrics']['volume'] = 0.0
+            hit['depth_map'][0, 0] = 99.0
+        assert cache.get('k')['metrics'] == {'volume': 1.5}
+        assert cache.get('k')['depth_map'][0, 0] != 99.0
+
+    def test_memory_tier_bounded_by_bytes(self, tmp_path):
+        entry_bytes = 1000 * 3 * 8 * 2
+        cache = ResultCache(None, max_memory_bytes=int(entry_bytes * 2.5))
+
+        for name in 'abc':
+            cache.put(name, _mesh_result())
+        cache.get('b')
+        cache.put('d', _mesh_result())
+
+        assert cache.get('a') is None
+        assert cache.get('c') is None
+        assert cache.get('b') is not None and cache.get('d') is not None
+        stats = cache.get_stats()
+        assert stats['evictions'] == 2
+        assert stats['memory_bytes'] <= cache.max_memory_bytes
+
+    def test_disk_tier_bounded_by_bytes(self, tmp_path):
+        cache = ResultCache(tmp_path, compress=False)
+        cache.put('first', _mesh_result())
+        size = (tmp_path / 'first.npz').stat().st_size
+        cache.max_disk_bytes = int(size * 2.5)
+        old = time.time() - 60
+        os.utime(tmp_path / 'first.npz', (old, old))
+
+        cache.put('second', _mesh_result())
+        cache.put('third', _mesh_result())
+
+        assert sorted(path.stem for path in tmp_path.glob('*.npz')) == ['second', 'third']
+
+    def test_disk_eviction_uses_index(self, tmp_path, monkeypatch):
+        ResultCache(tmp_path, compress=False).put('old', _mesh_result())
+        cache = ResultCache(tmp_path, compress=False)
+        scans = []
+        original_glob = Path.glob
+        monkeypatch.setattr(Path, 'glob', lambda self, pattern: scans.append(pattern) or original_glob(self, pattern))
+
+        cache.put('first', _mesh_result())
+        size = (tmp_path / 'first.npz').stat().st_size
+        cache.max_disk_bytes = int(size * 2.5)
+        cache.put('second', _mesh_result())
+        cache.put('third', _mesh_result())
+
+        # Files of earlier processes are indexed by the first store only
+        assert len(scans) == 1
+        assert sorted(path.stem for path in original_glob(tmp_path, '*.npz')) == ['second', 'third']
+        stats = cache.get_stats()
+        assert (stats['disk_entries'], stats['evictions']) == (2, 2)
+        assert stats['disk_bytes'] == 2 * size
+
+    def test_entries_expire(self, tmp_path):
+        cache = ResultCache(tmp_path, ttl_seconds=0.05)
+        cache.put('k', {'value': 1})
+        assert cache.get('k') == {'value': 1}
+
+        time.sleep(0.1)
+
+        assert cache.get('k') is None
+        assert ResultCache(tmp_path, ttl_seconds=0.05).get('k') is None
+        assert not (tmp_path / 'k.npz').exists()
+        assert cache.get_stats()['expirations'] == 1
+
+    def test_corrupt_file_is_a_miss(self, tmp_path):
+        (tmp_path / 'k.npz').write_bytes(b'not a zip file')
+        cache = ResultCache(tmp_path)
+
+        assert cache.get('k') is None
+        assert not (tmp_path / 'k.npz').exists()
+
+
+class TestConsumersShareCache:
+    """The image-to-3D consumers look up and store results in the cache."""
+
+    @pytest.mark.asyncio
+    async def test_advanced_processor_reuses_result(self, tmp_path):
+        from agents.advanced_image_processor import AdvancedImageProcessor
+
+        processor = AdvancedImageProcessor({'result_cache_dir': str(tmp_path)})
+        params = {'processing_mode': 'heightmap', 'resolution': 4}
+        image = _png()
+
+        first = await processor.process_image_advanced(image, 'a.png', params)
+        second = await processor.process_image_advanced(image, 'b.png', params)
+        other = await processor.process_image_advanced(_png(1), 'c.png', params)
+
+        assert second == first
+        assert other['cache_key'] != first['cache_key']
+        assert list(tmp_path.glob('*.npz'))
+
+    @pytest.mark.asyncio
+    async def test_ai_converter_skips_repeated_conversion(self, monkeypatch, tmp_path):
+        from core.ai_image_to_3d import AIImageTo3DConverter
+
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        monkeypatch.setattr('core.ai_image_to_3d.asyncio.sleep', fake_sleep)
+        converter = AIImageTo3DConverter()
+        converter.result_cache = ResultCache(tmp_path)
+        image = _png(2)
+
+        first = await converter.convert_image_to_3d(image, 'a.png')
+        second = await converter.convert_image_to_3d(image, 'b.png')
+
+        assert len(sleeps) == 1
+        assert second['model_id'] == first['model_id']
+        assert second['cache_hit'] and second['metadata']['original_filename'] == 'b.png'
+
+    @pytest.mark.asyncio
+    async def test_warm_cache_from_directory(self, tmp_path):
+        from agents.image_processing_agent import ImageProcessingAgent
+
+        uploads = tmp_path / 'uploads' / 'cats'
+        uploads.mkdir(parents=True)
+        for seed in range(2):
+            (uploads / f'{seed}.png').write_bytes(_png(seed + 10))
+        (uploads / 'notes.txt').write_text('not an image')
+
+        agent = ImageProcessingAgent({'result_cache_dir': str(tmp_path / 'cache')})
+        summary = await agent.warm_cache(tmp_path / 'uploads')
+
+        assert summary == {'images': 2, 'failed': 0}
+        stores = agent.result_cache.get_stats()['stores']
+        await agent.process_image_to_3d((uploads / '0.png').read_bytes(), '0.png')
+        stats = agent.result_cache.get_stats()
+        assert stats['stores'] == stores and stats['memory_hits'] >= 1
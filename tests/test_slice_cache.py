@@ -0,0 +1,146 @@
+"""
+Tests for the content-addressed slice cache and its use in the SlicerAgent.
+"""
+
+import os
+import stat
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.slice_cache import SliceCache, compute_slice_key
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "model.stl"
+    path.write_text("solid cube\nendsolid cube\n")
+    return path
+
+
+@pytest.fixture
+def gcode_file(tmp_path):
+    path = tmp_path / "sliced.gcode"
+    path.write_text("G28\nG1 X10 Y10 E1 F1500\n")
+    return path
+
+
+@pytest.fixture
+def fake_slicer(tmp_path):
+    """Executable named like PrusaSlicer that counts its slicing runs."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    runs_file = tmp_path / "slicer_runs"
+    script = bin_dir / "prusa-slicer"
+    script.write_text(textwrap.dedent(f"""\
+        #!{sys.executable}
+        import sys
+        args = sys.argv[1:]
+        if '--help' in args:
+            print("PrusaSlicer-2.7.2+fake based on Slic3r")
+            sys.exit(0)
+        with open({str(runs_file)!r}, 'a') as runs:
+            runs.write('run\\n')
+        output = args[args.index('--output') + 1]
+        with open(output, 'w') as gcode:
+            gcode.write(";LAYER:0\\nG1 Z0.2 F3000\\nG1 X10 Y10 E1 F1500\\n")
+    """))
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return script, runs_file
+
+
+class TestSliceCache:
+    """Disk cache behaviour."""
+
+    def test_miss_then_hit(self, tmp_path, gcode_file):
+        cache = SliceCache(tmp_path / "cache")
+
+        assert cache.get("job") is None
+        assert cache.put("job", gcode_file, {"layer_count": 1, "gcode_file_path": str(gcode_file)})
+
+        cached = cache.get("job")
+        assert cached["layer_count"] == 1
+        # The caller gets its own file with the cached content
+        assert cached["gcode_file_path"] != str(gcode_file)
+        assert Path(cached["gcode_file_path"]).read_text() == gcode_file.read_text()
+        os.unlink(cached["gcode_file_path"])
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+        assert stats["entries"] == 1
+        assert stats["hit_rate"] == 0.5
+        cache.close()
+
+    def test_least_recently_used_entry_is_evicted(self, tmp_path, gcode_file):
+        cache = SliceCache(tmp_path / "cache", max_entries=2)
+        cache.put("first", gcode_file, {})
+        cache.put("second", gcode_file, {})
+        os.unlink(cache.get("first")["gcode_file_path"])  # first is now the most recent
+
+        cache.put("third", gcode_file, {})
+
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get("second") is None
+        assert not (tmp_path / "cache" / "second.gcode").exists()
+        os.unlink(cache.get("first")["gcode_file_path"])
+        cache.close()
+
+    def test_size_limit(self, tmp_path, gcode_file):
+        size = gcode_file.stat().st_size
+        cache = SliceCache(tmp_path / "cache", max_size_bytes=2 * size)
+        for key in ("a", "b", "c"):
+            cache.put(key, gcode_file, {})
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["total_size"] <= 2 * size
+        cache.close()
+
+    def test_key_covers_content_settings_and_version(self, model_file):
+        settings = {"layer_height": 0.2, "infill_percentage": 20}
+        key = compute_slice_key(model_file, settings, "PrusaSlicer-2.7.2")
+
+        assert key == compute_slice_key(model_file, dict(reversed(list(settings.items()))), "PrusaSlicer-2.7.2")
+        assert key != compute_slice_key(model_file, dict(settings, infill_percentage=30), "PrusaSlicer-2.7.2")
+        assert key != compute_slice_key(model_file, settings, "PrusaSlicer-2.8.0")
+
+        model_file.write_text("solid other\nendsolid other\n")
+        assert key != compute_slice_key(model_file, settings, "PrusaSlicer-2.7.2")
+
+
+class TestSlicerAgentCache:
+    """Repeated jobs are served from the cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_slice_is_a_cache_hit(self, tmp_path, model_file, fake_slicer):
+        from agents.slicer_agent import SlicerAgent
+        script, runs_file = fake_slicer
+        agent = SlicerAgent("cache_test_slicer", config={
+            'mock_mode': False,
+            'slice_cache': {'directory': str(tmp_path / "slice_cache")}
+        })
+        agent.slicer_paths['prusaslicer'] = str(script)
+
+        try:
+            first = await agent.slice_stl(str(model_file), "ender3_pla_standard")
+            second = await agent.slice_stl(str(model_file), "ender3_pla_standard")
+
+            assert first["cache_hit"] is False
+            assert second["cache_hit"] is True
+            assert runs_file.read_text().count("run") == 1
+            assert second["slicer_version"] == "PrusaSlicer-2.7.2+fake"
+            assert second["layer_count"] == first["layer_count"]
+            assert Path(second["gcode_file_path"]).read_text() == Path(first["gcode_file_path"]).read_text()
+
+            stats = agent.get_slice_cache_stats()
+            assert stats["hits"] == 1 and stats["misses"] == 1
+
+            third = await agent.slice_stl(str(model_file), "ender3_pla_standard", infill_percentage=40)
+            assert third["cache_hit"] is False
+        finally:
+            agent.cleanup()
+            agent.slice_cache.close()
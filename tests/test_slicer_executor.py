@@ -0,0 +1,205 @@
+"""
+Tests for the async slicer process pool.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.exceptions import SlicerExecutionError, SlicerJobCancelledError
+from core.message_queue import MessagePriority
+from core.slicer_executor import SlicerProcessPool, get_slicer_process_pool
+
+
+def _python(code):
+    return [sys.executable, '-c', code]
+
+
+SLEEP = _python("import time; time.sleep(0.3)")
+
+
+class TestSlicerProcessPool:
+    """Scheduling, progress and cancellation of slicer processes."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        pool = SlicerProcessPool(max_concurrent=2)
+
+        start = time.monotonic()
+        results = await asyncio.gather(*(pool.run(SLEEP) for _ in range(4)))
+        elapsed = time.monotonic() - start
+
+        assert all(result.returncode == 0 for result in results)
+        assert pool.get_stats()['max_running'] == 2
+        assert pool.get_stats()['completed'] == 4
+        # Two waves of two processes
+        assert elapsed >= 0.55
+
+    @pytest.mark.asyncio
+    async def test_queued_jobs_start_by_priority(self):
+        pool = SlicerProcessPool(max_concurrent=1)
+        started = []
+
+        def track(event):
+            if event['state'] == 'running':
+                started.append(event['job_id'])
+
+        blocker = pool.submit(SLEEP, job_id='blocker', on_progress=track)
+        jobs = [
+            pool.submit(_python("pass"), priority, on_progress=track, job_id=name)
+            for name, priority in [
+                ('background', MessagePriority.BACKGROUND),
+                ('normal', MessagePriority.NORMAL),
+                ('critical', MessagePriority.CRITICAL),
+                ('normal_2', MessagePriority.NORMAL),
+            ]
+        ]
+        await asyncio.gather(blocker.future, *(job.future for job in jobs))
+
+        assert started == ['blocker', 'critical', 'normal', 'normal_2', 'background']
+
+    @pytest.mark.asyncio
+    async def test_output_streams_into_progress_events(self):
+        pool = SlicerProcessPool(max_concurrent=1)
+        events = []
+        script = (
+            "import sys, time\n"
+            "for step, name in [(10, 'Processing triangulated mesh'), (40, 'Generating perimeters'),"
+            " (90, 'Exporting G-code')]:\n"
+            "    print(f'[info] {step}% => {name}', flush=True)\n"
+            "    time.sleep(0.02)\n"
+            "print('done', file=sys.stderr)\n"
+        )
+
+        result = await pool.run(_python(script), on_progress=events.append)
+
+        progress = [(event['progress'], event['message']) for event in events if event['state'] == 'running']
+        assert (40.0, 'Generating perimeters') in progress
+        assert [value for value, _ in progress] == sorted(value for value, _ in progress)
+        assert events[-1]['state'] == 'completed' and events[-1]['progress'] == 100.0
+        assert 'Exporting G-code' in result.stdout
+        assert result.stderr == 'done'
+
+    @pytest.mark.asyncio
+    async def test_cancel_kills_running_process(self):
+        pool = SlicerProcessPool(max_concurrent=1)
+        job = pool.submit(_python("import time; time.sleep(30)"), job_id='long')
+        while job.process is None:
+            await asyncio.sleep(0.01)
+
+        assert pool.cancel('long')
+
+        with pytest.raises(SlicerJobCancelledError):
+            await job.future
+        await asyncio.wait_for(job.process.wait(), timeout=5)
+        assert job.process.returncode != 0
+        assert pool.get_job('long').state == 'cancelled'
+        assert not pool.cancel('long')
+
+    @pytest.mark.asyncio
+    async def test_cancelling_the_caller_cancels_queued_job(self):
+        pool = SlicerProcessPool(max_concurrent=1)
+        blocker = pool.submit(SLEEP)
+        waiter = asyncio.ensure_future(pool.run(_python("pass"), job_id='queued'))
+        await asyncio.sleep(0.05)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await blocker.future
+
+        assert pool.get_job('queued').state == 'cancelled'
+        assert pool.get_job('queued').process is None
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_process(self):
+        pool = SlicerProcessPool(max_concurrent=1)
+
+        with pytest.raises(SlicerExecutionError, match="timed out"):
+            await pool.run(_python("import time; time.sleep(30)"), timeout=0.2)
+
+        assert pool.get_stats()['timeouts'] == 1
+        assert pool.running_count == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_job_reaps_its_process(self, monkeypatch):
+        pool = SlicerProcessPool(max_concurrent=1)
+
+        async def broken_reader(job, stream, tail):
+            raise RuntimeError("pipe broke")
+
+        monkeypatch.setattr(pool, '_read_stream', broken_reader)
+        job = pool.submit(_python("import time; time.sleep(30)"))
+
+        with pytest.raises(SlicerExecutionError, match="pipe broke"):
+            await job.future
+        assert job.process.returncode is not None
+
+    @pytest.mark.asyncio
+    async def test_async_progress_callbacks_are_retained(self):
+        pool = SlicerProcessPool(max_concurrent=1)
+        states = []
+
+        async def on_progress(event):
+            await asyncio.sleep(0.01)
+            states.append(event['state'])
+
+        await pool.run(_python("pass"), on_progress=on_progress)
+        assert pool._tasks
+        while pool._tasks:
+            await asyncio.sleep(0.01)
+
+        assert states == ['queued', 'running', 'completed']
+
+    def test_each_event_loop_gets_its_own_pool(self):
+        async def slice_once():
+            pool = get_slicer_process_pool()
+            return pool, (await pool.run(_python("pass"))).returncode
+
+        first, first_code = asyncio.run(slice_once())
+        second, second_code = asyncio.run(slice_once())
+
+        assert first is not second
+        assert first_code == second_code == 0
+
+
+class TestSlicerAgentCancellation:
+    """Cancelled slicing jobs are not replaced by mock output."""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_slice_raises(self, tmp_path):
+        import stat
+        from agents.slicer_agent import SlicerAgent
+
+        script = tmp_path / "prusa-slicer"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import sys, time\n"
+            "if '--help' in sys.argv:\n"
+            "    print('PrusaSlicer-2.7.2+fake')\n"
+            "    sys.exit(0)\n"
+            "time.sleep(30)\n"
+        )
+        script.chmod(script.stat().st_mode | stat.S_IXUSR)
+        model = tmp_path / "model.stl"
+        model.write_text("solid cube\nendsolid cube\n")
+
+        agent = SlicerAgent("cancel_test_slicer", config={
+            'mock_mode': False,
+            'slice_cache': {'enabled': False}
+        })
+        agent.slicer_paths['prusaslicer'] = str(script)
+
+        task = asyncio.ensure_future(agent.slice_stl(str(model), "ender3_pla_standard", job_id='cancel-me'))
+        while (agent.get_slice_job('cancel-me') or {}).get('state') != 'running':
+            await asyncio.sleep(0.01)
+
+        assert agent.cancel_slice('cancel-me')
+        with pytest.raises(SlicerJobCancelledError):
+            await asyncio.wait_for(task, timeout=5)
+        agent.cleanup()
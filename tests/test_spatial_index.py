@@ -0,0 +1,117 @@
+"""
+Tests for the KD-tree spatial queries and the ray-cast wall thickness of the
+design analysis.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import trimesh
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.spatial_index import TriangleIndex, count_crowded_points, ray_triangle_distance
+
+
+def _soup(mesh):
+    """Triangle corners of a trimesh as an STL-style (m, 3, 3) array."""
+    return np.asarray(mesh.vertices)[np.asarray(mesh.faces)]
+
+
+def _hollow_box(outer=20.0, wall=2.0):
+    shell = trimesh.creation.box(extents=[outer] * 3)
+    cavity = trimesh.creation.box(extents=[outer - 2 * wall] * 3)
+    cavity.invert()  # inner surface faces into the cavity
+    return trimesh.util.concatenate([shell, cavity])
+
+
+class TestSpatialQueries:
+    """Neighbour counts and ray casting."""
+
+    def test_crowded_points_match_pairwise_count(self):
+        rng = np.random.default_rng(0)
+        points = np.vstack([rng.uniform(0, 50, size=(300, 3)), rng.normal(10, 0.1, size=(40, 3))])
+
+        distances = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+        expected = int(np.count_nonzero((distances <= 0.5).sum(axis=1) - 1 > 5))
+
+        assert count_crowded_points(points, 0.5, 5) == expected >= 40
+        assert count_crowded_points(np.zeros((0, 3)), 0.5, 5) == 0
+
+    def test_ray_triangle_distance(self):
+        triangle = np.array([[[0, 0, 5], [10, 0, 5], [0, 10, 5]]], dtype=float)
+        origins = np.array([[1, 1, 0], [9, 9, 0]], dtype=float)
+        up = np.array([[0, 0, 1], [0, 0, 1]], dtype=float)
+
+        distances = ray_triangle_distance(origins, up, np.repeat(triangle, 2, axis=0))
+
+        assert distances[0] == pytest.approx(5.0)
+        assert distances[1] == np.inf
+
+    def test_cast_matches_brute_force(self):
+        sphere = trimesh.creation.icosphere(subdivisions=4, radius=10.0)
+        triangles = _soup(sphere)
+        index = TriangleIndex(triangles)
+        rng = np.random.default_rng(1)
+        origins = rng.uniform(-3, 3, size=(50, 3))
+        directions = rng.normal(size=(50, 3))
+        directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+
+        distances = index.cast(origins, directions)
+
+        ray_ids = np.repeat(np.arange(50), len(triangles))
+        brute = ray_triangle_distance(origins[ray_ids], directions[ray_ids], np.tile(triangles, (50, 1, 1)))
+        brute[brute <= 0] = np.inf
+        np.testing.assert_allclose(distances, brute.reshape(50, -1).min(axis=1))
+
+    def test_large_triangles_are_tested_directly(self):
+        # A finely tessellated floor under one large roof triangle
+        floor = trimesh.creation.box(extents=[10, 10, 1]).subdivide().subdivide().subdivide()
+        roof = np.array([[[-50, -50, 20], [50, -50, 20], [0, 50, 20]]], dtype=float)
+        index = TriangleIndex(np.vstack([_soup(floor), roof]))
+
+        distances = index.cast([[0, 0, 1], [20, 0, 1]], [[0, 0, 1], [0, 0, 1]])
+
+        assert len(index._large) == 1
+        assert distances == pytest.approx([19.0, 19.0])
+
+    def test_wall_thickness_of_hollow_box(self):
+        index = TriangleIndex(_soup(_hollow_box(outer=20.0, wall=2.0)))
+
+        thickness = index.wall_thickness()
+
+        assert np.all(np.isfinite(thickness))
+        np.testing.assert_allclose(thickness, 2.0)
+
+    def test_open_surface_has_no_thickness(self):
+        plane = trimesh.creation.box(extents=[10, 10, 1])
+        top = _soup(plane)[np.asarray(plane.face_normals)[:, 2] > 0.9]
+
+        assert np.all(np.isinf(TriangleIndex(top).wall_thickness()))
+
+
+class TestGeometryAnalyzerWallThickness:
+    """The design analysis measures walls by ray casting."""
+
+    def test_solid_and_hollow_parts(self):
+        from core.ai_design_enhancer import GeometryAnalyzer
+        analyzer = GeometryAnalyzer()
+        solid = _soup(trimesh.creation.box(extents=[30, 20, 10])).reshape(-1, 3)
+
+        minimum, average = analyzer._analyze_wall_thickness(solid)
+        hollow_min, hollow_avg = analyzer._analyze_wall_thickness(_soup(_hollow_box()).reshape(-1, 3))
+
+        assert minimum == pytest.approx(10.0)
+        assert 10.0 < average < 30.0
+        assert (hollow_min, hollow_avg) == (pytest.approx(2.0), pytest.approx(2.0))
+
+    def test_flipped_normals_are_reoriented(self):
+        from core.ai_design_enhancer import GeometryAnalyzer
+        box = trimesh.creation.box(extents=[10, 10, 10])
+        inverted = _soup(box)[:, ::-1]
+
+        minimum, _ = GeometryAnalyzer()._analyze_wall_thickness(inverted, np.asarray(box.face_normals))
+
+        assert minimum == pytest.approx(10.0)
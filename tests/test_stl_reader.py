@@ -0,0 +1,136 @@
+"""
+Tests for the NumPy STL reader and its use in the print preview and the
+AI design analysis.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.stl_reader import STL_BINARY_DTYPE, is_binary_stl, read_stl
+
+# Unit cube as 12 triangles (outward normals)
+CUBE_TRIANGLES = np.array([
+    [[0, 0, 0], [0, 1, 0], [1, 1, 0]], [[0, 0, 0], [1, 1, 0], [1, 0, 0]],
+    [[0, 0, 1], [1, 0, 1], [1, 1, 1]], [[0, 0, 1], [1, 1, 1], [0, 1, 1]],
+    [[0, 0, 0], [1, 0, 0], [1, 0, 1]], [[0, 0, 0], [1, 0, 1], [0, 0, 1]],
+    [[0, 1, 0], [0, 1, 1], [1, 1, 1]], [[0, 1, 0], [1, 1, 1], [1, 1, 0]],
+    [[0, 0, 0], [0, 0, 1], [0, 1, 1]], [[0, 0, 0], [0, 1, 1], [0, 1, 0]],
+    [[1, 0, 0], [1, 1, 0], [1, 1, 1]], [[1, 0, 0], [1, 1, 1], [1, 0, 1]],
+], dtype=np.float32) * 10.0
+
+
+def _normals(triangles):
+    cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    return (cross / np.linalg.norm(cross, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _write_binary(path, triangles, header=b'binary test'):
+    records = np.zeros(len(triangles), dtype=STL_BINARY_DTYPE)
+    records['vertices'] = triangles
+    records['normal'] = _normals(triangles)
+    with open(path, 'wb') as handle:
+        handle.write(header.ljust(80, b' '))
+        handle.write(np.uint32(len(triangles)).tobytes())
+        records.tofile(handle)
+
+
+def _write_ascii(path, triangles, keyword=str.lower):
+    lines = ["solid cube"]
+    for triangle, normal in zip(triangles, _normals(triangles)):
+        lines.append(keyword("facet normal") + " {:e} {:e} {:e}".format(*normal))
+        lines.append("  " + keyword("outer loop"))
+        for vertex in triangle:
+            lines.append("    " + keyword("vertex") + " {} {} {}".format(*vertex))
+        lines.append("  " + keyword("endloop"))
+        lines.append(keyword("endfacet"))
+    lines.append("endsolid cube")
+    path.write_text("\n".join(lines) + "\n")
+
+
+class TestSTLReader:
+    """Binary and ASCII STL reading."""
+
+    def test_binary_is_memory_mapped(self, tmp_path):
+        path = tmp_path / "cube.stl"
+        _write_binary(path, CUBE_TRIANGLES)
+
+        mesh = read_stl(path)
+
+        assert isinstance(mesh.triangles.base, np.memmap) or isinstance(mesh.triangles, np.memmap)
+        assert mesh.triangle_count == 12
+        np.testing.assert_array_equal(mesh.triangles, CUBE_TRIANGLES)
+        assert mesh.bounds == {'x': (0.0, 10.0), 'y': (0.0, 10.0), 'z': (0.0, 10.0)}
+
+    def test_binary_header_starting_with_solid(self, tmp_path):
+        path = tmp_path / "solid_header.stl"
+        _write_binary(path, CUBE_TRIANGLES, header=b'solid exported by CAD')
+
+        assert is_binary_stl(path)
+        assert read_stl(path).triangle_count == 12
+
+    def test_truncated_binary_raises(self, tmp_path):
+        path = tmp_path / "truncated.stl"
+        _write_binary(path, CUBE_TRIANGLES)
+        path.write_bytes(path.read_bytes()[:-60])
+
+        with pytest.raises(ValueError):
+            read_stl(path)
+
+    @pytest.mark.parametrize("chunk_size", [64, 1000, 1 << 20])
+    def test_ascii_chunked(self, tmp_path, chunk_size):
+        path = tmp_path / "cube_ascii.stl"
+        _write_ascii(path, CUBE_TRIANGLES)
+
+        mesh = read_stl(path, chunk_size=chunk_size)
+
+        assert mesh.triangle_count == 12
+        np.testing.assert_allclose(mesh.triangles, CUBE_TRIANGLES)
+        np.testing.assert_allclose(mesh.normals, _normals(CUBE_TRIANGLES), atol=1e-6)
+
+    def test_ascii_uppercase_keywords(self, tmp_path):
+        path = tmp_path / "cube_upper.stl"
+        _write_ascii(path, CUBE_TRIANGLES, keyword=str.upper)
+        text = path.read_text().replace("ENDFACET", "endfacet")
+        path.write_text(text)
+
+        mesh = read_stl(path)
+
+        np.testing.assert_allclose(mesh.triangles, CUBE_TRIANGLES)
+
+
+class TestSTLConsumers:
+    """Preview and design analysis consume the array form."""
+
+    def test_preview_geometry(self, tmp_path):
+        from core.print_preview import PrintPreviewManager
+        path = tmp_path / "cube.stl"
+        _write_binary(path, CUBE_TRIANGLES)
+
+        preview = PrintPreviewManager(tmp_path / "preview").generate_stl_preview(path)
+
+        geometry = preview['geometry']
+        assert geometry['vertices'] == CUBE_TRIANGLES.ravel().tolist()
+        assert len(geometry['normals']) == 12 * 9
+        assert geometry['faces'] == list(range(36))
+        assert preview['statistics']['triangle_count'] == 12
+
+    def test_design_metrics_from_arrays(self, tmp_path):
+        from core.ai_design_enhancer import GeometryAnalyzer
+        from core.print_preview import STLParser
+        path = tmp_path / "cube.stl"
+        _write_binary(path, CUBE_TRIANGLES)
+
+        geometry_data = STLParser().parse_stl_file(path)
+        metrics = GeometryAnalyzer().analyze_stl_geometry(geometry_data)
+
+        assert metrics.triangle_count == 12
+        assert metrics.surface_area == pytest.approx(600.0)
+        assert metrics.volume == pytest.approx(1000.0)
+        assert metrics.bounding_box_volume == pytest.approx(1000.0)
+        # Two downward-facing triangles out of twelve
+        assert metrics.overhangs_percentage == pytest.approx(200 / 12)
@@ -0,0 +1,177 @@
+"""
+Tests for the template model cache and its use in the TemplateLibrary.
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.template_library import (
+    PrintDifficulty, Template, TemplateCategory, TemplateLibrary, TemplateParameter
+)
+from core.template_model_cache import (
+    TemplateModelCache, compute_model_key, normalize_parameters
+)
+
+
+def _template(**overrides):
+    fields = dict(
+        id="cube-template",
+        name="Calibration Cube",
+        description="Cube of adjustable size",
+        category=TemplateCategory.EDUCATIONAL,
+        difficulty=PrintDifficulty.BEGINNER,
+        parameters=[TemplateParameter("size", "Size", "number", 20, min_value=5, max_value=60, unit="mm")],
+        preview_image="",
+        model_file="",
+        tags=["calibration"],
+        author="tests",
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+    fields.update(overrides)
+    return Template(**fields)
+
+
+def _generator(tmp_path, calls):
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        path = tmp_path / f"model_{len(calls)}.stl"
+        path.write_text("solid cube\nendsolid cube\n")
+        return {"model_id": f"m{len(calls)}", "file_path": str(path), "printability_score": 0.9}
+    return generate
+
+
+class TestParameterKeys:
+    """Requests that describe the same model share a key."""
+
+    def test_defaults_quantization_and_whitespace(self):
+        specs = [TemplateParameter("size", "Size", "number", 20),
+                 TemplateParameter("label", "Label", "text", "A")]
+
+        assert normalize_parameters(specs, {}) == {"label": "A", "size": 20}
+        assert normalize_parameters(specs, {"size": 20.001, "label": " A "}) == {"label": "A", "size": 20}
+        assert normalize_parameters(specs, {"size": 20.25})["size"] == 20.25
+        assert normalize_parameters(specs, {"size": True})["size"] is True
+
+    def test_template_definition_changes_the_key(self):
+        template = _template()
+        parameters = normalize_parameters(template.parameters, {})
+        edited = _template(parameters=[TemplateParameter("size", "Size", "number", 25)])
+
+        assert compute_model_key(template, parameters) == compute_model_key(_template(usage_count=99), parameters)
+        assert compute_model_key(template, parameters) != compute_model_key(edited, parameters)
+
+
+class TestTemplateModelCache:
+    """Disk cache and single-flight behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_generate_once(self, tmp_path):
+        cache = TemplateModelCache(tmp_path / "cache")
+        calls = []
+
+        results = await asyncio.gather(*[
+            cache.get_or_create("key", _generator(tmp_path, calls)) for _ in range(4)
+        ])
+
+        assert len(calls) == 1
+        assert sorted(hit for _, hit in results) == [False, True, True, True]
+        # Every caller owns a distinct file with the generated content
+        paths = {result["file_path"] for result, _ in results}
+        assert len(paths) == 4
+        assert all(Path(path).read_text().startswith("solid cube") for path in paths)
+        assert cache.get_stats()["coalesced"] == 3
+
+    @pytest.mark.asyncio
+    async def test_stored_result_keeps_metadata(self, tmp_path):
+        cache = TemplateModelCache(tmp_path / "cache")
+        calls = []
+        await cache.get_or_create("key", _generator(tmp_path, calls))
+
+        result, hit = await cache.get_or_create("key", _generator(tmp_path, calls))
+
+        assert hit and len(calls) == 1
+        assert result["printability_score"] == 0.9
+        assert result["file_path"].endswith(".stl")
+
+    @pytest.mark.asyncio
+    async def test_uncacheable_results_are_not_stored(self, tmp_path):
+        cache = TemplateModelCache(tmp_path / "cache")
+        calls = []
+
+        for _ in range(2):
+            await cache.get_or_create("key", _generator(tmp_path, calls), cacheable=lambda result: False)
+
+        assert len(calls) == 2
+        assert cache.get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_size_limit_evicts(self, tmp_path):
+        cache = TemplateModelCache(tmp_path / "cache", max_size_bytes=60)
+        calls = []
+
+        for key in ("a", "b", "c"):
+            await cache.get_or_create(key, _generator(tmp_path, calls))
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 2 and stats["evictions"] == 1
+
+
+class TestTemplateLibraryCache:
+    """Customizations reuse generated models."""
+
+    @pytest.fixture
+    def library(self, tmp_path):
+        library = TemplateLibrary(str(tmp_path / "templates"), model_cache=TemplateModelCache(tmp_path / "cache"))
+        library.store.upsert(_template().to_dict())
+        return library
+
+    @pytest.mark.asyncio
+    async def test_equal_parameters_hit_the_cache(self, library):
+        first = await library.customize_template("cube-template", {"size": 20})
+        second = await library.customize_template("cube-template", {"size": 20.001})
+        other = await library.customize_template("cube-template", {"size": 30})
+
+        assert first["customized_model"]["generation_method"] == "real_cad"
+        assert not first["customized_model"]["cache_hit"]
+        assert second["customized_model"]["cache_hit"]
+        assert second["customized_model"]["cad_result"]["volume"] == pytest.approx(8000)
+        assert not other["customized_model"]["cache_hit"]
+        assert other["customized_model"]["cad_result"]["volume"] == pytest.approx(27000)
+
+    @pytest.mark.asyncio
+    async def test_assigned_cache_is_used(self, library, tmp_path):
+        configured = TemplateModelCache(tmp_path / "configured", max_entries=10)
+        library.model_cache = configured
+
+        await library.customize_template("cube-template", {"size": 20})
+
+        assert configured.get_stats()["entries"] == 1
+        assert any((tmp_path / "configured").iterdir())
+
+    @pytest.mark.asyncio
+    async def test_prewarm_generates_popular_defaults(self, library):
+        library.store.upsert(_template(usage_count=1000).to_dict())
+
+        assert (await library.prewarm_model_cache(limit=1)) == {"Calibration Cube": False}
+        result = await library.customize_template("cube-template", {})
+
+        assert result["customized_model"]["cache_hit"]
+        assert (await library.get_template("cube-template")).usage_count == 1001
+
+    @pytest.mark.asyncio
+    async def test_failed_generation_is_not_cached(self, library):
+        gear = (await library.get_templates(search_query="Simple Gear"))[0]
+
+        # CADAgent has no gear operation, so the library simulates the model
+        result = await library.customize_template(gear.id, {})
+
+        assert result["customized_model"]["generation_method"] == "fallback_simulation"
+        assert library.model_cache.get_stats()["entries"] == 0
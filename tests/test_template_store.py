@@ -0,0 +1,128 @@
+"""
+Tests for the indexed template store and its use in the TemplateLibrary.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.template_library import (
+    PrintDifficulty, Template, TemplateCategory, TemplateLibrary, TemplateParameter
+)
+from core.template_store import TemplateStore
+
+
+def _template(template_id, name, **overrides):
+    fields = dict(
+        id=template_id,
+        name=name,
+        description=f"{name} for the desk",
+        category=TemplateCategory.FUNCTIONAL,
+        difficulty=PrintDifficulty.BEGINNER,
+        parameters=[TemplateParameter("width", "Width", "number", 80, min_value=40, max_value=200, unit="mm")],
+        preview_image="",
+        model_file="",
+        tags=["desk"],
+        author="tests",
+        created_at=datetime(2026, 1, 1),
+        updated_at=datetime(2026, 1, 1)
+    )
+    fields.update(overrides)
+    return Template(**fields).to_dict()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TemplateStore(tmp_path / "templates.db")
+    store.upsert_many([
+        _template("stand", "Phone Stand", tags=["Phone", "desk"], rating=4.0, usage_count=50),
+        _template("gear", "Spur Gear", category=TemplateCategory.MECHANICAL,
+                  difficulty=PrintDifficulty.ADVANCED, tags=["gear", "mechanical"], rating=4.8, usage_count=5,
+                  created_at=datetime(2026, 1, 1) + timedelta(days=2)),
+        _template("box", "Storage Box", description="Box with a phone slot", tags=["storage"],
+                  rating=3.0, usage_count=400, created_at=datetime(2026, 1, 1) + timedelta(days=1)),
+    ])
+    yield store
+    store.close()
+
+
+def _ids(records):
+    return [record["id"] for record in records]
+
+
+class TestTemplateStore:
+    """Indexed queries and row updates."""
+
+    def test_round_trip(self, store):
+        record = store.get("stand")
+
+        assert Template.from_dict(record).parameters[0].max_value == 200
+        assert record["usage_count"] == 50
+        assert store.get("missing") is None
+
+    def test_filters_and_orderings(self, store):
+        assert _ids(store.query()) == ["gear", "stand", "box"]
+        assert _ids(store.query(order_by="popularity")) == ["box", "stand", "gear"]
+        assert _ids(store.query(order_by="recent")) == ["gear", "box", "stand"]
+        assert _ids(store.query(category="mechanical")) == ["gear"]
+        assert _ids(store.query(difficulty="beginner", limit=1, offset=1)) == ["box"]
+
+    def test_tag_filters_ignore_case(self, store):
+        assert _ids(store.query(tags=["PHONE", "gear"])) == ["gear", "stand"]
+        assert _ids(store.query(tags=["phone", "DESK"], match_all_tags=True)) == ["stand"]
+        assert store.query(tags=["phone", "gear"], match_all_tags=True) == []
+
+    def test_text_search_matches_substrings(self, store):
+        assert _ids(store.query(text="PHONE")) == ["stand", "box"]
+        assert _ids(store.query(text="ur ge")) == ["gear"]
+        assert _ids(store.query(text="ech")) == ["gear"]
+        # Too short for the trigram index
+        assert _ids(store.query(text="bo")) == ["box"]
+        assert store.query(text='"%_') == []
+
+    def test_updates_touch_the_row(self, store):
+        store.upsert(_template("stand", "Tablet Stand", tags=["tablet"]))
+
+        assert store.query(text="phone stand") == []
+        assert _ids(store.query(tags=["tablet"])) == ["stand"]
+        assert store.record_usage("stand") == 1
+        assert store.add_rating("stand", 5) == {"rating": 5.0, "rating_count": 1}
+        assert store.record_usage("missing") is None
+
+        assert store.delete("stand") and not store.delete("stand")
+        assert store.query(tags=["tablet"]) == [] and store.count() == 2
+
+    def test_builtins_keep_their_statistics(self, tmp_path):
+        builtin = _template("gear", "Spur Gear", usage_count=10)
+        store = TemplateStore(tmp_path / "templates.db", builtin_templates=[builtin])
+        store.record_usage("gear")
+        store.close()
+
+        reopened = TemplateStore(tmp_path / "templates.db", builtin_templates=[builtin])
+        assert reopened.get("gear")["usage_count"] == 11
+        reopened.close()
+
+
+class TestTemplateLibraryStore:
+    """The library reads and writes through the store."""
+
+    @pytest.mark.asyncio
+    async def test_ratings_and_search_persist(self, tmp_path):
+        library = TemplateLibrary(str(tmp_path / "templates"))
+        library._save_template(Template.from_dict(_template("stand", "Phone Stand", tags=["Phone"])))
+
+        assert (await library.rate_template("stand", 5))["new_rating"] == 5.0
+        assert (await library.rate_template("missing", 5))["error"] == "Template not found"
+        library.store.close()
+
+        reopened = TemplateLibrary(str(tmp_path / "templates"))
+        results = await reopened.search_templates(category="functional", search_term="stand", tags=["phone"])
+
+        assert [(t["id"], t["rating"]) for t in results] == [("stand", 5.0)]
+        assert {t["name"] for t in await reopened.list_templates()} == {"Phone Stand", "Simple Gear"}
+        assert (await reopened.get_categories_summary())["functional"]["count"] == 1
+        reopened.store.close()
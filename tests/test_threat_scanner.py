@@ -0,0 +1,99 @@
+"""
+Tests for the single-pass threat scanner behind InputSanitizer.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# core.security imports the MFA dependencies at module level
+pytest.importorskip("pyotp")
+pytest.importorskip("qrcode")
+
+from core.security import InputSanitizer, ThreatScanner
+
+PAYLOADS = [
+    "",
+    '{"name": "cat figurine", "height_mm": 42.5, "notes": "layers and supports"}',
+    "'; DROP TABLE users; --",
+    "1 OR 1=1",
+    "UNION ALL SELECT password FROM users",
+    "EXEC xp_cmdshell 'dir'",
+    "<script>alert('xss')</script>",
+    "<img src=x onerror=alert(1)>",
+    "javascript:alert(1)",
+    "background: url (evil.css); @import 'x'",
+    "os.system('rm -rf /')",
+    "__import__('os').popen('ls')",
+    "getattr(obj, name)",
+    "../../etc/passwd",
+    "..\\..\\windows",
+    "%2E%2E%2Fetc",
+    "C:\\Windows\\System32\\cmd.exe",
+    "file..%252f..%252fetc",
+    "information_schema.tables",
+]
+
+
+def _per_pattern(sanitizer, data):
+    """Detection the way sanitize_input did it: every regex searched on its own."""
+    threats, score = set(), 0
+    for category, patterns in sanitizer.threat_patterns.items():
+        flags = 0 if category == 'command_injection' else re.IGNORECASE
+        for regex, _ in patterns:
+            if re.search(regex, data, flags):
+                threats.add(category)
+                score += sanitizer.threat_scores[category]
+    return threats, score
+
+
+class TestThreatScanner:
+    """Trigger-literal prefilter with regex confirmation."""
+
+    @pytest.fixture
+    def sanitizer(self):
+        return InputSanitizer()
+
+    @pytest.mark.parametrize("payload", PAYLOADS)
+    def test_matches_per_pattern_detection(self, sanitizer, payload):
+        result = sanitizer.sanitize_input(payload, strict_mode=False)
+
+        assert (set(result['detected_threats']), result['threat_score']) == _per_pattern(sanitizer, payload)
+
+    def test_shared_pattern_is_compiled_once(self, sanitizer):
+        shared = [p for p in sanitizer.scanner.patterns if p.regex.pattern == r"\.\./"]
+
+        assert len(shared) == 1
+        assert shared[0].categories == ('command_injection', 'path_traversal')
+        assert sanitizer.sanitize_input("../x", strict_mode=False)['threat_score'] == 9 + 7
+
+    def test_benign_input_is_safe(self, sanitizer):
+        result = sanitizer.sanitize_input(PAYLOADS[1])
+
+        assert result['is_safe'] and result['threat_level'] is None
+        assert result['sanitized_data'] == PAYLOADS[1]
+
+    def test_strict_mode_removes_reassembled_matches(self, sanitizer):
+        result = sanitizer.sanitize_input("..././etc")
+
+        assert result['sanitized_data'] == "etc"
+        assert not sanitizer.scanner.matching(result['sanitized_data'])
+
+    def test_non_ascii_input_confirms_every_pattern(self, sanitizer):
+        # U+017F (long s) matches "s" case-insensitively, but does not lower-case to it
+        assert 'sql_injection' in sanitizer.detect_threats("UNION \u017fELECT 1")
+        assert sanitizer.detect_threats("h\u00e9llo w\u00f6rld") == []
+
+    def test_patterns_without_triggers_are_always_confirmed(self):
+        scanner = ThreatScanner([
+            ('a', r"ab+c", re.IGNORECASE, [("ab", "c")]),
+            ('b', r"\d{3}", 0, None),
+        ])
+
+        assert [p.categories for p in scanner.matching("xABBBC 123")] == [('a',), ('b',)]
+        assert [p.categories for p in scanner.matching("abx 12")] == []
+        assert scanner.remove("xabc123y") == "xy"